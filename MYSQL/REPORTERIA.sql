@@ -158,7 +158,8 @@ SELECT
     COALESCE(SUM(CASE WHEN a.equipo_id = p.equipo_local_id     THEN a.puntos END),0),
     '-',
     COALESCE(SUM(CASE WHEN a.equipo_id = p.equipo_visitante_id THEN a.puntos END),0)
-  ) AS marcador_final
+  ) AS marcador_final,
+  p.partido_id                              -- clave para paginar por keyset (API de reportes)
 FROM dim_partido AS p
 LEFT JOIN dim_equipo AS el ON el.equipo_id = p.equipo_local_id
 LEFT JOIN dim_equipo AS ev ON ev.equipo_id = p.equipo_visitante_id
@@ -203,7 +204,8 @@ SELECT
     WHEN e.equipo_id = p.equipo_local_id     THEN 'Local'
     WHEN e.equipo_id = p.equipo_visitante_id THEN 'Visitante'
     ELSE 'Otro'
-  END AS tipo                                                      -- [2025-10-12] alias esperado por la UI
+  END AS tipo,                                                     -- [2025-10-12] alias esperado por la UI
+  rp.roster_id                                                     -- clave para paginar por keyset (API de reportes)
 FROM bridge_roster_partido AS rp
 JOIN dim_jugador AS j ON j.jugador_id = rp.jugador_id
 JOIN dim_equipo  AS e ON e.equipo_id  = rp.equipo_id
@@ -225,7 +227,8 @@ SELECT
     WHEN e.equipo_id = p.equipo_local_id     THEN 'Local'
     WHEN e.equipo_id = p.equipo_visitante_id THEN 'Visitante'
     ELSE 'Otro'
-  END AS tipo
+  END AS tipo,
+  rp.roster_id                                                      -- clave para paginar por keyset (API de reportes)
 FROM bridge_roster_partido rp
 JOIN dim_jugador j ON j.jugador_id = rp.jugador_id
 JOIN dim_equipo  e ON e.equipo_id  = rp.equipo_id
@@ -0,0 +1,43 @@
+"""
+Exporta el esquema estrella de mb_report a Parquet para análisis fuera de línea
+
+Escribe dim_equipo y dim_jugador completas y dim_partido, bridge_roster_partido y
+fact_anotacion por mes de fecha_hora_inicio (<tabla>/mes=AAAA-MM/part-0.parquet).
+Los meses cerrados ya exportados (marca "parquet.mes" en sync_state) no se
+reescriben; las particiones de meses abiertos que se quedaron sin partidos se
+borran. Necesita pyarrow (no está en requirements.txt: ``pip install pyarrow``).
+
+Uso:
+    python -m app.commands.export_parquet                     # meses nuevos y abiertos
+    python -m app.commands.export_parquet --dir /datos/mb_report
+    python -m app.commands.export_parquet --desde-cero        # ignora sync_state (reescribe todo)
+"""
+import argparse
+
+from app.data.reporte_parquet import ReporteParquet
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportación de mb_report a Parquet")
+    parser.add_argument("--dir", default=None, help="Directorio de salida (PARQUET_DIR)")
+    parser.add_argument("--batch", type=int, default=None, help="Filas por lote (PARQUET_BATCH)")
+    parser.add_argument("--compresion", default=None, help="zstd | snappy | gzip | none (PARQUET_COMPRESSION)")
+    parser.add_argument("--desde-cero", action="store_true", help="Ignora la marca de sync_state")
+    args = parser.parse_args()
+
+    exportacion = ReporteParquet(directorio=args.dir, batch=args.batch, compresion=args.compresion)
+    print(f"📦 Exportando mb_report a {exportacion.directorio}...")
+    reporte = exportacion.run(desde_cero=args.desde_cero)
+    if reporte.get("skipped"):
+        print("⏭️  Otra exportación está en curso")
+        return
+    print(f"   meses: {', '.join(reporte['meses']) or '-'}  (último mes cerrado: {reporte['marca'] or '-'})")
+    if reporte["borrados"]:
+        print(f"   particiones sin partidos borradas: {', '.join(reporte['borrados'])}")
+    for nombre, t in reporte["tablas"].items():
+        print(f"   {nombre:24} {t['filas']:>10} filas  {t['archivos']:>4} archivos  {t['bytes'] / 1024:>10.1f} KB")
+    print(f"✅ {reporte['filas']} filas en {reporte['ms'] / 1000:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
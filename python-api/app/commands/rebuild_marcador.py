@@ -0,0 +1,33 @@
+"""
+Recalcula el marcador mantenido (dbo.MarcadorTotal/MarcadorCuarto) desde dbo.Anotacion
+
+Uso:
+    python -m app.commands.rebuild_marcador              # todos los partidos
+    python -m app.commands.rebuild_marcador --partido 5  # un partido
+"""
+import argparse
+import time
+
+from app.data.partido_data import PartidoDataAccess
+from app.data.pool import close_pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruye el marcador mantenido desde dbo.Anotacion")
+    parser.add_argument("--partido", type=int, default=None, help="ID del partido (por defecto, todos)")
+    args = parser.parse_args()
+
+    data_access = PartidoDataAccess()
+    objetivo = f"partido {args.partido}" if args.partido is not None else "todos los partidos"
+    print(f"🔧 Reconstruyendo marcador de {objetivo}...")
+
+    start = time.perf_counter()
+    try:
+        data_access.rebuild_marcador(args.partido)
+    finally:
+        close_pool()
+    print(f"✅ Marcador reconstruido en {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Reconcilia mb_report con SQL Server (cambios y borrados que el ETL incremental no ve)
+
+Compara dim_partido, bridge_roster_partido y fact_anotacion por rangos de clave con
+un árbol de hashes y repara en mb_report sólo los rangos que difieren.
+
+Uso:
+    python -m app.commands.reconciliar_reporte                     # las tres entidades
+    python -m app.commands.reconciliar_reporte --entidad fact_anotacion
+    python -m app.commands.reconciliar_reporte --chunk 1000 --fanout 32
+"""
+import argparse
+
+from app.data.pool import close_pool
+from app.data.reporte_reconciliacion import ReporteReconciliacion
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconciliación de mb_report con SQL Server")
+    parser.add_argument("--entidad", action="append", choices=list(ReporteReconciliacion.ENTIDADES),
+                        help="Entidad a reconciliar (se puede repetir; por defecto, todas)")
+    parser.add_argument("--chunk", type=int, default=None, help="Filas máximas por rango reparado (ETL_CHUNK_SIZE)")
+    parser.add_argument("--fanout", type=int, default=None, help="Sub-rangos por nivel (ETL_RECONCILE_FANOUT)")
+    args = parser.parse_args()
+
+    reconciliacion = ReporteReconciliacion(chunk_size=args.chunk, fanout=args.fanout)
+    print("🔍 Reconciliando mb_report...")
+    try:
+        reporte = reconciliacion.run(args.entidad)
+    finally:
+        close_pool()
+    if reporte.get("skipped"):
+        print("⏭️  Hay una sincronización en curso")
+        return
+    for nombre, e in reporte["entidades"].items():
+        print(f"   {nombre:24} hasta {e['hasta']:<10} {e['revisados']:>6} rangos  {e['distintos']:>5} distintos"
+              f"  {e['reparados']:>5} reparados  {e['upserts']:>6} upserts  {e['borrados']:>6} borrados"
+              f"  {e['ms']:>8.1f} ms")
+        for desde, hasta in e["rangos"]:
+            print(f"      reparado [{desde}, {hasta}]")
+    print(f"✅ {reporte['revisados']} rangos revisados, {reporte['reparados']} reparados"
+          f" en {reporte['ms'] / 1000:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Sincroniza mb_report (reportería MySQL) desde SQL Server de forma incremental
+
+Carga dim_equipo, dim_jugador, dim_partido, bridge_roster_partido y fact_anotacion
+a partir de la marca de agua de cada una en sync_state (sólo las filas nuevas, en
+tramos con upsert).
+
+Uso:
+    python -m app.commands.sync_reporte                       # todas las entidades
+    python -m app.commands.sync_reporte --entidad fact_anotacion
+    python -m app.commands.sync_reporte --desde-cero          # ignora sync_state (recarga todo)
+    python -m app.commands.sync_reporte --estado              # muestra las marcas de agua
+"""
+import argparse
+
+from app.data.pool import close_pool
+from app.data.reporte_sync import POR_NOMBRE, ReporteSync
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ETL incremental de SQL Server a mb_report")
+    parser.add_argument("--entidad", action="append", choices=list(POR_NOMBRE),
+                        help="Entidad a cargar (se puede repetir; por defecto, todas)")
+    parser.add_argument("--chunk", type=int, default=None, help="Filas por tramo (ETL_CHUNK_SIZE)")
+    parser.add_argument("--workers", type=int, default=None, help="Extracciones simultáneas (ETL_WORKERS)")
+    parser.add_argument("--desde-cero", action="store_true", help="Ignora las marcas de sync_state")
+    parser.add_argument("--estado", action="store_true", help="Sólo muestra las marcas de agua")
+    args = parser.parse_args()
+
+    sync = ReporteSync(chunk_size=args.chunk, workers=args.workers)
+    try:
+        if args.estado:
+            for nombre, marca in sync.estado().items():
+                print(f"   {nombre:24} {marca['lastId'] if marca else '-':>12}  {marca['lastTs'] if marca else ''}")
+            return
+        print("🔄 Sincronizando mb_report...")
+        reporte = sync.run(args.entidad, desde_cero=args.desde_cero)
+    finally:
+        close_pool()
+    if reporte.get("skipped"):
+        print("⏭️  Otra sincronización está en curso")
+        return
+    abiertos = reporte.get("abiertos")
+    if abiertos:
+        print(f"   partidos abiertos        {abiertos['partidos']:>8} partidos  {abiertos['roster']:>8} roster"
+              f"  {abiertos['borrados']} borrados  {abiertos['ms']:>8.1f} ms")
+    for nombre, e in reporte["entidades"].items():
+        print(f"   {nombre:24} {e['filas']:>8} filas  {e['tramos']:>4} tramos  last_id {e['lastId']:<10}"
+              f"  extraer {e['extraerMs']:>8.1f}  espera {e['esperaMs']:>8.1f}  cargar {e['cargarMs']:>8.1f}"
+              f"  fin {e['finMs']:>8.1f} ms  x{e['intentos']}")
+        if e.get("error"):
+            print(f"      ❌ {e['error']}")
+    print(f"✅ {reporte['filas']} filas en {reporte['ms'] / 1000:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,80 @@ class Settings(BaseSettings):
     sqlserver_username: str = "sa"
     sqlserver_password: str = os.getenv("MSSQL_SA_PASSWORD", "")
     
+    # SQL Server connection pool (uno por worker de uvicorn)
+    sqlserver_pool_size: int = 10
+    sqlserver_pool_timeout: float = 5.0      # segundos de espera por una conexión libre
+    sqlserver_pool_recycle: int = 1800       # vida máxima de una conexión (segundos)
+    sqlserver_pool_ping_after: int = 30      # validar conexiones ociosas por más de N segundos
+    
+    # Executor de consultas (hilos dedicados para no bloquear el event loop)
+    db_executor_workers: int = 10            # consultas simultáneas; no mayor que sqlserver_pool_size
+    db_executor_max_pending: int = 100       # consultas en el pool de hilos (en ejecución + en su cola); las demás esperan sin tope
+    
+    # Marcador mantenido (dbo.MarcadorTotal/MarcadorCuarto)
+    marcador_cache_ttl: float = 2.0          # segundos; la API .NET también escribe anotaciones
+    
+    # KPIs del dashboard (foto en memoria, invalidada por escrituras)
+    kpi_max_staleness: float = 30.0          # segundos; red de seguridad para escrituras externas
+    
+    # Próximos partidos (caché que caduca al inicio de cada partido)
+    proximos_cache_size: int = 10            # partidos precalculados
+    proximos_max_staleness: float = 300.0    # segundos; red de seguridad para escrituras externas
+    
+    # Ingesta de eventos de partido: anotaciones, faltas y tiempos muertos (lotes por partido)
+    evento_ingest_interval_ms: int = 50      # espera máxima antes de escribir lo acumulado
+    evento_ingest_max_batch: int = 200       # eventos por lote (máx. 1000)
+    evento_ingest_retries: int = 6           # reintentos seguidos de un lote que falla (deadlock, conexión, pool)
+    evento_ingest_retry_backoff: float = 0.1 # segundos antes del primer reintento (se duplica en cada uno)
+    evento_ingest_retry_max: float = 5.0     # espera máxima entre reintentos; agotados, se vuelve a intentar tras ella
+    evento_dedupe_window: int = 1024         # eventoId recientes recordados por partido
+    evento_gap_timeout: float = 2.0          # segundos que un evento espera a los anteriores (seq)
+    evento_max_fuera_de_orden: int = 256     # eventos adelantados en espera por partido
+    evento_batch_max_items: int = 5000       # eventos por llamada a /eventos:batch
+    
+    # Paginación de listados de partidos (keyset)
+    partidos_page_size: int = 100
+    partidos_page_size_max: int = 500
+    
+    # API de reportes sobre las vistas de mb_report (keyset y exportación en streaming)
+    reportes_page_size: int = 100
+    reportes_page_size_max: int = 1000
+    reportes_export_batch: int = 1000        # filas por lectura del cursor del servidor y por bloque enviado
+    
+    # ETag por versión de partido (GET de partido y roster)
+    partido_etag_ttl: float = 30.0           # segundos; revalidación contra la base (escrituras de la API .NET)
+    
+    # Actualizaciones en vivo (WebSocket por partido)
+    live_queue_size: int = 64                # mensajes pendientes por conexión
+    live_overflow: str = "drop_oldest"       # drop_oldest | disconnect (consumidores lentos)
+    live_send_timeout: float = 5.0           # segundos máximos por envío
+    live_tick_ms: int = 100                  # ventana en la que se funden los cambios del marcador
+    live_refresh_interval: float = 2.0       # segundos; relectura para escrituras de la API .NET
+    live_history_size: int = 128             # parches recientes por partido (reanudar con Last-Event-ID)
+    live_sse_heartbeat: float = 15.0         # segundos sin cambios antes de un comentario de keep-alive
+    live_sse_min_interval: float = 0.0       # segundos mínimos entre envíos SSE (0 = sin límite)
+    live_broker: str = "inproc"              # inproc | unix | modulo:fabrica (broker externo)
+    live_broker_path: str = "/tmp/marcador-live.sock"  # socket del modo unix (compartido por los workers)
+    live_state_poll_interval: float = 1.0    # segundos; seguimiento de escrituras de la API .NET
+    live_state_lookback: int = 256           # últimos IDs releídos por tabla (commits tardíos)
+    
+    # ETL a mb_report (reportería, incremental por sync_state)
+    etl_sync_interval: float = 0.0           # segundos entre sincronizaciones en segundo plano (0 = desactivada)
+    etl_chunk_size: int = 5000               # filas por lectura de SQL Server y por upsert en MySQL
+    etl_lookback: int = 256                  # últimos IDs releídos por entidad (commits tardíos)
+    etl_workers: int = 5                     # tramos leídos a la vez de SQL Server (una conexión cada uno)
+    etl_prefetch: int = 2                    # tramos extraídos en espera de carga por entidad
+    etl_retries: int = 2                     # reintentos por entidad antes de dar la corrida por fallida
+    etl_retry_backoff: float = 1.0           # segundos antes del primer reintento (se duplica en cada uno)
+    etl_reconcile_interval: float = 0.0      # segundos entre reconciliaciones con mb_report (0 = desactivada)
+    etl_reconcile_fanout: int = 16           # sub-rangos por nivel del árbol de hashes
+    
+    # Exportación Parquet del esquema estrella de mb_report (análisis fuera de línea; requiere pyarrow)
+    parquet_dir: str = "exports/parquet"     # un directorio por tabla; las de partido, por mes (mes=AAAA-MM)
+    parquet_batch: int = 50000               # filas por lectura del cursor del servidor y por row group
+    parquet_compression: str = "zstd"        # zstd | snappy | gzip | none
+    parquet_margen_horas: float = 24.0       # horas tras el fin de un mes antes de darlo por cerrado
+    
     mysql_host: str = "localhost"
     mysql_port: int = 3306
     mysql_database: str = "mb_report"
@@ -29,6 +103,7 @@ class Settings(BaseSettings):
     # Environment
     environment: str = os.getenv("ENVIRONMENT", "development")
     debug: bool = environment == "development"
+    log_level: str = "INFO"                  # DEBUG muestra el detalle de cada petición
     
     class Config:
         env_file = ".env"
@@ -39,6 +114,17 @@ class Settings(BaseSettings):
     def sqlserver_url(self) -> str:
         return f"mssql+pyodbc://{self.sqlserver_username}:{self.sqlserver_password}@{self.sqlserver_host}:{self.sqlserver_port}/{self.sqlserver_database}?driver=ODBC+Driver+17+for+SQL+Server&TrustServerCertificate=yes"
     
+    @property
+    def sqlserver_odbc_connection_string(self) -> str:
+        return (
+            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+            f"SERVER={self.sqlserver_host},{self.sqlserver_port};"
+            f"DATABASE={self.sqlserver_database};"
+            f"UID={self.sqlserver_username};"
+            f"PWD={self.sqlserver_password};"
+            f"TrustServerCertificate=yes;"
+        )
+    
     @property
     def mysql_url(self) -> str:
         return f"mysql+pymysql://{self.mysql_username}:{self.mysql_password}@{self.mysql_host}:{self.mysql_port}/{self.mysql_database}"
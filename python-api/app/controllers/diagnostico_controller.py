@@ -0,0 +1,81 @@
+from fastapi import APIRouter
+from app.data.evento_ingest import get_evento_ingest
+from app.data.executor import get_db_executor
+from app.data.kpi_snapshot import get_kpi_snapshot
+from app.data.live_state import get_live_state
+from app.data.partido_versions import get_partido_versiones
+from app.data.pool import get_pool
+from app.data.proximos_cache import get_proximos_cache
+from app.data.reporte_reconciliacion import get_reporte_reconciliacion
+from app.data.reporte_sync import get_reporte_sync
+from app.data.statements import get_statement_catalog
+from app.realtime.reloj import get_reloj_hub
+from app.realtime.scoreboard import get_scoreboard_hub
+
+router = APIRouter()
+
+@router.get("/pool")
+async def get_pool_stats():
+    """Estadísticas del pool de conexiones a SQL Server de este worker"""
+    return get_pool().stats()
+
+@router.get("/executor")
+async def get_executor_stats():
+    """Estadísticas del executor de consultas de este worker"""
+    return get_db_executor().stats()
+
+@router.get("/kpis")
+async def get_kpi_snapshot_stats():
+    """Estado de la foto de KPIs del dashboard de este worker"""
+    return get_kpi_snapshot().stats()
+
+@router.get("/proximos")
+async def get_proximos_cache_stats():
+    """Estado de la caché de próximos partidos de este worker"""
+    return get_proximos_cache().stats()
+
+@router.get("/eventos")
+async def get_evento_ingest_stats():
+    """Ingesta de eventos de partido de este worker: pendientes, lotes, duplicados y demora hasta el commit"""
+    return get_evento_ingest().stats()
+
+@router.get("/live")
+async def get_live_stats():
+    """Marcadores en vivo de este worker: secuencias, parches fundidos y suscriptores"""
+    return get_scoreboard_hub().stats()
+
+@router.get("/estado-vivo")
+async def get_live_state_stats():
+    """Partidos en curso en memoria de este worker: memoria por partido y seguimiento de la base"""
+    return get_live_state().stats()
+
+@router.get("/versiones")
+async def get_version_stats():
+    """ETag por versión de partido en este worker: 304 servidos, revalidaciones y cambios"""
+    return get_partido_versiones().stats()
+
+@router.get("/reloj")
+async def get_reloj_stats():
+    """Transiciones del reloj publicadas y streams abiertos en este worker"""
+    return get_reloj_hub().stats()
+
+@router.get("/reporte-sync")
+async def get_reporte_sync_stats():
+    """ETL a mb_report de este worker: corridas, última corrida (filas y ms por entidad)"""
+    return get_reporte_sync().stats()
+
+@router.get("/reporte-reconciliacion")
+async def get_reporte_reconciliacion_stats():
+    """Reconciliación de mb_report de este worker: rangos revisados y reparados de la última corrida"""
+    return get_reporte_reconciliacion().stats()
+
+@router.get("/sentencias")
+async def get_statement_stats():
+    """Llamadas, filas y latencia (histograma) por sentencia SQL de este worker"""
+    return get_statement_catalog().stats()
+
+@router.delete("/sentencias")
+async def reset_statement_stats():
+    """Reinicia las métricas por sentencia de este worker"""
+    get_statement_catalog().reset()
+    return {"message": "Métricas reiniciadas"}
@@ -1,35 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.data.partido_data import PartidoDataAccess
-from app.dependencies import get_partido_data_access
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.data.kpi_snapshot import get_kpi_snapshot
+from app.data.partido_data import AsyncPartidoDataAccess
+from app.data.proximos_cache import get_proximos_cache
+from app.dependencies import get_async_partido_data_access
 
 router = APIRouter()
 
 @router.get("/kpis")
 async def get_kpis(
-    data_access: PartidoDataAccess = Depends(get_partido_data_access),
+    data_access: AsyncPartidoDataAccess = Depends(get_async_partido_data_access),
 ):
-    """Obtiene KPIs para el dashboard"""
+    """Obtiene KPIs para el dashboard (desde la foto en memoria)"""
     try:
-        with data_access.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Total equipos
-            cursor.execute("SELECT COUNT(*) FROM dbo.Equipo WHERE activo = 1")
-            total_equipos = cursor.fetchone()[0]
-            
-            # Total jugadores
-            cursor.execute("SELECT COUNT(*) FROM dbo.Jugador WHERE activo = 1")
-            total_jugadores = cursor.fetchone()[0]
-            
-            # Partidos pendientes (programados)
-            cursor.execute("SELECT COUNT(*) FROM dbo.Partido WHERE estado = 'programado'")
-            partidos_pendientes = cursor.fetchone()[0]
-            
-            return {
-                "totalEquipos": total_equipos,
-                "totalJugadores": total_jugadores,
-                "partidosPendientes": partidos_pendientes
-            }
+        # Camino rápido: la foto vigente se responde sin pasar por el executor
+        snapshot = get_kpi_snapshot().get_fresh()
+        if snapshot is None:
+            snapshot = await data_access.get_kpis_snapshot()
+        kpis, age = snapshot
+        
+        return {
+            "totalEquipos": kpis["total_equipos"],
+            "totalJugadores": kpis["total_jugadores"],
+            "partidosPendientes": kpis["partidos_pendientes"],
+            "snapshotAgeMs": round(age * 1000, 1)
+        }
             
     except Exception as e:
         raise HTTPException(
@@ -37,47 +31,55 @@ async def get_kpis(
             detail=f"Error al obtener KPIs: {str(e)}"
         )
 
+def _proximo_dto(partido: dict) -> dict:
+    return {
+        "id": partido["partido_id"],
+        "equipoLocalId": partido["equipo_local_id"],
+        "equipoVisitanteId": partido["equipo_visitante_id"],
+        "fechaHoraInicio": partido["fecha_hora_inicio"].isoformat() if partido["fecha_hora_inicio"] else None,
+        "sede": partido["sede"],
+        "estado": partido["estado"]
+    }
+
+async def _proximos(data_access: AsyncPartidoDataAccess, n: int) -> list:
+    # Camino rápido: la caché precalculada responde sin pasar por el executor
+    proximos = get_proximos_cache().get_fresh(n)
+    if proximos is None:
+        proximos = await data_access.get_proximos_partidos(n)
+    return proximos
+
 @router.get("/proximo")
 async def get_proximo_partido(
-    data_access: PartidoDataAccess = Depends(get_partido_data_access),
+    data_access: AsyncPartidoDataAccess = Depends(get_async_partido_data_access),
 ):
     """Obtiene el próximo partido programado"""
     try:
-        with data_access.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Buscar próximo partido programado
-            cursor.execute("""
-                SELECT TOP 1 
-                    partido_id,
-                    equipo_local_id,
-                    equipo_visitante_id,
-                    fecha_hora_inicio,
-                    sede,
-                    estado
-                FROM dbo.Partido 
-                WHERE estado = 'programado' 
-                    AND fecha_hora_inicio >= GETDATE()
-                ORDER BY fecha_hora_inicio ASC
-            """)
-            
-            partido = cursor.fetchone()
-            
-            if not partido:
-                # No hay próximo partido - retornar 204 No Content
-                return None
-            
-            return {
-                "id": partido[0],
-                "equipoLocalId": partido[1],
-                "equipoVisitanteId": partido[2],
-                "fechaHoraInicio": partido[3].isoformat() if partido[3] else None,
-                "sede": partido[4],
-                "estado": partido[5]
-            }
+        # Buscar próximo partido programado
+        proximos = await _proximos(data_access, 1)
+        
+        if not proximos:
+            # No hay próximo partido - retornar 204 No Content
+            return None
+        
+        return _proximo_dto(proximos[0])
             
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al obtener próximo partido: {str(e)}"
         )
+
+@router.get("/proximos")
+async def get_proximos_partidos(
+    n: int = Query(5, ge=1, le=50, description="Cantidad de partidos"),
+    data_access: AsyncPartidoDataAccess = Depends(get_async_partido_data_access),
+):
+    """Obtiene los próximos N partidos programados, del más cercano al más lejano"""
+    try:
+        return [_proximo_dto(p) for p in await _proximos(data_access, n)]
+            
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al obtener próximos partidos: {str(e)}"
+        )
@@ -0,0 +1,84 @@
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query, WebSocket, status
+from fastapi.responses import StreamingResponse
+from app.data.live_state import get_live_state
+from app.realtime.reloj import get_reloj_hub
+from app.realtime.scoreboard import get_scoreboard_hub
+
+router = APIRouter()
+
+@router.websocket("/partidos/{partido_id}")
+async def marcador_en_vivo(websocket: WebSocket, partido_id: int):
+    """Marcador en vivo: foto inicial con secuencia y luego parches; {"t": "r"} pide una foto nueva"""
+    await get_scoreboard_hub().serve(websocket, partido_id)
+
+@router.get("/partidos/{partido_id}/estado")
+async def estado_en_vivo(partido_id: int):
+    """Estado completo de un partido en curso (cuartos, faltas por jugador), desde memoria"""
+    detalle = get_live_state().detalle(partido_id)
+    if detalle is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="El partido no está en curso"
+        )
+    return detalle
+
+@router.get("/partidos/{partido_id}/reloj")
+async def reloj_de_juego(partido_id: int):
+    """Reloj del cuarto actual calculado en el servidor; el cliente lo descuenta si ``corriendo``"""
+    reloj = get_reloj_hub().reloj(partido_id)
+    if reloj is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="El partido no está en curso"
+        )
+    return reloj
+
+@router.get("/partidos/{partido_id}/reloj/sse")
+async def reloj_sse(partido_id: int):
+    """Reloj por Server-Sent Events: sólo inicio, pausa, reanudación, fin y cambio de cuarto"""
+    hub = get_reloj_hub()
+    if hub.reloj(partido_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="El partido no está en curso"
+        )
+    return StreamingResponse(
+        hub.stream(partido_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # nginx: no acumular el stream
+        },
+    )
+
+@router.get("/partidos/{partido_id}/sse")
+async def marcador_sse(
+    partido_id: int,
+    intervaloMinimo: Optional[float] = Query(None, ge=0, le=60, description="Segundos mínimos entre envíos"),
+    lastEventId: Optional[str] = Query(None, description="Alternativa al header Last-Event-ID"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """Marcador en vivo por Server-Sent Events (sólo lectura, para pantallas y overlays)"""
+    hub = get_scoreboard_hub()
+    try:
+        board = await hub.board(partido_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al obtener marcador: {str(e)}"
+        )
+    if board is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Partido no encontrado"
+        )
+    
+    return StreamingResponse(
+        hub.stream(board, last_event_id or lastEventId, intervaloMinimo),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # nginx: no acumular el stream
+        },
+    )
@@ -1,14 +1,27 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List, Dict, Any
+from fastapi import APIRouter, Body, HTTPException, Depends, Header, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+import logging
+from typing import List, Dict, Any, Optional
 from datetime import datetime
+from app.config import get_settings
 from app.models.partido_models import (
     PartidoDto, CreatePartidoRequest, UpdatePartidoRequest,
-    SaveRosterRequest, RosterEntryDto
+    SaveRosterRequest, RosterEntryDto, EstadoPartido
 )
-from app.data.partido_data import PartidoDataAccess
+from app.data.evento_ingest import (
+    ANOTACION, ConflictoSecuencia, LoteRechazado, PartidoNoEncontrado, get_evento_ingest, leer_evento,
+)
+from app.data.keyset import InvalidCursorError
+from app.data.partido_data import AsyncPartidoDataAccess
+from app.data.partido_versions import etag_coincide, get_partido_versiones
+from app.realtime.scoreboard import get_scoreboard_hub
+from app.dependencies import get_async_partido_data_access
+from app.logging_config import get_logger
+from app.serialization import FastJSONResponse, dumps
 # from app.auth import get_current_user  # Temporarily disabled for testing
 
 router = APIRouter(prefix="/api/admin/partidos", tags=["partidos"])
+logger = get_logger(__name__)
 
 @router.get("/test")
 async def test_endpoint():
@@ -16,70 +29,111 @@ async def test_endpoint():
     return {"message": "Python API funcionando correctamente", "status": "OK"}
 
 @router.get("/test-db")
-async def test_database():
+async def test_database(
+    data_access: AsyncPartidoDataAccess = Depends(get_async_partido_data_access)
+):
     """Endpoint de prueba de conexión a base de datos"""
     try:
-        data_access = PartidoDataAccess()
         # Intentar una consulta simple
-        with data_access.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1 as test")
-            result = cursor.fetchone()
-            return {"message": "Conexión a base de datos exitosa", "status": "OK", "test_result": result[0]}
+        result = await data_access.ping()
+        return {"message": "Conexión a base de datos exitosa", "status": "OK", "test_result": result}
     except Exception as e:
         return {"message": "Error de conexión a base de datos", "status": "ERROR", "error": str(e)}
 
 @router.post("/debug")
 async def debug_create_partido(request_data: dict):
     """Endpoint de debug para ver qué datos llegan del frontend"""
-    print(f"DEBUG RAW DATA: {request_data}")
+    logger.debug("debug.payload", extra={"payload": request_data})
     return {"received_data": request_data, "status": "DEBUG"}
 
-def get_partido_data_access():
-    """Dependency para obtener acceso a datos de partidos"""
-    return PartidoDataAccess()
+class PartidoFiltros:
+    """Filtros y paginación (keyset) comunes a los listados de partidos"""
+    
+    def __init__(
+        self,
+        equipoId: Optional[int] = Query(None, description="Partidos donde juega este equipo"),
+        sede: Optional[str] = Query(None, description="Sede exacta"),
+        desde: Optional[datetime] = Query(None, description="fecha_hora_inicio >= desde"),
+        hasta: Optional[datetime] = Query(None, description="fecha_hora_inicio < hasta"),
+        limit: Optional[int] = Query(None, ge=1, description="Tamaño de página"),
+        cursor: Optional[str] = Query(None, description="Token X-Next-Cursor de la página anterior"),
+    ):
+        settings = get_settings()
+        self.equipo_id = equipoId
+        self.sede = sede
+        self.desde = desde
+        self.hasta = hasta
+        # Sin limit ni cursor se devuelve todo: los clientes que no leen X-Next-Cursor
+        # (partidos.service.ts, historial.service.ts) siguen recibiendo la lista completa
+        self.limit = (min(limit or settings.partidos_page_size, settings.partidos_page_size_max)
+                      if limit is not None or cursor else None)
+        self.cursor = cursor
+
+async def listar_partidos(
+    data_access: AsyncPartidoDataAccess,
+    filtros: PartidoFiltros,
+    response: Response,
+    estado: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Obtiene una página de partidos y publica el cursor siguiente en X-Next-Cursor"""
+    try:
+        partidos, next_cursor = await data_access.list_partidos(
+            estado=estado,
+            equipo_id=filtros.equipo_id,
+            sede=filtros.sede,
+            desde=filtros.desde,
+            hasta=filtros.hasta,
+            limit=filtros.limit,
+            cursor=filtros.cursor,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return partidos
+
+def partido_dto(partido: Dict[str, Any]) -> Dict[str, Any]:
+    """PartidoDto como dict, sin validar: la fila viene de nuestra BD (fechas ya en ISO)"""
+    return {
+        "id": partido['id'],
+        "equipoLocalId": partido['equipo_local_id'],
+        "equipoVisitanteId": partido['equipo_visitante_id'],
+        "fechaHoraInicio": partido['fecha_hora_inicio'],
+        "estado": partido['estado'],
+        "minutosPorCuarto": partido['minutos_por_cuarto'],
+        "cuartosTotales": partido['cuartos_totales'],
+        "faltasPorEquipoLimite": partido['faltas_por_equipo_limite'],
+        "faltasPorJugadorLimite": partido['faltas_por_jugador_limite'],
+        "sede": partido['sede'],
+        "fechaCreacion": partido['fecha_creacion'],
+        "puntosLocal": partido['puntos_local'],
+        "puntosVisitante": partido['puntos_visitante'],
+    }
+
+def partidos_response(partidos: List[Dict[str, Any]], response: Response) -> FastJSONResponse:
+    """Lista de PartidoDto serializada en una sola pasada (sin revalidar response_model)"""
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return FastJSONResponse([partido_dto(p) for p in partidos], headers=headers)
 
 @router.get("/", response_model=List[PartidoDto])
 async def get_all_partidos(
-    data_access: PartidoDataAccess = Depends(get_partido_data_access)
+    response: Response,
+    estado: Optional[EstadoPartido] = Query(None, description="Filtrar por estado"),
+    filtros: PartidoFiltros = Depends(),
+    data_access: AsyncPartidoDataAccess = Depends(get_async_partido_data_access)
     # current_user: dict = Depends(get_current_user)  # Temporarily disabled
 ):
-    """Obtiene todos los partidos"""
+    """Obtiene los partidos (paginados por cursor, más recientes primero)"""
     try:
-        print("DEBUG GET ALL: Starting to get all partidos")
-        partidos = data_access.get_all_partidos()
-        print(f"DEBUG GET ALL: Retrieved {len(partidos)} partidos from database")
-        
-        # Convertir a DTOs para el frontend
-        partidos_dto = []
-        for i, partido in enumerate(partidos):
-            try:
-                print(f"DEBUG GET ALL: Processing partido {i}: {partido}")
-                dto = PartidoDto(
-                    id=partido.get('partido_id') or partido.get('id'),
-                    equipoLocalId=partido['equipo_local_id'],
-                    equipoVisitanteId=partido['equipo_visitante_id'],
-                    fechaHoraInicio=partido['fecha_hora_inicio'],  # Ya es string desde data layer
-                    estado=partido['estado'],
-                    minutosPorCuarto=partido['minutos_por_cuarto'],
-                    cuartosTotales=partido['cuartos_totales'],
-                    faltasPorEquipoLimite=partido['faltas_por_equipo_limite'],
-                    faltasPorJugadorLimite=partido['faltas_por_jugador_limite'],
-                    sede=partido['sede'],
-                    fechaCreacion=partido['fecha_creacion']  # Ya es string desde data layer
-                )
-                partidos_dto.append(dto)
-                print(f"DEBUG GET ALL: Successfully processed partido {i}")
-            except Exception as dto_error:
-                print(f"DEBUG GET ALL: Error processing partido {i}: {dto_error}")
-                print(f"DEBUG GET ALL: Partido data: {partido}")
-                raise
-        
-        print(f"DEBUG GET ALL: Successfully converted {len(partidos_dto)} partidos to DTOs")
-        return partidos_dto
+        partidos = await listar_partidos(data_access, filtros, response, estado=estado)
+        logger.debug("partidos.listado", extra={"partidos": len(partidos), "estado": estado})
+        return partidos_response(partidos, response)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG GET ALL: Error in get_all_partidos: {str(e)}")
+        logger.exception("partidos.listado.error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al obtener partidos: {str(e)}"
@@ -87,53 +141,60 @@ async def get_all_partidos(
 
 @router.get("/historial", response_model=List[PartidoDto])
 async def get_historial_partidos(
-    data_access: PartidoDataAccess = Depends(get_partido_data_access)
+    response: Response,
+    filtros: PartidoFiltros = Depends(),
+    data_access: AsyncPartidoDataAccess = Depends(get_async_partido_data_access)
     # current_user: dict = Depends(get_current_user)  # Temporarily disabled
 ):
-    """Obtiene el historial de partidos finalizados"""
+    """Obtiene el historial de partidos finalizados (paginado por cursor)"""
     try:
-        print("DEBUG HISTORIAL: Getting finalized matches")
-        partidos = data_access.get_partidos_by_estado("finalizado")
-        
-        # Convertir a DTOs para el frontend
-        partidos_dto = []
-        for partido in partidos:
-            dto = PartidoDto(
-                id=partido['partido_id'],
-                equipoLocalId=partido['equipo_local_id'],
-                equipoVisitanteId=partido['equipo_visitante_id'],
-                fechaHoraInicio=partido['fecha_hora_inicio'],  # Ya es string desde data layer
-                estado=partido['estado'],
-                minutosPorCuarto=partido['minutos_por_cuarto'],
-                cuartosTotales=partido['cuartos_totales'],
-                faltasPorEquipoLimite=partido['faltas_por_equipo_limite'],
-                faltasPorJugadorLimite=partido['faltas_por_jugador_limite'],
-                sede=partido['sede'],
-                fechaCreacion=partido['fecha_creacion'],  # Ya es string desde data layer
-                puntosLocal=partido['puntos_local'],
-                puntosVisitante=partido['puntos_visitante']
-            )
-            partidos_dto.append(dto)
-        
-        print(f"DEBUG HISTORIAL: Found {len(partidos_dto)} finalized matches")
-        return partidos_dto
+        partidos = await listar_partidos(data_access, filtros, response, estado="finalizado")
+        logger.debug("partidos.historial", extra={"partidos": len(partidos)})
+        return partidos_response(partidos, response)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG HISTORIAL: Error getting historial: {str(e)}")
+        logger.exception("partidos.historial.error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al obtener historial: {str(e)}"
         )
 
+def no_modificado(partido_id: int, recurso: str, if_none_match: Optional[str]) -> Optional[Response]:
+    """304 si el cliente ya tiene la versión vigente del recurso (sin tocar la base)"""
+    etag = get_partido_versiones().no_modificado(partido_id, recurso, if_none_match)
+    if etag is None:
+        return None
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+def respuesta_versionada(partido_id: int, recurso: str, contenido: Any, leida: int,
+                         if_none_match: Optional[str] = None) -> Response:
+    """JSON con el ETag de su contenido (sin ETag si hubo una escritura durante la lectura).
+    
+    Si lo releído es lo que el cliente ya tiene (p. ej. lo validó otro worker) responde 304.
+    """
+    body = dumps(contenido)
+    etag = get_partido_versiones().validar(partido_id, recurso, body, leida)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"} if etag else {}
+    if etag and etag_coincide(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @router.get("/{partido_id}", response_model=PartidoDto)
 async def get_partido_by_id(
     partido_id: int,
-    data_access: PartidoDataAccess = Depends(get_partido_data_access),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    data_access: AsyncPartidoDataAccess = Depends(get_async_partido_data_access),
     # current_user: dict = Depends(get_current_user)  # Temporarily disabled
 ):
-    """Obtiene un partido por ID"""
+    """Obtiene un partido por ID (ETag por versión: If-None-Match responde 304 sin consultar)"""
+    respuesta = no_modificado(partido_id, "partido", if_none_match)
+    if respuesta is not None:
+        return respuesta
     try:
-        partido = data_access.get_partido_by_id(partido_id)
+        leida = get_partido_versiones().version(partido_id)
+        partido = await data_access.get_partido_by_id(partido_id)
         
         if not partido:
             raise HTTPException(
@@ -156,7 +217,7 @@ async def get_partido_by_id(
             fechaCreacion=partido['fecha_creacion']
         )
         
-        return dto
+        return respuesta_versionada(partido_id, "partido", jsonable_encoder(dto), leida, if_none_match)
         
     except HTTPException:
         raise
@@ -167,7 +228,10 @@ async def get_partido_by_id(
         )
 
 @router.post("/start")
-async def start_partido(request_data: dict):
+async def start_partido(
+    request_data: dict,
+    data_access: AsyncPartidoDataAccess = Depends(get_async_partido_data_access)
+):
     """Crear/iniciar un nuevo partido"""
     try:
         equipo_local_id = request_data.get("equipoLocalId")
@@ -179,14 +243,12 @@ async def start_partido(request_data: dict):
                 detail="equipoLocalId y equipoVisitanteId son requeridos"
             )
         
-        data_access = PartidoDataAccess()
-        
         # Crear objeto con la estructura que espera create_partido
         from types import SimpleNamespace
         partido_data = SimpleNamespace(
             equipo_local_id=equipo_local_id,
             equipo_visitante_id=equipo_visitante_id,
-            fecha_hora_inicio=datetime.now().isoformat(),
+            fecha_hora_inicio=datetime.now(),  # partido.crear declara DATETIME2: no un string ISO
             estado="programado",
             minutos_por_cuarto=10,
             cuartos_totales=4,
@@ -195,22 +257,10 @@ async def start_partido(request_data: dict):
             sede="Cancha Principal"
         )
         
-        partido_id = data_access.create_partido(partido_data)
+        partido_id = await data_access.create_partido(partido_data)
         
         # Obtener datos de equipos para la respuesta
-        with data_access.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT equipo_id, nombre, abreviatura FROM Equipo WHERE equipo_id IN (?, ?)", 
-                         (equipo_local_id, equipo_visitante_id))
-            equipos = cursor.fetchall()
-            
-            equipos_dict = {}
-            for equipo in equipos:
-                equipos_dict[equipo[0]] = {
-                    "id": equipo[0],
-                    "nombre": equipo[1],
-                    "abreviatura": equipo[2] or ""
-                }
+        equipos_dict = await data_access.get_equipos_basicos([equipo_local_id, equipo_visitante_id])
         
         return {
             "partidoId": partido_id,
@@ -220,7 +270,7 @@ async def start_partido(request_data: dict):
         }
         
     except Exception as e:
-        print(f"ERROR en start_partido: {str(e)}")
+        logger.exception("partidos.start.error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al crear partido: {str(e)}"
@@ -229,13 +279,13 @@ async def start_partido(request_data: dict):
 @router.post("/", response_model=PartidoDto, status_code=status.HTTP_201_CREATED)
 async def create_partido(
     partido_request: CreatePartidoRequest,
-    data_access: PartidoDataAccess = Depends(get_partido_data_access),
+    data_access: AsyncPartidoDataAccess = Depends(get_async_partido_data_access),
     # current_user: dict = Depends(get_current_user)  # Temporarily disabled
 ):
     """Crea un nuevo partido"""
     try:
-        print(f"DEBUG: Received partido_request: {partido_request}")
-        print(f"DEBUG: Request dict: {partido_request.dict()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("partidos.crear", extra={"request": partido_request.model_dump()})
         
         # Validar que los equipos sean diferentes
         if partido_request.equipoLocalId == partido_request.equipoVisitanteId:
@@ -259,10 +309,10 @@ async def create_partido(
         )
         
         # Crear el partido
-        partido_id = data_access.create_partido(partido_data)
+        partido_id = await data_access.create_partido(partido_data)
         
         # Obtener el partido creado
-        partido_creado = data_access.get_partido_by_id(partido_id)
+        partido_creado = await data_access.get_partido_by_id(partido_id)
         
         if not partido_creado:
             raise HTTPException(
@@ -299,16 +349,16 @@ async def create_partido(
 async def update_partido(
     partido_id: int,
     partido_request: UpdatePartidoRequest,
-    data_access: PartidoDataAccess = Depends(get_partido_data_access),
+    data_access: AsyncPartidoDataAccess = Depends(get_async_partido_data_access),
     # current_user: dict = Depends(get_current_user)  # Temporarily disabled
 ):
     """Actualiza un partido existente"""
     try:
-        print(f"DEBUG UPDATE: Received partido_request: {partido_request}")
-        print(f"DEBUG UPDATE: Request dict: {partido_request.dict()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("partidos.actualizar", extra={"partidoId": partido_id, "request": partido_request.model_dump()})
         
         # Validar que el partido existe
-        partido_existente = data_access.get_partido_by_id(partido_id)
+        partido_existente = await data_access.get_partido_by_id(partido_id)
         if not partido_existente:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -325,15 +375,13 @@ async def update_partido(
         # Convertir datos del frontend al formato de base de datos
         try:
             from app.models.partido_models import PartidoBase
-            print(f"DEBUG UPDATE: Converting data to PartidoBase format")
             
             fecha_convertida = None
             if partido_request.fechaHoraInicio:
                 try:
                     fecha_convertida = datetime.fromisoformat(partido_request.fechaHoraInicio.replace('Z', '+00:00'))
-                    print(f"DEBUG UPDATE: Converted date: {fecha_convertida}")
                 except Exception as date_error:
-                    print(f"DEBUG UPDATE: Date conversion error: {date_error}")
+                    logger.warning("partidos.actualizar.fecha_invalida", extra={"partidoId": partido_id, "error": str(date_error)})
                     fecha_convertida = None
             
             partido_data = PartidoBase(
@@ -347,21 +395,20 @@ async def update_partido(
                 faltas_por_jugador_limite=partido_request.faltasPorJugadorLimite,
                 sede=partido_request.sede
             )
-            print(f"DEBUG UPDATE: PartidoBase created successfully")
         except Exception as conversion_error:
-            print(f"DEBUG UPDATE: Error creating PartidoBase: {conversion_error}")
+            logger.warning("partidos.actualizar.datos_invalidos", extra={"partidoId": partido_id, "error": str(conversion_error)})
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Error al convertir datos: {str(conversion_error)}"
             )
         
-        # Actualizar el partido
+        # Actualizar el partido (los equipos pueden cambiar: se descarta el estado de la ingesta)
+        await get_evento_ingest().flush(partido_id)
+        get_evento_ingest().forget(partido_id)
         try:
-            print(f"DEBUG UPDATE: Calling data_access.update_partido")
-            success = data_access.update_partido(partido_id, partido_data)
-            print(f"DEBUG UPDATE: Update result: {success}")
+            success = await data_access.update_partido(partido_id, partido_data)
         except Exception as update_error:
-            print(f"DEBUG UPDATE: Error updating partido: {update_error}")
+            logger.exception("partidos.actualizar.error", extra={"partidoId": partido_id})
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error al actualizar partido en base de datos: {str(update_error)}"
@@ -372,12 +419,11 @@ async def update_partido(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Error al actualizar el partido"
             )
+        get_scoreboard_hub().update(partido_id, {"estado": partido_data.estado})
         
         # Obtener el partido actualizado
         try:
-            print(f"DEBUG UPDATE: Getting updated partido {partido_id}")
-            partido_actualizado = data_access.get_partido_by_id(partido_id)
-            print(f"DEBUG UPDATE: Retrieved partido: {partido_actualizado}")
+            partido_actualizado = await data_access.get_partido_by_id(partido_id)
             
             if not partido_actualizado:
                 raise HTTPException(
@@ -386,7 +432,6 @@ async def update_partido(
                 )
             
             # Convertir a DTO para el frontend
-            print(f"DEBUG UPDATE: Creating DTO")
             dto = PartidoDto(
                 id=partido_actualizado.get('partido_id') or partido_actualizado.get('id'),
                 equipoLocalId=partido_actualizado['equipo_local_id'],
@@ -400,12 +445,11 @@ async def update_partido(
                 sede=partido_actualizado['sede'],
                 fechaCreacion=partido_actualizado['fecha_creacion']  # Ya es string desde data layer
             )
-            print(f"DEBUG UPDATE: DTO created successfully")
+            logger.debug("partidos.actualizado", extra={"partidoId": partido_id})
             
             return dto
         except Exception as dto_error:
-            print(f"DEBUG UPDATE: Error creating DTO: {dto_error}")
-            print(f"DEBUG UPDATE: Partido data: {partido_actualizado}")
+            logger.exception("partidos.actualizar.dto_error", extra={"partidoId": partido_id})
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error al procesar partido actualizado: {str(dto_error)}"
@@ -422,41 +466,38 @@ async def update_partido(
 @router.delete("/{partido_id}")
 async def delete_partido(
     partido_id: int,
-    data_access: PartidoDataAccess = Depends(get_partido_data_access),
+    data_access: AsyncPartidoDataAccess = Depends(get_async_partido_data_access),
     # current_user: dict = Depends(get_current_user)  # Temporarily disabled
 ):
     """Elimina un partido"""
     try:
-        print(f"DEBUG DELETE: Attempting to delete partido with ID: {partido_id}")
         
         # Validar que el partido existe
-        partido_existente = data_access.get_partido_by_id(partido_id)
+        partido_existente = await data_access.get_partido_by_id(partido_id)
         if not partido_existente:
-            print(f"DEBUG DELETE: Partido {partido_id} not found")
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Partido no encontrado"
             )
         
-        print(f"DEBUG DELETE: Found partido {partido_id}, proceeding with deletion")
-        
-        # Eliminar el partido
-        success = data_access.delete_partido(partido_id)
+        # Eliminar el partido (con lo que quedara sin escribir de sus anotaciones)
+        get_evento_ingest().forget(partido_id)
+        success = await data_access.delete_partido(partido_id)
         
         if not success:
-            print(f"DEBUG DELETE: Failed to delete partido {partido_id}")
+            logger.error("partidos.eliminar.fallo", extra={"partidoId": partido_id})
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Error al eliminar el partido"
             )
         
-        print(f"DEBUG DELETE: Successfully deleted partido {partido_id}")
+        logger.info("partidos.eliminado", extra={"partidoId": partido_id})
         return {"message": "Partido eliminado exitosamente", "partidoId": partido_id}
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"DEBUG DELETE: Exception occurred: {str(e)}")
+        logger.exception("partidos.eliminar.error", extra={"partidoId": partido_id})
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al eliminar partido: {str(e)}"
@@ -466,14 +507,13 @@ async def delete_partido(
 async def update_partido_estado(
     partido_id: int,
     estado_data: dict,
-    data_access: PartidoDataAccess = Depends(get_partido_data_access)
+    data_access: AsyncPartidoDataAccess = Depends(get_async_partido_data_access)
 ):
     """Actualiza solo el estado de un partido"""
     try:
-        print(f"DEBUG UPDATE ESTADO: Updating partido {partido_id} to estado: {estado_data}")
         
         # Validar que el partido existe
-        partido_existente = data_access.get_partido_by_id(partido_id)
+        partido_existente = await data_access.get_partido_by_id(partido_id)
         if not partido_existente:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -491,7 +531,7 @@ async def update_partido_estado(
             )
         
         # Actualizar solo el estado
-        success = data_access.update_partido_estado(partido_id, nuevo_estado)
+        success = await data_access.update_partido_estado(partido_id, nuevo_estado)
         
         if not success:
             raise HTTPException(
@@ -499,13 +539,14 @@ async def update_partido_estado(
                 detail="Error al actualizar el estado del partido"
             )
         
-        print(f"DEBUG UPDATE ESTADO: Successfully updated partido {partido_id} to {nuevo_estado}")
+        get_scoreboard_hub().update(partido_id, {"estado": nuevo_estado})
+        logger.info("partidos.estado", extra={"partidoId": partido_id, "estado": nuevo_estado})
         return {"message": "Estado actualizado exitosamente", "partidoId": partido_id, "nuevoEstado": nuevo_estado}
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"DEBUG UPDATE ESTADO: Error: {str(e)}")
+        logger.exception("partidos.estado.error", extra={"partidoId": partido_id})
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al actualizar estado: {str(e)}"
@@ -515,20 +556,25 @@ async def update_partido_estado(
 @router.get("/{partido_id}/roster")
 async def get_roster_partido(
     partido_id: int,
-    data_access: PartidoDataAccess = Depends(get_partido_data_access),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    data_access: AsyncPartidoDataAccess = Depends(get_async_partido_data_access),
     # current_user: dict = Depends(get_current_user)  # Temporarily disabled
 ):
-    """Obtiene el roster de un partido"""
+    """Obtiene el roster de un partido (ETag por versión, como el partido)"""
+    respuesta = no_modificado(partido_id, "roster", if_none_match)
+    if respuesta is not None:
+        return respuesta
     try:
+        leida = get_partido_versiones().version(partido_id)
         # Validar que el partido existe
-        partido_existente = data_access.get_partido_by_id(partido_id)
+        partido_existente = await data_access.get_partido_by_id(partido_id)
         if not partido_existente:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Partido no encontrado"
             )
         
-        roster_data = data_access.get_roster_by_partido(partido_id)
+        roster_data = await data_access.get_roster_by_partido(partido_id)
         
         # Convertir a formato esperado por el frontend
         roster_dto = []
@@ -541,7 +587,7 @@ async def get_roster_partido(
             }
             roster_dto.append(dto)
         
-        return roster_dto
+        return respuesta_versionada(partido_id, "roster", roster_dto, leida, if_none_match)
         
     except HTTPException:
         raise
@@ -555,13 +601,13 @@ async def get_roster_partido(
 async def save_roster_partido(
     partido_id: int,
     roster_request: SaveRosterRequest,
-    data_access: PartidoDataAccess = Depends(get_partido_data_access),
+    data_access: AsyncPartidoDataAccess = Depends(get_async_partido_data_access),
     # current_user: dict = Depends(get_current_user)  # Temporarily disabled
 ):
     """Guarda el roster completo de un partido"""
     try:
         # Validar que el partido existe
-        partido_existente = data_access.get_partido_by_id(partido_id)
+        partido_existente = await data_access.get_partido_by_id(partido_id)
         if not partido_existente:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -575,16 +621,10 @@ async def save_roster_partido(
                 detail="El ID del partido no coincide"
             )
         
-        # Guardar el roster
-        success = data_access.save_roster_complete(partido_id, roster_request.items)
-        
-        if not success:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Error al guardar el roster"
-            )
+        # Guardar el roster (sólo las diferencias con lo guardado)
+        cambios = await data_access.save_roster_complete(partido_id, roster_request.items)
         
-        return {"message": "Roster guardado exitosamente"}
+        return {"message": "Roster guardado exitosamente", **cambios}
         
     except HTTPException:
         raise
@@ -598,12 +638,12 @@ async def save_roster_partido(
 async def update_estado_partido(
     partido_id: int,
     request_data: dict,
-    data_access: PartidoDataAccess = Depends(get_partido_data_access),
+    data_access: AsyncPartidoDataAccess = Depends(get_async_partido_data_access),
 ):
     """Actualiza el estado de un partido"""
     try:
         # Validar que el partido existe
-        partido_existente = data_access.get_partido_by_id(partido_id)
+        partido_existente = await data_access.get_partido_by_id(partido_id)
         if not partido_existente:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -618,20 +658,14 @@ async def update_estado_partido(
             )
         
         # Actualizar estado en base de datos
-        with data_access.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "UPDATE dbo.Partido SET estado = ? WHERE partido_id = ?",
-                (nuevo_estado, partido_id)
+        success = await data_access.update_partido_estado(partido_id, nuevo_estado)
+        if not success:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No se pudo actualizar el partido"
             )
-            conn.commit()
-            
-            if cursor.rowcount == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="No se pudo actualizar el partido"
-                )
         
+        get_scoreboard_hub().update(partido_id, {"estado": nuevo_estado})
         return {"message": f"Estado actualizado a '{nuevo_estado}' exitosamente"}
         
     except HTTPException:
@@ -642,83 +676,99 @@ async def update_estado_partido(
             detail=f"Error al actualizar estado: {str(e)}"
         )
 
-@router.post("/{partido_id}/anotaciones/ajustar")
-async def ajustar_puntos_partido(
+@router.get("/{partido_id}/marcador")
+async def get_marcador_partido(
     partido_id: int,
-    request_data: dict,
-    data_access: PartidoDataAccess = Depends(get_partido_data_access),
+    data_access: AsyncPartidoDataAccess = Depends(get_async_partido_data_access),
 ):
-    """Ajusta puntos de un equipo en un partido"""
+    """Obtiene el marcador actual (totales y por cuarto) de un partido"""
     try:
-        # Validar que el partido existe
-        partido_existente = data_access.get_partido_by_id(partido_id)
-        if not partido_existente:
+        marcador = await data_access.get_marcador(partido_id)
+        
+        if not marcador:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Partido no encontrado"
             )
         
-        equipo_id = request_data.get("equipoId")
-        puntos = request_data.get("puntos")
+        return marcador
         
-        if not equipo_id or puntos is None:
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al obtener marcador: {str(e)}"
+        )
+
+def _publicar_marcador(partido_id: int, marcador: Dict[str, Any]) -> None:
+    """Lleva el estado de la ingesta al marcador en vivo (sólo salen los campos que cambian)"""
+    get_scoreboard_hub().update(partido_id, {
+        "puntos_local": marcador["local"],
+        "puntos_visitante": marcador["visitante"],
+        "faltas_local": marcador["faltasLocal"],
+        "faltas_visitante": marcador["faltasVisitante"],
+        "tiempos_local": marcador["tiemposLocal"],
+        "tiempos_visitante": marcador["tiemposVisitante"],
+    })
+
+async def _registrar_evento(partido_id: int, request_data: dict, tipo: Optional[str], durable: bool) -> Dict[str, Any]:
+    """Valida y encola un evento; publica el marcador en vivo y devuelve el estado resultante"""
+    try:
+        evento = leer_evento(request_data, tipo)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    # Se encola y se responde con el estado en memoria; la escritura va en lote
+    try:
+        marcador, escrito = await get_evento_ingest().submit(partido_id, evento)
+    except PartidoNoEncontrado:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Partido no encontrado"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ConflictoSecuencia as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if durable:
+        try:
+            escrito_marcador = dict(await escrito)
+        except ConflictoSecuencia as e:
+            # Otro worker escribió antes esa seq: sólo este evento queda rechazado
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        if "duplicado" in marcador:
+            escrito_marcador["duplicado"] = marcador["duplicado"]
+        marcador = escrito_marcador
+    
+    _publicar_marcador(partido_id, marcador)
+    return marcador
+
+@router.post("/{partido_id}/anotaciones/ajustar")
+async def ajustar_puntos_partido(
+    partido_id: int,
+    request_data: dict,
+    durable: bool = Query(False, description="Responder recién cuando el ajuste esté escrito en la base"),
+):
+    """Ajusta puntos de un equipo en un partido (con eventoId y seq, idempotente y en orden)"""
+    try:
+        if not request_data.get("equipoId") or request_data.get("puntos") is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="equipoId y puntos son requeridos"
             )
         
-        # Obtener marcador actual
-        with data_access.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Obtener puntos actuales
-            cursor.execute("""
-                SELECT 
-                    ISNULL(SUM(CASE WHEN equipo_id = ? THEN puntos ELSE 0 END), 0) as puntos_equipo,
-                    ISNULL(SUM(CASE WHEN equipo_id != ? THEN puntos ELSE 0 END), 0) as puntos_otro
-                FROM dbo.Anotacion 
-                WHERE partido_id = ?
-            """, (equipo_id, equipo_id, partido_id))
-            
-            result = cursor.fetchone()
-            puntos_actuales_equipo = result[0] if result else 0
-            puntos_otro_equipo = result[1] if result else 0
-            
-            # Insertar nueva anotación
-            cursor.execute("""
-                INSERT INTO dbo.Anotacion (partido_id, equipo_id, jugador_id, puntos, descripcion, fecha_hora)
-                VALUES (?, ?, NULL, ?, 'Ajuste manual', GETDATE())
-            """, (partido_id, equipo_id, puntos))
-            
-            conn.commit()
-            
-            # Calcular nuevo marcador
-            nuevos_puntos_equipo = puntos_actuales_equipo + puntos
-            
-            # Determinar cuál equipo es local y cuál visitante
-            cursor.execute("""
-                SELECT equipo_local_id, equipo_visitante_id 
-                FROM dbo.Partido 
-                WHERE partido_id = ?
-            """, (partido_id,))
-            
-            partido_info = cursor.fetchone()
-            equipo_local_id = partido_info[0]
-            equipo_visitante_id = partido_info[1]
-            
-            if equipo_id == equipo_local_id:
-                puntos_local = nuevos_puntos_equipo
-                puntos_visitante = puntos_otro_equipo
-            else:
-                puntos_local = puntos_otro_equipo  
-                puntos_visitante = nuevos_puntos_equipo
+        marcador = await _registrar_evento(partido_id, request_data, ANOTACION, durable)
         
         # Retornar marcador actualizado
-        return {
+        respuesta = {
             "partidoId": partido_id,
-            "local": puntos_local,
-            "visitante": puntos_visitante
+            "local": marcador["local"],
+            "visitante": marcador["visitante"]
         }
+        if "duplicado" in marcador:
+            respuesta.update(seq=request_data["seq"], duplicado=marcador["duplicado"])
+        return respuesta
         
     except HTTPException:
         raise
@@ -728,68 +778,126 @@ async def ajustar_puntos_partido(
             detail=f"Error al ajustar puntos: {str(e)}"
         )
 
+@router.post("/{partido_id}/eventos")
+async def registrar_evento_partido(
+    partido_id: int,
+    request_data: dict,
+    durable: bool = Query(False, description="Responder recién cuando el evento esté escrito en la base"),
+):
+    """Registra una anotación, falta o tiempo muerto (``tipo``).
+    
+    Con ``eventoId`` (UUID) y ``seq`` (1, 2, ... por partido) el evento es idempotente:
+    un reintento no se vuelve a aplicar y los eventos enviados sin esperar respuesta se
+    aplican en orden de seq.
+    """
+    try:
+        return await _registrar_evento(partido_id, request_data, None, durable)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al registrar evento: {str(e)}"
+        )
+
+@router.post("/{partido_id}/eventos:batch")
+async def registrar_eventos_partido(
+    partido_id: int,
+    request_data: List[dict] = Body(...),
+):
+    """Registra un lote mixto de anotaciones, faltas y tiempos muertos.
+    
+    Se valida todo en una pasada: si algún evento no es válido no se aplica ninguno
+    (400, o 409 si sólo hay conflictos de seq) y se informa el error de cada uno. Los
+    eventos nuevos se escriben en una transacción; los ya recibidos (mismo eventoId y
+    seq) se informan como duplicados. Responde después del commit.
+    """
+    limite = get_settings().evento_batch_max_items
+    if not request_data or len(request_data) > limite:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Se esperan entre 1 y {limite} eventos"
+        )
+    
+    eventos, errores = [], []
+    for indice, item in enumerate(request_data):
+        try:
+            eventos.append(leer_evento(item))
+        except ValueError as e:
+            errores.append({"indice": indice, "error": str(e)})
+    if errores:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"errores": errores})
+    
+    try:
+        resultados, escrito = await get_evento_ingest().submit_lote(partido_id, eventos)
+        marcador = await escrito
+    except PartidoNoEncontrado:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Partido no encontrado"
+        )
+    except LoteRechazado as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT if e.conflicto else status.HTTP_400_BAD_REQUEST,
+            detail={"errores": [{"indice": x["indice"], "error": x["error"]} for x in e.errores]}
+        )
+    except ConflictoSecuencia as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        logger.exception("partidos.eventos_lote.error", extra={"partidoId": partido_id, "eventos": len(eventos)})
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al registrar eventos: {str(e)}"
+        )
+    
+    _publicar_marcador(partido_id, marcador)
+    aplicados = sum(1 for r in resultados if r["resultado"] == "aplicado")
+    return {
+        "partidoId": partido_id,
+        "aplicados": aplicados,
+        "duplicados": len(resultados) - aplicados,
+        "resultados": resultados,
+        "estado": marcador,
+    }
+
+@router.get("/{partido_id}/eventos/secuencia")
+async def get_secuencia_eventos(partido_id: int):
+    """Última seq aplicada del partido: el cliente continúa desde ``ultimoSeq + 1``"""
+    try:
+        marcador = await get_evento_ingest().estado(partido_id)
+    except PartidoNoEncontrado:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Partido no encontrado"
+        )
+    return {"partidoId": partido_id, "ultimoSeq": marcador["ultimoSeq"]}
+
 @router.delete("/{partido_id}/reset")
 async def reset_partido_completo(
     partido_id: int,
-    data_access: PartidoDataAccess = Depends(get_partido_data_access),
+    data_access: AsyncPartidoDataAccess = Depends(get_async_partido_data_access),
 ):
     """Elimina TODOS los datos del partido de TODAS las tablas"""
     try:
         # Validar que el partido existe
-        partido_existente = data_access.get_partido_by_id(partido_id)
+        partido_existente = await data_access.get_partido_by_id(partido_id)
         if not partido_existente:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Partido no encontrado"
             )
         
-        with data_access.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Eliminar en orden correcto (respetando foreign keys)
-            
-            # 1. Eliminar roster del partido
-            cursor.execute("DELETE FROM dbo.RosterPartido WHERE partido_id = ?", (partido_id,))
-            
-            # 2. Eliminar anotaciones del partido
-            cursor.execute("DELETE FROM dbo.Anotacion WHERE partido_id = ?", (partido_id,))
-            
-            # 3. Eliminar faltas del partido (si existe tabla)
-            try:
-                cursor.execute("DELETE FROM dbo.Falta WHERE partido_id = ?", (partido_id,))
-            except:
-                pass  # Tabla puede no existir
-            
-            # 4. Eliminar tiempos muertos del partido (si existe tabla)
-            try:
-                cursor.execute("DELETE FROM dbo.TiempoMuerto WHERE partido_id = ?", (partido_id,))
-            except:
-                pass  # Tabla puede no existir
-            
-            # 5. Eliminar cuartos del partido (si existe tabla)
-            try:
-                cursor.execute("DELETE FROM dbo.Cuarto WHERE partido_id = ?", (partido_id,))
-            except:
-                pass  # Tabla puede no existir
-            
-            # 6. Eliminar eventos del partido (si existe tabla)
-            try:
-                cursor.execute("DELETE FROM dbo.EventoPartido WHERE partido_id = ?", (partido_id,))
-            except:
-                pass  # Tabla puede no existir
-            
-            # 7. Finalmente eliminar el partido
-            cursor.execute("DELETE FROM dbo.Partido WHERE partido_id = ?", (partido_id,))
-            
-            conn.commit()
-            
-            # Verificar que se eliminó
-            if cursor.rowcount == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="No se pudo eliminar el partido"
-                )
+        get_evento_ingest().forget(partido_id)
+        success = await data_access.reset_partido(partido_id)
+        
+        # Verificar que se eliminó
+        if not success:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No se pudo eliminar el partido"
+            )
         
+        get_scoreboard_hub().touch(partido_id)
         return {"message": "Partido y todos sus datos eliminados exitosamente"}
         
     except HTTPException:
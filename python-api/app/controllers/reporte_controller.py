@@ -0,0 +1,76 @@
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.data.keyset import InvalidCursorError
+from app.data.reporte_vistas import FORMATOS, VISTAS, VistaReporte, exportar, pagina
+from app.database import MySQLSessionLocal, get_mysql_db
+from app.logging_config import get_logger
+from app.serialization import FastJSONResponse
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+# Parámetros propios de los endpoints (el resto de la query son filtros de la vista)
+_RESERVADOS = {"limit", "cursor", "formato"}
+
+
+def _vista(recurso: str) -> VistaReporte:
+    vista = VISTAS.get(recurso)
+    if vista is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Reporte no encontrado: {recurso}")
+    return vista
+
+
+def _filtros(vista: VistaReporte, request: Request) -> Dict[str, Any]:
+    try:
+        return vista.convertir_filtros({k: v for k, v in request.query_params.items() if k not in _RESERVADOS})
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/")
+async def listar_reportes():
+    """Reportes disponibles, con su clave de paginación y sus filtros"""
+    return [{"recurso": v.nombre, "vista": v.tabla, "clave": v.clave, "filtros": list(v.filtros)}
+            for v in VISTAS.values()]
+
+
+@router.get("/{recurso}")
+def get_reporte(
+    recurso: str,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Token X-Next-Cursor de la página anterior"),
+    db: Session = Depends(get_mysql_db),
+):
+    """Una página de la vista ordenada por su clave (keyset); el cursor siguiente va en X-Next-Cursor"""
+    vista = _vista(recurso)
+    settings = get_settings()
+    limit = min(limit or settings.reportes_page_size, settings.reportes_page_size_max)
+    try:
+        filas, next_cursor = pagina(db, vista, _filtros(vista, request), limit, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return FastJSONResponse(filas, headers=headers)
+
+
+@router.get("/{recurso}/export")
+def exportar_reporte(
+    recurso: str,
+    request: Request,
+    formato: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson | csv"),
+):
+    """Toda la vista en streaming (NDJSON o CSV), sin cargarla en memoria"""
+    vista = _vista(recurso)
+    filtros = _filtros(vista, request)
+    logger.info("reportes.export", extra={"recurso": recurso, "formato": formato})
+    return StreamingResponse(
+        exportar(MySQLSessionLocal, vista, filtros, formato, get_settings().reportes_export_batch),
+        media_type=FORMATOS[formato],
+        headers={"Content-Disposition": f'attachment; filename="{vista.nombre}.{formato}"'},
+    )
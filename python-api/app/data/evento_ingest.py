@@ -0,0 +1,693 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import pyodbc
+
+from app.config import get_settings
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+ANOTACION = "anotacion"
+FALTA = "falta"
+TIEMPO_MUERTO = "tiempo_muerto"
+TIPOS = (ANOTACION, FALTA, TIEMPO_MUERTO)
+
+# Valores que admiten CK_Anotacion_Puntos y CK_TM_Tipo
+PUNTOS_VALIDOS = (-3, -2, -1, 1, 2, 3)
+TIEMPOS_VALIDOS = ("corto", "largo")
+
+# Eventos por transacción (PartidoDataAccess parte los INSERT según el límite de parámetros)
+MAX_BATCH = 1000
+
+
+class PartidoNoEncontrado(LookupError):
+    """El partido no existe"""
+
+
+class ConflictoSecuencia(Exception):
+    """La seq no corresponde: ya la usa otro evento o falta un evento anterior"""
+
+
+class LoteRechazado(ValueError):
+    """Algún evento del lote no se puede aplicar: no se aplica ninguno"""
+
+    def __init__(self, errores: List[Dict[str, Any]]):
+        super().__init__(f"{len(errores)} eventos rechazados")
+        self.errores = errores
+        # Sólo errores de secuencia (409); si no, hay eventos inválidos (400)
+        self.conflicto = all(error.get("conflicto") for error in errores)
+
+
+class Evento:
+    """Evento de la mesa de control, ya validado en su forma"""
+
+    __slots__ = ("tipo", "equipo_id", "puntos", "jugador_id", "tipo_falta_id", "es_de_tiro",
+                 "tiempo", "evento_id", "seq")
+
+    def __init__(self, tipo: str, equipo_id: int, puntos: int = 0, jugador_id: Optional[int] = None,
+                 tipo_falta_id: int = 1, es_de_tiro: bool = False, tiempo: str = "corto",
+                 evento_id: Optional[str] = None, seq: Optional[int] = None):
+        self.tipo = tipo
+        self.equipo_id = equipo_id
+        self.puntos = puntos
+        self.jugador_id = jugador_id
+        self.tipo_falta_id = tipo_falta_id
+        self.es_de_tiro = es_de_tiro
+        self.tiempo = tiempo
+        self.evento_id = evento_id
+        self.seq = seq
+
+
+def _entero(data: Dict[str, Any], campo: str, requerido: bool = True) -> Optional[int]:
+    valor = data.get(campo)
+    if valor is None:
+        if requerido:
+            raise ValueError(f"{campo} es requerido")
+        return None
+    if isinstance(valor, bool) or not isinstance(valor, int):
+        raise ValueError(f"{campo} debe ser un entero")
+    return valor
+
+
+def leer_evento(data: Dict[str, Any], tipo: Optional[str] = None) -> Evento:
+    """Evento desde el JSON del cliente (camelCase); ValueError si la forma no es válida"""
+    if not isinstance(data, dict):
+        raise ValueError("El evento debe ser un objeto")
+    tipo = tipo or data.get("tipo")
+    if tipo not in TIPOS:
+        raise ValueError(f"tipo debe ser uno de {TIPOS}")
+    evento = Evento(tipo, _entero(data, "equipoId"))
+
+    if tipo == ANOTACION:
+        evento.puntos = _entero(data, "puntos")
+        if evento.puntos not in PUNTOS_VALIDOS:
+            raise ValueError(f"puntos debe ser uno de {PUNTOS_VALIDOS}")
+    elif tipo == FALTA:
+        evento.jugador_id = _entero(data, "jugadorId", requerido=False)
+        evento.tipo_falta_id = _entero(data, "tipoFaltaId", requerido=False) or 1
+        evento.es_de_tiro = bool(data.get("esDeTiro", False))
+    else:
+        evento.tiempo = data.get("tiempo") or "corto"
+        if evento.tiempo not in TIEMPOS_VALIDOS:
+            raise ValueError(f"tiempo debe ser uno de {TIEMPOS_VALIDOS}")
+
+    evento_id, seq = data.get("eventoId"), _entero(data, "seq", requerido=False)
+    if (evento_id is None) != (seq is None):
+        raise ValueError("eventoId y seq van juntos")
+    if evento_id is not None:
+        try:
+            evento.evento_id = str(uuid.UUID(str(evento_id)))
+        except ValueError:
+            raise ValueError("eventoId debe ser un UUID")
+        if seq < 1:
+            raise ValueError("seq debe ser mayor que 0")
+        evento.seq = seq
+    return evento
+
+
+class _Partido:
+    """Estado en memoria de un partido en la ingesta: marcador, contadores y eventos por escribir"""
+
+    __slots__ = ("partido_id", "local_id", "visitante_id", "local", "visitante", "faltas", "tiempos",
+                 "ultimo_seq", "vistos", "adelantados", "pending", "atomicos", "timer", "flushing",
+                 "loaded_at")
+
+    def __init__(self, estado: Dict[str, Any]):
+        self.partido_id = estado["partido_id"]
+        self.local_id = estado["equipo_local_id"]
+        self.visitante_id = estado["equipo_visitante_id"]
+        self.vistos: "OrderedDict[str, Tuple[int, Dict[str, Any], asyncio.Future]]" = OrderedDict()
+        # seq -> (evento, future que se cumple al aplicarlo)
+        self.adelantados: Dict[int, Tuple[Evento, asyncio.Future]] = {}
+        # (evento, encolado_en, future de durabilidad)
+        self.pending: List[Tuple[Evento, float, asyncio.Future]] = []
+        # Los primeros ``atomicos`` de pending van juntos en la próxima transacción (lotes)
+        self.atomicos = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.flushing: Optional[asyncio.Task] = None
+        self.load(estado)
+
+    def load(self, estado: Dict[str, Any]) -> None:
+        """Contadores de la base; lo que sigue pendiente en memoria se vuelve a sumar"""
+        self.local = estado["puntos_local"]
+        self.visitante = estado["puntos_visitante"]
+        self.faltas = {self.local_id: estado["faltas_local"], self.visitante_id: estado["faltas_visitante"]}
+        self.tiempos = {self.local_id: estado["tiempos_local"], self.visitante_id: estado["tiempos_visitante"]}
+        self.ultimo_seq = max(estado["ultimo_seq"], getattr(self, "ultimo_seq", 0))
+        for evento, _, _ in self.pending:
+            self.apply(evento)
+        self.loaded_at = time.monotonic()
+
+    def apply(self, evento: Evento) -> None:
+        if evento.tipo == ANOTACION:
+            if evento.equipo_id == self.local_id:
+                self.local += evento.puntos
+            else:
+                self.visitante += evento.puntos
+        elif evento.tipo == FALTA:
+            self.faltas[evento.equipo_id] += 1
+        else:
+            self.tiempos[evento.equipo_id] += 1
+
+    def marcador(self) -> Dict[str, Any]:
+        return {
+            "partidoId": self.partido_id,
+            "local": self.local,
+            "visitante": self.visitante,
+            "faltasLocal": self.faltas[self.local_id],
+            "faltasVisitante": self.faltas[self.visitante_id],
+            "tiemposLocal": self.tiempos[self.local_id],
+            "tiemposVisitante": self.tiempos[self.visitante_id],
+            "ultimoSeq": self.ultimo_seq,
+        }
+
+
+class EventoIngest:
+    """Cola de eventos de partido (anotaciones, faltas, tiempos muertos) escrita en lotes.
+
+    ``submit`` valida contra el estado en memoria, actualiza los contadores y responde
+    sin esperar a SQL Server. Lo pendiente de un partido se escribe junto, en una
+    transacción, a los ``interval`` segundos o al llegar a ``max_batch``; después del
+    commit los contadores se corrigen con los de la base (que también recibe eventos
+    de la API .NET). Un lote que falla por un error pasajero (deadlock, conexión, pool)
+    vuelve al frente de la cola y se reintenta con espera creciente: lo ya respondido
+    no se pierde. Si lo rechaza una clave única (otro worker usó la seq) sólo se
+    rechaza el evento en conflicto; el resto del lote se vuelve a escribir.
+
+    Los eventos con ``eventoId`` y ``seq`` son idempotentes y se aplican en orden de
+    seq: un reintento devuelve el resultado original (``duplicado``), un evento
+    adelantado espera a los anteriores hasta ``gap_timeout``. Los ids recientes se
+    recuerdan en memoria; UQ_EventoPartido_Evento/_Seq respaldan al resto.
+    """
+
+    def __init__(self, data_access=None, interval: Optional[float] = None,
+                 max_batch: Optional[int] = None, state_ttl: Optional[float] = None,
+                 dedupe_window: Optional[int] = None, gap_timeout: Optional[float] = None,
+                 max_fuera_de_orden: Optional[int] = None, retries: Optional[int] = None,
+                 retry_backoff: Optional[float] = None, retry_max: Optional[float] = None):
+        settings = get_settings()
+        self._data_access = data_access
+        self.interval = settings.evento_ingest_interval_ms / 1000 if interval is None else interval
+        self.max_batch = min(settings.evento_ingest_max_batch if max_batch is None else max_batch, MAX_BATCH)
+        self.state_ttl = settings.marcador_cache_ttl if state_ttl is None else state_ttl
+        self.dedupe_window = settings.evento_dedupe_window if dedupe_window is None else dedupe_window
+        self.gap_timeout = settings.evento_gap_timeout if gap_timeout is None else gap_timeout
+        self.max_fuera_de_orden = (settings.evento_max_fuera_de_orden
+                                   if max_fuera_de_orden is None else max_fuera_de_orden)
+        self.retries = settings.evento_ingest_retries if retries is None else retries
+        self.retry_backoff = settings.evento_ingest_retry_backoff if retry_backoff is None else retry_backoff
+        self.retry_max = settings.evento_ingest_retry_max if retry_max is None else retry_max
+        self._partidos: Dict[int, _Partido] = {}
+        self._loading: Dict[int, asyncio.Future] = {}
+        self._closed = False
+        self.submitted = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.reintentos = 0
+        self.duplicados = 0
+        self.reordenados = 0
+        self.conflictos = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    @property
+    def data_access(self):
+        if self._data_access is None:
+            from app.dependencies import get_async_partido_data_access
+            self._data_access = get_async_partido_data_access()
+        return self._data_access
+
+    async def _partido(self, partido_id: int) -> _Partido:
+        partido = self._partidos.get(partido_id)
+        if partido is not None:
+            idle = not partido.pending and partido.flushing is None and not partido.adelantados
+            if not idle or time.monotonic() - partido.loaded_at < self.state_ttl:
+                return partido
+        loading = self._loading.get(partido_id)
+        if loading is not None:
+            return await asyncio.shield(loading)
+        loading = asyncio.get_running_loop().create_future()
+        self._loading[partido_id] = loading
+        try:
+            estado = await self.data_access.get_estado_ingesta(partido_id)
+            if estado is None:
+                self._partidos.pop(partido_id, None)
+                raise PartidoNoEncontrado(partido_id)
+            current = self._partidos.get(partido_id)
+            if current is not None and (current.pending or current.flushing is not None or current.adelantados):
+                partido = current  # llegaron eventos mientras se leía: su estado manda
+            elif current is not None and (current.local_id, current.visitante_id) == (
+                    estado["equipo_local_id"], estado["equipo_visitante_id"]):
+                partido = current  # se conservan los eventoId recordados
+                partido.load(estado)
+            else:
+                partido = _Partido(estado)
+                self._partidos[partido_id] = partido
+            loading.set_result(partido)
+            return partido
+        except Exception as e:
+            loading.set_exception(e)
+            loading.exception()  # evita el aviso de excepción no leída si nadie más esperaba
+            raise
+        finally:
+            del self._loading[partido_id]
+
+    async def estado(self, partido_id: int) -> Dict[str, Any]:
+        """Estado en memoria del partido (contadores y última seq aplicada)"""
+        return (await self._partido(partido_id)).marcador()
+
+    async def submit(self, partido_id: int, evento: Evento) -> Tuple[Dict[str, Any], asyncio.Future]:
+        """Encola un evento; devuelve el estado resultante y un future que se cumple con el commit.
+
+        Con ``eventoId`` el estado incluye ``duplicado`` (True si ya se había recibido).
+        """
+        if self._closed:
+            raise RuntimeError("La ingesta de eventos está cerrada")
+        partido = await self._partido(partido_id)
+        if evento.equipo_id not in (partido.local_id, partido.visitante_id):
+            raise ValueError("El equipo no juega este partido")
+        if evento.evento_id is None:
+            return self._enqueue(partido, evento)
+
+        visto = partido.vistos.get(evento.evento_id)
+        if visto is not None:
+            return self._duplicado(evento, *visto)
+        if evento.seq <= partido.ultimo_seq:
+            return await self._ya_aplicado(partido, evento)
+        if evento.seq == partido.ultimo_seq + 1:
+            resultado = self._enqueue(partido, evento)
+            self._liberar(partido)
+            return resultado
+        return await self._esperar_anteriores(partido, evento)
+
+    async def submit_lote(self, partido_id: int, eventos: List[Evento]) -> Tuple[List[Dict[str, Any]], asyncio.Future]:
+        """Aplica un lote de eventos (p. ej. al recuperar la conexión) todo junto o nada.
+
+        Se valida en una pasada y, si algo no se puede aplicar, se rechaza el lote entero
+        (``LoteRechazado`` con los errores por índice). Los eventos nuevos se escriben en
+        una sola transacción; los ya recibidos se informan como duplicados. Devuelve un
+        resultado por evento y un future que se cumple con el estado tras el commit.
+        """
+        if self._closed:
+            raise RuntimeError("La ingesta de eventos está cerrada")
+        partido = await self._partido(partido_id)
+        # Reintentos más viejos que la ventana en memoria: una sola consulta para todos
+        dudosos = [e.evento_id for e in eventos if e.evento_id is not None and e.seq <= partido.ultimo_seq
+                   and e.evento_id not in partido.vistos]
+        registrados = await self.data_access.buscar_eventos(partido_id, dudosos) if dudosos else {}
+        if self._partidos.get(partido_id) is not partido:
+            partido = await self._partido(partido_id)
+
+        resultados, nuevos, errores = self._clasificar(partido, eventos, registrados)
+        if errores:
+            self.conflictos += sum(1 for error in errores if error.get("conflicto"))
+            raise LoteRechazado(errores)
+
+        durable = None
+        for i in nuevos:
+            evento = eventos[i]
+            _, durable = self._enqueue(partido, evento, kick=False)
+            adelantado = partido.adelantados.pop(evento.seq, None) if evento.seq is not None else None
+            if adelantado is not None and not adelantado[1].done():
+                adelantado[1].set_result(partido.vistos[evento.evento_id][1:])
+        self.duplicados += len(eventos) - len(nuevos)
+        if durable is None:
+            durable = asyncio.get_running_loop().create_future()
+            durable.set_result(partido.marcador())
+            return resultados, durable
+        # Todo lo pendiente, con el lote, va en la misma transacción
+        partido.atomicos = len(partido.pending)
+        self._liberar(partido)
+        self._kick(partido)
+        return resultados, durable
+
+    def _clasificar(self, partido: _Partido, eventos: List[Evento], registrados: Dict[str, int]):
+        """Una pasada sobre el lote: resultado por evento, índices a aplicar y errores"""
+        resultados: List[Dict[str, Any]] = []
+        nuevos: List[int] = []
+        errores: List[Dict[str, Any]] = []
+        esperado = partido.ultimo_seq + 1
+        ids = set()
+        for i, evento in enumerate(eventos):
+            resultado = {"indice": i, "tipo": evento.tipo}
+            resultados.append(resultado)
+            error = conflicto = None
+            if evento.equipo_id not in (partido.local_id, partido.visitante_id):
+                error = "El equipo no juega este partido"
+            elif evento.evento_id is None:
+                nuevos.append(i)
+                resultado["resultado"] = "aplicado"
+                continue
+            elif evento.evento_id in ids:
+                error = "eventoId repetido en el lote"
+            if error is None:
+                ids.add(evento.evento_id)
+                resultado["seq"] = evento.seq
+                visto = partido.vistos.get(evento.evento_id)
+                seq_previa = visto[0] if visto is not None else registrados.get(evento.evento_id)
+                if seq_previa is not None and seq_previa != evento.seq:
+                    error = conflicto = f"El evento {evento.evento_id} ya se registró con seq {seq_previa}"
+                elif seq_previa is not None or (evento.seq < esperado and self._pendiente(partido, evento)):
+                    resultado["resultado"] = "duplicado"
+                    continue
+                elif evento.seq < esperado:
+                    error = conflicto = f"La seq {evento.seq} ya la usa otro evento"
+                elif evento.seq > esperado:
+                    error = conflicto = f"Falta el evento con seq {esperado} (recibido: {evento.seq})"
+                elif partido.adelantados.get(evento.seq, (evento,))[0].evento_id != evento.evento_id:
+                    error = conflicto = f"La seq {evento.seq} ya la usa otro evento"
+                else:
+                    esperado += 1
+                    nuevos.append(i)
+                    resultado["resultado"] = "aplicado"
+                    continue
+            errores.append({"indice": i, "error": error, "conflicto": conflicto is not None})
+            resultado["resultado"] = "rechazado"
+        return resultados, nuevos, errores
+
+    @staticmethod
+    def _pendiente(partido: _Partido, evento: Evento) -> bool:
+        return any(p.evento_id == evento.evento_id and p.seq == evento.seq for p, _, _ in partido.pending)
+
+    def _enqueue(self, partido: _Partido, evento: Evento, kick: bool = True) -> Tuple[Dict[str, Any], asyncio.Future]:
+        durable = asyncio.get_running_loop().create_future()
+        partido.pending.append((evento, time.monotonic(), durable))
+        partido.apply(evento)
+        self.submitted += 1
+        if evento.seq is not None:
+            partido.ultimo_seq = evento.seq
+        marcador = partido.marcador()
+        if evento.evento_id is not None:
+            marcador["duplicado"] = False
+            partido.vistos[evento.evento_id] = (evento.seq, marcador, durable)
+            while len(partido.vistos) > self.dedupe_window:
+                partido.vistos.popitem(last=False)
+
+        if kick:
+            self._programar(partido)
+        return marcador, durable
+
+    def _programar(self, partido: _Partido) -> None:
+        if len(partido.pending) >= self.max_batch:
+            self._kick(partido)
+        elif partido.timer is None and partido.flushing is None:
+            partido.timer = asyncio.get_running_loop().call_later(self.interval, self._kick, partido)
+
+    def _duplicado(self, evento: Evento, seq: int, marcador: Dict[str, Any],
+                   durable: asyncio.Future) -> Tuple[Dict[str, Any], asyncio.Future]:
+        if seq != evento.seq:
+            self.conflictos += 1
+            raise ConflictoSecuencia(f"El evento {evento.evento_id} ya se registró con seq {seq}")
+        self.duplicados += 1
+        return dict(marcador, duplicado=True), durable
+
+    async def _ya_aplicado(self, partido: _Partido, evento: Evento) -> Tuple[Dict[str, Any], asyncio.Future]:
+        """seq ya usada y el id no está en la ventana: se consulta la base (reintento tardío)"""
+        for pendiente, _, durable in partido.pending:
+            if pendiente.evento_id == evento.evento_id:
+                return self._duplicado(evento, pendiente.seq, partido.marcador(), durable)
+        registrados = await self.data_access.buscar_eventos(partido.partido_id, [evento.evento_id])
+        if evento.evento_id not in registrados:
+            self.conflictos += 1
+            raise ConflictoSecuencia(f"La seq {evento.seq} ya la usa otro evento (última: {partido.ultimo_seq})")
+        durable = asyncio.get_running_loop().create_future()
+        durable.set_result(partido.marcador())
+        # Sin el resultado original: se responde con el estado actual
+        return self._duplicado(evento, registrados[evento.evento_id], partido.marcador(), durable)
+
+    async def _esperar_anteriores(self, partido: _Partido, evento: Evento) -> Tuple[Dict[str, Any], asyncio.Future]:
+        """Evento adelantado (pipelining): espera a que lleguen los de seq menor"""
+        adelantado = partido.adelantados.get(evento.seq)
+        if adelantado is not None:
+            if adelantado[0].evento_id != evento.evento_id:
+                self.conflictos += 1
+                raise ConflictoSecuencia(f"La seq {evento.seq} ya la usa otro evento")
+            aplicado = adelantado[1]
+        else:
+            if len(partido.adelantados) >= self.max_fuera_de_orden:
+                self.conflictos += 1
+                raise ConflictoSecuencia("Demasiados eventos fuera de orden")
+            aplicado = asyncio.get_running_loop().create_future()
+            partido.adelantados[evento.seq] = (evento, aplicado)
+            self.reordenados += 1
+        try:
+            marcador, durable = await asyncio.wait_for(asyncio.shield(aplicado), self.gap_timeout)
+        except asyncio.TimeoutError:
+            self.conflictos += 1
+            error = ConflictoSecuencia(
+                f"No llegó el evento con seq {partido.ultimo_seq + 1} (recibido: {evento.seq})")
+            if partido.adelantados.get(evento.seq, (None, None))[1] is aplicado:
+                del partido.adelantados[evento.seq]
+                aplicado.set_exception(error)  # también para otros envíos del mismo evento
+                aplicado.exception()
+                partido.loaded_at = float("-inf")  # otro worker pudo avanzar la seq
+            raise error
+        if adelantado is not None:
+            self.duplicados += 1
+            marcador = dict(marcador, duplicado=True)  # segundo envío del mismo evento adelantado
+        return marcador, durable
+
+    def _liberar(self, partido: _Partido) -> None:
+        """Aplica los adelantados que ya son consecutivos"""
+        while partido.ultimo_seq + 1 in partido.adelantados:
+            evento, aplicado = partido.adelantados.pop(partido.ultimo_seq + 1)
+            resultado = self._enqueue(partido, evento)
+            if not aplicado.done():
+                aplicado.set_result(resultado)
+
+    def _kick(self, partido: _Partido) -> None:
+        if partido.timer is not None:
+            partido.timer.cancel()
+            partido.timer = None
+        if partido.flushing is None and partido.pending:
+            partido.flushing = asyncio.create_task(self._flush(partido))
+
+    async def _flush(self, partido: _Partido) -> None:
+        """Escribe lo pendiente por lotes, en orden; lo que llega mientras tanto va en el siguiente"""
+        intentos = 0
+        limite: Optional[int] = None  # lotes más chicos para aislar un evento que la base rechaza
+        try:
+            while partido.pending:
+                n = max(limite or self.max_batch, partido.atomicos)
+                atomicos = partido.atomicos
+                batch = partido.pending[:n]
+                del partido.pending[:n]
+                partido.atomicos = max(partido.atomicos - n, 0)
+                try:
+                    estado = await self._escribir(partido.partido_id, [evento for evento, _, _ in batch])
+                except Exception as e:
+                    # El lote vuelve al frente: lo que llegó después sigue detrás, en orden de seq
+                    partido.pending[:0] = batch
+                    partido.atomicos = partido.atomicos + len(batch) if partido.atomicos else atomicos
+                    if isinstance(e, pyodbc.IntegrityError):
+                        # Clave única o FK: reintentar igual no cambia el resultado
+                        try:
+                            limite = await self._conflicto(partido, batch, atomicos, e)
+                            continue
+                        except PartidoNoEncontrado as perdido:
+                            logger.warning("eventos.partido_eliminado", extra={
+                                "partidoId": partido.partido_id, "pendientes": len(partido.pending)})
+                            self.failed += len(partido.pending)
+                            self._descartar(partido, perdido)
+                            return
+                        except Exception as consulta:
+                            e = consulta  # no se pudo leer la base: se reintenta como cualquier error
+                    intentos += 1
+                    if intentos > self.retries:
+                        logger.error("eventos.lote.en_espera", extra={
+                            "partidoId": partido.partido_id, "pendientes": len(partido.pending), "error": str(e)})
+                        if not self._closed and partido.timer is None:
+                            partido.timer = asyncio.get_running_loop().call_later(
+                                self.retry_max, self._kick, partido)
+                        return
+                    espera = min(self.retry_backoff * 2 ** (intentos - 1), self.retry_max)
+                    self.reintentos += 1
+                    logger.warning("eventos.lote.reintento", extra={
+                        "partidoId": partido.partido_id, "filas": len(batch), "intento": intentos,
+                        "esperaS": espera, "error": str(e)})
+                    await asyncio.sleep(espera)
+                    continue
+
+                intentos = 0
+                now = time.monotonic()
+                self.batches += 1
+                self.written += len(batch)
+                self.last_lag = now - batch[0][1]
+                self.max_lag = max(self.max_lag, self.last_lag)
+                # Estado de la base + lo que siga pendiente en memoria
+                partido.load(estado)
+                marcador = partido.marcador()
+                for _, _, durable in batch:
+                    if not durable.done():
+                        durable.set_result(marcador)
+        finally:
+            partido.flushing = None
+
+    async def _conflicto(self, partido: _Partido, batch: List[Tuple[Evento, float, asyncio.Future]],
+                         atomicos: int, error: Exception) -> Optional[int]:
+        """Separa lo que la base rechazó de un lote (ya devuelto al frente de ``pending``).
+
+        Los eventos que ya están escritos (commit sin respuesta) se dan por escritos y los
+        que chocan con la seq o el eventoId de otro se rechazan solos; el resto sigue en la
+        cola. Si no aparece el culpable, devuelve un tamaño de lote menor para aislarlo.
+        """
+        estado = await self.data_access.get_estado_ingesta(partido.partido_id)
+        if estado is None:
+            raise PartidoNoEncontrado(partido.partido_id)
+        ids = [evento.evento_id for evento, _, _ in batch if evento.evento_id is not None]
+        registrados = await self.data_access.buscar_eventos(partido.partido_id, ids) if ids else {}
+
+        escritos: List[Tuple[Evento, float, asyncio.Future]] = []
+        rechazados: List[Tuple[Tuple[Evento, float, asyncio.Future], Exception]] = []
+        for item in batch:
+            evento = item[0]
+            if evento.evento_id is None:
+                continue
+            seq = registrados.get(evento.evento_id)
+            if seq == evento.seq:
+                escritos.append(item)
+            elif seq is not None:
+                rechazados.append((item, ConflictoSecuencia(
+                    f"El evento {evento.evento_id} ya se registró con seq {seq}")))
+            elif evento.seq <= estado["ultimo_seq"]:
+                rechazados.append((item, ConflictoSecuencia(f"La seq {evento.seq} ya la usa otro evento")))
+        self.conflictos += len(rechazados)
+
+        limite = None
+        if not escritos and not rechazados:
+            if atomicos or len(batch) == 1:
+                rechazados = [(item, error) for item in batch[:atomicos or 1]]
+            else:
+                limite = len(batch) // 2
+        elif atomicos:
+            # Un lote de /eventos:batch va entero o nada
+            grupo = {id(item) for item in batch[:atomicos]}
+            motivo = next((e for item, e in rechazados if id(item) in grupo), None)
+            if motivo is not None:
+                ya = {id(item) for item, _ in rechazados} | {id(item) for item in escritos}
+                rechazados += [(item, motivo) for item in batch[:atomicos] if id(item) not in ya]
+
+        quitar = {id(item) for item in escritos} | {id(item) for item, _ in rechazados}
+        partido.atomicos -= sum(1 for item in partido.pending[:partido.atomicos] if id(item) in quitar)
+        partido.pending = [item for item in partido.pending if id(item) not in quitar]
+        for (evento, _, durable), motivo in rechazados:
+            visto = partido.vistos.get(evento.evento_id)
+            if visto is not None and visto[2] is durable:
+                del partido.vistos[evento.evento_id]  # no quedó aplicado: un reenvío no es un duplicado
+            if not durable.done():
+                durable.set_exception(motivo)
+                durable.exception()
+        self.failed += len(rechazados)
+        self.written += len(escritos)
+        logger.warning("eventos.lote.conflicto", extra={
+            "partidoId": partido.partido_id, "filas": len(batch), "escritos": len(escritos),
+            "rechazados": [item[0].seq for item, _ in rechazados], "error": str(error)})
+
+        # Estado de la base + lo que siga pendiente en memoria (sin los rechazados)
+        partido.load(estado)
+        marcador = partido.marcador()
+        for _, _, durable in escritos:
+            if not durable.done():
+                durable.set_result(marcador)
+        return limite
+
+    async def _escribir(self, partido_id: int, eventos: List[Evento]) -> Dict[str, Any]:
+        """Un lote en una transacción; devuelve el estado del partido tras el commit"""
+        return await self.data_access.registrar_eventos(
+            partido_id,
+            anotaciones=[(e.equipo_id, e.puntos) for e in eventos if e.tipo == ANOTACION],
+            faltas=[(e.equipo_id, e.jugador_id, e.tipo_falta_id, e.es_de_tiro)
+                    for e in eventos if e.tipo == FALTA],
+            tiempos=[(e.equipo_id, e.tiempo) for e in eventos if e.tipo == TIEMPO_MUERTO],
+            registros=[(e.evento_id, e.seq, e.tipo) for e in eventos if e.evento_id is not None],
+        )
+
+    def forget(self, partido_id: int) -> None:
+        """Descarta el estado y lo pendiente de un partido (reset, borrado o cambio de equipos)"""
+        partido = self._partidos.get(partido_id)
+        if partido is not None:
+            self._descartar(partido, RuntimeError("Evento descartado: el partido se reinició o se eliminó"))
+
+    def _descartar(self, partido: _Partido, error: Exception) -> None:
+        if self._partidos.get(partido.partido_id) is partido:
+            del self._partidos[partido.partido_id]
+        if partido.timer is not None:
+            partido.timer.cancel()
+        futures = [durable for _, _, durable in partido.pending]
+        futures += [aplicado for _, aplicado in partido.adelantados.values()]
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+                future.exception()
+        partido.pending.clear()
+        partido.atomicos = 0
+        partido.adelantados.clear()
+
+    async def flush(self, partido_id: Optional[int] = None) -> None:
+        """Escribe lo pendiente (de un partido o de todos) y espera a que termine"""
+        partidos = [p for pid, p in self._partidos.items() if partido_id is None or pid == partido_id]
+        for partido in partidos:
+            self._kick(partido)
+        tasks = [p.flushing for p in partidos if p.flushing is not None]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Deja de aceptar eventos y vacía las colas (apagado ordenado)"""
+        self._closed = True
+        await self.flush()
+        pendientes = 0
+        for partido in self._partidos.values():
+            # La base no respondió en todos los reintentos: quien espera el commit se entera
+            for _, _, durable in partido.pending:
+                if not durable.done():
+                    durable.set_exception(RuntimeError("La ingesta se cerró sin poder escribir el evento"))
+                    durable.exception()
+            pendientes += len(partido.pending)
+        self.failed += pendientes
+        logger.info("eventos.cerrado", extra={"escritos": self.written, "fallidos": self.failed,
+                                              "pendientes": pendientes})
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        oldest = min((p.pending[0][1] for p in self._partidos.values() if p.pending), default=None)
+        return {
+            "partidos": len(self._partidos),
+            "pending": sum(len(p.pending) for p in self._partidos.values()),
+            "outOfOrder": sum(len(p.adelantados) for p in self._partidos.values()),
+            "oldestPendingMs": round((now - oldest) * 1000, 1) if oldest is not None else None,
+            "submitted": self.submitted,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+            "retries": self.reintentos,
+            "avgBatch": round(self.written / self.batches, 2) if self.batches else 0.0,
+            "duplicates": self.duplicados,
+            "reordered": self.reordenados,
+            "conflicts": self.conflictos,
+            "lastLagMs": round(self.last_lag * 1000, 1),
+            "maxLagMs": round(self.max_lag * 1000, 1),
+            "intervalMs": round(self.interval * 1000, 1),
+            "maxBatch": self.max_batch,
+            "dedupeWindow": self.dedupe_window,
+        }
+
+
+_ingest: Optional[EventoIngest] = None
+
+
+def get_evento_ingest() -> EventoIngest:
+    global _ingest
+    if _ingest is None:
+        _ingest = EventoIngest()
+    return _ingest
+
+
+async def close_evento_ingest() -> None:
+    if _ingest is not None:
+        await _ingest.close()
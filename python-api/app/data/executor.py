@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.config import get_settings
+
+T = TypeVar("T")
+
+
+class DbExecutor:
+    """Ejecuta las llamadas bloqueantes de pyodbc en hilos dedicados.
+
+    Así una consulta lenta no congela el event loop (ni ``/health``). ``max_workers``
+    limita las consultas simultáneas y ``max_pending`` las entregadas al pool de hilos
+    (en ejecución + en su cola) por event loop. Las llamadas que pasan de ese límite
+    esperan en el event loop, sin tope y sin rechazarse; no cuentan en ``pending``.
+    """
+
+    def __init__(self, max_workers: int = 10, max_pending: int = 100):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(self.max_workers, max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="db")
+        # Un semáforo por event loop; se libera junto con el loop
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+        # Métricas
+        self._running = 0
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._queue_total = 0.0
+        self._queue_max = 0.0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_pending)
+        return semaphore
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Ejecuta ``func`` en el pool de hilos y espera su resultado"""
+        async with self._semaphore():
+            enqueued = time.monotonic()
+            with self._lock:
+                self._pending += 1
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(self._call, func, enqueued, args, kwargs))
+
+    def _call(self, func: Callable[..., T], enqueued: float, args, kwargs) -> T:
+        waited = time.monotonic() - enqueued
+        with self._lock:
+            self._pending -= 1
+            self._running += 1
+            self._queue_total += waited
+            self._queue_max = max(self._queue_max, waited)
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas del executor"""
+        with self._lock:
+            return {
+                "maxWorkers": self.max_workers,
+                "maxPending": self.max_pending,
+                "running": self._running,
+                "pending": self._pending,
+                "completed": self._completed,
+                "failed": self._failed,
+                "queueAvgMs": round(self._queue_total * 1000 / self._completed, 3) if self._completed else 0.0,
+                "queueMaxMs": round(self._queue_max * 1000, 3),
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+_executor: Optional[DbExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> DbExecutor:
+    """Executor de base de datos del proceso"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                settings = get_settings()
+                _executor = DbExecutor(
+                    max_workers=settings.db_executor_workers,
+                    max_pending=settings.db_executor_max_pending,
+                )
+    return _executor
+
+
+def shutdown_db_executor() -> None:
+    """Espera las consultas en curso y libera los hilos (shutdown de la aplicación)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
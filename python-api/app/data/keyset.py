@@ -0,0 +1,25 @@
+import base64
+import json
+from typing import Any, Dict
+
+
+class InvalidCursorError(ValueError):
+    """El cursor de paginación no es válido"""
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Codifica la posición de una página como token opaco (base64url)"""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """Decodifica un token generado por ``encode_cursor``"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursorError("Cursor inválido") from e
+    if not isinstance(values, dict):
+        raise InvalidCursorError("Cursor inválido")
+    return values
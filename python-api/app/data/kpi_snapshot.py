@@ -0,0 +1,82 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.config import get_settings
+
+
+class KpiSnapshot:
+    """Foto en memoria de los KPIs del dashboard.
+
+    Se invalida con cada escritura de partidos, equipos o jugadores hecha por este
+    proceso; ``max_staleness`` (segundos) limita la antigüedad para recoger las
+    escrituras de otros servicios (API .NET) u otros workers.
+    """
+
+    def __init__(self, max_staleness: Optional[float] = None):
+        self.max_staleness = get_settings().kpi_max_staleness if max_staleness is None else max_staleness
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._value: Optional[Dict[str, int]] = None
+        self._taken_at = 0.0
+        self._generation = 0
+        self.hits = 0
+        self.refreshes = 0
+        self.invalidations = 0
+
+    def get_fresh(self) -> Optional[Tuple[Dict[str, int], float]]:
+        """(kpis, edad en segundos) si la foto es válida; None si hay que recalcular"""
+        with self._lock:
+            if self._value is None:
+                return None
+            age = time.monotonic() - self._taken_at
+            if age > self.max_staleness:
+                return None
+            self.hits += 1
+            return self._value, age
+
+    def get(self, loader: Callable[[], Dict[str, int]]) -> Tuple[Dict[str, int], float]:
+        """Foto vigente o recalculada con ``loader`` (una sola recarga a la vez)"""
+        fresh = self.get_fresh()
+        if fresh is not None:
+            return fresh
+        with self._refresh_lock:
+            # Otro hilo pudo recargarla mientras esperábamos
+            fresh = self.get_fresh()
+            if fresh is not None:
+                return fresh
+            with self._lock:
+                generation = self._generation
+            value = loader()
+            taken_at = time.monotonic()
+            with self._lock:
+                self.refreshes += 1
+                # Si hubo una escritura durante la lectura, no se guarda como válida
+                if generation == self._generation:
+                    self._value = value
+                    self._taken_at = taken_at
+            return value, 0.0
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._value = None
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "cached": self._value is not None,
+                "ageMs": round((time.monotonic() - self._taken_at) * 1000, 3) if self._value is not None else None,
+                "maxStaleness": self.max_staleness,
+                "hits": self.hits,
+                "refreshes": self.refreshes,
+                "invalidations": self.invalidations,
+            }
+
+
+kpi_snapshot = KpiSnapshot()
+
+
+def get_kpi_snapshot() -> KpiSnapshot:
+    return kpi_snapshot
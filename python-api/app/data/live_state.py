@@ -0,0 +1,468 @@
+import asyncio
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.config import get_settings
+from app.data.pool import ConnectionPool, get_pool
+from app.data.queries import LIVE_EVENTOS, catalog
+from app.data.statements import INT
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+Listener = Callable[[int, Dict[str, Any]], None]
+
+# Contadores por cuarto: puntos, faltas de equipo y tiempos muertos (local, visitante)
+PTS_L, PTS_V, FALTAS_L, FALTAS_V, TM_L, TM_V = range(6)
+
+# Eventos sin cuarto (se registraron sin cuarto en curso)
+SIN_CUARTO = 0
+
+# Tipos de CronometroEvento con el reloj en marcha
+RELOJ_EN_MARCHA = ("inicio", "reanudar")
+
+# IDs por sentencia en las reproducciones (límite de parámetros de SQL Server)
+MAX_IDS = 2000
+
+
+class _Juego:
+    """Estado de un partido en curso en estructuras compactas"""
+
+    __slots__ = ("partido_id", "equipos", "estado", "limites", "cuartos", "contadores",
+                 "faltas_jugador", "crono", "crono_mono", "referencia", "version")
+
+    def __init__(self, row: tuple, mono: float):
+        self.partido_id = row[0]
+        self.cuartos: List[list] = []  # [cuarto_id, numero, duracion, segundos_restantes, estado]
+        self.contadores: Dict[int, List[int]] = {}
+        self.faltas_jugador: Dict[int, int] = {}
+        # Último evento de cronómetro: (tipo, segundos_restantes, creado_en, cuarto_id)
+        self.crono: Optional[Tuple[str, Optional[int], datetime, int]] = None
+        self.crono_mono = 0.0  # time.monotonic() equivalente a crono.creado_en
+        self.version = 0
+        self.update(row, mono)
+
+    def update(self, row: tuple, mono: float) -> bool:
+        """Datos de dbo.Partido leídos en ``mono`` (time.monotonic()); True si cambiaron"""
+        _, local, visitante, estado, limite_equipo, limite_jugador, ahora = row
+        # Hora de SQL Server a la lectura: los creado_en se miden contra ella, no contra la local
+        self.referencia = (ahora, mono)
+        antes = (getattr(self, "equipos", None), getattr(self, "estado", None), getattr(self, "limites", None))
+        self.equipos = (local, visitante)
+        self.estado = estado
+        self.limites = (limite_equipo, limite_jugador)
+        return antes != (self.equipos, self.estado, self.limites)
+
+    def _lado(self, equipo_id: int) -> Optional[int]:
+        if equipo_id == self.equipos[0]:
+            return 0
+        if equipo_id == self.equipos[1]:
+            return 1
+        return None  # equipo que ya no juega el partido
+
+    def _contador(self, cuarto_id: Optional[int]) -> List[int]:
+        key = cuarto_id or SIN_CUARTO
+        contador = self.contadores.get(key)
+        if contador is None:
+            contador = self.contadores[key] = [0] * 6
+        return contador
+
+    def anotacion(self, cuarto_id, equipo_id, puntos) -> None:
+        lado = self._lado(equipo_id)
+        if lado is not None:
+            self._contador(cuarto_id)[PTS_L + lado] += puntos
+
+    def falta(self, cuarto_id, equipo_id, jugador_id) -> None:
+        lado = self._lado(equipo_id)
+        if lado is not None:
+            self._contador(cuarto_id)[FALTAS_L + lado] += 1
+        if jugador_id is not None:
+            self.faltas_jugador[jugador_id] = self.faltas_jugador.get(jugador_id, 0) + 1
+
+    def tiempo_muerto(self, cuarto_id, equipo_id) -> None:
+        lado = self._lado(equipo_id)
+        if lado is not None:
+            self._contador(cuarto_id)[TM_L + lado] += 1
+
+    def cronometro(self, cuarto_id, tipo, segundos_restantes, creado_en) -> None:
+        if self.crono is not None and creado_en < self.crono[2]:
+            return  # confirmado tarde: ya hay un evento posterior
+        self.crono = (tipo, segundos_restantes, creado_en, cuarto_id)
+        # creado_en es SYSUTCDATETIME(): lo transcurrido se mide contra la hora de SQL Server
+        # de la misma sincronización (sin desfase con el reloj de este servidor) y de ahí en
+        # más con el monotónico (inmune a ajustes de hora)
+        ahora, mono = self.referencia
+        self.crono_mono = mono - (ahora - creado_en).total_seconds()
+
+    def cuarto_actual(self) -> Optional[list]:
+        """En curso; si no, el último finalizado; si no, el primero pendiente (como live.estado)"""
+        orden = {"en_curso": 0, "finalizado": 1}
+        return min(self.cuartos, default=None, key=lambda c: (
+            orden.get(c[4], 2), c[1] if c[4] == "pendiente" else -c[1]))
+
+    def _reloj_base(self, cuarto: Optional[list]) -> Tuple[Optional[int], bool]:
+        """Segundos restantes al último evento del cuarto actual y si el reloj corre desde entonces"""
+        if cuarto is None:
+            return None, False
+        if self.crono is None or self.crono[3] != cuarto[0]:
+            return cuarto[3], False  # sin eventos en este cuarto: lo que guarda dbo.Cuarto
+        tipo, segundos = self.crono[0], self.crono[1]
+        corriendo = tipo in RELOJ_EN_MARCHA and cuarto[4] == "en_curso"
+        return (cuarto[3] if segundos is None else segundos), corriendo
+
+    def reloj(self, ahora: float) -> Dict[str, Any]:
+        """Reloj del cuarto actual a ``ahora`` (time.monotonic())"""
+        cuarto = self.cuarto_actual()
+        base, corriendo = self._reloj_base(cuarto)
+        restantes = base
+        if corriendo and base is not None:
+            restantes = max(base - max(ahora - self.crono_mono, 0.0), 0.0)
+            corriendo = restantes > 0
+        return {
+            "partidoId": self.partido_id,
+            "cuartoId": cuarto[0] if cuarto else None,
+            "cuarto": cuarto[1] if cuarto else None,
+            "estadoCuarto": cuarto[4] if cuarto else None,
+            "duracionSegundos": cuarto[2] if cuarto else None,
+            "segundosRestantes": round(restantes, 1) if restantes is not None else None,
+            "corriendo": corriendo,
+            "evento": self.crono[0] if self.crono and cuarto and self.crono[3] == cuarto[0] else None,
+        }
+
+    def transicion(self) -> tuple:
+        """Lo que cambia sólo en un inicio, pausa, reanudación o cambio de cuarto (no con el paso del tiempo)"""
+        cuarto = self.cuarto_actual()
+        base, corriendo = self._reloj_base(cuarto)
+        return (self.estado, cuarto and tuple(cuarto), base, corriendo, self.crono)
+
+    def estado_vivo(self) -> Dict[str, Any]:
+        """Mismas claves que ``PartidoDataAccess.get_estado_vivo``"""
+        cuarto = self.cuarto_actual()
+        total = [sum(c[i] for c in self.contadores.values()) for i in range(6)]
+        en_cuarto = self.contadores.get(cuarto[0]) if cuarto else None
+        return {
+            "partido_id": self.partido_id,
+            "estado": self.estado,
+            "puntos_local": total[PTS_L],
+            "puntos_visitante": total[PTS_V],
+            "cuarto": cuarto[1] if cuarto else None,
+            "segundos_restantes": cuarto[3] if cuarto else None,
+            "faltas_local": en_cuarto[FALTAS_L] if en_cuarto else 0,
+            "faltas_visitante": en_cuarto[FALTAS_V] if en_cuarto else 0,
+            "tiempos_local": total[TM_L],
+            "tiempos_visitante": total[TM_V],
+            "reloj_corriendo": self._reloj_base(cuarto)[1],
+        }
+
+    def detalle(self) -> Dict[str, Any]:
+        """Todo lo que necesita un espectador: marcador y faltas por cuarto y por jugador"""
+        estado = self.estado_vivo()
+        cuartos = []
+        for cuarto_id, numero, duracion, segundos, estado_cuarto in sorted(self.cuartos, key=lambda c: c[1]):
+            contador = self.contadores.get(cuarto_id, [0] * 6)
+            cuartos.append({
+                "cuartoId": cuarto_id,
+                "numero": numero,
+                "estado": estado_cuarto,
+                "duracionSegundos": duracion,
+                "segundosRestantes": segundos,
+                "puntosLocal": contador[PTS_L],
+                "puntosVisitante": contador[PTS_V],
+                "faltasLocal": contador[FALTAS_L],
+                "faltasVisitante": contador[FALTAS_V],
+            })
+        limite_jugador = self.limites[1]
+        return {
+            "partidoId": self.partido_id,
+            "estado": self.estado,
+            "equipoLocalId": self.equipos[0],
+            "equipoVisitanteId": self.equipos[1],
+            "local": estado["puntos_local"],
+            "visitante": estado["puntos_visitante"],
+            "cuarto": estado["cuarto"],
+            "segundosRestantes": estado["segundos_restantes"],
+            "relojCorriendo": estado["reloj_corriendo"],
+            "faltasLocal": estado["faltas_local"],
+            "faltasVisitante": estado["faltas_visitante"],
+            "limiteFaltasEquipo": self.limites[0],
+            "tiemposLocal": estado["tiempos_local"],
+            "tiemposVisitante": estado["tiempos_visitante"],
+            "cuartos": cuartos,
+            "faltasJugador": [
+                {"jugadorId": jugador_id, "faltas": n, "eliminado": n >= limite_jugador}
+                for jugador_id, n in sorted(self.faltas_jugador.items())
+            ],
+            "version": self.version,
+        }
+
+    def memoria(self) -> int:
+        """Bytes aproximados del estado del partido (objeto, contenedores y contenido)"""
+        return _sizeof(self) + sum(_sizeof(getattr(self, slot)) for slot in self.__slots__)
+
+
+def _sizeof(obj: Any) -> int:
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_sizeof(k) + _sizeof(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_sizeof(item) for item in obj)
+    return size
+
+
+class LiveStateEngine:
+    """Estado en memoria de los partidos en curso, sin consultar SQL Server al leer.
+
+    Al arrancar reproduce las filas de Anotacion, Falta, TiempoMuerto y
+    CronometroEvento (y los Cuarto) de cada partido ``en_curso``; después sigue
+    cada tabla por su IDENTITY. Cada escritura de esta API pide una sincronización
+    inmediata (``kick``); las de la API .NET se recogen cada ``poll_interval``.
+    Las filas que se confirman tarde con un IDENTITY menor se recogen releyendo los
+    últimos ``lookback`` ids de cada tabla (sin aplicarlas dos veces).
+    """
+
+    def __init__(self, pool: Optional[ConnectionPool] = None, poll_interval: Optional[float] = None,
+                 lookback: Optional[int] = None):
+        settings = get_settings()
+        self._pool = pool
+        self.poll_interval = settings.live_state_poll_interval if poll_interval is None else poll_interval
+        self.lookback = settings.live_state_lookback if lookback is None else lookback
+        self._juegos: Dict[int, _Juego] = {}
+        self._marcas: Optional[Dict[str, int]] = None
+        self._recientes: Dict[str, Set[int]] = {tabla: set() for tabla in LIVE_EVENTOS}
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._listeners: List[Listener] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.syncs = 0
+        self.replays = 0
+        self.rows = 0
+        self.errors = 0
+        self.last_sync = 0.0
+        self.last_sync_ms = 0.0
+
+    def connection(self):
+        return (self._pool or get_pool()).connection()
+
+    # --- Lectura (sin base de datos) ---------------------------------------------
+
+    def estado(self, partido_id: int) -> Optional[Dict[str, Any]]:
+        """Estado en vivo del partido, o None si no está en curso (o aún no se cargó)"""
+        with self._lock:
+            juego = self._juegos.get(partido_id)
+            return juego.estado_vivo() if juego is not None else None
+
+    def detalle(self, partido_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            juego = self._juegos.get(partido_id)
+            if juego is None:
+                return None
+            detalle = juego.detalle()
+            detalle["memoriaBytes"] = juego.memoria()
+            return detalle
+
+    def reloj(self, partido_id: int) -> Optional[Dict[str, Any]]:
+        """Reloj del partido calculado ahora, o None si no está en curso"""
+        with self._lock:
+            juego = self._juegos.get(partido_id)
+            return juego.reloj(time.monotonic()) if juego is not None else None
+
+    def transicion(self, partido_id: int) -> Optional[tuple]:
+        with self._lock:
+            juego = self._juegos.get(partido_id)
+            return juego.transicion() if juego is not None else None
+
+    def subscribe(self, listener: Listener) -> None:
+        """``listener(partido_id, estado)`` en el event loop con cada partido que cambia.
+
+        ``estado`` es None cuando el partido deja de estar en curso.
+        """
+        self._listeners.append(listener)
+
+    # --- Sincronización ----------------------------------------------------------
+
+    def sync(self) -> Set[int]:
+        """Un paso de sincronización (bloqueante): devuelve los partidos que cambiaron o terminaron"""
+        with self._sync_lock, self.connection() as conn:
+            cursor = conn.cursor()
+            start = time.perf_counter()
+            partidos = catalog.fetchall(cursor, "live.partidos")
+            mono = time.monotonic()
+            if self._marcas is None:
+                marcas = catalog.fetchone(cursor, "live.marcas")
+                self._marcas = dict(zip(LIVE_EVENTOS, marcas))
+
+            vivos = {row[0]: row for row in partidos}
+            with self._lock:
+                terminados = set(self._juegos) - set(vivos)
+                for partido_id in terminados:
+                    del self._juegos[partido_id]  # terminó (o se borró): deja de mantenerse
+                nuevos = [pid for pid in vivos if pid not in self._juegos]
+            cambiados = set(nuevos)
+
+            filas = {}
+            if nuevos:
+                filas = self._leer_replay(cursor, nuevos)
+            cola = {tabla: catalog.fetchall(cursor, f"live.tail.{tabla}",
+                                            (max(self._marcas[tabla] - self.lookback, 0),))
+                    for tabla in LIVE_EVENTOS}
+            cuartos = catalog.fetchall(cursor, "live.cuartos")
+
+            with self._lock:
+                for partido_id in nuevos:
+                    self._juegos[partido_id] = _Juego(vivos[partido_id], mono)
+                for partido_id, row in vivos.items():
+                    if self._juegos[partido_id].update(row, mono):
+                        cambiados.add(partido_id)
+                for tabla, rows in filas.items():
+                    self._aplicar(tabla, rows, cambiados, replay=True)
+                for tabla, rows in cola.items():
+                    self._aplicar(tabla, rows, cambiados)
+                cambiados |= self._aplicar_cuartos(cuartos)
+                for partido_id in cambiados:
+                    if partido_id in self._juegos:
+                        self._juegos[partido_id].version += 1
+                self.replays += len(nuevos)
+                self.syncs += 1
+                self.last_sync = time.monotonic()
+                self.last_sync_ms = (time.perf_counter() - start) * 1000
+            return {pid for pid in cambiados if pid in self._juegos} | terminados
+
+    def _leer_replay(self, cursor, partido_ids: List[int]) -> Dict[str, list]:
+        filas: Dict[str, list] = {tabla: [] for tabla in LIVE_EVENTOS}
+        for i in range(0, len(partido_ids), MAX_IDS):
+            chunk = partido_ids[i:i + MAX_IDS]
+            for tabla in LIVE_EVENTOS:
+                filas[tabla] += catalog.fetchall(cursor, f"live.replay.{tabla}", chunk, types=[INT] * len(chunk),
+                                                 parts={"ids": ", ".join(["?"] * len(chunk))})
+        return filas
+
+    def _aplicar(self, tabla: str, rows: Iterable[tuple], cambiados: Set[int], replay: bool = False) -> None:
+        """Aplica filas (id, partido_id, ...) una sola vez cada una y avanza la marca de la tabla.
+
+        La reproducción de un partido aplica todas sus filas; las de la ventana de
+        ``lookback`` quedan anotadas para que el seguimiento no las repita.
+        """
+        recientes = self._recientes[tabla]
+        marca = self._marcas[tabla]
+        for row in rows:
+            row_id = row[0]
+            if replay:
+                if row_id > marca - self.lookback:
+                    recientes.add(row_id)
+            elif row_id in recientes or row_id <= marca - self.lookback:
+                continue
+            else:
+                marca = max(marca, row_id)
+                recientes.add(row_id)
+            juego = self._juegos.get(row[1])
+            if juego is None:
+                continue
+            getattr(juego, _APLICAR[tabla])(*row[2:])
+            cambiados.add(row[1])
+            self.rows += 1
+        self._marcas[tabla] = marca
+        piso = marca - self.lookback
+        if len(recientes) > self.lookback:
+            self._recientes[tabla] = {row_id for row_id in recientes if row_id > piso}
+
+    def _aplicar_cuartos(self, rows: Iterable[tuple]) -> Set[int]:
+        por_partido: Dict[int, List[list]] = {}
+        for cuarto_id, partido_id, numero, duracion, segundos, estado in rows:
+            por_partido.setdefault(partido_id, []).append([cuarto_id, numero, duracion, segundos, estado])
+        cambiados = set()
+        for partido_id, juego in self._juegos.items():
+            cuartos = sorted(por_partido.get(partido_id, []))
+            if cuartos != juego.cuartos:
+                juego.cuartos = cuartos
+                cambiados.add(partido_id)
+        return cambiados
+
+    # --- Ciclo en segundo plano --------------------------------------------------
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def kick(self) -> None:
+        """Pide una sincronización inmediata (seguro desde cualquier hilo)"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self) -> None:
+        from app.data.executor import get_db_executor
+
+        while True:
+            self._wake.clear()
+            try:
+                cambiados = await get_db_executor().run(self.sync)
+            except Exception:
+                self.errors += 1
+                logger.exception("live_state.sync.error")
+                cambiados = set()
+            for partido_id in cambiados:
+                estado = self.estado(partido_id)
+                for listener in self._listeners:
+                    try:
+                        listener(partido_id, estado)
+                    except Exception:
+                        logger.exception("live_state.listener.error", extra={"partidoId": partido_id})
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._loop = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            memoria = {pid: juego.memoria() for pid, juego in self._juegos.items()}
+            return {
+                "partidos": len(self._juegos),
+                "memoriaBytes": sum(memoria.values()),
+                "memoriaPorPartido": memoria,
+                "syncs": self.syncs,
+                "replays": self.replays,
+                "rowsApplied": self.rows,
+                "errors": self.errors,
+                "lastSyncMs": round(self.last_sync_ms, 3),
+                "lastSyncAgeMs": round((time.monotonic() - self.last_sync) * 1000, 1) if self.syncs else None,
+                "pollInterval": self.poll_interval,
+                "marks": dict(self._marcas or {}),
+            }
+
+
+_APLICAR = {
+    "Anotacion": "anotacion",
+    "Falta": "falta",
+    "TiempoMuerto": "tiempo_muerto",
+    "CronometroEvento": "cronometro",
+}
+
+_engine: Optional[LiveStateEngine] = None
+
+
+def get_live_state() -> LiveStateEngine:
+    global _engine
+    if _engine is None:
+        _engine = LiveStateEngine()
+    return _engine
+
+
+async def start_live_state() -> None:
+    await get_live_state().start()
+
+
+async def close_live_state() -> None:
+    if _engine is not None:
+        await _engine.close()
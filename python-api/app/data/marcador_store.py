@@ -0,0 +1,95 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.config import get_settings
+from app.data.queries import MARCADOR_REBUILD, catalog
+from app.data.statements import INT
+
+
+class MarcadorStore:
+    """Marcador mantenido por partido (dbo.MarcadorTotal/MarcadorCuarto) con caché en memoria.
+
+    Los contadores los mantiene el trigger ``trg_Anotacion_Marcador`` en la misma
+    transacción de cada anotación, también cuando escribe la API .NET. La caché
+    se actualiza con cada escritura de este proceso y caduca a los ``ttl`` segundos
+    para recoger las escrituras de otros servicios.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = get_settings().marcador_cache_ttl if ttl is None else ttl
+        self._cache: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_cached(self, partido_id: int) -> Optional[Dict[str, Any]]:
+        """Marcador en caché, o None si no está o caducó"""
+        with self._lock:
+            entry = self._cache.get(partido_id)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def get(self, cursor, partido_id: int) -> Optional[Dict[str, Any]]:
+        """Marcador de un partido: caché en memoria o lectura por clave primaria"""
+        marcador = self.get_cached(partido_id)
+        if marcador is None:
+            marcador = self.read(cursor, partido_id)
+            if marcador is not None:
+                self.put(marcador)
+        return marcador
+
+    def read(self, cursor, partido_id: int) -> Optional[Dict[str, Any]]:
+        """Lee el marcador mantenido desde la base de datos"""
+        rows = catalog.fetchall(cursor, "marcador.leer", (partido_id,))
+        if not rows:
+            return None
+        cuartos: List[Dict[str, int]] = [
+            {"cuartoId": row[3], "local": row[4], "visitante": row[5]}
+            for row in rows if row[3] is not None
+        ]
+        return {
+            "partidoId": rows[0][0],
+            "local": rows[0][1],
+            "visitante": rows[0][2],
+            "cuartos": cuartos,
+        }
+
+    def put(self, marcador: Dict[str, Any]) -> None:
+        with self._lock:
+            self._cache[marcador["partidoId"]] = (time.monotonic() + self.ttl, marcador)
+
+    def invalidate(self, partido_id: Optional[int] = None) -> None:
+        """Descarta el marcador en caché de un partido (o de todos)"""
+        with self._lock:
+            if partido_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(partido_id, None)
+
+    def rebuild(self, cursor, partido_id: Optional[int] = None) -> None:
+        """Recalcula los contadores desde dbo.Anotacion (todo o un partido).
+
+        No hace commit: corre en la transacción de quien lo llama.
+        """
+        where = "WHERE partido_id = ?" if partido_id is not None else ""
+        where_a = "WHERE a.partido_id = ?" if partido_id is not None else ""
+        params = (partido_id,) if partido_id is not None else ()
+        types = (INT,) if partido_id is not None else ()
+        for name in MARCADOR_REBUILD:
+            catalog.execute(cursor, name, params, types=types, parts={"where": where, "where_a": where_a})
+        self.invalidate(partido_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses, "ttl": self.ttl}
+
+
+marcador_store = MarcadorStore()
+
+
+def get_marcador_store() -> MarcadorStore:
+    return marcador_store
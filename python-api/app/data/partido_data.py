@@ -1,55 +1,152 @@
 import pyodbc
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence, Tuple
 from datetime import datetime
 from app.config import get_settings
+from app.data.executor import DbExecutor, get_db_executor
+from app.data.keyset import InvalidCursorError, decode_cursor, encode_cursor
+from app.data.kpi_snapshot import KpiSnapshot, get_kpi_snapshot
+from app.data.live_state import LiveStateEngine, get_live_state
+from app.data.marcador_store import MarcadorStore, get_marcador_store
+from app.data.partido_versions import PartidoVersiones, get_partido_versiones
+from app.data.pool import ConnectionPool, get_pool, PooledConnection
+from app.data.proximos_cache import ProximosCache, get_proximos_cache
+from app.data.queries import ESTADO, SEDE, catalog
+from app.data.statements import BIT, DATETIME2, INT, NVARCHAR, SMALLINT, TINYINT
 from app.models.partido_models import (
     PartidoResponse, CreatePartidoRequest, UpdatePartidoRequest,
     RosterEntryResponse, CreateRosterEntry, EstadisticaPartidoResponse
 )
 
+# Parámetros por sentencia: SQL Server admite hasta 2100 (pyodbc usa sp_prepexec)
+MAX_PARAMS = 2098
+
+
+def _insertar_lote(cursor, nombre: str, fijos: List[Any], tipos_fijos: List[Any],
+                   filas: Sequence[Sequence[Any]], tipos_fila: List[Any]) -> None:
+    """INSERT multi-fila de ``nombre`` ({values}), en tantas sentencias como pida el límite de parámetros"""
+    por_sentencia = (MAX_PARAMS - len(fijos)) // len(tipos_fila)
+    marcador = "(" + ", ".join(["?"] * len(tipos_fila)) + ")"
+    for i in range(0, len(filas), por_sentencia):
+        chunk = filas[i:i + por_sentencia]
+        params = list(fijos)
+        for fila in chunk:
+            params += fila
+        catalog.execute(cursor, nombre, params, types=tipos_fijos + tipos_fila * len(chunk),
+                        parts={"values": ", ".join([marcador] * len(chunk))})
+
+
 class PartidoDataAccess:
     """Capa de acceso a datos para partidos"""
     
-    def __init__(self):
+    def __init__(self, pool: Optional[ConnectionPool] = None, marcador_store: Optional[MarcadorStore] = None,
+                 kpi_snapshot: Optional[KpiSnapshot] = None, proximos_cache: Optional[ProximosCache] = None,
+                 live_state: Optional[LiveStateEngine] = None, versiones: Optional[PartidoVersiones] = None):
         self.settings = get_settings()
+        self._pool = pool
+        self.marcador_store = marcador_store or get_marcador_store()
+        self.kpi_snapshot = kpi_snapshot or get_kpi_snapshot()
+        self.proximos_cache = proximos_cache or get_proximos_cache()
+        self.live_state = live_state or get_live_state()
+        self.versiones = versiones or get_partido_versiones()
     
-    def get_connection(self) -> pyodbc.Connection:
-        """Obtiene conexión a la base de datos"""
-        return pyodbc.connect(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={self.settings.sqlserver_host},{self.settings.sqlserver_port};"
-            f"DATABASE={self.settings.sqlserver_database};"
-            f"UID={self.settings.sqlserver_username};"
-            f"PWD={self.settings.sqlserver_password};"
-            f"TrustServerCertificate=yes;"
-        )
+    def get_connection(self) -> PooledConnection:
+        """Obtiene una conexión del pool compartido (usar con ``with``)"""
+        return (self._pool or get_pool()).connection()
     
-    def get_all_partidos(self) -> List[Dict[str, Any]]:
-        """Obtiene todos los partidos"""
-        query = """
-        SELECT 
-            partido_id as id,
-            equipo_local_id,
-            equipo_visitante_id,
-            fecha_hora_inicio,
-            estado,
-            minutos_por_cuarto,
-            cuartos_totales,
-            faltas_por_equipo_limite,
-            faltas_por_jugador_limite,
-            sede,
-            fecha_creacion
-        FROM dbo.Partido
-        ORDER BY fecha_creacion DESC
+    def _partidos_modificados(self, partido_id: Optional[int] = None) -> None:
+        """Descarta las cachés derivadas de dbo.Partido tras una escritura"""
+        if partido_id is not None:
+            self.versiones.bump(partido_id)
+        self.kpi_snapshot.invalidate()
+        self.proximos_cache.invalidate()
+        self.live_state.kick()
+    
+    # Posición del cursor: se toma fecha_creacion exacta de la fila (DATETIME2(7)),
+    # con el valor del token como respaldo si la fila ya no existe. El primer término
+    # (<=) acota el rango del índice; sin él el OR obliga a recorrer desde el inicio
+    KEYSET_PREDICATE = """(
+            p.fecha_creacion <= ISNULL((SELECT fecha_creacion FROM dbo.Partido WHERE partido_id = ?), ?)
+            AND (p.fecha_creacion < ISNULL((SELECT fecha_creacion FROM dbo.Partido WHERE partido_id = ?), ?)
+                 OR p.partido_id < ?)
+        )"""
+    
+    def list_partidos(
+        self,
+        estado: Optional[str] = None,
+        equipo_id: Optional[int] = None,
+        sede: Optional[str] = None,
+        desde: Optional[datetime] = None,
+        hasta: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Lista partidos con marcador, filtros y paginación por keyset.
+        
+        Devuelve (partidos, cursor_siguiente); el cursor es None en la última página.
         """
+        conditions = []
+        params: List[Any] = []
+        types: List[tuple] = []
         
+        if estado:
+            conditions.append("p.estado = ?")
+            params.append(estado)
+            types.append(ESTADO)
+        if equipo_id:
+            conditions.append("(p.equipo_local_id = ? OR p.equipo_visitante_id = ?)")
+            params.extend([equipo_id, equipo_id])
+            types.extend([INT, INT])
+        if sede:
+            conditions.append("p.sede = ?")
+            params.append(sede)
+            types.append(SEDE)
+        if desde:
+            conditions.append("p.fecha_hora_inicio >= ?")
+            params.append(desde)
+            types.append(DATETIME2)
+        if hasta:
+            conditions.append("p.fecha_hora_inicio < ?")
+            params.append(hasta)
+            types.append(DATETIME2)
+        if cursor:
+            posicion = decode_cursor(cursor)
+            try:
+                ultimo_id = int(posicion["id"])
+                ultima_fecha = datetime.fromisoformat(posicion["fc"])
+            except (KeyError, TypeError, ValueError) as e:
+                raise InvalidCursorError("Cursor inválido") from e
+            conditions.append(self.KEYSET_PREDICATE)
+            params.extend([ultimo_id, ultima_fecha, ultimo_id, ultima_fecha, ultimo_id])
+            types.extend([INT, DATETIME2, INT, DATETIME2, INT])
+        
+        top = ""
+        if limit is not None:
+            # Se pide una fila extra para saber si hay página siguiente
+            top = "TOP (?)"
+            params.insert(0, limit + 1)
+            types.insert(0, INT)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        partidos = self._fetch_partidos_con_marcador(top, where, tuple(params), tuple(types))
+        
+        next_cursor = None
+        if limit is not None and len(partidos) > limit:
+            partidos = partidos[:limit]
+            ultimo = partidos[-1]
+            next_cursor = encode_cursor({"fc": ultimo['fecha_creacion'], "id": ultimo['id']})
+        return partidos, next_cursor
+    
+    def _fetch_partidos_con_marcador(self, top: str = "", where: str = "", params: tuple = (),
+                                     types: tuple = ()) -> List[Dict[str, Any]]:
+        """Ejecuta la consulta de partidos con marcador y convierte las filas"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query)
+            rows = catalog.fetchall(cursor, "partidos.listado", params, types=types,
+                                    parts={"top": top, "where": where})
             columns = [column[0] for column in cursor.description]
             results = []
             
-            for row in cursor.fetchall():
+            for row in rows:
                 partido = dict(zip(columns, row))
                 # Convertir datetime a string para JSON
                 if partido['fecha_hora_inicio']:
@@ -60,90 +157,19 @@ class PartidoDataAccess:
             
             return results
     
+    def get_all_partidos(self) -> List[Dict[str, Any]]:
+        """Obtiene todos los partidos con su marcador"""
+        return self.list_partidos()[0]
+    
     def get_partidos_by_estado(self, estado: str) -> List[Dict[str, Any]]:
-        """Obtiene partidos por estado específico"""
-        query = """
-        SELECT 
-            partido_id,
-            equipo_local_id,
-            equipo_visitante_id,
-            fecha_hora_inicio,
-            estado,
-            minutos_por_cuarto,
-            cuartos_totales,
-            faltas_por_equipo_limite,
-            faltas_por_jugador_limite,
-            sede,
-            fecha_creacion
-        FROM dbo.Partido
-        WHERE estado = ?
-        ORDER BY fecha_creacion DESC
-        """
-        
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, (estado,))
-            
-            columns = [column[0] for column in cursor.description]
-            results = []
-            
-            for row in cursor.fetchall():
-                result = dict(zip(columns, row))
-                # Convertir datetime a string para JSON
-                if result['fecha_hora_inicio']:
-                    result['fecha_hora_inicio'] = result['fecha_hora_inicio'].isoformat()
-                if result['fecha_creacion']:
-                    result['fecha_creacion'] = result['fecha_creacion'].isoformat()
-                
-                # Calcular marcador desde tabla Anotacion
-                partido_id = result['partido_id']
-                equipo_local_id = result['equipo_local_id']
-                equipo_visitante_id = result['equipo_visitante_id']
-                
-                # Obtener puntos de cada equipo
-                cursor.execute("""
-                    SELECT 
-                        ISNULL(SUM(CASE WHEN equipo_id = ? THEN puntos ELSE 0 END), 0) as puntos_local,
-                        ISNULL(SUM(CASE WHEN equipo_id = ? THEN puntos ELSE 0 END), 0) as puntos_visitante
-                    FROM dbo.Anotacion 
-                    WHERE partido_id = ?
-                """, (equipo_local_id, equipo_visitante_id, partido_id))
-                
-                marcador_row = cursor.fetchone()
-                if marcador_row:
-                    result['puntos_local'] = marcador_row[0]
-                    result['puntos_visitante'] = marcador_row[1]
-                else:
-                    result['puntos_local'] = 0
-                    result['puntos_visitante'] = 0
-                
-                results.append(result)
-            
-            return results
+        """Obtiene partidos por estado específico con su marcador"""
+        return self.list_partidos(estado=estado)[0]
     
     def get_partido_by_id(self, partido_id: int) -> Optional[Dict[str, Any]]:
         """Obtiene un partido por ID"""
-        query = """
-        SELECT 
-            partido_id as id,
-            equipo_local_id,
-            equipo_visitante_id,
-            fecha_hora_inicio,
-            estado,
-            minutos_por_cuarto,
-            cuartos_totales,
-            faltas_por_equipo_limite,
-            faltas_por_jugador_limite,
-            sede,
-            fecha_creacion
-        FROM dbo.Partido
-        WHERE partido_id = ?
-        """
-        
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, (partido_id,))
-            row = cursor.fetchone()
+            row = catalog.fetchone(cursor, "partido.por_id", (partido_id,))
             
             if row:
                 columns = [column[0] for column in cursor.description]
@@ -159,23 +185,9 @@ class PartidoDataAccess:
     
     def create_partido(self, partido_data: CreatePartidoRequest) -> int:
         """Crea un nuevo partido"""
-        query = """
-        INSERT INTO dbo.Partido (
-            equipo_local_id,
-            equipo_visitante_id,
-            fecha_hora_inicio,
-            estado,
-            minutos_por_cuarto,
-            cuartos_totales,
-            faltas_por_equipo_limite,
-            faltas_por_jugador_limite,
-            sede
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, (
+            catalog.execute(cursor, "partido.crear", (
                 partido_data.equipo_local_id,
                 partido_data.equipo_visitante_id,
                 partido_data.fecha_hora_inicio,
@@ -188,31 +200,17 @@ class PartidoDataAccess:
             ))
             
             # Obtener el ID del partido creado
-            cursor.execute("SELECT @@IDENTITY")
-            partido_id = cursor.fetchone()[0]
+            partido_id = catalog.fetchone(cursor, "identity")[0]
             conn.commit()
-            
-            return int(partido_id)
+        
+        self._partidos_modificados()
+        return int(partido_id)
     
     def update_partido(self, partido_id: int, partido_data) -> bool:
         """Actualiza un partido existente"""
-        query = """
-        UPDATE dbo.Partido SET
-            equipo_local_id = ?,
-            equipo_visitante_id = ?,
-            fecha_hora_inicio = ?,
-            estado = ?,
-            minutos_por_cuarto = ?,
-            cuartos_totales = ?,
-            faltas_por_equipo_limite = ?,
-            faltas_por_jugador_limite = ?,
-            sede = ?
-        WHERE partido_id = ?
-        """
-        
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, (
+            catalog.execute(cursor, "partido.actualizar", (
                 partido_data.equipo_local_id,
                 partido_data.equipo_visitante_id,
                 partido_data.fecha_hora_inicio,
@@ -226,58 +224,51 @@ class PartidoDataAccess:
             ))
             
             rows_affected = cursor.rowcount
+            if rows_affected > 0:
+                # Los equipos pudieron cambiar: recalcular local/visitante del marcador
+                self.marcador_store.rebuild(cursor, partido_id)
             conn.commit()
-            
-            return rows_affected > 0
+        
+        if rows_affected > 0:
+            self._partidos_modificados(partido_id)
+        return rows_affected > 0
     
     def delete_partido(self, partido_id: int) -> bool:
         """Elimina un partido"""
-        query = "DELETE FROM dbo.Partido WHERE partido_id = ?"
-        
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, (partido_id,))
+            catalog.execute(cursor, "partido.eliminar", (partido_id,))
             
             rows_affected = cursor.rowcount
             conn.commit()
-            
-            return rows_affected > 0
+        
+        self.marcador_store.invalidate(partido_id)
+        self._partidos_modificados(partido_id)
+        return rows_affected > 0
     
     def update_partido_estado(self, partido_id: int, nuevo_estado: str) -> bool:
         """Actualiza solo el estado de un partido"""
-        query = "UPDATE dbo.Partido SET estado = ? WHERE partido_id = ?"
-        
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, (nuevo_estado, partido_id))
+            catalog.execute(cursor, "partido.actualizar_estado", (nuevo_estado, partido_id))
             
             rows_affected = cursor.rowcount
             conn.commit()
-            
-            return rows_affected > 0
+        
+        if rows_affected > 0:
+            self._partidos_modificados(partido_id)
+        return rows_affected > 0
     
     # Métodos para Roster
     def get_roster_by_partido(self, partido_id: int) -> List[Dict[str, Any]]:
         """Obtiene el roster de un partido"""
-        query = """
-        SELECT 
-            roster_id,
-            partido_id,
-            equipo_id,
-            jugador_id,
-            es_titular
-        FROM dbo.RosterPartido
-        WHERE partido_id = ?
-        ORDER BY equipo_id, es_titular DESC, jugador_id
-        """
-        
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, (partido_id,))
+            rows = catalog.fetchall(cursor, "roster.por_partido", (partido_id,))
             columns = [column[0] for column in cursor.description]
             results = []
             
-            for row in cursor.fetchall():
+            for row in rows:
                 roster_entry = dict(zip(columns, row))
                 results.append(roster_entry)
             
@@ -285,28 +276,18 @@ class PartidoDataAccess:
     
     def clear_roster_partido(self, partido_id: int) -> bool:
         """Limpia el roster de un partido"""
-        query = "DELETE FROM dbo.RosterPartido WHERE partido_id = ?"
-        
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, (partido_id,))
+            catalog.execute(cursor, "roster.limpiar", (partido_id,))
             conn.commit()
-            return True
+        self.versiones.bump(partido_id)
+        return True
     
     def add_roster_entry(self, roster_data: CreateRosterEntry) -> int:
         """Agrega una entrada al roster"""
-        query = """
-        INSERT INTO dbo.RosterPartido (
-            partido_id,
-            equipo_id,
-            jugador_id,
-            es_titular
-        ) VALUES (?, ?, ?, ?)
-        """
-        
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, (
+            catalog.execute(cursor, "roster.insertar", (
                 roster_data.partido_id,
                 roster_data.equipo_id,
                 roster_data.jugador_id,
@@ -314,35 +295,284 @@ class PartidoDataAccess:
             ))
             
             # Obtener el ID del roster creado
-            cursor.execute("SELECT @@IDENTITY")
-            roster_id = cursor.fetchone()[0]
+            roster_id = catalog.fetchone(cursor, "identity")[0]
             conn.commit()
+        
+        self.versiones.bump(roster_data.partido_id)
+        return int(roster_id)
+    
+    def save_roster_complete(self, partido_id: int, roster_entries: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Guarda el roster completo de un partido aplicando sólo las diferencias.
+
+        Compara con las filas guardadas (bloqueadas hasta el commit) y envía en bloque
+        las altas, bajas y cambios de titularidad, todo en una transacción.
+        """
+        deseado: Dict[int, tuple] = {}
+        for entry in roster_entries:
+            deseado[int(entry['jugadorId'])] = (int(entry['equipoId']), bool(entry['esTitular']))
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            actual = {
+                row[2]: (row[0], row[1], bool(row[3]))
+                for row in catalog.fetchall(cursor, "roster.bloquear", (partido_id,))
+            }
+            
+            eliminar = [(roster_id,) for jugador_id, (roster_id, _, _) in actual.items()
+                        if jugador_id not in deseado]
+            actualizar = []
+            insertar = []
+            sin_cambios = 0
+            for jugador_id, (equipo_id, es_titular) in deseado.items():
+                existente = actual.get(jugador_id)
+                if existente is None:
+                    insertar.append((partido_id, equipo_id, jugador_id, es_titular))
+                elif existente[1:] != (equipo_id, es_titular):
+                    actualizar.append((equipo_id, es_titular, existente[0]))
+                else:
+                    sin_cambios += 1
+            
+            # Un solo envío por tipo de cambio (executemany no acepta listas vacías)
+            cursor.fast_executemany = True
+            if eliminar:
+                catalog.executemany(cursor, "roster.eliminar", eliminar)
+            if actualizar:
+                catalog.executemany(cursor, "roster.actualizar", actualizar)
+            if insertar:
+                catalog.executemany(cursor, "roster.insertar", insertar)
+            
+            conn.commit()
+        
+        if eliminar or actualizar or insertar:
+            self.versiones.bump(partido_id)
+        return {
+            "insertados": len(insertar),
+            "eliminados": len(eliminar),
+            "actualizados": len(actualizar),
+            "sinCambios": sin_cambios,
+        }
+    
+    def ping(self) -> int:
+        """Consulta trivial para verificar la conexión"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            return catalog.fetchone(cursor, "ping")[0]
+    
+    def get_equipos_basicos(self, equipo_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Obtiene id, nombre y abreviatura de los equipos indicados"""
+        if not equipo_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in equipo_ids)
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            rows = catalog.fetchall(cursor, "equipos.basicos", tuple(equipo_ids),
+                                    types=(INT,) * len(equipo_ids), parts={"ids": placeholders})
+            
+            equipos = {}
+            for equipo in rows:
+                equipos[equipo[0]] = {
+                    "id": equipo[0],
+                    "nombre": equipo[1],
+                    "abreviatura": equipo[2] or ""
+                }
+            return equipos
+    
+    def ajustar_puntos(self, partido_id: int, equipo_id: int, puntos: int) -> Dict[str, Any]:
+        """Registra un ajuste de puntos y devuelve el marcador resultante"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Insertar nueva anotación en el cuarto en curso;
+            # trg_Anotacion_Marcador actualiza el marcador en la misma transacción
+            catalog.execute(cursor, "anotacion.ajuste", (partido_id, partido_id, equipo_id, puntos))
             
-            return int(roster_id)
+            marcador = self.marcador_store.read(cursor, partido_id)
+            conn.commit()
+        
+        self.marcador_store.put(marcador)
+        self.versiones.bump(partido_id)
+        self.live_state.kick()
+        return marcador
+    
+    def get_estado_ingesta(self, partido_id: int) -> Optional[Dict[str, Any]]:
+        """Equipos, marcador, faltas, tiempos muertos y última seq de un partido (None si no existe)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            row = catalog.fetchone(cursor, "evento.ingesta_estado", (partido_id,))
+            if not row:
+                return None
+            columns = [column[0] for column in cursor.description]
+            return dict(zip(columns, row))
+    
+    def buscar_eventos(self, partido_id: int, evento_ids: Sequence[str]) -> Dict[str, int]:
+        """Secuencia con que se registró cada evento_id que ya está en la base"""
+        encontrados: Dict[str, int] = {}
+        por_sentencia = MAX_PARAMS - 1
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            for i in range(0, len(evento_ids), por_sentencia):
+                chunk = list(evento_ids[i:i + por_sentencia])
+                rows = catalog.fetchall(cursor, "evento.buscar", [partido_id] + chunk,
+                                        types=[INT] + [NVARCHAR(36)] * len(chunk),
+                                        parts={"ids": ", ".join(["?"] * len(chunk))})
+                encontrados.update((evento_id, seq) for evento_id, seq in rows)
+        return encontrados
+    
+    def registrar_eventos(
+        self,
+        partido_id: int,
+        anotaciones: Sequence[Tuple[int, int]] = (),
+        faltas: Sequence[Tuple[int, Optional[int], int, bool]] = (),
+        tiempos: Sequence[Tuple[int, str]] = (),
+        registros: Sequence[Tuple[str, int, str]] = (),
+    ) -> Dict[str, Any]:
+        """Registra un lote de eventos en una transacción y devuelve el estado resultante.
+        
+        anotaciones: (equipo_id, puntos); faltas: (equipo_id, jugador_id, tipo_falta_id,
+        es_de_tiro); tiempos: (equipo_id, tipo); registros: (evento_id, seq, tipo) de los
+        eventos identificados. Si un evento_id o una seq ya existen falla todo el lote.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            fijos = [partido_id, partido_id]
+            # trg_Anotacion_Marcador corre una vez por sentencia
+            _insertar_lote(cursor, "anotacion.lote", fijos, [INT, INT], anotaciones, [INT, SMALLINT])
+            _insertar_lote(cursor, "falta.lote", fijos, [INT, INT], faltas, [INT, INT, TINYINT, BIT])
+            _insertar_lote(cursor, "tiempo_muerto.lote", fijos, [INT, INT], tiempos, [INT, NVARCHAR(10)])
+            _insertar_lote(cursor, "evento.lote", [partido_id], [INT], registros,
+                           [NVARCHAR(36), INT, NVARCHAR(20)])
+            row = catalog.fetchone(cursor, "evento.ingesta_estado", (partido_id,))
+            columns = [column[0] for column in cursor.description]
+            conn.commit()
+        
+        self.marcador_store.invalidate(partido_id)
+        self.versiones.bump(partido_id)
+        self.live_state.kick()
+        return dict(zip(columns, row))
+    
+    def get_marcador(self, partido_id: int) -> Optional[Dict[str, Any]]:
+        """Obtiene el marcador mantenido (totales y por cuarto) de un partido"""
+        marcador = self.marcador_store.get_cached(partido_id)
+        if marcador is not None:
+            return marcador
+        
+        with self.get_connection() as conn:
+            return self.marcador_store.get(conn.cursor(), partido_id)
+    
+    def rebuild_marcador(self, partido_id: Optional[int] = None) -> None:
+        """Recalcula el marcador mantenido desde dbo.Anotacion"""
+        with self.get_connection() as conn:
+            self.marcador_store.rebuild(conn.cursor(), partido_id)
+            conn.commit()
     
-    def save_roster_complete(self, partido_id: int, roster_entries: List[Dict[str, Any]]) -> bool:
-        """Guarda el roster completo de un partido"""
+    def reset_partido(self, partido_id: int) -> bool:
+        """Elimina el partido y todos sus datos de todas las tablas"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            # Primero limpiar el roster existente
-            cursor.execute("DELETE FROM dbo.RosterPartido WHERE partido_id = ?", (partido_id,))
+            # Eliminar en orden correcto (respetando foreign keys)
+            
+            # 1. Eliminar roster del partido
+            catalog.execute(cursor, "partido.reset.RosterPartido", (partido_id,))
+            
+            # 2. Eliminar anotaciones del partido
+            catalog.execute(cursor, "partido.reset.Anotacion", (partido_id,))
             
-            # Insertar las nuevas entradas
-            for entry in roster_entries:
-                cursor.execute("""
-                    INSERT INTO dbo.RosterPartido (
-                        partido_id,
-                        equipo_id,
-                        jugador_id,
-                        es_titular
-                    ) VALUES (?, ?, ?, ?)
-                """, (
-                    entry['partidoId'],
-                    entry['equipoId'],
-                    entry['jugadorId'],
-                    entry['esTitular']
-                ))
+            # 3-6. Faltas, tiempos muertos, cuartos y eventos (si existen las tablas)
+            for tabla in ("Falta", "TiempoMuerto", "Cuarto", "EventoPartido"):
+                try:
+                    catalog.execute(cursor, f"partido.reset.{tabla}", (partido_id,))
+                except pyodbc.Error:
+                    pass  # Tabla puede no existir
+            
+            # 7. Finalmente eliminar el partido
+            catalog.execute(cursor, "partido.eliminar", (partido_id,))
+            rows_affected = cursor.rowcount
             
             conn.commit()
-            return True
+        
+        self.marcador_store.invalidate(partido_id)
+        self._partidos_modificados(partido_id)
+        return rows_affected > 0
+    
+    def get_estado_vivo(self, partido_id: int) -> Optional[Dict[str, Any]]:
+        """Estado de marcador en vivo (puntos, cuarto, reloj, faltas y tiempos muertos)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            row = catalog.fetchone(cursor, "live.estado", (partido_id,))
+            if not row:
+                return None
+            columns = [column[0] for column in cursor.description]
+            estado = dict(zip(columns, row))
+            estado["reloj_corriendo"] = estado.pop("ultimo_cronometro") in ("inicio", "reanudar")
+            return estado
+    
+    # Métodos para el dashboard de inicio
+    def get_kpis(self) -> Dict[str, int]:
+        """Obtiene los KPIs del dashboard (un solo viaje a la base de datos)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            row = catalog.fetchone(cursor, "kpi.snapshot")
+            
+            return {
+                "total_equipos": row[0],
+                "total_jugadores": row[1],
+                "partidos_pendientes": row[2]
+            }
+    
+    def get_kpis_snapshot(self) -> Tuple[Dict[str, int], float]:
+        """KPIs desde la foto en memoria (o recalculados); devuelve (kpis, edad en segundos)"""
+        return self.kpi_snapshot.get(self.get_kpis)
+    
+    def _query_proximos(self, top: int) -> Tuple[List[Dict[str, Any]], datetime]:
+        """Lee los ``top`` próximos partidos programados y la hora del servidor"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            rows = catalog.fetchall(cursor, "partidos.proximos", (top,))
+            columns = [column[0] for column in cursor.description]
+            
+            ahora = rows[0][0]
+            partidos = [dict(zip(columns[1:], row[1:])) for row in rows if row[1] is not None]
+            return partidos, ahora
+    
+    def get_proximos_partidos(self, n: int) -> List[Dict[str, Any]]:
+        """Obtiene los ``n`` próximos partidos programados (desde la caché si alcanza)"""
+        return self.proximos_cache.get(self._query_proximos, n)
+    
+    def get_proximo_partido(self) -> Optional[Dict[str, Any]]:
+        """Obtiene el próximo partido programado"""
+        proximos = self.get_proximos_partidos(1)
+        return proximos[0] if proximos else None
+
+class AsyncPartidoDataAccess:
+    """Versión awaitable de PartidoDataAccess.
+
+    Cada método público se ejecuta en el executor de base de datos, de modo que los
+    handlers ``async def`` pueden hacer ``await data_access.get_all_partidos()`` sin
+    bloquear el event loop.
+    """
+    
+    def __init__(self, data_access: Optional[PartidoDataAccess] = None, executor: Optional[DbExecutor] = None):
+        self.sync = data_access or PartidoDataAccess()
+        self._executor = executor
+    
+    @property
+    def executor(self) -> DbExecutor:
+        return self._executor or get_db_executor()
+    
+    async def run(self, func, *args, **kwargs):
+        """Ejecuta cualquier función bloqueante en el executor de base de datos"""
+        return await self.executor.run(func, *args, **kwargs)
+    
+    def __getattr__(self, name: str):
+        method = getattr(self.sync, name)
+        if name.startswith("_") or name == "get_connection" or not callable(method):
+            return method
+        
+        async def call(*args, **kwargs):
+            return await self.executor.run(method, *args, **kwargs)
+        
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        return call
@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+import secrets
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.config import get_settings
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Tópico del broker con las escrituras de partidos (llegan a todos los workers)
+TOPIC = "partido.version"
+
+
+def etag_coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """True si el header If-None-Match incluye ``etag`` (comparación débil) o es ``*``"""
+    if not if_none_match:
+        return False
+    opaco = etag[2:] if etag.startswith("W/") else etag
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato == "*":
+            return True
+        if candidato.startswith("W/"):
+            candidato = candidato[2:]
+        if candidato == opaco:
+            return True
+    return False
+
+
+class PartidoVersiones:
+    """Contador de versión por partido, en memoria, para ETag/If-None-Match.
+
+    Cada escritura de esta API sobre el partido o sus tablas hijas (roster,
+    anotaciones, faltas, ...) sube la versión, también en los demás workers por el
+    broker; el motor de estado en vivo la sube con lo que escribe la API .NET en los
+    partidos en curso. Las versiones no se guardan: se rearman al arrancar con la
+    primera lectura de cada partido.
+
+    El ETag de cada recurso sale del digest del contenido leído en la versión vigente,
+    no del proceso: todos los workers (y el mismo worker tras reiniciar) dan el mismo
+    ETag al mismo contenido. Una versión sólo responde 304 durante ``ttl`` segundos
+    desde la última lectura de la base; después la siguiente petición relee y, si el
+    contenido cambió por otra vía, la versión sube.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, broker=None):
+        self.ttl = get_settings().partido_etag_ttl if ttl is None else ttl
+        # Identifica a este worker en el broker (sus propias escrituras ya se contaron)
+        self.origen = secrets.token_hex(4)
+        # partido_id -> [version, validado_hasta, {recurso: digest}]
+        self._versiones: Dict[int, list] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.broker = broker
+        self.not_modified = 0
+        self.validations = 0
+        self.bumps = 0
+        self.remote_bumps = 0
+
+    def start(self, broker=None) -> None:
+        """Difunde las escrituras de este worker por el broker (desde el event loop)"""
+        from app.realtime.broker import get_broker
+
+        self._loop = asyncio.get_running_loop()
+        self.broker = broker or self.broker or get_broker()
+        self.broker.subscribe(TOPIC, self._remota)
+
+    @staticmethod
+    def _etag(partido_id: int, recurso: str, digest: bytes) -> str:
+        return f'W/"{partido_id}.{recurso}.{digest.hex()}"'
+
+    def etag(self, partido_id: int, recurso: str) -> Optional[str]:
+        """ETag vigente sin tocar la base, o None si hay que leer (desconocido o vencido)"""
+        with self._lock:
+            entry = self._versiones.get(partido_id)
+            if entry is None or entry[1] < time.monotonic() or recurso not in entry[2]:
+                return None
+            return self._etag(partido_id, recurso, entry[2][recurso])
+
+    def no_modificado(self, partido_id: int, recurso: str, if_none_match: Optional[str]) -> Optional[str]:
+        """ETag si el cliente ya tiene la versión vigente (responder 304); si no, None"""
+        if not if_none_match:
+            return None
+        etag = self.etag(partido_id, recurso)
+        if etag is None or not etag_coincide(if_none_match, etag):
+            return None
+        self.not_modified += 1
+        return etag
+
+    def version(self, partido_id: int) -> int:
+        """Versión actual (0 si no se conoce); se toma antes de leer de la base"""
+        with self._lock:
+            entry = self._versiones.get(partido_id)
+            return entry[0] if entry is not None else 0
+
+    def validar(self, partido_id: int, recurso: str, contenido: bytes, leida: int) -> Optional[str]:
+        """Registra lo leído de la base y devuelve su ETag; sube la versión si cambió sin aviso.
+
+        ``leida`` es la versión tomada antes de la lectura: si hubo una escritura
+        mientras tanto lo leído puede ser anterior a ella y no se le da ETag.
+        """
+        digest = hashlib.blake2b(contenido, digest_size=16).digest()
+        with self._lock:
+            self.validations += 1
+            entry = self._versiones.get(partido_id)
+            if entry is None:
+                if leida:
+                    return None
+                entry = self._versiones[partido_id] = [1, 0.0, {}]
+            elif entry[0] != leida:
+                return None
+            anterior = entry[2].get(recurso)
+            if anterior is not None and anterior != digest:
+                entry[0] += 1  # escrito por otra vía (API .NET, otro servicio)
+                entry[2].clear()
+                self.bumps += 1
+            entry[2][recurso] = digest
+            entry[1] = time.monotonic() + self.ttl
+            return self._etag(partido_id, recurso, digest)
+
+    def bump(self, partido_id: int) -> None:
+        """Escritura de este worker (seguro desde cualquier hilo): sube la versión aquí y en los demás"""
+        self._subir(partido_id)
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._difundir, partido_id)
+
+    def _subir(self, partido_id: int) -> None:
+        with self._lock:
+            entry = self._versiones.get(partido_id)
+            if entry is None:
+                self._versiones[partido_id] = [1, 0.0, {}]
+            else:
+                entry[0] += 1
+                entry[1] = 0.0  # el contenido nuevo se conoce en la próxima lectura
+                entry[2].clear()
+            self.bumps += 1
+
+    def _difundir(self, partido_id: int) -> None:
+        try:
+            self.broker.publish(TOPIC, partido_id, self.origen)
+        except Exception:
+            logger.exception("partido_version.publish.error", extra={"partidoId": partido_id})
+
+    def _remota(self, partido_id: Any, origen: Any) -> None:
+        if origen != self.origen:
+            self.remote_bumps += 1
+            self._subir(int(partido_id))
+
+    def observe(self, partido_id: int, estado: Optional[Dict[str, Any]]) -> None:
+        """Listener del motor de estado en vivo: cambios de los partidos en curso, de cualquier origen"""
+        self._subir(partido_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            partidos = len(self._versiones)
+        return {
+            "partidos": partidos,
+            "notModified": self.not_modified,
+            "validations": self.validations,
+            "bumps": self.bumps,
+            "remoteBumps": self.remote_bumps,
+            "ttl": self.ttl,
+        }
+
+
+_versiones: Optional[PartidoVersiones] = None
+
+
+def get_partido_versiones() -> PartidoVersiones:
+    global _versiones
+    if _versiones is None:
+        _versiones = PartidoVersiones()
+    return _versiones
+
+
+def start_partido_versiones() -> None:
+    from app.data.live_state import get_live_state
+
+    versiones = get_partido_versiones()
+    versiones.start()
+    get_live_state().subscribe(versiones.observe)
@@ -0,0 +1,255 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Any, Optional
+
+import pyodbc
+
+from app.config import get_settings
+
+
+class PoolTimeoutError(Exception):
+    """No se obtuvo una conexión del pool dentro del tiempo de espera"""
+
+
+class _PoolEntry:
+    """Conexión física administrada por el pool"""
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn: pyodbc.Connection):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+class PooledConnection:
+    """Conexión prestada por el pool.
+
+    Se usa igual que una conexión de pyodbc dentro de un ``with``: al salir hace
+    commit (o rollback si hubo excepción) y devuelve la conexión al pool.
+    """
+
+    def __init__(self, pool: "ConnectionPool", entry: _PoolEntry):
+        self._pool = pool
+        self._entry: Optional[_PoolEntry] = entry
+
+    def __enter__(self) -> pyodbc.Connection:
+        return self._entry.conn
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        entry, self._entry = self._entry, None
+        if entry is None:
+            return False
+        broken = False
+        try:
+            if exc_type is None:
+                entry.conn.commit()
+            else:
+                entry.conn.rollback()
+        except pyodbc.Error:
+            broken = True
+        self._pool.release(entry, discard=broken)
+        return False
+
+    def close(self) -> None:
+        """Devuelve la conexión al pool sin confirmar cambios pendientes"""
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool.release(entry)
+
+
+class ConnectionPool:
+    """Pool acotado de conexiones pyodbc compartido por todo el proceso"""
+
+    def __init__(
+        self,
+        factory: Callable[[], pyodbc.Connection],
+        max_size: int = 10,
+        timeout: float = 5.0,
+        recycle: float = 1800,
+        ping_after: float = 30,
+    ):
+        self._factory = factory
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+
+        self._idle: Deque[_PoolEntry] = deque()
+        self._cond = threading.Condition(threading.Lock())
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+
+        # Métricas
+        self._created = 0
+        self._discarded = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._ping_failures = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def connection(self) -> PooledConnection:
+        """Presta una conexión del pool (usar con ``with``)"""
+        return PooledConnection(self, self._checkout())
+
+    def _checkout(self) -> _PoolEntry:
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+
+        while True:
+            entry = None
+            create = False
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("El pool de conexiones está cerrado")
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"No hay conexiones disponibles tras {self.timeout:.1f}s "
+                            f"(en uso: {self._in_use}/{self.max_size})"
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+                if self._idle:
+                    # LIFO: la conexión usada más recientemente sigue "caliente"
+                    entry = self._idle.pop()
+                else:
+                    self._size += 1
+                    create = True
+                self._in_use += 1
+
+            if create:
+                try:
+                    entry = _PoolEntry(self._factory())
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._in_use -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._created += 1
+            elif not self._is_usable(entry):
+                self._discard(entry)
+                continue
+
+            wait = time.monotonic() - start
+            with self._cond:
+                self._checkouts += 1
+                if waited:
+                    self._waits += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+            return entry
+
+    def _is_usable(self, entry: _PoolEntry) -> bool:
+        """Valida vida máxima y, si estuvo ociosa un rato, que siga viva"""
+        now = time.monotonic()
+        if self.recycle and now - entry.created_at > self.recycle:
+            return False
+        if now - entry.last_used > self.ping_after:
+            try:
+                entry.conn.execute("SELECT 1").fetchone()
+            except pyodbc.Error:
+                with self._cond:
+                    self._ping_failures += 1
+                return False
+        return True
+
+    def release(self, entry: _PoolEntry, discard: bool = False) -> None:
+        """Devuelve una conexión al pool, limpiando cualquier transacción abierta"""
+        if not discard:
+            try:
+                entry.conn.rollback()
+            except pyodbc.Error:
+                discard = True
+        if discard or self._closed:
+            self._discard(entry)
+            return
+        entry.last_used = time.monotonic()
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def _discard(self, entry: _PoolEntry) -> None:
+        try:
+            entry.conn.close()
+        except pyodbc.Error:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._in_use -= 1
+            self._discarded += 1
+            self._cond.notify()
+
+    def close(self) -> None:
+        """Cierra las conexiones ociosas y rechaza nuevos préstamos"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            try:
+                entry.conn.close()
+            except pyodbc.Error:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas del pool para dimensionarlo por worker"""
+        with self._cond:
+            return {
+                "maxSize": self.max_size,
+                "size": self._size,
+                "inUse": self._in_use,
+                "idle": len(self._idle),
+                "created": self._created,
+                "discarded": self._discarded,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "pingFailures": self._ping_failures,
+                "waitTotalMs": round(self._wait_total * 1000, 3),
+                "waitAvgMs": round(self._wait_total * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+                "waitMaxMs": round(self._wait_max * 1000, 3),
+            }
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Pool de SQL Server del proceso (uno por worker de uvicorn)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                settings = get_settings()
+                connection_string = settings.sqlserver_odbc_connection_string
+                _pool = ConnectionPool(
+                    factory=lambda: pyodbc.connect(connection_string),
+                    max_size=settings.sqlserver_pool_size,
+                    timeout=settings.sqlserver_pool_timeout,
+                    recycle=settings.sqlserver_pool_recycle,
+                    ping_after=settings.sqlserver_pool_ping_after,
+                )
+    return _pool
+
+
+def close_pool() -> None:
+    """Cierra el pool del proceso (shutdown de la aplicación)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -0,0 +1,111 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import get_settings
+
+ProximosLoader = Callable[[int], Tuple[List[Dict[str, Any]], datetime]]
+
+
+class ProximosCache:
+    """Próximos partidos programados, precalculados y con caducidad por horario.
+
+    Guarda los ``size`` siguientes partidos junto con la hora del servidor SQL
+    (``GETDATE()``) al leerlos. Cada partido deja de servirse exactamente cuando
+    llega su ``fecha_hora_inicio`` según ese reloj; sólo se vuelve a consultar si
+    quedan menos partidos de los pedidos, si hay una escritura de partidos
+    (``invalidate``) o tras ``max_staleness`` segundos (escrituras de la API .NET).
+    """
+
+    def __init__(self, size: Optional[int] = None, max_staleness: Optional[float] = None):
+        settings = get_settings()
+        self.size = settings.proximos_cache_size if size is None else size
+        self.max_staleness = settings.proximos_max_staleness if max_staleness is None else max_staleness
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._entries: Optional[List[Dict[str, Any]]] = None
+        self._complete = False          # menos filas que ``size``: no hay más partidos programados
+        self._db_now = datetime.min
+        self._fetched_at = 0.0
+        self._generation = 0
+        self.hits = 0
+        self.refreshes = 0
+        self.invalidations = 0
+
+    def _db_clock(self) -> datetime:
+        """Hora actual del servidor SQL estimada desde la última lectura"""
+        return self._db_now + timedelta(seconds=time.monotonic() - self._fetched_at)
+
+    def get_fresh(self, n: int = 1) -> Optional[List[Dict[str, Any]]]:
+        """Los ``n`` próximos partidos si la caché alcanza para responder; None si no"""
+        if n > self.size:
+            return None
+        with self._lock:
+            if self._entries is None or time.monotonic() - self._fetched_at > self.max_staleness:
+                return None
+            ahora = self._db_clock()
+            pendientes = [p for p in self._entries if p["fecha_hora_inicio"] >= ahora]
+            if len(pendientes) < n and not self._complete:
+                return None
+            self.hits += 1
+            return pendientes[:n]
+
+    def get(self, loader: ProximosLoader, n: int = 1) -> List[Dict[str, Any]]:
+        """Próximos ``n`` partidos desde la caché o recargándola con ``loader(size)``"""
+        if n > self.size:
+            return loader(n)[0]
+        fresh = self.get_fresh(n)
+        if fresh is not None:
+            return fresh
+        with self._refresh_lock:
+            fresh = self.get_fresh(n)
+            if fresh is not None:
+                return fresh
+            with self._lock:
+                generation = self._generation
+            entries, db_now = loader(self.size)
+            fetched_at = time.monotonic()
+            with self._lock:
+                self.refreshes += 1
+                if generation == self._generation:
+                    self._entries = entries
+                    self._complete = len(entries) < self.size
+                    self._db_now = db_now
+                    self._fetched_at = fetched_at
+            return entries[:n]
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries = None
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            cached = self._entries is not None
+            siguiente = None
+            if cached:
+                ahora = self._db_clock()
+                pendientes = [p for p in self._entries if p["fecha_hora_inicio"] >= ahora]
+                if pendientes:
+                    siguiente = round((pendientes[0]["fecha_hora_inicio"] - ahora).total_seconds(), 3)
+            return {
+                "cached": cached,
+                "entries": len(self._entries) if cached else 0,
+                "complete": self._complete,
+                "ageMs": round((time.monotonic() - self._fetched_at) * 1000, 3) if cached else None,
+                "nextExpiresInS": siguiente,
+                "size": self.size,
+                "maxStaleness": self.max_staleness,
+                "hits": self.hits,
+                "refreshes": self.refreshes,
+                "invalidations": self.invalidations,
+            }
+
+
+proximos_cache = ProximosCache()
+
+
+def get_proximos_cache() -> ProximosCache:
+    return proximos_cache
@@ -0,0 +1,493 @@
+"""Catálogo de sentencias SQL Server de la capa de datos.
+
+Todo el SQL que ejecuta la API contra MarcadorBasket se registra aquí con un nombre
+y los tipos de sus parámetros; las métricas se consultan en
+``GET /api/admin/diagnostico/sentencias``.
+"""
+from app.data.statements import (
+    BIGINT, BIT, DATETIME2, INT, NVARCHAR, SMALLINT, TINYINT, get_statement_catalog,
+)
+
+catalog = get_statement_catalog()
+
+ESTADO = NVARCHAR(20)
+SEDE = NVARCHAR(100)
+
+# --- Partidos -------------------------------------------------------------------
+
+# Partidos con su marcador: un solo JOIN contra el marcador mantenido (sin N+1).
+# Orden estable (fecha_creacion, partido_id) para paginar por keyset.
+# {top} y {where} los arma PartidoDataAccess.list_partidos según los filtros.
+catalog.register("partidos.listado", """
+    SELECT {top}
+        p.partido_id as id,
+        p.equipo_local_id,
+        p.equipo_visitante_id,
+        p.fecha_hora_inicio,
+        p.estado,
+        p.minutos_por_cuarto,
+        p.cuartos_totales,
+        p.faltas_por_equipo_limite,
+        p.faltas_por_jugador_limite,
+        p.sede,
+        p.fecha_creacion,
+        ISNULL(m.puntos_local, 0) as puntos_local,
+        ISNULL(m.puntos_visitante, 0) as puntos_visitante
+    FROM dbo.Partido p
+    LEFT JOIN dbo.MarcadorTotal m ON m.partido_id = p.partido_id
+    {where}
+    ORDER BY p.fecha_creacion DESC, p.partido_id DESC
+    """)
+
+catalog.register("partido.por_id", """
+    SELECT
+        partido_id as id,
+        equipo_local_id,
+        equipo_visitante_id,
+        fecha_hora_inicio,
+        estado,
+        minutos_por_cuarto,
+        cuartos_totales,
+        faltas_por_equipo_limite,
+        faltas_por_jugador_limite,
+        sede,
+        fecha_creacion
+    FROM dbo.Partido
+    WHERE partido_id = ?
+    """, (INT,))
+
+catalog.register("partido.crear", """
+    INSERT INTO dbo.Partido (
+        equipo_local_id,
+        equipo_visitante_id,
+        fecha_hora_inicio,
+        estado,
+        minutos_por_cuarto,
+        cuartos_totales,
+        faltas_por_equipo_limite,
+        faltas_por_jugador_limite,
+        sede
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (INT, INT, DATETIME2, ESTADO, INT, INT, TINYINT, TINYINT, SEDE))
+
+catalog.register("identity", "SELECT @@IDENTITY")
+
+catalog.register("partido.actualizar", """
+    UPDATE dbo.Partido SET
+        equipo_local_id = ?,
+        equipo_visitante_id = ?,
+        fecha_hora_inicio = ?,
+        estado = ?,
+        minutos_por_cuarto = ?,
+        cuartos_totales = ?,
+        faltas_por_equipo_limite = ?,
+        faltas_por_jugador_limite = ?,
+        sede = ?
+    WHERE partido_id = ?
+    """, (INT, INT, DATETIME2, ESTADO, INT, INT, TINYINT, TINYINT, SEDE, INT))
+
+catalog.register("partido.eliminar", "DELETE FROM dbo.Partido WHERE partido_id = ?", (INT,))
+
+catalog.register("partido.actualizar_estado",
+                 "UPDATE dbo.Partido SET estado = ? WHERE partido_id = ?", (ESTADO, INT))
+
+# Limpieza completa de un partido (reset), en orden de foreign keys
+for _tabla in ("RosterPartido", "Anotacion", "Falta", "TiempoMuerto", "Cuarto", "EventoPartido"):
+    catalog.register(f"partido.reset.{_tabla}", f"DELETE FROM dbo.{_tabla} WHERE partido_id = ?", (INT,))
+
+# --- Roster ---------------------------------------------------------------------
+
+catalog.register("roster.por_partido", """
+    SELECT
+        roster_id,
+        partido_id,
+        equipo_id,
+        jugador_id,
+        es_titular
+    FROM dbo.RosterPartido
+    WHERE partido_id = ?
+    ORDER BY equipo_id, es_titular DESC, jugador_id
+    """, (INT,))
+
+catalog.register("roster.limpiar", "DELETE FROM dbo.RosterPartido WHERE partido_id = ?", (INT,))
+
+catalog.register("roster.insertar", """
+    INSERT INTO dbo.RosterPartido (
+        partido_id,
+        equipo_id,
+        jugador_id,
+        es_titular
+    ) VALUES (?, ?, ?, ?)
+    """, (INT, INT, INT, BIT))
+
+catalog.register("roster.bloquear", """
+    SELECT roster_id, equipo_id, jugador_id, es_titular
+    FROM dbo.RosterPartido WITH (UPDLOCK, HOLDLOCK)
+    WHERE partido_id = ?
+    """, (INT,))
+
+catalog.register("roster.eliminar", "DELETE FROM dbo.RosterPartido WHERE roster_id = ?", (INT,))
+
+catalog.register("roster.actualizar",
+                 "UPDATE dbo.RosterPartido SET equipo_id = ?, es_titular = ? WHERE roster_id = ?",
+                 (INT, BIT, INT))
+
+# --- Equipos --------------------------------------------------------------------
+
+# {ids} = "?, ?, ..." (un INT por equipo)
+catalog.register("equipos.basicos",
+                 "SELECT equipo_id, nombre, abreviatura FROM dbo.Equipo WHERE equipo_id IN ({ids})")
+
+# --- Marcador -------------------------------------------------------------------
+
+catalog.register("anotacion.ajuste", """
+    INSERT INTO dbo.Anotacion (partido_id, cuarto_id, equipo_id, puntos)
+    SELECT ?, (
+        SELECT TOP 1 cuarto_id FROM dbo.Cuarto
+        WHERE partido_id = ? AND estado = N'en_curso'
+        ORDER BY numero
+    ), ?, ?
+    """, (INT, INT, INT, SMALLINT))
+
+# Lote de anotaciones en una sola sentencia: trg_Anotacion_Marcador corre una vez por
+# lote. {values} = "(?, ?), ..." (equipo_id INT, puntos SMALLINT por anotación)
+catalog.register("anotacion.lote", """
+    INSERT INTO dbo.Anotacion (partido_id, cuarto_id, equipo_id, puntos)
+    SELECT ?, (
+        SELECT TOP 1 cuarto_id FROM dbo.Cuarto
+        WHERE partido_id = ? AND estado = N'en_curso'
+        ORDER BY numero
+    ), v.equipo_id, v.puntos
+    FROM (VALUES {values}) AS v(equipo_id, puntos)
+    """)
+
+# --- Eventos de partido (ingesta) -----------------------------------------------
+
+# Faltas en el cuarto en curso: {values} = "(?, ?, ?, ?), ..." (equipo_id INT,
+# jugador_id INT NULL, tipo_falta_id TINYINT, es_de_tiro BIT por falta)
+catalog.register("falta.lote", """
+    INSERT INTO dbo.Falta (partido_id, cuarto_id, equipo_id, jugador_id, tipo_falta_id, es_de_tiro)
+    SELECT ?, (
+        SELECT TOP 1 cuarto_id FROM dbo.Cuarto
+        WHERE partido_id = ? AND estado = N'en_curso'
+        ORDER BY numero
+    ), v.equipo_id, v.jugador_id, v.tipo_falta_id, v.es_de_tiro
+    FROM (VALUES {values}) AS v(equipo_id, jugador_id, tipo_falta_id, es_de_tiro)
+    """)
+
+# Tiempos muertos en el cuarto en curso: {values} = "(?, ?), ..." (equipo_id INT, tipo NVARCHAR(10))
+catalog.register("tiempo_muerto.lote", """
+    INSERT INTO dbo.TiempoMuerto (partido_id, cuarto_id, equipo_id, tipo)
+    SELECT ?, (
+        SELECT TOP 1 cuarto_id FROM dbo.Cuarto
+        WHERE partido_id = ? AND estado = N'en_curso'
+        ORDER BY numero
+    ), v.equipo_id, v.tipo
+    FROM (VALUES {values}) AS v(equipo_id, tipo)
+    """)
+
+# Registro de eventos identificados (UQ por evento_id y por seq):
+# {values} = "(?, ?, ?), ..." (evento_id NVARCHAR(36), seq INT, tipo NVARCHAR(20))
+catalog.register("evento.lote", """
+    INSERT INTO dbo.EventoPartido (partido_id, evento_id, seq, tipo)
+    SELECT ?, CONVERT(UNIQUEIDENTIFIER, v.evento_id), v.seq, v.tipo
+    FROM (VALUES {values}) AS v(evento_id, seq, tipo)
+    """)
+
+# Secuencia de eventos ya registrados: {ids} = "?, ..." (evento_id NVARCHAR(36) por evento)
+catalog.register("evento.buscar", """
+    SELECT LOWER(CONVERT(NVARCHAR(36), evento_id)), seq FROM dbo.EventoPartido
+    WHERE partido_id = ? AND evento_id IN ({ids})
+    """)
+
+# Estado de un partido para la ingesta de eventos: equipos, marcador, faltas de
+# equipo en el cuarto actual (mismo criterio que live.estado), tiempos muertos y
+# última secuencia registrada
+catalog.register("evento.ingesta_estado", """
+    SELECT
+        p.partido_id,
+        p.equipo_local_id,
+        p.equipo_visitante_id,
+        ISNULL(m.puntos_local, 0) as puntos_local,
+        ISNULL(m.puntos_visitante, 0) as puntos_visitante,
+        (SELECT COUNT(*) FROM dbo.Falta f
+         WHERE f.partido_id = p.partido_id AND f.cuarto_id = c.cuarto_id
+           AND f.equipo_id = p.equipo_local_id) as faltas_local,
+        (SELECT COUNT(*) FROM dbo.Falta f
+         WHERE f.partido_id = p.partido_id AND f.cuarto_id = c.cuarto_id
+           AND f.equipo_id = p.equipo_visitante_id) as faltas_visitante,
+        (SELECT COUNT(*) FROM dbo.TiempoMuerto t
+         WHERE t.partido_id = p.partido_id AND t.equipo_id = p.equipo_local_id) as tiempos_local,
+        (SELECT COUNT(*) FROM dbo.TiempoMuerto t
+         WHERE t.partido_id = p.partido_id AND t.equipo_id = p.equipo_visitante_id) as tiempos_visitante,
+        (SELECT ISNULL(MAX(e.seq), 0) FROM dbo.EventoPartido e
+         WHERE e.partido_id = p.partido_id) as ultimo_seq
+    FROM dbo.Partido p
+    LEFT JOIN dbo.MarcadorTotal m ON m.partido_id = p.partido_id
+    OUTER APPLY (
+        SELECT TOP 1 cuarto_id
+        FROM dbo.Cuarto
+        WHERE partido_id = p.partido_id
+        ORDER BY
+            CASE estado WHEN N'en_curso' THEN 0 WHEN N'finalizado' THEN 1 ELSE 2 END,
+            CASE WHEN estado = N'pendiente' THEN numero ELSE -numero END
+    ) c
+    WHERE p.partido_id = ?
+    """, (INT,))
+
+# --- Marcador mantenido ---------------------------------------------------------
+
+# Lectura O(1): fila de totales + filas por cuarto (acotadas por el número de cuartos)
+catalog.register("marcador.leer", """
+    SELECT
+        p.partido_id,
+        ISNULL(t.puntos_local, 0) as puntos_local,
+        ISNULL(t.puntos_visitante, 0) as puntos_visitante,
+        c.cuarto_id,
+        c.puntos_local as cuarto_local,
+        c.puntos_visitante as cuarto_visitante
+    FROM dbo.Partido p
+    LEFT JOIN dbo.MarcadorTotal t ON t.partido_id = p.partido_id
+    LEFT JOIN dbo.MarcadorCuarto c ON c.partido_id = p.partido_id
+    WHERE p.partido_id = ?
+    ORDER BY c.cuarto_id
+    """, (INT,))
+
+# Recalcula los contadores desde dbo.Anotacion ({where} filtra por partido)
+MARCADOR_REBUILD = (
+    "marcador.rebuild.borrar_cuartos",
+    "marcador.rebuild.borrar_totales",
+    "marcador.rebuild.cuartos",
+    "marcador.rebuild.totales",
+)
+catalog.register("marcador.rebuild.borrar_cuartos", "DELETE FROM dbo.MarcadorCuarto {where}")
+catalog.register("marcador.rebuild.borrar_totales", "DELETE FROM dbo.MarcadorTotal {where}")
+catalog.register("marcador.rebuild.cuartos", """
+    INSERT INTO dbo.MarcadorCuarto (partido_id, cuarto_id, puntos_local, puntos_visitante)
+    SELECT
+        a.partido_id,
+        ISNULL(a.cuarto_id, 0),
+        SUM(CASE WHEN a.equipo_id = p.equipo_local_id THEN a.puntos ELSE 0 END),
+        SUM(CASE WHEN a.equipo_id = p.equipo_visitante_id THEN a.puntos ELSE 0 END)
+    FROM dbo.Anotacion a WITH (UPDLOCK, HOLDLOCK)
+    JOIN dbo.Partido p ON p.partido_id = a.partido_id
+    {where_a}
+    GROUP BY a.partido_id, ISNULL(a.cuarto_id, 0)
+    """)
+catalog.register("marcador.rebuild.totales", """
+    INSERT INTO dbo.MarcadorTotal (partido_id, puntos_local, puntos_visitante)
+    SELECT partido_id, SUM(puntos_local), SUM(puntos_visitante)
+    FROM dbo.MarcadorCuarto
+    {where}
+    GROUP BY partido_id
+    """)
+
+# --- En vivo --------------------------------------------------------------------
+
+# Estado de marcador en vivo de un partido en un solo viaje: marcador, cuarto actual
+# (en curso; si no, el último finalizado; si no, el primero pendiente), faltas de
+# equipo en ese cuarto, tiempos muertos del partido y último evento de cronómetro
+catalog.register("live.estado", """
+    SELECT
+        p.partido_id,
+        p.estado,
+        ISNULL(m.puntos_local, 0) as puntos_local,
+        ISNULL(m.puntos_visitante, 0) as puntos_visitante,
+        c.numero as cuarto,
+        c.segundos_restantes,
+        (SELECT COUNT(*) FROM dbo.Falta f
+         WHERE f.partido_id = p.partido_id AND f.cuarto_id = c.cuarto_id
+           AND f.equipo_id = p.equipo_local_id) as faltas_local,
+        (SELECT COUNT(*) FROM dbo.Falta f
+         WHERE f.partido_id = p.partido_id AND f.cuarto_id = c.cuarto_id
+           AND f.equipo_id = p.equipo_visitante_id) as faltas_visitante,
+        (SELECT COUNT(*) FROM dbo.TiempoMuerto t
+         WHERE t.partido_id = p.partido_id AND t.equipo_id = p.equipo_local_id) as tiempos_local,
+        (SELECT COUNT(*) FROM dbo.TiempoMuerto t
+         WHERE t.partido_id = p.partido_id AND t.equipo_id = p.equipo_visitante_id) as tiempos_visitante,
+        (SELECT TOP 1 ce.tipo FROM dbo.CronometroEvento ce
+         WHERE ce.partido_id = p.partido_id
+         ORDER BY ce.evento_id DESC) as ultimo_cronometro
+    FROM dbo.Partido p
+    LEFT JOIN dbo.MarcadorTotal m ON m.partido_id = p.partido_id
+    OUTER APPLY (
+        SELECT TOP 1 cuarto_id, numero, segundos_restantes
+        FROM dbo.Cuarto
+        WHERE partido_id = p.partido_id
+        ORDER BY
+            CASE estado WHEN N'en_curso' THEN 0 WHEN N'finalizado' THEN 1 ELSE 2 END,
+            CASE WHEN estado = N'pendiente' THEN numero ELSE -numero END
+    ) c
+    WHERE p.partido_id = ?
+    """, (INT,))
+
+# Motor de estado en vivo (LiveStateEngine): partidos en curso, cuartos y eventos.
+# Cada tabla de eventos se reproduce completa para un partido que entra en curso
+# ({ids} = "?, ..." un INT por partido) y después se sigue por su IDENTITY.
+LIVE_EVENTOS = {
+    "Anotacion": ("anotacion_id", "t.partido_id, t.cuarto_id, t.equipo_id, t.puntos"),
+    "Falta": ("falta_id", "t.partido_id, t.cuarto_id, t.equipo_id, t.jugador_id"),
+    "TiempoMuerto": ("tiempo_muerto_id", "t.partido_id, t.cuarto_id, t.equipo_id"),
+    "CronometroEvento": ("evento_id", "t.partido_id, t.cuarto_id, t.tipo, t.segundos_restantes, t.creado_en"),
+}
+
+# Con la hora de SQL Server (SYSUTCDATETIME(), la misma de CronometroEvento.creado_en):
+# el reloj de juego no depende de la hora del servidor de la API
+catalog.register("live.partidos", """
+    SELECT partido_id, equipo_local_id, equipo_visitante_id, estado,
+           faltas_por_equipo_limite, faltas_por_jugador_limite, SYSUTCDATETIME() as ahora
+    FROM dbo.Partido
+    WHERE estado = N'en_curso'
+    """)
+
+catalog.register("live.cuartos", """
+    SELECT c.cuarto_id, c.partido_id, c.numero, c.duracion_segundos, c.segundos_restantes, c.estado
+    FROM dbo.Cuarto c
+    JOIN dbo.Partido p ON p.partido_id = c.partido_id AND p.estado = N'en_curso'
+    """)
+
+# Último IDENTITY de cada tabla de eventos (punto de partida del seguimiento)
+catalog.register("live.marcas", "SELECT " + ", ".join(
+    f"(SELECT ISNULL(MAX({_pk}), 0) FROM dbo.{_tabla})" for _tabla, (_pk, _) in LIVE_EVENTOS.items()
+))
+
+for _tabla, (_pk, _columnas) in LIVE_EVENTOS.items():
+    catalog.register(f"live.replay.{_tabla}", f"""
+    SELECT t.{_pk}, {_columnas}
+    FROM dbo.{_tabla} t
+    WHERE t.partido_id IN ({{ids}})
+    ORDER BY t.{_pk}
+    """)
+    catalog.register(f"live.tail.{_tabla}", f"""
+    SELECT t.{_pk}, {_columnas}
+    FROM dbo.{_tabla} t
+    JOIN dbo.Partido p ON p.partido_id = t.partido_id AND p.estado = N'en_curso'
+    WHERE t.{_pk} > ?
+    ORDER BY t.{_pk}
+    """, (BIGINT,))
+
+# --- Inicio (dashboard) ---------------------------------------------------------
+
+# Los tres KPIs en un solo viaje
+catalog.register("kpi.snapshot", """
+    SELECT
+        (SELECT COUNT(*) FROM dbo.Equipo WHERE activo = 1) as total_equipos,
+        (SELECT COUNT(*) FROM dbo.Jugador WHERE activo = 1) as total_jugadores,
+        (SELECT COUNT(*) FROM dbo.Partido WHERE estado = 'programado') as partidos_pendientes
+    """)
+
+# Próximos partidos programados junto con la hora del servidor (siempre devuelve una
+# fila: si no hay partidos, partido_id viene NULL)
+catalog.register("partidos.proximos", """
+    SELECT
+        ahora.valor as ahora,
+        p.partido_id,
+        p.equipo_local_id,
+        p.equipo_visitante_id,
+        p.fecha_hora_inicio,
+        p.sede,
+        p.estado
+    FROM (SELECT GETDATE() as valor) ahora
+    OUTER APPLY (
+        SELECT TOP (?)
+            partido_id, equipo_local_id, equipo_visitante_id, fecha_hora_inicio, sede, estado
+        FROM dbo.Partido
+        WHERE estado = 'programado'
+            AND fecha_hora_inicio >= ahora.valor
+        ORDER BY fecha_hora_inicio ASC, partido_id ASC
+    ) p
+    ORDER BY p.fecha_hora_inicio ASC, p.partido_id ASC
+    """, (INT,))
+
+# --- ETL a mb_report (reportería) -----------------------------------------------
+
+# Entidad del data mart -> (tabla de origen, clave, columnas de origen). El orden es el
+# de carga: dimensiones antes que el puente y los hechos.
+ETL_ORIGENES = {
+    "dim_equipo": ("dbo.Equipo", "equipo_id",
+                   "equipo_id, nombre, ciudad, abreviatura, activo, fecha_creacion"),
+    "dim_jugador": ("dbo.Jugador", "jugador_id",
+                    "jugador_id, equipo_id, nombres, apellidos, dorsal, posicion, estatura_cm, edad, "
+                    "nacionalidad, activo"),
+    "dim_partido": ("dbo.Partido", "partido_id",
+                    "partido_id, equipo_local_id, equipo_visitante_id, fecha_hora_inicio, estado, "
+                    "minutos_por_cuarto, cuartos_totales, faltas_por_equipo_limite, "
+                    "faltas_por_jugador_limite, sede, fecha_creacion"),
+    "bridge_roster_partido": ("dbo.RosterPartido", "roster_id",
+                              "roster_id, partido_id, equipo_id, jugador_id, es_titular"),
+    "fact_anotacion": ("dbo.Anotacion", "anotacion_id",
+                       "anotacion_id, partido_id, cuarto_id, equipo_id, puntos"),
+}
+
+# Filas nuevas por marca de agua: siguiente tramo de a lo sumo TOP (?) filas por clave
+for _entidad, (_tabla, _pk, _columnas) in ETL_ORIGENES.items():
+    catalog.register(f"etl.{_entidad}", f"""
+    SELECT TOP (?) {_columnas}
+    FROM {_tabla}
+    WHERE {_pk} > ?
+    ORDER BY {_pk}
+    """, (INT, BIGINT))
+
+# Partidos aún abiertos en mb_report y su roster ({ids} = "?, ..." un INT por partido):
+# su estado y su roster todavía pueden cambiar
+catalog.register("etl.dim_partido.abiertos", f"""
+    SELECT {ETL_ORIGENES["dim_partido"][2]}
+    FROM dbo.Partido
+    WHERE partido_id IN ({{ids}})
+    """)
+
+catalog.register("etl.bridge_roster_partido.abiertos", f"""
+    SELECT {ETL_ORIGENES["bridge_roster_partido"][2]}
+    FROM dbo.RosterPartido
+    WHERE partido_id IN ({{ids}})
+    ORDER BY roster_id
+    """)
+
+# --- Reconciliación con mb_report (árbol de hashes por rangos de clave) -----------
+
+# Tipo de cada columna de ETL_ORIGENES para la huella por fila: i = entero/bit,
+# s = texto, d = fecha (redondeada al segundo, como la guarda DATETIME de MySQL)
+RECONCILIAR_TIPOS = {
+    "dim_partido": "iiidsiiiisd",
+    "bridge_roster_partido": "iiiii",
+    "fact_anotacion": "iiiii",
+}
+
+
+def _huella(columnas: str, tipos: str) -> str:
+    """MD5 del texto 'v1|v2|...' en UTF-16; reporte_reconciliacion arma el mismo en MySQL"""
+    partes = []
+    for columna, tipo in zip(columnas.split(", "), tipos):
+        if tipo == "d":
+            valor = f"CONVERT(NVARCHAR(19), CAST({columna} AS DATETIME2(0)), 120)"
+        elif tipo == "i":
+            valor = f"CONVERT(NVARCHAR(20), {columna})"
+        else:
+            valor = columna
+        partes.append(f"COALESCE({valor}, NCHAR(1))")
+    return f"HASHBYTES('MD5', CONCAT_WS(N'|', {', '.join(partes)}))"
+
+
+for _entidad, _tipos in RECONCILIAR_TIPOS.items():
+    _tabla, _pk, _columnas = ETL_ORIGENES[_entidad]
+    # Huella de cada sub-rango de ancho ? dentro de [?, ?]: filas y suma de dos trozos
+    # de 32 bits del MD5 por fila (no depende del orden de las filas)
+    catalog.register(f"reconciliar.{_entidad}.hash", f"""
+    SELECT bucket, COUNT(*),
+           SUM(CAST(SUBSTRING(h, 1, 4) AS BIGINT)), SUM(CAST(SUBSTRING(h, 5, 4) AS BIGINT))
+    FROM (
+        SELECT ({_pk} - ?) / ? AS bucket, {_huella(_columnas, _tipos)} AS h
+        FROM {_tabla}
+        WHERE {_pk} BETWEEN ? AND ?
+    ) x
+    GROUP BY bucket
+    """, (BIGINT, BIGINT, BIGINT, BIGINT))
+
+    catalog.register(f"reconciliar.{_entidad}.filas", f"""
+    SELECT {_columnas}
+    FROM {_tabla}
+    WHERE {_pk} BETWEEN ? AND ?
+    ORDER BY {_pk}
+    """, (BIGINT, BIGINT))
+
+catalog.register("ping", "SELECT 1 as test")
@@ -0,0 +1,281 @@
+import os
+import shutil
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from pymysql.cursors import SSCursor
+
+from app.config import get_settings
+from app.data.reporte_sync import ReporteSync, _mysql_connect
+from app.logging_config import get_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional: sólo lo necesita la exportación a Parquet
+    pa = pq = None
+
+logger = get_logger(__name__)
+
+# Candado de MySQL: una sola exportación a la vez
+LOCK_NAME = "mb_report.parquet"
+
+# Marca en sync_state: último mes cerrado exportado (last_id = AAAAMM)
+MARCA = "parquet.mes"
+
+# Partición de los partidos sin fecha_hora_inicio (se reescribe en cada corrida)
+SIN_FECHA = "sin-fecha"
+
+ARCHIVO = "part-0.parquet"
+
+
+class TablaParquet:
+    """Tabla del esquema estrella exportada a Parquet, con el tipo Arrow de cada columna.
+
+    Con ``sql`` la tabla se particiona por mes de ``dim_partido.fecha_hora_inicio``
+    (la consulta lleva ``{filtro}`` sobre ``p.fecha_hora_inicio``); sin ella, cada
+    corrida escribe la tabla entera en un solo archivo.
+    """
+
+    __slots__ = ("nombre", "columnas", "tipos", "sql", "por_mes")
+
+    def __init__(self, nombre: str, columnas: Sequence[Tuple[str, str]], sql: Optional[str] = None):
+        self.nombre = nombre
+        self.columnas = [c for c, _ in columnas]
+        self.tipos = [t for _, t in columnas]
+        self.por_mes = sql is not None
+        self.sql = sql or f"SELECT {', '.join(self.columnas)} FROM {nombre} ORDER BY {self.columnas[0]}"
+
+    def schema(self):
+        return pa.schema([(c, pa.timestamp("s") if t == "timestamp" else getattr(pa, t)())
+                          for c, t in zip(self.columnas, self.tipos)])
+
+    def lote(self, rows: Sequence[Sequence[Any]], schema) -> Any:
+        """Filas de MySQL como RecordBatch (los TINYINT(1) pasan a booleanos)"""
+        arrays = []
+        for valores, tipo, campo in zip(zip(*rows), self.tipos, schema):
+            if tipo == "bool_":
+                valores = [None if v is None else bool(v) for v in valores]
+            arrays.append(pa.array(list(valores), type=campo.type))
+        return pa.record_batch(arrays, schema=schema)
+
+
+def _select(alias: str, columnas: Sequence[Tuple[str, str]]) -> str:
+    return ", ".join(f"{alias}.{c}" for c, _ in columnas)
+
+
+_PARTIDO = (
+    ("partido_id", "int32"), ("equipo_local_id", "int32"), ("equipo_visitante_id", "int32"),
+    ("fecha_hora_inicio", "timestamp"), ("estado", "string"), ("minutos_por_cuarto", "int32"),
+    ("cuartos_totales", "int32"), ("faltas_equipo_lim", "int8"), ("faltas_jugador_lim", "int8"),
+    ("sede", "string"), ("fecha_creacion", "timestamp"),
+)
+_ROSTER = (
+    ("roster_id", "int32"), ("partido_id", "int32"), ("equipo_id", "int32"), ("jugador_id", "int32"),
+    ("es_titular", "bool_"),
+)
+_ANOTACION = (
+    ("anotacion_id", "int64"), ("partido_id", "int32"), ("cuarto_id", "int32"), ("equipo_id", "int32"),
+    ("puntos", "int16"),
+)
+
+TABLAS: Tuple[TablaParquet, ...] = (
+    TablaParquet("dim_equipo", (
+        ("equipo_id", "int32"), ("nombre", "string"), ("ciudad", "string"), ("abreviatura", "string"),
+        ("logo_path", "string"), ("activo", "bool_"), ("fecha_creacion", "timestamp"),
+    )),
+    TablaParquet("dim_jugador", (
+        ("jugador_id", "int32"), ("equipo_id", "int32"), ("nombres", "string"), ("apellidos", "string"),
+        ("dorsal", "int8"), ("posicion", "string"), ("estatura_cm", "int16"), ("edad", "int8"),
+        ("nacionalidad", "string"), ("activo", "bool_"), ("fecha_creacion", "timestamp"),
+    )),
+    TablaParquet("dim_partido", _PARTIDO,
+                 f"SELECT {_select('p', _PARTIDO)} FROM dim_partido p WHERE {{filtro}} ORDER BY p.partido_id"),
+    TablaParquet("bridge_roster_partido", _ROSTER,
+                 f"SELECT {_select('r', _ROSTER)} FROM dim_partido p "
+                 f"JOIN bridge_roster_partido r ON r.partido_id = p.partido_id "
+                 f"WHERE {{filtro}} ORDER BY r.roster_id"),
+    TablaParquet("fact_anotacion", _ANOTACION,
+                 f"SELECT {_select('a', _ANOTACION)} FROM dim_partido p "
+                 f"JOIN fact_anotacion a ON a.partido_id = p.partido_id "
+                 f"WHERE {{filtro}} ORDER BY a.anotacion_id"),
+)
+
+
+def _siguiente(mes: date) -> date:
+    return date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+
+
+def _inicio(mes: date) -> datetime:
+    return datetime(mes.year, mes.month, 1)
+
+
+def _particion(mes: Optional[date]) -> str:
+    return SIN_FECHA if mes is None else mes.strftime("%Y-%m")
+
+
+def _clave(particion: str) -> Optional[int]:
+    """AAAAMM de un directorio ``mes=AAAA-MM`` (None para ``sin-fecha``); ValueError si no es una partición"""
+    if particion == SIN_FECHA:
+        return None
+    mes = datetime.strptime(particion, "%Y-%m")
+    return mes.year * 100 + mes.month
+
+
+def meses_a_exportar(claves: Sequence[Optional[int]], marca: int, ahora: datetime,
+                     margen: timedelta) -> List[Tuple[Optional[date], bool]]:
+    """Meses (AAAAMM, None = sin fecha) que toca exportar, como (primer día, cerrado).
+
+    Un mes está cerrado cuando terminó hace más de ``margen``: se exporta una sola vez,
+    si es posterior a ``marca``. Los abiertos (el actual, los futuros y los partidos sin
+    fecha) todavía cambian y se reescriben en cada corrida.
+    """
+    meses = []
+    for clave in sorted(claves, key=lambda c: (c is None, c or 0)):
+        if clave is None:
+            meses.append((None, False))
+            continue
+        mes = date(clave // 100, clave % 100, 1)
+        cerrado = _inicio(_siguiente(mes)) + margen <= ahora
+        if not cerrado or clave > marca:
+            meses.append((mes, cerrado))
+    return meses
+
+
+class ReporteParquet:
+    """Exportación del esquema estrella de mb_report a Parquet para análisis fuera de línea.
+
+    ``dim_partido``, ``bridge_roster_partido`` y ``fact_anotacion`` se escriben en una
+    partición por mes de ``fecha_hora_inicio`` (``<tabla>/mes=AAAA-MM/``, legible como
+    dataset de Hive); ``dim_equipo`` y ``dim_jugador`` se reescriben enteras. Cada
+    tabla se lee con un cursor del servidor en lotes de ``batch`` filas, así la memoria
+    no depende del tamaño del mes. Los meses cerrados quedan registrados en
+    ``sync_state`` y las corridas siguientes ya no los vuelven a escribir. La partición
+    de un mes que se exportaría pero ya no tiene partidos (reprogramados, borrados o
+    que recibieron fecha) se borra, para no dejar filas repetidas en el dataset.
+    """
+
+    def __init__(self, directorio: Optional[str] = None, batch: Optional[int] = None,
+                 compresion: Optional[str] = None, margen_horas: Optional[float] = None,
+                 mysql_connect: Optional[Callable[[], Any]] = None):
+        settings = get_settings()
+        self.directorio = directorio or settings.parquet_dir
+        self.batch = batch or settings.parquet_batch
+        self.compresion = compresion or settings.parquet_compression
+        self.margen = timedelta(hours=settings.parquet_margen_horas if margen_horas is None else margen_horas)
+        self._mysql_connect = mysql_connect or _mysql_connect
+
+    def run(self, desde_cero: bool = False, ahora: Optional[datetime] = None) -> Dict[str, Any]:
+        """Una exportación completa (bloqueante); devuelve meses, filas y bytes por tabla"""
+        if pq is None:
+            raise RuntimeError("La exportación a Parquet necesita pyarrow (pip install pyarrow)")
+        start = time.perf_counter()
+        ahora = ahora or datetime.now()
+        mysql = self._mysql_connect()
+        try:
+            cursor = mysql.cursor()
+            cursor.execute("SELECT GET_LOCK(%s, 0)", (LOCK_NAME,))
+            if not cursor.fetchone()[0]:
+                return {"skipped": True}
+            try:
+                reporte = self._exportar(mysql, cursor, desde_cero, ahora)
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+                cursor.fetchall()
+        finally:
+            mysql.close()
+        reporte["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        reporte["filas"] = sum(t["filas"] for t in reporte["tablas"].values())
+        logger.info("reporte_parquet.run", extra={"meses": len(reporte["meses"]), "filas": reporte["filas"],
+                                                  "ms": reporte["ms"]})
+        return reporte
+
+    def _exportar(self, mysql, cursor, desde_cero: bool, ahora: datetime) -> Dict[str, Any]:
+        marca = 0 if desde_cero else ReporteSync.leer_marcas(mysql).get(MARCA, (0, None))[0]
+        cursor.execute("SELECT DISTINCT YEAR(fecha_hora_inicio) * 100 + MONTH(fecha_hora_inicio) FROM dim_partido")
+        claves = {row[0] for row in cursor.fetchall()}
+        meses = meses_a_exportar(list(claves), marca, ahora, self.margen)
+        reporte: Dict[str, Any] = {
+            "meses": [], "marca": marca, "borrados": [],
+            "tablas": {t.nombre: {"filas": 0, "archivos": 0, "bytes": 0} for t in TABLAS},
+        }
+
+        # Particiones en disco de meses que se exportarían pero ya no tienen partidos
+        vacios = meses_a_exportar(list(self._particiones() - claves), marca, ahora, self.margen)
+        for mes, _ in vacios:
+            particion = _particion(mes)
+            for tabla in TABLAS:
+                if tabla.por_mes:
+                    shutil.rmtree(os.path.join(self.directorio, tabla.nombre, f"mes={particion}"),
+                                  ignore_errors=True)
+            reporte["borrados"].append(particion)
+
+        for tabla in TABLAS:
+            if not tabla.por_mes:
+                self._escribir(mysql, tabla, os.path.join(self.directorio, tabla.nombre), (), reporte)
+
+        for mes, cerrado in meses:
+            particion = _particion(mes)
+            if mes is None:
+                filtro, params = "p.fecha_hora_inicio IS NULL", ()
+            else:
+                filtro = "p.fecha_hora_inicio >= %s AND p.fecha_hora_inicio < %s"
+                params = (_inicio(mes), _inicio(_siguiente(mes)))
+            for tabla in TABLAS:
+                if tabla.por_mes:
+                    self._escribir(mysql, tabla, os.path.join(self.directorio, tabla.nombre, f"mes={particion}"),
+                                   params, reporte, filtro)
+            reporte["meses"].append(particion)
+            if cerrado:
+                # Mes cerrado y escrito en las tres tablas: las corridas siguientes lo saltan
+                clave = mes.year * 100 + mes.month
+                ReporteSync._guardar_marca(cursor, MARCA, clave, datetime.now(timezone.utc).replace(tzinfo=None))
+                mysql.commit()
+                reporte["marca"] = max(reporte["marca"], clave)
+        return reporte
+
+    def _particiones(self) -> set:
+        """Meses (AAAAMM, None = sin fecha) con algún directorio ``mes=`` ya exportado"""
+        claves = set()
+        for tabla in TABLAS:
+            directorio = os.path.join(self.directorio, tabla.nombre)
+            if not tabla.por_mes or not os.path.isdir(directorio):
+                continue
+            for nombre in os.listdir(directorio):
+                if nombre.startswith("mes="):
+                    try:
+                        claves.add(_clave(nombre[len("mes="):]))
+                    except ValueError:
+                        pass
+        return claves
+
+    def _escribir(self, mysql, tabla: TablaParquet, directorio: str, params: Sequence[Any],
+                  reporte: Dict[str, Any], filtro: Optional[str] = None) -> None:
+        """Escribe una tabla (o una partición) leyéndola en lotes; reemplaza el archivo al terminar"""
+        os.makedirs(directorio, exist_ok=True)
+        ruta = os.path.join(directorio, ARCHIVO)
+        tmp = ruta + ".tmp"
+        schema = tabla.schema()
+        filas = 0
+        cursor = mysql.cursor(SSCursor)
+        try:
+            cursor.execute(tabla.sql.format(filtro=filtro) if filtro else tabla.sql, params)
+            with pq.ParquetWriter(tmp, schema, compression=self.compresion) as writer:
+                while True:
+                    rows = cursor.fetchmany(self.batch)
+                    if not rows:
+                        break
+                    writer.write_batch(tabla.lote(rows, schema))
+                    filas += len(rows)
+            os.replace(tmp, ruta)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        finally:
+            cursor.close()
+        t = reporte["tablas"][tabla.nombre]
+        t["filas"] += filas
+        t["archivos"] += 1
+        t["bytes"] += os.path.getsize(ruta)
@@ -0,0 +1,242 @@
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.config import get_settings
+from app.data.pool import ConnectionPool, get_pool
+from app.data.queries import RECONCILIAR_TIPOS, catalog
+from app.data.reporte_sync import LOCK_NAME, POR_NOMBRE, Entidad, ReporteSync, ReporteSyncJob, _mysql_connect
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Rangos reparados que se listan por entidad en el reporte (el resto sólo se cuenta)
+MAX_RANGOS_REPORTE = 50
+
+# Huella de un rango: (filas, suma de los bytes 1-4 del MD5, suma de los bytes 5-8)
+Huella = Tuple[int, int, int]
+
+
+def _huella_mysql(columnas: Sequence[str], tipos: str) -> str:
+    """Mismo texto por fila que ``queries._huella`` en SQL Server, pasado a UTF-16 antes del MD5"""
+    partes = [
+        f"COALESCE({c if tipo == 's' else f'CAST({c} AS CHAR)'}, CHAR(1 USING utf8mb4))"
+        for c, tipo in zip(columnas, tipos)
+    ]
+    return f"MD5(CONVERT(CONCAT_WS('|', {', '.join(partes)}) USING utf16le))"
+
+
+def _huella_fila(row) -> Huella:
+    return (int(row[1]), int(row[2] or 0), int(row[3] or 0))
+
+
+def _canonica(valor: Any) -> Any:
+    """Valor como queda en MySQL: fechas redondeadas al segundo (DATETIME), bits como entero"""
+    if isinstance(valor, datetime):
+        return (valor + timedelta(microseconds=500000)).replace(microsecond=0)
+    if isinstance(valor, bool):
+        return int(valor)
+    return valor
+
+
+class ReporteReconciliacion:
+    """Reconciliación de mb_report con SQL Server por árbol de hashes sobre rangos de clave.
+
+    Cada lado calcula en el servidor, por sub-rango de clave, el número de filas y una
+    suma del MD5 de cada fila; sólo se baja a los sub-rangos cuya huella difiere
+    (``fanout`` por nivel) hasta llegar a rangos de a lo sumo ``chunk_size`` filas, que
+    se comparan fila a fila y se reparan en mb_report (upsert de las distintas o
+    faltantes, borrado de las que ya no están en el origen). Así se recogen los
+    cambios y borrados que la marca de agua de ``ReporteSync`` no ve. Sólo se revisan
+    las claves hasta la marca de ``sync_state``: lo posterior es del ETL.
+    """
+
+    ENTIDADES = tuple(RECONCILIAR_TIPOS)
+
+    def __init__(self, pool: Optional[ConnectionPool] = None, mysql_connect: Optional[Callable[[], Any]] = None,
+                 chunk_size: Optional[int] = None, fanout: Optional[int] = None):
+        settings = get_settings()
+        self._pool = pool
+        self._mysql_connect = mysql_connect or _mysql_connect
+        self.chunk_size = settings.etl_chunk_size if chunk_size is None else chunk_size
+        self.fanout = max(2, settings.etl_reconcile_fanout if fanout is None else fanout)
+        self.runs = 0
+        self.skipped = 0
+        self.errors = 0
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    def connection(self):
+        return (self._pool or get_pool()).connection()
+
+    def run(self, entidades: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Una reconciliación completa (bloqueante); devuelve rangos revisados y reparados por entidad.
+
+        Comparte el candado de ``ReporteSync``: si hay una carga en curso no hace nada.
+        """
+        nombres = list(entidades or self.ENTIDADES)
+        for nombre in nombres:
+            if nombre not in RECONCILIAR_TIPOS:
+                raise ValueError(f"Entidad no reconciliable: {nombre}")
+        start = time.perf_counter()
+        mysql = self._mysql_connect()
+        try:
+            cursor = mysql.cursor()
+            cursor.execute("SELECT GET_LOCK(%s, 0)", (LOCK_NAME,))
+            if not cursor.fetchone()[0]:
+                self.skipped += 1
+                return {"skipped": True}
+            try:
+                marcas = ReporteSync.leer_marcas(mysql)
+                reporte: Dict[str, Any] = {"entidades": {}}
+                with self.connection() as conn:
+                    origen = conn.cursor()
+                    for nombre in nombres:
+                        hasta = marcas.get(nombre, (0, None))[0]
+                        reporte["entidades"][nombre] = self._reconciliar(origen, mysql, nombre, hasta)
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+                cursor.fetchall()
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            mysql.close()
+        entidades_reporte = reporte["entidades"].values()
+        reporte["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        reporte["revisados"] = sum(e["revisados"] for e in entidades_reporte)
+        reporte["reparados"] = sum(e["reparados"] for e in entidades_reporte)
+        self.runs += 1
+        self.last_run = reporte
+        logger.info("reporte_reconciliacion.run", extra={
+            "revisados": reporte["revisados"], "reparados": reporte["reparados"], "ms": reporte["ms"],
+        })
+        return reporte
+
+    # --- Árbol de hashes ----------------------------------------------------------
+
+    def _reconciliar(self, origen, mysql, nombre: str, hasta: int) -> Dict[str, Any]:
+        """Recorre en profundidad sólo los rangos distintos de [0, hasta]"""
+        start = time.perf_counter()
+        entidad = POR_NOMBRE[nombre]
+        e: Dict[str, Any] = {
+            "hasta": hasta, "revisados": 0, "distintos": 0, "reparados": 0, "niveles": 0,
+            "filasLeidas": 0, "upserts": 0, "borrados": 0, "rangos": [],
+        }
+        if hasta > 0:
+            # (desde, hasta, ancho de sus sub-rangos o None si se repara, nivel); la raíz
+            # es un solo rango. Se recorre en orden de clave: una baja se borra antes de
+            # reparar la fila que la reemplaza con una clave mayor (únicos de mb_report).
+            pila: List[Tuple[int, int, Optional[int], int]] = [(0, hasta, hasta + 1, 1)]
+            while pila:
+                desde, tope, ancho, nivel = pila.pop()
+                if ancho is None:
+                    self._reparar(origen, mysql, entidad, desde, tope, e)
+                    continue
+                e["niveles"] = max(e["niveles"], nivel)
+                distintos = self._distintos(origen, mysql, entidad, desde, tope, ancho, e)
+                e["distintos"] += len(distintos)
+                for a, b, filas in reversed(distintos):
+                    hoja = filas <= self.chunk_size or a == b
+                    pila.append((a, b, None if hoja else -(-(b - a + 1) // self.fanout), nivel + 1))
+        e["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return e
+
+    def _distintos(self, origen, mysql, entidad: Entidad, desde: int, hasta: int, ancho: int,
+                   e: Dict[str, Any]) -> List[Tuple[int, int, int]]:
+        """Sub-rangos de ``ancho`` claves en [desde, hasta] cuya huella difiere: (a, b, filas)"""
+        params = (desde, ancho, desde, hasta)
+        fuente = {row[0]: _huella_fila(row) for row in
+                  catalog.fetchall(origen, f"reconciliar.{entidad.nombre}.hash", params)}
+        cursor = mysql.cursor()
+        cursor.execute(self._hash_mysql(entidad), params)
+        destino = {row[0]: _huella_fila(row) for row in cursor.fetchall()}
+        distintos = []
+        for bucket in sorted(fuente.keys() | destino.keys()):
+            e["revisados"] += 1
+            a = fuente.get(bucket)
+            b = destino.get(bucket)
+            if a != b:
+                inicio = desde + bucket * ancho
+                distintos.append((inicio, min(inicio + ancho - 1, hasta), max(a[0] if a else 0, b[0] if b else 0)))
+        return distintos
+
+    @staticmethod
+    def _hash_mysql(entidad: Entidad) -> str:
+        return (
+            "SELECT bucket, COUNT(*), SUM(CAST(CONV(SUBSTRING(h, 1, 8), 16, 10) AS UNSIGNED)), "
+            "SUM(CAST(CONV(SUBSTRING(h, 9, 8), 16, 10) AS UNSIGNED)) "
+            f"FROM (SELECT ({entidad.clave} - %s) DIV %s AS bucket, "
+            f"{_huella_mysql(entidad.columnas, RECONCILIAR_TIPOS[entidad.nombre])} AS h "
+            f"FROM {entidad.nombre} WHERE {entidad.clave} BETWEEN %s AND %s) x GROUP BY bucket"
+        )
+
+    # --- Reparación ---------------------------------------------------------------
+
+    def _reparar(self, origen, mysql, entidad: Entidad, desde: int, hasta: int, e: Dict[str, Any]) -> None:
+        """Compara fila a fila un rango chico y deja mb_report igual al origen"""
+        fuente = {
+            row[0]: row for row in (
+                tuple(_canonica(v) for v in entidad.convertir(r))
+                for r in catalog.fetchall(origen, f"reconciliar.{entidad.nombre}.filas", (desde, hasta))
+            )
+        }
+        cursor = mysql.cursor()
+        cursor.execute(
+            f"SELECT {', '.join(entidad.columnas)} FROM {entidad.nombre} "
+            f"WHERE {entidad.clave} BETWEEN %s AND %s",
+            (desde, hasta),
+        )
+        destino = {row[0]: tuple(_canonica(v) for v in row) for row in cursor.fetchall()}
+        e["filasLeidas"] += len(fuente) + len(destino)
+
+        upserts = [row for clave, row in fuente.items() if destino.get(clave) != row]
+        borrados = sorted(destino.keys() - fuente.keys())
+        if upserts:
+            cursor.executemany(entidad.upsert, upserts)
+        if borrados:
+            en = ", ".join(["%s"] * len(borrados))
+            if entidad.nombre == "dim_partido":
+                # Sin el partido tampoco valen sus filas hijas
+                for tabla in ("fact_anotacion", "bridge_roster_partido"):
+                    cursor.execute(f"DELETE FROM {tabla} WHERE partido_id IN ({en})", borrados)
+            cursor.execute(f"DELETE FROM {entidad.nombre} WHERE {entidad.clave} IN ({en})", borrados)
+        mysql.commit()
+        e["upserts"] += len(upserts)
+        e["borrados"] += len(borrados)
+        if upserts or borrados:
+            e["reparados"] += 1
+            if len(e["rangos"]) < MAX_RANGOS_REPORTE:
+                e["rangos"].append([desde, hasta])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "chunkSize": self.chunk_size,
+            "fanout": self.fanout,
+            "lastRun": self.last_run,
+        }
+
+
+_reconciliacion: Optional[ReporteReconciliacion] = None
+_job: Optional[ReporteSyncJob] = None
+
+
+def get_reporte_reconciliacion() -> ReporteReconciliacion:
+    global _reconciliacion
+    if _reconciliacion is None:
+        _reconciliacion = ReporteReconciliacion()
+    return _reconciliacion
+
+
+async def start_reporte_reconciliacion() -> None:
+    global _job
+    if _job is None:
+        _job = ReporteSyncJob(get_reporte_reconciliacion(), get_settings().etl_reconcile_interval)
+    await _job.start()
+
+
+async def close_reporte_reconciliacion() -> None:
+    if _job is not None:
+        await _job.close()
@@ -0,0 +1,476 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.config import get_settings
+from app.data.pool import ConnectionPool, get_pool
+from app.data.queries import catalog
+from app.data.statements import INT
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Estados de partido que todavía pueden cambiar (se releen en cada sincronización)
+ESTADOS_ABIERTOS = ("programado", "en_curso", "suspendido")
+
+# Partidos por sentencia al releer los abiertos (límite de parámetros de SQL Server)
+MAX_IDS = 1000
+
+# Candado de MySQL: un solo worker sincroniza a la vez
+LOCK_NAME = "mb_report.sync"
+
+
+def _bit(valor: Any) -> Optional[int]:
+    return None if valor is None else int(valor)
+
+
+class Entidad:
+    """Tabla del data mart cargada desde una tabla de SQL Server por marca de agua de ID.
+
+    ``completa``: tabla chica cuyas filas cambian (renombres, bajas, traspasos); se relee
+    entera en cada corrida en vez de desde la marca. ``unica``: otra clave única de
+    MySQL (la última columna admite NULL). Antes de cada tramo se pone en NULL esa
+    columna en las filas de otro ID que ya la ocupan; si no, el upsert chocaría con
+    esa clave y ``ON DUPLICATE KEY UPDATE`` pisaría la fila equivocada.
+    """
+
+    __slots__ = ("nombre", "clave", "columnas", "convertir", "depende", "completa", "upsert", "liberar",
+                 "_unica")
+
+    def __init__(self, nombre: str, columnas: Sequence[str],
+                 convertir: Optional[Callable[[tuple], tuple]] = None, depende: Sequence[str] = (),
+                 completa: bool = False, unica: Sequence[str] = ()):
+        self.nombre = nombre
+        self.clave = columnas[0]
+        self.columnas = tuple(columnas)
+        self.convertir = convertir or tuple
+        self.depende = tuple(depende)  # entidades que deben terminar de cargar antes
+        self.completa = completa
+        self._unica = tuple(self.columnas.index(c) for c in unica)
+        self.liberar = (
+            f"UPDATE {nombre} SET {unica[-1]} = NULL "
+            f"WHERE {' AND '.join(f'{c} = %s' for c in unica)} AND {self.clave} <> %s"
+        ) if unica else None
+        actualizar = ", ".join(f"{c} = VALUES({c})" for c in self.columnas[1:])
+        self.upsert = (
+            f"INSERT INTO {nombre} ({', '.join(self.columnas)}) "
+            f"VALUES ({', '.join(['%s'] * len(self.columnas))}) "
+            f"ON DUPLICATE KEY UPDATE {actualizar}"
+        )
+
+    def liberaciones(self, filas: Sequence[tuple]) -> List[tuple]:
+        """Parámetros de ``liberar`` para las filas (ya convertidas) con la clave única completa"""
+        return [
+            tuple(fila[i] for i in self._unica) + (fila[0],)
+            for fila in filas if all(fila[i] is not None for i in self._unica)
+        ]
+
+
+# En orden de dependencias (dimensiones, puente, hechos). logo_path no viene de SQL Server
+# (allí el logo es binario) y dim_jugador.fecha_creacion la pone MySQL al insertar.
+ENTIDADES: Tuple[Entidad, ...] = (
+    Entidad("dim_equipo", ("equipo_id", "nombre", "ciudad", "abreviatura", "activo", "fecha_creacion"),
+            lambda r: (r[0], r[1], r[2], r[3], _bit(r[4]), r[5]), completa=True),
+    Entidad("dim_jugador", ("jugador_id", "equipo_id", "nombres", "apellidos", "dorsal", "posicion",
+                            "estatura_cm", "edad", "nacionalidad", "activo"),
+            lambda r: tuple(r[:9]) + (_bit(r[9]),), completa=True, unica=("equipo_id", "dorsal")),
+    Entidad("dim_partido", ("partido_id", "equipo_local_id", "equipo_visitante_id", "fecha_hora_inicio",
+                            "estado", "minutos_por_cuarto", "cuartos_totales", "faltas_equipo_lim",
+                            "faltas_jugador_lim", "sede", "fecha_creacion")),
+    Entidad("bridge_roster_partido", ("roster_id", "partido_id", "equipo_id", "jugador_id", "es_titular"),
+            lambda r: tuple(r[:4]) + (_bit(r[4]),), depende=("dim_equipo", "dim_jugador", "dim_partido")),
+    Entidad("fact_anotacion", ("anotacion_id", "partido_id", "cuarto_id", "equipo_id", "puntos"),
+            depende=("dim_equipo", "dim_partido")),
+)
+POR_NOMBRE = {entidad.nombre: entidad for entidad in ENTIDADES}
+
+
+class _DependenciaFallida(Exception):
+    """Una entidad de la que depende ésta no se pudo cargar"""
+
+
+class _Corrida:
+    """Estado compartido de una sincronización entre los hilos de carga"""
+
+    def __init__(self, nombres: Sequence[str], start: float, workers: int):
+        self.listas = set(nombres)
+        self.start = start
+        # Lecturas de SQL Server a la vez; sólo se toma mientras se lee un tramo
+        self.consultas = threading.BoundedSemaphore(workers)
+        self.reporte: Dict[str, Any] = {"entidades": {}}
+        self.confirmado: Dict[str, int] = {}
+        self.errores: List[Exception] = []
+        self._fallidas: set = set()
+        self._terminadas = {nombre: threading.Event() for nombre in nombres}
+
+    def esperar(self, entidad: Entidad) -> None:
+        """Bloquea hasta que sus dependencias (las de esta corrida) terminaron de cargar"""
+        for dependencia in entidad.depende:
+            if dependencia in self._terminadas:
+                self._terminadas[dependencia].wait()
+                if dependencia in self._fallidas:
+                    raise _DependenciaFallida(f"No se cargó {dependencia}")
+
+    def terminar(self, entidad: Entidad, error: Optional[Exception]) -> None:
+        if error is not None:
+            self._fallidas.add(entidad.nombre)
+            if not isinstance(error, _DependenciaFallida):
+                self.errores.append(error)
+        self._terminadas[entidad.nombre].set()
+
+
+def _poner(cola: queue.Queue, parar: threading.Event, item: Any) -> None:
+    """``put`` que se rinde si la carga abandonó el intento"""
+    while not parar.is_set():
+        try:
+            cola.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
+def _mysql_connect():
+    """Conexión DB-API (pymysql) del pool de ``mysql_engine``; ``close()`` la devuelve al pool"""
+    from app.database import mysql_engine
+
+    return mysql_engine.raw_connection()
+
+
+class ReporteSync:
+    """ETL incremental de SQL Server a mb_report con marcas de agua en ``sync_state``.
+
+    Cada entidad guarda en ``sync_state`` el último ID cargado (``last_id``) y la hora
+    de la última carga (``last_ts``). Una sincronización lee sólo las filas con ID
+    mayor, en tramos de ``chunk_size``, y cada tramo se escribe con un upsert
+    (``ON DUPLICATE KEY UPDATE``) en la misma transacción que avanza la marca: si se
+    corta, la siguiente sigue desde el último tramo confirmado. Se releen además los
+    últimos ``lookback`` IDs (commits tardíos) y los partidos que en mb_report siguen
+    abiertos, con su roster, porque su estado y su roster todavía pueden cambiar.
+
+    Las entidades se sincronizan en paralelo (ver ``run``): cada tramo se lee con una
+    conexión del pool y hasta ``workers`` a la vez, así que una corrida usa hasta
+    ``workers`` + 1 conexiones de SQL Server.
+
+    ``dim_equipo`` y ``dim_jugador`` son chicas y sus filas cambian (renombres, bajas,
+    traspasos, dorsales): se releen enteras en cada corrida. Los borrados y los cambios
+    en filas ya cargadas de partidos cerrados no se ven con una marca de agua (los
+    recoge ``ReporteReconciliacion``); los borrados de equipos y jugadores, no.
+    """
+
+    def __init__(self, pool: Optional[ConnectionPool] = None, mysql_connect: Optional[Callable[[], Any]] = None,
+                 chunk_size: Optional[int] = None, lookback: Optional[int] = None,
+                 workers: Optional[int] = None, retries: Optional[int] = None,
+                 retry_backoff: Optional[float] = None):
+        settings = get_settings()
+        self._pool = pool
+        self._mysql_connect = mysql_connect or _mysql_connect
+        self.chunk_size = settings.etl_chunk_size if chunk_size is None else chunk_size
+        self.lookback = settings.etl_lookback if lookback is None else lookback
+        self.workers = max(1, settings.etl_workers if workers is None else workers)
+        self.retries = settings.etl_retries if retries is None else retries
+        self.retry_backoff = settings.etl_retry_backoff if retry_backoff is None else retry_backoff
+        self.prefetch = max(1, settings.etl_prefetch)
+        self.runs = 0
+        self.skipped = 0
+        self.errors = 0
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    def connection(self):
+        return (self._pool or get_pool()).connection()
+
+    # --- sync_state ---------------------------------------------------------------
+
+    @staticmethod
+    def leer_marcas(mysql) -> Dict[str, Tuple[int, Optional[datetime]]]:
+        cursor = mysql.cursor()
+        cursor.execute("SELECT entity, last_id, last_ts FROM sync_state")
+        return {entity: (last_id or 0, last_ts) for entity, last_id, last_ts in cursor.fetchall()}
+
+    @staticmethod
+    def _guardar_marca(cursor, entidad: str, last_id: int, last_ts: datetime) -> None:
+        cursor.execute(
+            "INSERT INTO sync_state (entity, last_id, last_ts) VALUES (%s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE last_id = GREATEST(COALESCE(last_id, 0), VALUES(last_id)), "
+            "last_ts = VALUES(last_ts)",
+            (entidad, last_id, last_ts),
+        )
+
+    # --- Sincronización -----------------------------------------------------------
+
+    def run(self, entidades: Optional[Sequence[str]] = None, desde_cero: bool = False) -> Dict[str, Any]:
+        """Una sincronización completa (bloqueante); devuelve filas y tiempos por entidad y etapa.
+
+        Las entidades corren como un DAG: todas extraen a la vez (hasta ``workers``
+        tramos leyéndose de SQL Server) y cada una carga en cuanto terminaron de cargar
+        sus dependencias (``Entidad.depende``). Cada extracción tiene su hilo: una que
+        espera con la cola llena no suelta el hilo pero sí su turno de lectura, así que
+        no puede bloquear la de una dependencia. Una entidad que falla se reintenta sola
+        desde su último tramo confirmado; si agota los reintentos se omiten las que
+        dependen de ella, las demás terminan y al final se relanza el error.
+        Si otro proceso ya está sincronizando no hace nada (``{"skipped": True}``).
+        """
+        elegidas = set(entidades or POR_NOMBRE)
+        for nombre in elegidas:
+            if nombre not in POR_NOMBRE:
+                raise ValueError(f"Entidad desconocida: {nombre}")
+        nombres = [nombre for nombre in POR_NOMBRE if nombre in elegidas]  # orden de dependencias
+        start = time.perf_counter()
+        mysql = self._mysql_connect()
+        try:
+            cursor = mysql.cursor()
+            cursor.execute("SELECT GET_LOCK(%s, 0)", (LOCK_NAME,))
+            if not cursor.fetchone()[0]:
+                self.skipped += 1
+                return {"skipped": True}
+            try:
+                marcas = {} if desde_cero else self.leer_marcas(mysql)
+                corrida = _Corrida(nombres, start, self.workers)
+                with ThreadPoolExecutor(max_workers=len(nombres), thread_name_prefix="etl-extraer") as extraer, \
+                        ThreadPoolExecutor(max_workers=len(nombres), thread_name_prefix="etl-cargar") as cargar:
+                    # Se encolan en orden de dependencias: una carga nunca espera a otra que no empezó
+                    futuros = [
+                        cargar.submit(self._entidad, corrida, POR_NOMBRE[nombre], marcas.get(nombre, (0, None))[0],
+                                      extraer)
+                        for nombre in nombres
+                    ]
+                    for futuro in futuros:
+                        futuro.result()
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+                cursor.fetchall()
+            if corrida.errores:
+                raise corrida.errores[0]
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            mysql.close()
+        reporte = corrida.reporte
+        reporte["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        reporte["filas"] = sum(e["filas"] for e in reporte["entidades"].values())
+        self.runs += 1
+        self.last_run = reporte
+        logger.info("reporte_sync.run", extra={"filas": reporte["filas"], "ms": reporte["ms"]})
+        return reporte
+
+    def _entidad(self, corrida: "_Corrida", entidad: Entidad, last_id: int, extraer: ThreadPoolExecutor) -> None:
+        """Extracción y carga de una entidad con sus reintentos (hilo de carga)"""
+        nombre = entidad.nombre
+        e = corrida.reporte["entidades"][nombre] = {
+            "filas": 0, "tramos": 0, "lastId": last_id, "intentos": 0,
+            "extraerMs": 0.0, "esperaMs": 0.0, "cargarMs": 0.0,
+        }
+        desde = 0 if entidad.completa else max(last_id - self.lookback, 0)
+        error: Optional[Exception] = None
+        for intento in range(self.retries + 1):
+            e["intentos"] = intento + 1
+            cola: queue.Queue = queue.Queue(maxsize=self.prefetch)
+            parar = threading.Event()
+            extraccion = extraer.submit(self._extraer, corrida, entidad, desde, cola, parar, e)
+            try:
+                if intento == 0:
+                    inicio = time.perf_counter()
+                    corrida.esperar(entidad)
+                    e["esperaMs"] = round((time.perf_counter() - inicio) * 1000, 1)
+                desde = self._cargar(corrida, entidad, cola, e)
+                error = None
+                break
+            except _DependenciaFallida as exc:
+                error = exc
+                break
+            except Exception as exc:
+                error = exc
+                # El siguiente intento sigue desde el último tramo confirmado
+                desde = max(desde, corrida.confirmado.get(nombre, desde))
+                logger.warning("reporte_sync.reintento", extra={
+                    "entidad": nombre, "intento": intento + 1, "error": str(exc),
+                })
+                if intento < self.retries:
+                    time.sleep(self.retry_backoff * 2 ** intento)
+            finally:
+                parar.set()
+                extraccion.result()
+        e["extraerMs"] = round(e["extraerMs"], 1)
+        e["cargarMs"] = round(e["cargarMs"], 1)
+        e["finMs"] = round((time.perf_counter() - corrida.start) * 1000, 1)
+        if error is not None:
+            e["error"] = str(error)
+        corrida.terminar(entidad, error)
+
+    def _extraer(self, corrida: "_Corrida", entidad: Entidad, desde: int, cola: queue.Queue,
+                 parar: threading.Event, e: Dict[str, Any]) -> None:
+        """Lee tramos de filas con ID > ``desde`` y los deja en ``cola`` (None al terminar)
+
+        El turno de lectura (y la conexión) se suelta antes de encolar el tramo: con la
+        cola llena se espera a la carga sin quitarle el turno a otra entidad.
+        """
+        try:
+            while not parar.is_set():
+                with corrida.consultas, self.connection() as conn:
+                    inicio = time.perf_counter()
+                    rows = catalog.fetchall(conn.cursor(), f"etl.{entidad.nombre}", (self.chunk_size, desde))
+                    e["extraerMs"] += (time.perf_counter() - inicio) * 1000
+                if rows:
+                    _poner(cola, parar, rows)
+                    desde = rows[-1][0]
+                if len(rows) < self.chunk_size:
+                    break
+            _poner(cola, parar, None)
+        except Exception as exc:
+            _poner(cola, parar, exc)
+
+    def _cargar(self, corrida: "_Corrida", entidad: Entidad, cola: queue.Queue, e: Dict[str, Any]) -> int:
+        """Escribe los tramos extraídos, cada uno con su marca; devuelve la última marca"""
+        mysql = self._mysql_connect()
+        try:
+            if entidad.nombre == "dim_partido" and "abiertos" not in corrida.reporte:
+                corrida.reporte["abiertos"] = self._releer_abiertos(
+                    mysql, "bridge_roster_partido" in corrida.listas)
+            while True:
+                rows = cola.get()
+                if rows is None:
+                    return e["lastId"]
+                if isinstance(rows, Exception):
+                    raise rows
+                inicio = time.perf_counter()
+                cursor = mysql.cursor()
+                filas = [entidad.convertir(row) for row in rows]
+                if entidad.liberar:
+                    liberaciones = entidad.liberaciones(filas)
+                    if liberaciones:
+                        cursor.executemany(entidad.liberar, liberaciones)
+                cursor.executemany(entidad.upsert, filas)
+                last_id = rows[-1][0]
+                self._guardar_marca(cursor, entidad.nombre, last_id, datetime.now(timezone.utc).replace(tzinfo=None))
+                mysql.commit()
+                e["cargarMs"] += (time.perf_counter() - inicio) * 1000
+                e["filas"] += len(rows)
+                e["tramos"] += 1
+                e["lastId"] = max(e["lastId"], last_id)
+                corrida.confirmado[entidad.nombre] = last_id
+        finally:
+            mysql.close()
+
+    def _releer_abiertos(self, mysql, con_roster: bool) -> Dict[str, Any]:
+        """Partidos abiertos en mb_report: se actualizan (o se quitan si ya no existen) con su roster"""
+        with self.connection() as conn:
+            return self._releer_abiertos_con(conn.cursor(), mysql, con_roster)
+
+    def _releer_abiertos_con(self, origen, mysql, con_roster: bool) -> Dict[str, Any]:
+        start = time.perf_counter()
+        cursor = mysql.cursor()
+        cursor.execute(
+            "SELECT partido_id FROM dim_partido WHERE estado IN (%s)" % ", ".join(["%s"] * len(ESTADOS_ABIERTOS)),
+            ESTADOS_ABIERTOS,
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+        partidos = roster = borrados = 0
+        for i in range(0, len(ids), MAX_IDS):
+            chunk = ids[i:i + MAX_IDS]
+            params = {"types": [INT] * len(chunk), "parts": {"ids": ", ".join(["?"] * len(chunk))}}
+            rows = catalog.fetchall(origen, "etl.dim_partido.abiertos", chunk, **params)
+            filas_roster = catalog.fetchall(origen, "etl.bridge_roster_partido.abiertos", chunk, **params) \
+                if con_roster else []
+            en = ", ".join(["%s"] * len(chunk))
+            cursor = mysql.cursor()
+            if rows:
+                cursor.executemany(POR_NOMBRE["dim_partido"].upsert, [tuple(row) for row in rows])
+            if con_roster:
+                # El roster se reemplaza entero: así también se quitan las bajas
+                cursor.execute(f"DELETE FROM bridge_roster_partido WHERE partido_id IN ({en})", chunk)
+                if filas_roster:
+                    entidad = POR_NOMBRE["bridge_roster_partido"]
+                    cursor.executemany(entidad.upsert, [entidad.convertir(row) for row in filas_roster])
+            eliminados = sorted(set(chunk) - {row[0] for row in rows})
+            if eliminados:
+                en = ", ".join(["%s"] * len(eliminados))
+                for tabla in ("fact_anotacion", "bridge_roster_partido", "dim_partido"):
+                    cursor.execute(f"DELETE FROM {tabla} WHERE partido_id IN ({en})", eliminados)
+            mysql.commit()
+            partidos += len(rows)
+            roster += len(filas_roster)
+            borrados += len(eliminados)
+        return {
+            "partidos": partidos,
+            "roster": roster,
+            "borrados": borrados,
+            "ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    def estado(self) -> Dict[str, Any]:
+        """Marcas de agua guardadas en sync_state"""
+        mysql = self._mysql_connect()
+        try:
+            marcas = self.leer_marcas(mysql)
+        finally:
+            mysql.close()
+        return {
+            nombre: {"lastId": marcas[nombre][0], "lastTs": marcas[nombre][1]} if nombre in marcas else None
+            for nombre in POR_NOMBRE
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "chunkSize": self.chunk_size,
+            "lookback": self.lookback,
+            "workers": self.workers,
+            "retries": self.retries,
+            "lastRun": self.last_run,
+        }
+
+
+class ReporteSyncJob:
+    """Corrida periódica en segundo plano de ``sync.run()`` (cada ``interval`` segundos; 0 = desactivada)"""
+
+    def __init__(self, sync: ReporteSync, interval: Optional[float] = None):
+        self.sync = sync
+        self.interval = get_settings().etl_sync_interval if interval is None else interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # Hilo propio: una carga larga no ocupa el executor de las consultas
+                await asyncio.to_thread(self.sync.run)
+            except Exception:
+                logger.exception("reporte_sync.error", extra={"job": type(self.sync).__name__})
+            await asyncio.sleep(self.interval)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+_sync: Optional[ReporteSync] = None
+_job: Optional[ReporteSyncJob] = None
+
+
+def get_reporte_sync() -> ReporteSync:
+    global _sync
+    if _sync is None:
+        _sync = ReporteSync()
+    return _sync
+
+
+async def start_reporte_sync() -> None:
+    global _job
+    if _job is None:
+        _job = ReporteSyncJob(get_reporte_sync())
+    await _job.start()
+
+
+async def close_reporte_sync() -> None:
+    if _job is not None:
+        await _job.close()
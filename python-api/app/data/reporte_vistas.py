@@ -0,0 +1,125 @@
+import csv
+import io
+from datetime import date
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.data.keyset import InvalidCursorError, decode_cursor, encode_cursor
+from app.serialization import dumps
+
+# Formatos de exportación -> media type
+FORMATOS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+class VistaReporte:
+    """Vista (o tabla) de mb_report expuesta por la API, con su clave única y sus filtros"""
+
+    __slots__ = ("nombre", "tabla", "clave", "filtros")
+
+    def __init__(self, nombre: str, tabla: str, clave: str,
+                 filtros: Optional[Dict[str, Callable[[str], Any]]] = None):
+        self.nombre = nombre
+        self.tabla = tabla
+        self.clave = clave
+        self.filtros = filtros or {}  # columna filtrable por igualdad (?columna=valor) -> conversión
+
+    def convertir_filtros(self, valores: Dict[str, str]) -> Dict[str, Any]:
+        """Valores de la query convertidos al tipo de su columna; ValueError si no se permiten"""
+        desconocidos = sorted(set(valores) - set(self.filtros))
+        if desconocidos:
+            raise ValueError(f"Filtros no permitidos en {self.nombre}: {', '.join(desconocidos)} "
+                             f"(permitidos: {', '.join(self.filtros) or 'ninguno'})")
+        filtros = {}
+        for columna, valor in valores.items():
+            try:
+                filtros[columna] = self.filtros[columna](valor)
+            except ValueError as e:
+                raise ValueError(f"Valor inválido para {columna}: {valor}") from e
+        return filtros
+
+
+VISTAS: Dict[str, VistaReporte] = {v.nombre: v for v in (
+    VistaReporte("equipos", "vw_report_equipos", "equipo_id", {"activo": int}),
+    VistaReporte("jugadores", "vw_report_jugadores", "jugador_id", {"equipo_id": int, "activo": int}),
+    VistaReporte("partidos", "vw_report_partidos", "partido_id", {"fecha": date.fromisoformat}),
+    VistaReporte("roster", "vw_report_roster", "roster_id", {"partido_id": int}),
+    VistaReporte("roster-all", "vw_report_roster_all", "roster_id", {"partido_id": int}),
+    VistaReporte("anotaciones", "fact_anotacion", "anotacion_id", {"partido_id": int, "equipo_id": int}),
+)}
+
+
+def _consulta(vista: VistaReporte, filtros: Dict[str, Any], despues: Any = None,
+              limit: Optional[int] = None) -> Tuple[str, Dict[str, Any]]:
+    """SELECT ordenado por la clave; ``filtros`` ya convertidos, ``despues`` = última clave leída"""
+    conditions = []
+    params: Dict[str, Any] = {}
+    for columna, valor in filtros.items():
+        conditions.append(f"{columna} = :f_{columna}")
+        params[f"f_{columna}"] = valor
+    if despues is not None:
+        conditions.append(f"{vista.clave} > :despues")
+        params["despues"] = despues
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"SELECT * FROM {vista.tabla} {where} ORDER BY {vista.clave}"
+    if limit is not None:
+        sql += " LIMIT :limit"
+        params["limit"] = limit
+    return sql, params
+
+
+def pagina(db: Session, vista: VistaReporte, filtros: Dict[str, Any], limit: int,
+           cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Una página por keyset sobre la clave de la vista; devuelve (filas, cursor_siguiente)"""
+    despues = None
+    if cursor:
+        posicion = decode_cursor(cursor)
+        if posicion.get("v") != vista.nombre or "k" not in posicion:
+            raise InvalidCursorError("Cursor inválido")
+        despues = posicion["k"]
+    sql, params = _consulta(vista, filtros, despues, limit + 1)
+    filas = [dict(row) for row in db.execute(text(sql), params).mappings()]
+    next_cursor = None
+    if len(filas) > limit:
+        filas = filas[:limit]
+        next_cursor = encode_cursor({"v": vista.nombre, "k": filas[-1][vista.clave]})
+    return filas, next_cursor
+
+
+def _bloque_ndjson(columnas: List[str], filas: Sequence[Sequence[Any]]) -> bytes:
+    return b"".join(dumps(dict(zip(columnas, fila))) + b"\n" for fila in filas)
+
+
+def _bloque_csv(filas: Sequence[Sequence[Any]]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(filas)
+    return buffer.getvalue().encode("utf-8")
+
+
+def exportar(session_factory: Callable[[], Session], vista: VistaReporte, filtros: Dict[str, Any],
+             formato: str, batch: int) -> Iterator[bytes]:
+    """Toda la vista como NDJSON o CSV, un bloque de ``batch`` filas a la vez.
+
+    Lee con un cursor del lado del servidor (``stream_results``: SSCursor en pymysql),
+    así la memoria no depende del número de filas. La sesión es propia del generador
+    porque vive mientras se envía la respuesta.
+    """
+    sql, params = _consulta(vista, filtros)
+    db = session_factory()
+    try:
+        result = db.execute(text(sql), params, execution_options={"yield_per": batch})
+        columnas = list(result.keys())
+        if formato == "csv":
+            yield _bloque_csv([columnas])
+        for filas in result.partitions():
+            yield _bloque_ndjson(columnas, filas) if formato == "ndjson" else _bloque_csv(filas)
+    except GeneratorExit:
+        # El cliente se fue: se descarta la conexión en vez de leer el resto del resultado
+        db.connection().invalidate()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,193 @@
+import bisect
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pyodbc
+
+# Tipos de parámetro para ``cursor.setinputsizes``: (tipo SQL, tamaño, decimales).
+# Con tipos fijos SQL Server recibe siempre la misma declaración (p. ej. nvarchar(100)
+# y no nvarchar(<largo del valor>)) y reutiliza un único plan por sentencia.
+ParamType = Tuple[int, int, int]
+
+INT: ParamType = (pyodbc.SQL_INTEGER, 0, 0)
+BIGINT: ParamType = (pyodbc.SQL_BIGINT, 0, 0)
+SMALLINT: ParamType = (pyodbc.SQL_SMALLINT, 0, 0)
+TINYINT: ParamType = (pyodbc.SQL_TINYINT, 0, 0)
+BIT: ParamType = (pyodbc.SQL_BIT, 0, 0)
+DATETIME2: ParamType = (pyodbc.SQL_TYPE_TIMESTAMP, 27, 7)
+
+
+def NVARCHAR(length: int) -> ParamType:
+    return (pyodbc.SQL_WVARCHAR, length, 0)
+
+
+# Límites superiores (ms) del histograma de latencia
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class Statement:
+    """Sentencia SQL con nombre y tipos de parámetros declarados"""
+
+    __slots__ = ("name", "sql", "types")
+
+    def __init__(self, name: str, sql: str, types: Sequence[ParamType] = ()):
+        self.name = name
+        self.sql = sql
+        self.types = tuple(types)
+
+    def render(self, parts: Optional[Dict[str, str]] = None) -> str:
+        """Texto SQL; ``parts`` completa las plantillas ({where}, {top}, ...)"""
+        return self.sql.format(**parts) if parts else self.sql
+
+
+class _StatementStats:
+    __slots__ = ("calls", "errors", "rows", "total", "max", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Estimación por histograma: límite superior del bucket que contiene el percentil"""
+        if not self.calls:
+            return None
+        objetivo = p / 100 * self.calls
+        acumulado = 0
+        for i, count in enumerate(self.buckets):
+            acumulado += count
+            if acumulado >= objetivo:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else round(self.max * 1000, 3)
+        return round(self.max * 1000, 3)
+
+
+class StatementCatalog:
+    """Registro central de sentencias SQL Server con métricas por sentencia.
+
+    Cada ejecución pasa por aquí: se enlazan los parámetros con sus tipos
+    declarados y se registran llamadas, errores, filas y latencia.
+    """
+
+    def __init__(self):
+        self._statements: Dict[str, Statement] = {}
+        self._stats: Dict[str, _StatementStats] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, sql: str, types: Sequence[ParamType] = ()) -> Statement:
+        if name in self._statements:
+            raise ValueError(f"Sentencia duplicada: {name}")
+        statement = Statement(name, sql, types)
+        self._statements[name] = statement
+        self._stats[name] = _StatementStats()
+        return statement
+
+    def get(self, name: str) -> Statement:
+        return self._statements[name]
+
+    def names(self) -> List[str]:
+        return list(self._statements)
+
+    def _prepare(self, cursor, name: str, params: Sequence[Any], types, parts) -> str:
+        statement = self._statements[name]
+        declared = statement.types if types is None else tuple(types)
+        if declared:
+            cursor.setinputsizes(list(declared))
+        elif params:
+            cursor.setinputsizes(None)
+        return statement.render(parts)
+
+    def _record(self, name: str, elapsed: float, rows: int, error: bool = False) -> None:
+        with self._lock:
+            stats = self._stats[name]
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.rows += max(rows, 0)
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            stats.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed * 1000)] += 1
+
+    def _run(self, name: str, action):
+        start = time.perf_counter()
+        try:
+            result, rows = action()
+        except Exception:
+            self._record(name, time.perf_counter() - start, 0, error=True)
+            raise
+        self._record(name, time.perf_counter() - start, rows)
+        return result
+
+    def execute(self, cursor, name: str, params: Sequence[Any] = (),
+                types: Optional[Sequence[ParamType]] = None, parts: Optional[Dict[str, str]] = None):
+        """Ejecuta una sentencia (filas = filas afectadas)"""
+        sql = self._prepare(cursor, name, params, types, parts)
+        return self._run(name, lambda: (cursor.execute(sql, tuple(params)), cursor.rowcount))
+
+    def executemany(self, cursor, name: str, seq_of_params: Iterable[Sequence[Any]],
+                    types: Optional[Sequence[ParamType]] = None, parts: Optional[Dict[str, str]] = None) -> None:
+        """Ejecuta una sentencia para cada juego de parámetros (en bloque con fast_executemany)"""
+        seq = list(seq_of_params)
+        sql = self._prepare(cursor, name, seq[0] if seq else (), types, parts)
+        self._run(name, lambda: (cursor.executemany(sql, seq), len(seq)))
+
+    def fetchone(self, cursor, name: str, params: Sequence[Any] = (),
+                 types: Optional[Sequence[ParamType]] = None, parts: Optional[Dict[str, str]] = None):
+        """Ejecuta y devuelve la primera fila (o None)"""
+        sql = self._prepare(cursor, name, params, types, parts)
+
+        def action():
+            cursor.execute(sql, tuple(params))
+            row = cursor.fetchone()
+            return row, int(row is not None)
+
+        return self._run(name, action)
+
+    def fetchall(self, cursor, name: str, params: Sequence[Any] = (),
+                 types: Optional[Sequence[ParamType]] = None, parts: Optional[Dict[str, str]] = None) -> list:
+        """Ejecuta y devuelve todas las filas"""
+        sql = self._prepare(cursor, name, params, types, parts)
+
+        def action():
+            cursor.execute(sql, tuple(params))
+            rows = cursor.fetchall()
+            return rows, len(rows)
+
+        return self._run(name, action)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Métricas por sentencia, las de mayor tiempo total primero"""
+        with self._lock:
+            result = []
+            for name, stats in self._stats.items():
+                histogram = {f"<={limit}ms": count for limit, count in zip(LATENCY_BUCKETS_MS, stats.buckets)}
+                histogram[f">{LATENCY_BUCKETS_MS[-1]}ms"] = stats.buckets[-1]
+                result.append({
+                    "name": name,
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "rows": stats.rows,
+                    "totalMs": round(stats.total * 1000, 3),
+                    "avgMs": round(stats.total * 1000 / stats.calls, 3) if stats.calls else 0.0,
+                    "maxMs": round(stats.max * 1000, 3),
+                    "p50Ms": stats.percentile(50),
+                    "p95Ms": stats.percentile(95),
+                    "p99Ms": stats.percentile(99),
+                    "histogram": histogram,
+                })
+        result.sort(key=lambda s: s["totalMs"], reverse=True)
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            for name in self._stats:
+                self._stats[name] = _StatementStats()
+
+
+statement_catalog = StatementCatalog()
+
+
+def get_statement_catalog() -> StatementCatalog:
+    return statement_catalog
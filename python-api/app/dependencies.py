@@ -1,5 +1,13 @@
-from app.data.partido_data import PartidoDataAccess
+from app.data.partido_data import PartidoDataAccess, AsyncPartidoDataAccess
+
+# Instancias compartidas: no guardan estado por request y las conexiones vienen del pool
+_partido_data_access = PartidoDataAccess()
+_async_partido_data_access = AsyncPartidoDataAccess(_partido_data_access)
 
 def get_partido_data_access() -> PartidoDataAccess:
     """Dependency injection para PartidoDataAccess"""
-    return PartidoDataAccess()
+    return _partido_data_access
+
+def get_async_partido_data_access() -> AsyncPartidoDataAccess:
+    """Dependency injection para PartidoDataAccess en modo async (executor dedicado)"""
+    return _async_partido_data_access
@@ -0,0 +1,44 @@
+import logging
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.config import get_settings
+from app.serialization import dumps
+
+# Atributos propios de LogRecord; el resto viene de ``extra`` y se emite como campo
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por evento: ts, level, logger, msg y los campos de ``extra``"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return dumps(data).decode("utf-8")
+
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """Configura el logger ``app`` (los de uvicorn no se tocan)"""
+    logger = logging.getLogger("app")
+    logger.setLevel((level or get_settings().log_level).upper())
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(JsonFormatter())
+        logger.addHandler(handler)
+    logger.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger hijo de ``app`` (p. ej. ``app.controllers.partido_controller``)"""
+    return logging.getLogger(name if name.startswith("app") else f"app.{name}")
@@ -0,0 +1 @@
+# Actualizaciones en vivo (WebSocket/SSE)
@@ -0,0 +1,354 @@
+import asyncio
+import fcntl
+import importlib
+import json
+import os
+import struct
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Hashable, List, Optional, Set
+
+from app.config import get_settings
+from app.logging_config import get_logger
+from app.serialization import dumps
+
+logger = get_logger(__name__)
+
+Handler = Callable[[Hashable, Any], None]
+
+INPROC = "inproc"
+UNIX = "unix"
+
+_HEADER = struct.Struct(">I")
+
+# Frame vacío con el que el hub confirma que ya reenvía a un worker recién conectado
+_HELLO = _HEADER.pack(0)
+
+
+def encode(topic: str, key: Hashable, payload: Any) -> bytes:
+    """Mensaje con prefijo de longitud: [tópico, clave, contenido] en JSON"""
+    body = dumps([topic, key, payload])
+    return _HEADER.pack(len(body)) + body
+
+
+def decode(body: bytes) -> tuple:
+    topic, key, payload = json.loads(body)
+    return topic, key, payload
+
+
+class Broker(ABC):
+    """Difusión de mensajes en vivo entre los workers de la API.
+
+    ``publish(topic, key, payload)`` llama a los handlers del tópico en todos los
+    workers (también en éste). Los mensajes de una misma clave (partido/juego) llegan
+    a todos en el mismo orden. Fuera del modo en proceso el contenido debe ser JSON.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.errors = 0
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        self._handlers.setdefault(topic, []).append(handler)
+
+    @abstractmethod
+    def publish(self, topic: str, key: Hashable, payload: Any) -> None:
+        """Difunde ``payload`` a los handlers de ``topic`` de todos los workers"""
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    def _deliver(self, topic: str, key: Hashable, payload: Any) -> None:
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(key, payload)
+                self.delivered += 1
+            except Exception:
+                self.errors += 1
+                logger.exception("broker.handler.error", extra={"topic": topic})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "topics": sorted(self._handlers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "errors": self.errors,
+        }
+
+
+class InProcessBroker(Broker):
+    """Sólo este worker: entrega en el acto, sin serializar (un único worker)"""
+
+    name = INPROC
+
+    def publish(self, topic: str, key: Hashable, payload: Any) -> None:
+        self.published += 1
+        self._deliver(topic, key, payload)
+
+
+class UnixSocketBroker(Broker):
+    """Difusión entre los workers de una máquina por un socket Unix.
+
+    El primer worker que toma el lock ``<path>.lock`` atiende el socket (hub) y los
+    demás se conectan. Todo mensaje, también los del propio hub, pasa por el hub y
+    se reenvía a todos en el orden en que llegó: todos los workers ven el mismo
+    orden. Si el hub cae, otro worker toma el lock y los demás se reconectan; lo
+    publicado mientras tanto (también con la conexión al hub ya cerrándose) se guarda
+    en una cola acotada y lo que se desborda cuenta en ``lost``.
+    """
+
+    name = UNIX
+
+    def __init__(self, path: str, backlog: int = 10000, max_buffer: int = 8 * 1024 * 1024,
+                 retry: float = 0.1):
+        super().__init__()
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.max_buffer = max_buffer
+        self.retry = retry
+        self.role: Optional[str] = None
+        self._backlog: Deque[bytes] = deque(maxlen=backlog)
+        self._clients: Set[asyncio.StreamWriter] = set()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._lock_fd: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.reconnects = 0
+        self.dropped_clients = 0
+        self.lost = 0
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def publish(self, topic: str, key: Hashable, payload: Any) -> None:
+        frame = encode(topic, key, payload)
+        self.published += 1
+        if self.role == "hub":
+            self._relay(frame)
+        elif self._writer is not None and not self._writer.is_closing():
+            self._writer.write(frame)
+        else:
+            # Sin hub (o con la conexión cerrándose: lo escrito se perdería sin contarse)
+            if len(self._backlog) == self._backlog.maxlen:
+                self.lost += 1
+            self._backlog.append(frame)
+
+    async def _run(self) -> None:
+        while not self._closing:
+            if self._try_lock():
+                await self._serve_hub()
+                return
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+                await reader.readexactly(len(_HELLO))
+            except (OSError, asyncio.IncompleteReadError):
+                await asyncio.sleep(self.retry)
+                continue
+            self.role = "client"
+            self._writer = writer
+            while self._backlog:
+                writer.write(self._backlog.popleft())
+            try:
+                await self._read_loop(reader, relay=False)
+            finally:
+                self._writer = None
+                self.role = None
+                writer.close()
+            if not self._closing:
+                self.reconnects += 1
+                logger.warning("broker.hub_perdido", extra={"path": self.path})
+
+    def _try_lock(self) -> bool:
+        fd = os.open(self.lock_path, os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def _serve_hub(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # socket de un hub anterior que ya no tiene el lock
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+        self.role = "hub"
+        logger.info("broker.hub", extra={"path": self.path, "pid": os.getpid()})
+        while self._backlog:
+            self._relay(self._backlog.popleft())
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._clients.add(writer)
+        writer.write(_HELLO)
+        try:
+            await self._read_loop(reader, relay=True)
+        except asyncio.CancelledError:
+            pass  # cierre del hub
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def _read_loop(self, reader: asyncio.StreamReader, relay: bool) -> None:
+        while True:
+            try:
+                header = await reader.readexactly(_HEADER.size)
+                body = await reader.readexactly(_HEADER.unpack(header)[0])
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            if not body:
+                continue
+            if relay:
+                self._relay(header + body)
+            else:
+                self._deliver(*decode(body))
+
+    def _relay(self, frame: bytes) -> None:
+        """Hub: reenvía a todos los workers y entrega aquí, sin puntos de espera (orden total)"""
+        for writer in tuple(self._clients):
+            if writer.transport.get_write_buffer_size() > self.max_buffer:
+                # Un worker que no lee no debe hacer crecer la memoria del hub
+                self._clients.discard(writer)
+                self.dropped_clients += 1
+                writer.close()
+                continue
+            writer.write(frame)
+        self._deliver(*decode(frame[_HEADER.size:]))
+
+    async def close(self) -> None:
+        self._closing = True
+        if self._task is not None:
+            self._task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+        for writer in tuple(self._clients):
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+        self.role = None
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "path": self.path,
+            "role": self.role,
+            "workers": len(self._clients) + 1 if self.role == "hub" else None,
+            "backlog": len(self._backlog),
+            "lost": self.lost,
+            "reconnects": self.reconnects,
+            "droppedWorkers": self.dropped_clients,
+        })
+        return stats
+
+
+class BrokerAdapter(ABC):
+    """Interfaz para un broker externo (Redis, NATS, ...).
+
+    Transporta mensajes ya codificados por un único stream ordenado: lo que se
+    envía con ``send`` vuelve, en el mismo orden para todos los workers, por
+    ``messages()`` (incluido el worker que lo envió). Un adaptador incompleto falla
+    al crearse (``TypeError``), no en el primer mensaje.
+    """
+
+    @abstractmethod
+    async def connect(self) -> None:
+        """Abre la conexión con el broker externo"""
+
+    @abstractmethod
+    async def send(self, data: bytes) -> None:
+        """Envía un mensaje al stream"""
+
+    @abstractmethod
+    def messages(self) -> AsyncIterator[bytes]:
+        """Mensajes del stream en orden, incluidos los propios"""
+
+    async def close(self) -> None:
+        pass
+
+
+class AdapterBroker(Broker):
+    """Broker sobre un ``BrokerAdapter`` externo"""
+
+    def __init__(self, adapter: BrokerAdapter):
+        super().__init__()
+        self.adapter = adapter
+        self.name = type(adapter).__name__
+        self._outbox: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        await self.adapter.connect()
+        self._tasks = [asyncio.create_task(self._send_loop()), asyncio.create_task(self._receive_loop())]
+
+    def publish(self, topic: str, key: Hashable, payload: Any) -> None:
+        self.published += 1
+        self._outbox.put_nowait(encode(topic, key, payload)[_HEADER.size:])
+
+    async def _send_loop(self) -> None:
+        while True:
+            data = await self._outbox.get()
+            try:
+                await self.adapter.send(data)
+            except Exception:
+                self.errors += 1
+                logger.exception("broker.send.error", extra={"backend": self.name})
+
+    async def _receive_loop(self) -> None:
+        async for data in self.adapter.messages():
+            self._deliver(*decode(data))
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await self.adapter.close()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["pending"] = self._outbox.qsize()
+        return stats
+
+
+def create_broker(backend: str, path: Optional[str] = None) -> Broker:
+    """``inproc``, ``unix`` o ``modulo:fabrica`` (una función que devuelve un ``BrokerAdapter``)"""
+    if backend == INPROC:
+        return InProcessBroker()
+    if backend == UNIX:
+        return UnixSocketBroker(path or get_settings().live_broker_path)
+    if ":" in backend:
+        module, factory = backend.split(":", 1)
+        return AdapterBroker(getattr(importlib.import_module(module), factory)())
+    raise ValueError(f"Broker desconocido: {backend}")
+
+
+_broker: Optional[Broker] = None
+
+
+def get_broker() -> Broker:
+    global _broker
+    if _broker is None:
+        settings = get_settings()
+        _broker = create_broker(settings.live_broker, settings.live_broker_path)
+    return _broker
+
+
+async def start_broker() -> None:
+    await get_broker().start()
+
+
+async def close_broker() -> None:
+    if _broker is not None:
+        await _broker.close()
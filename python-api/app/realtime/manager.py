@@ -0,0 +1,210 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Hashable, Optional, Set
+
+from fastapi import WebSocket
+
+from app.config import get_settings
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SendFunc = Callable[[Any], Awaitable[None]]
+
+DROP_OLDEST = "drop_oldest"
+DISCONNECT = "disconnect"
+
+# Código de cierre WebSocket para consumidores lentos ("Try Again Later")
+CLOSE_SLOW_CONSUMER = 1013
+
+
+class Subscriber:
+    """Suscripción a un canal con cola de envío acotada.
+
+    ``offer`` nunca bloquea: si la cola está llena se descarta el mensaje más antiguo
+    (``drop_oldest``) o se desconecta al suscriptor (``disconnect``). Los mensajes se
+    consumen con ``run(send)`` (WebSocket) o iterando ``messages()`` (SSE).
+    """
+
+    def __init__(self, channel: Hashable, max_queue: int, overflow: str):
+        self.channel = channel
+        self.max_queue = max(1, max_queue)
+        self.overflow = overflow
+        self._queue: Deque[Any] = deque()
+        self._ready = asyncio.Event()
+        self.closed = False
+        self.close_reason: Optional[str] = None
+        self.delivered = 0
+        self.dropped = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def offer(self, message: Any) -> bool:
+        """Encola un mensaje; False si el suscriptor está (o quedó) desconectado"""
+        if self.closed:
+            return False
+        if len(self._queue) >= self.max_queue:
+            if self.overflow == DISCONNECT:
+                self.close("slow consumer")
+                return False
+            self._queue.popleft()
+            self.dropped += 1
+        self._queue.append(message)
+        self._ready.set()
+        return True
+
+    def close(self, reason: Optional[str] = None) -> None:
+        if not self.closed:
+            self.closed = True
+            self.close_reason = reason
+            self._queue.clear()
+            self._ready.set()
+
+    async def messages(self) -> AsyncIterator[Any]:
+        """Mensajes en orden hasta que se cierre la suscripción"""
+        while True:
+            while self._queue:
+                self.delivered += 1
+                yield self._queue.popleft()
+            if self.closed:
+                return
+            self._ready.clear()
+            await self._ready.wait()
+
+    async def receive(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """Siguiente mensaje, o None si pasan ``timeout`` segundos sin mensajes o se cerró"""
+        while not self._queue:
+            if self.closed:
+                return None
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        self.delivered += 1
+        return self._queue.popleft()
+
+    async def run(self, send: SendFunc, send_timeout: Optional[float] = None) -> None:
+        """Envía los mensajes con ``send``; un envío que no termina a tiempo cierra la suscripción"""
+        try:
+            async for message in self.messages():
+                await asyncio.wait_for(send(message), send_timeout)
+        except asyncio.TimeoutError:
+            self.close("send timeout")
+        except Exception as e:
+            self.close(f"send error: {e}")
+
+
+class ChannelManager:
+    """Suscripciones en vivo agrupadas por canal (un canal por partido/juego).
+
+    ``publish`` sólo encola en cada suscriptor del canal y vuelve enseguida; cada
+    conexión envía desde su propia tarea, así un cliente lento no retrasa al resto.
+    """
+
+    def __init__(self, max_queue: Optional[int] = None, overflow: Optional[str] = None,
+                 send_timeout: Optional[float] = None):
+        settings = get_settings()
+        self.max_queue = settings.live_queue_size if max_queue is None else max_queue
+        self.overflow = settings.live_overflow if overflow is None else overflow
+        self.send_timeout = settings.live_send_timeout if send_timeout is None else send_timeout
+        if self.overflow not in (DROP_OLDEST, DISCONNECT):
+            raise ValueError(f"Política de desborde desconocida: {self.overflow}")
+        self._channels: Dict[Hashable, Set[Subscriber]] = {}
+        self._lock = threading.Lock()
+        self.broker = None
+        self.topic: Optional[str] = None
+        self.published = 0
+        self.dropped = 0
+        self.slow_disconnects = 0
+
+    def subscribe(self, channel: Hashable) -> Subscriber:
+        subscriber = Subscriber(channel, self.max_queue, self.overflow)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscriber.close()
+        with self._lock:
+            subscribers = self._channels.get(subscriber.channel)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._channels[subscriber.channel]
+        self.dropped += subscriber.dropped
+        subscriber.dropped = 0
+
+    def attach(self, broker, topic: str) -> None:
+        """Difunde ``broadcast`` por ``broker`` para llegar a los suscriptores de todos los workers"""
+        self.broker = broker
+        self.topic = topic
+        broker.subscribe(topic, self.publish)
+
+    def publish(self, channel: Hashable, message: Any) -> int:
+        """Encola ``message`` para los suscriptores del canal en este worker; devuelve cuántos lo recibirán"""
+        with self._lock:
+            subscribers = tuple(self._channels.get(channel, ()))
+        self.published += 1
+        accepted = 0
+        for subscriber in subscribers:
+            if subscriber.offer(message):
+                accepted += 1
+            elif subscriber.close_reason == "slow consumer":
+                self.slow_disconnects += 1
+                self.unsubscribe(subscriber)
+        return accepted
+
+    async def broadcast(self, channel: Hashable, message: Any) -> int:
+        """Publica en todos los workers si hay broker; si no, sólo en éste"""
+        if self.broker is None:
+            return self.publish(channel, message)
+        self.broker.publish(self.topic, channel, message)
+        return 0
+
+    def subscribers(self, channel: Hashable) -> int:
+        with self._lock:
+            return len(self._channels.get(channel, ()))
+
+    async def connect(self, websocket: WebSocket, channel: Hashable, accept: bool = True,
+                      send: Optional[SendFunc] = None) -> Subscriber:
+        """Acepta el WebSocket, lo suscribe al canal y arranca su tarea de envío.
+
+        ``send`` reemplaza a ``websocket.send_text`` cuando los mensajes no son texto.
+        """
+        if accept:
+            await websocket.accept()
+        subscriber = self.subscribe(channel)
+        subscriber.task = asyncio.create_task(self._send_loop(websocket, subscriber, send or websocket.send_text))
+        return subscriber
+
+    async def _send_loop(self, websocket: WebSocket, subscriber: Subscriber, send: SendFunc) -> None:
+        await subscriber.run(send, self.send_timeout)
+        if subscriber.close_reason in ("slow consumer", "send timeout"):
+            logger.info("live.desconectado", extra={"canal": str(subscriber.channel), "motivo": subscriber.close_reason})
+            try:
+                await websocket.close(code=CLOSE_SLOW_CONSUMER)
+            except Exception:
+                pass
+        self.unsubscribe(subscriber)
+
+    def disconnect(self, subscriber: Subscriber) -> None:
+        """Quita la suscripción y detiene su tarea de envío"""
+        self.unsubscribe(subscriber)
+        if subscriber.task is not None and not subscriber.task.done():
+            subscriber.task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            channels = {str(channel): len(subs) for channel, subs in self._channels.items()}
+            pending_dropped = sum(s.dropped for subs in self._channels.values() for s in subs)
+        return {
+            "channels": len(channels),
+            "subscribers": sum(channels.values()),
+            "byChannel": channels,
+            "published": self.published,
+            "dropped": self.dropped + pending_dropped,
+            "slowDisconnects": self.slow_disconnects,
+            "maxQueue": self.max_queue,
+            "overflow": self.overflow,
+        }
@@ -0,0 +1,106 @@
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+from app.config import get_settings
+from app.data.live_state import LiveStateEngine
+from app.logging_config import get_logger
+from app.realtime.manager import ChannelManager
+from app.serialization import dumps
+
+logger = get_logger(__name__)
+
+# Espera sugerida a los clientes SSE antes de reconectar
+SSE_RETRY_MS = 3000
+
+FIN = "fin"
+
+
+def sse_reloj(reloj: Optional[Dict[str, Any]]) -> str:
+    if reloj is None:
+        return f"event: {FIN}\ndata: {{}}\n\n"
+    return f"event: reloj\ndata: {dumps(reloj).decode('utf-8')}\n\n"
+
+
+class RelojHub:
+    """Reloj de juego de los partidos en curso, calculado en el servidor.
+
+    El reloj sale del motor de estado en vivo (último CronometroEvento del cuarto y
+    dbo.Cuarto) y de ``time.monotonic()``. Sólo se publica cuando hay una transición
+    (inicio, pausa, reanudación, fin, cambio de cuarto); entre transiciones el
+    cliente descuenta el tiempo por su cuenta a partir de ``segundosRestantes``.
+    """
+
+    def __init__(self, engine: LiveStateEngine, manager: Optional[ChannelManager] = None,
+                 heartbeat: Optional[float] = None):
+        self.engine = engine
+        self.manager = manager or ChannelManager()
+        self.heartbeat = get_settings().live_sse_heartbeat if heartbeat is None else heartbeat
+        self._transiciones: Dict[int, tuple] = {}
+        self.transitions = 0
+        self.streams = 0
+        engine.subscribe(self.observe)
+
+    def reloj(self, partido_id: int) -> Optional[Dict[str, Any]]:
+        """Reloj calculado ahora (sin base de datos), con la hora del servidor en ms"""
+        reloj = self.engine.reloj(partido_id)
+        if reloj is not None:
+            reloj["servidorMs"] = int(time.time() * 1000)
+        return reloj
+
+    def observe(self, partido_id: int, estado: Optional[Dict[str, Any]]) -> None:
+        """Listener del motor: publica el reloj sólo si cambió algo más que el paso del tiempo"""
+        transicion = self.engine.transicion(partido_id)
+        if transicion is None:
+            if self._transiciones.pop(partido_id, None) is not None:
+                self.manager.publish(partido_id, sse_reloj(None))
+            return
+        if self._transiciones.get(partido_id) == transicion:
+            return
+        self._transiciones[partido_id] = transicion
+        self.transitions += 1
+        if self.manager.subscribers(partido_id):
+            self.manager.publish(partido_id, sse_reloj(self.reloj(partido_id)))
+
+    async def stream(self, partido_id: int) -> AsyncIterator[str]:
+        """Server-Sent Events: el reloj actual y después una por transición; ``fin`` al terminar el partido"""
+        subscriber = self.manager.subscribe(partido_id)
+        self.streams += 1
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            reloj = self.reloj(partido_id)
+            yield sse_reloj(reloj)
+            if reloj is None:
+                return
+            while True:
+                message = await subscriber.receive(self.heartbeat)
+                if message is None:
+                    if subscriber.closed:
+                        return
+                    yield ": ping\n\n"
+                    continue
+                yield message
+                if message.startswith(f"event: {FIN}"):
+                    return
+        finally:
+            self.streams -= 1
+            self.manager.unsubscribe(subscriber)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "partidos": len(self._transiciones),
+            "transitions": self.transitions,
+            "streams": self.streams,
+            "channels": self.manager.stats(),
+        }
+
+
+_hub: Optional[RelojHub] = None
+
+
+def get_reloj_hub() -> RelojHub:
+    global _hub
+    if _hub is None:
+        from app.data.live_state import get_live_state
+
+        _hub = RelojHub(get_live_state())
+    return _hub
@@ -0,0 +1,401 @@
+import asyncio
+import json
+import secrets
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.config import get_settings
+from app.logging_config import get_logger
+from app.realtime.broker import Broker, get_broker
+from app.realtime.manager import ChannelManager
+from app.serialization import dumps
+
+logger = get_logger(__name__)
+
+Loader = Callable[[int], Awaitable[Optional[Dict[str, Any]]]]
+
+# Claves compactas del protocolo de marcador en vivo
+FIELDS = {
+    "estado": "e",
+    "puntos_local": "sl",
+    "puntos_visitante": "sv",
+    "cuarto": "q",
+    "segundos_restantes": "c",
+    "reloj_corriendo": "cr",
+    "faltas_local": "fl",
+    "faltas_visitante": "fv",
+    "tiempos_local": "tl",
+    "tiempos_visitante": "tv",
+}
+
+SNAPSHOT = "s"
+PATCH = "p"
+RESYNC = "r"
+
+# Cierre WebSocket cuando el partido no existe
+CLOSE_NOT_FOUND = 4404
+
+# Espera sugerida a los clientes SSE antes de reconectar
+SSE_RETRY_MS = 3000
+
+# Tópico del broker con los cambios de marcador (llegan a todos los workers)
+TOPIC = "marcador"
+
+
+def compact(estado: Dict[str, Any]) -> Dict[str, Any]:
+    """Traduce un estado (nombres de columna) a las claves compactas del protocolo"""
+    return {short: estado[name] for name, short in FIELDS.items() if name in estado}
+
+
+class Frame:
+    """Frame del protocolo; se serializa una sola vez para todos los suscriptores"""
+
+    __slots__ = ("body", "_text")
+
+    def __init__(self, body: Dict[str, Any]):
+        self.body = body
+        self._text: Optional[str] = None
+
+    @property
+    def seq(self) -> int:
+        return self.body["s"]
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = dumps(self.body).decode("utf-8")
+        return self._text
+
+
+class Scoreboard:
+    """Estado versionado del marcador de un partido.
+
+    Cada parche aplicado incrementa ``seq``; un cliente que recibe un parche con
+    ``s`` distinto de su secuencia + 1 perdió frames y debe pedir una foto (resync).
+    """
+
+    def __init__(self, partido_id: int, estado: Dict[str, Any], history: int = 0):
+        self.partido_id = partido_id
+        # Identifica esta instancia: las secuencias de otro worker o de una carga
+        # anterior no son comparables con las de ésta
+        self.epoch = secrets.token_hex(4)
+        self.state = compact(estado)
+        self.seq = 0
+        self._pending: Dict[str, Any] = {}
+        self.history: Deque[Frame] = deque(maxlen=max(history, 0))
+
+    def stage(self, changes: Dict[str, Any]) -> None:
+        """Acumula cambios hasta el próximo ``flush`` (el último valor de cada campo gana)"""
+        self._pending.update(compact(changes))
+
+    def flush(self) -> Optional[Frame]:
+        """Aplica lo acumulado y devuelve el parche con sólo los campos que cambiaron"""
+        delta = {k: v for k, v in self._pending.items() if self.state.get(k) != v}
+        self._pending.clear()
+        if not delta:
+            return None
+        self.state.update(delta)
+        self.seq += 1
+        frame = Frame({"t": PATCH, "s": self.seq, "d": delta})
+        self.history.append(frame)
+        return frame
+
+    def snapshot(self) -> Frame:
+        return Frame({"t": SNAPSHOT, "p": self.partido_id, "s": self.seq, "d": dict(self.state)})
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def since(self, event_id: Optional[str]) -> Optional[List[Frame]]:
+        """Parches posteriores a un ``Last-Event-ID``; None si hace falta una foto"""
+        if not event_id:
+            return None
+        epoch, _, seq = event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        if seq == self.seq:
+            return []
+        if seq > self.seq or not self.history or self.history[0].seq > seq + 1:
+            return None
+        return [frame for frame in self.history if frame.seq > seq]
+
+
+def merge_patches(base: int, frames: List[Frame]) -> Frame:
+    """Funde parches consecutivos en uno (``b`` = secuencia sobre la que se aplica)"""
+    delta: Dict[str, Any] = {}
+    for frame in frames:
+        delta.update(frame.body["d"])
+    return Frame({"t": PATCH, "s": frames[-1].seq, "b": base, "d": delta})
+
+
+def sse_event(board: Scoreboard, frame: Frame) -> str:
+    kind = "snapshot" if frame.body["t"] == SNAPSHOT else "patch"
+    return f"id: {board.event_id(frame.seq)}\nevent: {kind}\ndata: {frame.text}\n\n"
+
+
+class ScoreboardHub:
+    """Marcadores en vivo por partido sobre un ``ChannelManager``.
+
+    Al suscribirse el cliente recibe una foto completa con su secuencia y después
+    parches compactos. Los cambios que llegan dentro de la misma ventana de ``tick``
+    se funden en un solo frame. Mientras haya suscriptores, el estado se relee de la
+    base cada ``refresh_interval`` segundos para recoger lo que escribe la API .NET.
+
+    Los cambios viajan por el ``broker`` y cada worker los aplica a su propio
+    marcador en el mismo orden; los frames se arman y envían localmente.
+    """
+
+    def __init__(self, loader: Loader, manager: Optional[ChannelManager] = None,
+                 tick: Optional[float] = None, refresh_interval: Optional[float] = None,
+                 broker: Optional[Broker] = None):
+        settings = get_settings()
+        self.loader = loader
+        self.manager = manager or ChannelManager()
+        self.broker = broker or get_broker()
+        self.broker.subscribe(TOPIC, self._apply)
+        self.tick = settings.live_tick_ms / 1000 if tick is None else tick
+        self.refresh_interval = settings.live_refresh_interval if refresh_interval is None else refresh_interval
+        self.history = settings.live_history_size
+        self.sse_heartbeat = settings.live_sse_heartbeat
+        self.sse_min_interval = settings.live_sse_min_interval
+        self._boards: Dict[int, Scoreboard] = {}
+        self._loading: Dict[int, asyncio.Future] = {}
+        self._flushes: Dict[int, asyncio.TimerHandle] = {}
+        self._refreshers: Dict[int, asyncio.Task] = {}
+        self.updates = 0
+        self.patches = 0
+        self.snapshots = 0
+        self.resyncs = 0
+        self.sse_streams = 0
+        self.sse_resumes = 0
+
+    async def board(self, partido_id: int) -> Optional[Scoreboard]:
+        """Marcador en memoria del partido; lo carga una sola vez aunque lo pidan varios clientes"""
+        board = self._boards.get(partido_id)
+        if board is not None:
+            return board
+        loading = self._loading.get(partido_id)
+        if loading is None:
+            loading = asyncio.get_running_loop().create_future()
+            self._loading[partido_id] = loading
+            try:
+                estado = await self.loader(partido_id)
+                board = Scoreboard(partido_id, estado, self.history) if estado else None
+                if board is not None:
+                    self._boards[partido_id] = board
+                    self._refreshers[partido_id] = asyncio.create_task(self._refresh_loop(partido_id))
+                loading.set_result(board)
+            except Exception as e:
+                loading.set_exception(e)
+                raise
+            finally:
+                del self._loading[partido_id]
+            return board
+        return await asyncio.shield(loading)
+
+    def update(self, partido_id: int, changes: Dict[str, Any]) -> None:
+        """Registra cambios del partido (en todos los workers); salen juntos al cerrar la ventana de tick"""
+        self.broker.publish(TOPIC, partido_id, changes)
+
+    def touch(self, partido_id: int) -> None:
+        """Pide una relectura inmediata (escrituras cuyo efecto no se conoce campo a campo)"""
+        self.broker.publish(TOPIC, partido_id, None)
+
+    def observe(self, partido_id: int, estado: Optional[Dict[str, Any]]) -> None:
+        """Estado que este worker ya conoce por su cuenta (motor de estado en vivo): no pasa por el broker"""
+        self._apply(partido_id, estado)
+
+    def _apply(self, partido_id: int, changes: Optional[Dict[str, Any]]) -> None:
+        board = self._boards.get(partido_id)
+        if board is None:
+            return  # nadie mira este partido en este worker
+        if changes is None:
+            asyncio.create_task(self._safe_refresh(partido_id))
+            return
+        board.stage(changes)
+        self.updates += 1
+        if partido_id not in self._flushes:
+            loop = asyncio.get_running_loop()
+            self._flushes[partido_id] = loop.call_later(self.tick, self._flush, partido_id)
+
+    def _flush(self, partido_id: int) -> None:
+        self._flushes.pop(partido_id, None)
+        board = self._boards.get(partido_id)
+        if board is None:
+            return
+        frame = board.flush()
+        if frame is not None:
+            self.patches += 1
+            self.manager.publish(partido_id, frame)
+
+    async def refresh(self, partido_id: int) -> None:
+        """Relee el estado del partido desde la base y publica lo que haya cambiado"""
+        if partido_id not in self._boards:
+            return
+        estado = await self.loader(partido_id)
+        if estado:
+            self._apply(partido_id, estado)
+
+    async def _safe_refresh(self, partido_id: int) -> None:
+        try:
+            await self.refresh(partido_id)
+        except Exception:
+            logger.exception("live.refresh.error", extra={"partidoId": partido_id})
+
+    async def _refresh_loop(self, partido_id: int) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            if not self.manager.subscribers(partido_id):
+                self._drop(partido_id)
+                return
+            await self._safe_refresh(partido_id)
+
+    def _drop(self, partido_id: int) -> None:
+        self._boards.pop(partido_id, None)
+        self._refreshers.pop(partido_id, None)
+        handle = self._flushes.pop(partido_id, None)
+        if handle is not None:
+            handle.cancel()
+
+    async def serve(self, websocket: WebSocket, partido_id: int) -> None:
+        """Atiende un WebSocket: foto inicial, parches y fotos a pedido ({"t": "r"})"""
+        await websocket.accept()
+        board = await self.board(partido_id)
+        if board is None:
+            await websocket.close(code=CLOSE_NOT_FOUND)
+            return
+        # Sin puntos de espera entre suscribir y encolar la foto: ningún parche se cuela antes
+        async def send(frame: Frame) -> None:
+            await websocket.send_text(frame.text)
+
+        subscriber = await self.manager.connect(websocket, partido_id, accept=False, send=send)
+        subscriber.offer(board.snapshot())
+        self.snapshots += 1
+        try:
+            while not subscriber.closed:
+                text = await websocket.receive_text()
+                try:
+                    message = json.loads(text)
+                except ValueError:
+                    continue
+                if isinstance(message, dict) and message.get("t") == RESYNC:
+                    self.resyncs += 1
+                    self.snapshots += 1
+                    subscriber.offer(board.snapshot())
+        except WebSocketDisconnect:
+            pass
+        finally:
+            self.manager.disconnect(subscriber)
+
+    async def stream(self, board: Scoreboard, last_event_id: Optional[str] = None,
+                     min_interval: Optional[float] = None) -> AsyncIterator[str]:
+        """Server-Sent Events de un partido (sólo lectura).
+
+        Con un ``Last-Event-ID`` de esta misma instancia se reanuda con los parches
+        perdidos que sigan en el historial; si no, se empieza con una foto. Con
+        ``min_interval`` los parches que llegan antes de tiempo se funden en uno. Sin
+        cambios se envía un comentario cada ``sse_heartbeat`` segundos para que los
+        proxies no corten la conexión.
+        """
+        min_interval = self.sse_min_interval if min_interval is None else min_interval
+        subscriber = self.manager.subscribe(board.partido_id)
+        self.sse_streams += 1
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            missed = board.since(last_event_id)
+            if missed is None:
+                self.snapshots += 1
+                sent = board.seq
+                yield sse_event(board, board.snapshot())
+            else:
+                self.sse_resumes += 1
+                sent = board.seq
+                for frame in missed:
+                    yield sse_event(board, frame)
+            last_push = time.monotonic()
+            pending: List[Frame] = []
+            while True:
+                if pending:
+                    timeout = max(last_push + min_interval - time.monotonic(), 0)
+                else:
+                    timeout = self.sse_heartbeat
+                frame = await subscriber.receive(timeout)
+                if frame is None:
+                    if subscriber.closed:
+                        return
+                    if pending:
+                        yield sse_event(board, merge_patches(sent, pending) if len(pending) > 1 else pending[0])
+                        sent = pending[-1].seq
+                        pending = []
+                        last_push = time.monotonic()
+                    else:
+                        yield ": ping\n\n"
+                    continue
+                if frame.seq <= sent:
+                    continue
+                pending.append(frame)
+                if time.monotonic() - last_push >= min_interval:
+                    yield sse_event(board, merge_patches(sent, pending) if len(pending) > 1 else pending[0])
+                    sent = pending[-1].seq
+                    pending = []
+                    last_push = time.monotonic()
+        finally:
+            self.sse_streams -= 1
+            self.manager.unsubscribe(subscriber)
+
+    def close(self) -> None:
+        for partido_id in list(self._boards):
+            task = self._refreshers.get(partido_id)
+            if task is not None:
+                task.cancel()
+            self._drop(partido_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "partidos": {str(pid): {"seq": b.seq, "subscribers": self.manager.subscribers(pid)}
+                         for pid, b in self._boards.items()},
+            "updates": self.updates,
+            "patches": self.patches,
+            "coalesced": max(self.updates - self.patches, 0),
+            "snapshots": self.snapshots,
+            "resyncs": self.resyncs,
+            "sseStreams": self.sse_streams,
+            "sseResumes": self.sse_resumes,
+            "tickMs": round(self.tick * 1000, 1),
+            "refreshInterval": self.refresh_interval,
+            "channels": self.manager.stats(),
+            "broker": self.broker.stats(),
+        }
+
+
+_hub: Optional[ScoreboardHub] = None
+
+
+async def _cargar_estado(partido_id: int) -> Optional[Dict[str, Any]]:
+    """De memoria si el partido está en curso (LiveStateEngine); si no, de la base"""
+    from app.data.live_state import get_live_state
+    from app.dependencies import get_async_partido_data_access
+
+    estado = get_live_state().estado(partido_id)
+    if estado is not None:
+        return estado
+    return await get_async_partido_data_access().get_estado_vivo(partido_id)
+
+
+def get_scoreboard_hub() -> ScoreboardHub:
+    global _hub
+    if _hub is None:
+        from app.data.live_state import get_live_state
+
+        _hub = ScoreboardHub(_cargar_estado)
+        get_live_state().subscribe(_hub.observe)
+    return _hub
+
+
+def close_scoreboard_hub() -> None:
+    if _hub is not None:
+        _hub.close()
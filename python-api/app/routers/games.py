@@ -7,33 +7,14 @@ from ..database import get_db
 from ..models import Game, Team, User, GameEvent
 from ..schemas import Game as GameSchema, GameCreate, GameUpdate, GameEvent as GameEventSchema, GameEventCreate
 from ..auth import get_current_active_user, get_current_admin_user
+from ..realtime.broker import get_broker
+from ..realtime.manager import ChannelManager
 
 router = APIRouter()
 
-# WebSocket connection manager for live updates
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
-
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except:
-                # Remove dead connections
-                self.active_connections.remove(connection)
-
-manager = ConnectionManager()
+# WebSocket subscriptions per game (bounded send queue per connection)
+manager = ChannelManager()
+manager.attach(get_broker(), "games")
 
 @router.get("/", response_model=List[GameSchema])
 async def read_games(
@@ -119,7 +100,7 @@ async def update_game(
     
     # Broadcast live update if game is live
     if game.game_status == "live":
-        await manager.broadcast(f"Game {game_id} updated: {game.home_score}-{game.away_score}")
+        await manager.broadcast(game_id, f"Game {game_id} updated: {game.home_score}-{game.away_score}")
     
     return game
 
@@ -142,7 +123,7 @@ async def create_game_event(
     db.refresh(db_event)
     
     # Broadcast live update
-    await manager.broadcast(f"Game {game_id} event: {event.event_type}")
+    await manager.broadcast(game_id, f"Game {game_id} event: {event.event_type}")
     
     return db_event
 
@@ -175,7 +156,7 @@ async def start_game(
     game.time_remaining = "12:00"
     db.commit()
     
-    await manager.broadcast(f"Game {game_id} started!")
+    await manager.broadcast(game_id, f"Game {game_id} started!")
     return {"message": "Game started successfully"}
 
 @router.post("/{game_id}/finish")
@@ -192,15 +173,17 @@ async def finish_game(
     game.time_remaining = "00:00"
     db.commit()
     
-    await manager.broadcast(f"Game {game_id} finished! Final score: {game.home_score}-{game.away_score}")
+    await manager.broadcast(game_id, f"Game {game_id} finished! Final score: {game.home_score}-{game.away_score}")
     return {"message": "Game finished successfully"}
 
 @router.websocket("/{game_id}/live")
 async def websocket_endpoint(websocket: WebSocket, game_id: int):
-    await manager.connect(websocket)
+    subscriber = await manager.connect(websocket, game_id)
     try:
         while True:
             data = await websocket.receive_text()
-            await manager.send_personal_message(f"Connected to game {game_id} live updates", websocket)
+            subscriber.offer(f"Connected to game {game_id} live updates")
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
+    finally:
+        manager.disconnect(subscriber)
@@ -6,6 +6,7 @@ from ..database import get_db
 from ..models import Team, User
 from ..schemas import Team as TeamSchema, TeamCreate, TeamUpdate
 from ..auth import get_current_active_user, get_current_admin_user
+from ..data.kpi_snapshot import get_kpi_snapshot
 
 router = APIRouter()
 
@@ -50,6 +51,7 @@ async def create_team(
     db_team = Team(**team.dict())
     db.add(db_team)
     db.commit()
+    get_kpi_snapshot().invalidate()
     db.refresh(db_team)
     return db_team
 
@@ -79,6 +81,7 @@ async def update_team(
         setattr(team, field, value)
     
     db.commit()
+    get_kpi_snapshot().invalidate()
     db.refresh(team)
     return team
 
@@ -95,6 +98,7 @@ async def delete_team(
     # Soft delete - just mark as inactive
     team.is_active = False
     db.commit()
+    get_kpi_snapshot().invalidate()
     return {"message": "Team deactivated successfully"}
 
 @router.post("/{team_id}/activate")
@@ -109,4 +113,5 @@ async def activate_team(
     
     team.is_active = True
     db.commit()
+    get_kpi_snapshot().invalidate()
     return {"message": "Team activated successfully"}
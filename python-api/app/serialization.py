@@ -0,0 +1,27 @@
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: se usa json de la librería estándar
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Serializa a JSON (UTF-8) en una sola pasada; usa orjson si está instalado"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Respuesta JSON para contenido ya listo (dicts/listas de tipos básicos).
+
+    Devolverla desde un endpoint evita la revalidación de ``response_model`` y el
+    paso por ``jsonable_encoder``: sólo para datos que vienen de nuestra propia BD.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark: consultas bloqueantes en el event loop vs executor dedicado
+
+Simula un worker que atiende a la vez consultas lentas y rápidas (y un /health).
+Por defecto las consultas se simulan con time.sleep; con --sqlserver se ejecutan
+contra SQL Server usando el pool (WAITFOR DELAY para las lentas, SELECT 1 para las rápidas).
+
+Uso:
+    python bench_async_db.py --slow 20 --fast 500 --workers 10
+    python bench_async_db.py --sqlserver
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.data.executor import DbExecutor
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def make_queries(args):
+    """Devuelve (consulta_lenta, consulta_rapida) bloqueantes"""
+    if args.sqlserver:
+        from app.data.pool import get_pool
+
+        def slow():
+            with get_pool().connection() as conn:
+                conn.cursor().execute(f"WAITFOR DELAY '00:00:{args.slow_ms / 1000:06.3f}'")
+
+        def fast():
+            with get_pool().connection() as conn:
+                conn.cursor().execute("SELECT 1").fetchone()
+
+        return slow, fast
+
+    def slow():
+        time.sleep(args.slow_ms / 1000)
+
+    def fast():
+        time.sleep(args.fast_ms / 1000)
+
+    return slow, fast
+
+
+async def run_scenario(mode, args):
+    slow, fast = make_queries(args)
+    executor = DbExecutor(max_workers=args.workers, max_pending=args.slow + args.fast)
+
+    async def call(func):
+        if mode == "loop":
+            return func()  # lo que hacían los handlers: bloquear el event loop
+        return await executor.run(func)
+
+    fast_latencies = []
+    health_latencies = []
+    done = asyncio.Event()
+
+    async def fast_request(arrival):
+        # Todas las peticiones llegan en t0: la latencia incluye el tiempo esperando al loop
+        await call(fast)
+        fast_latencies.append(time.perf_counter() - arrival)
+
+    async def health_probe():
+        # /health no toca la BD: sólo mide cuánto tarda el loop en atenderlo
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0)
+            health_latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+    probe = asyncio.create_task(health_probe())
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(call(slow)) for _ in range(args.slow)]
+    tasks += [asyncio.create_task(fast_request(start)) for _ in range(args.fast)]
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe
+    executor.shutdown()
+
+    return {
+        "mode": mode,
+        "elapsed": elapsed,
+        "throughput": (args.slow + args.fast) / elapsed,
+        "fast_p50": percentile(fast_latencies, 50) * 1000,
+        "fast_p99": percentile(fast_latencies, 99) * 1000,
+        "health_max": max(health_latencies) * 1000 if health_latencies else 0.0,
+        "health_avg": statistics.mean(health_latencies) * 1000 if health_latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del modo async de la capa de datos")
+    parser.add_argument("--slow", type=int, default=20, help="Consultas lentas concurrentes")
+    parser.add_argument("--fast", type=int, default=500, help="Consultas rápidas concurrentes")
+    parser.add_argument("--slow-ms", type=float, default=500)
+    parser.add_argument("--fast-ms", type=float, default=2)
+    parser.add_argument("--workers", type=int, default=10, help="Hilos del executor (DB_EXECUTOR_WORKERS)")
+    parser.add_argument("--sqlserver", action="store_true", help="Ejecutar contra SQL Server real")
+    args = parser.parse_args()
+
+    print("🚀 Benchmark: event loop bloqueado vs executor dedicado")
+    print(f"   {args.slow} lentas de {args.slow_ms:.0f} ms + {args.fast} rápidas de {args.fast_ms:.0f} ms, "
+          f"{args.workers} workers")
+    print("=" * 78)
+    print(f"{'modo':<10}{'total s':>10}{'req/s':>10}{'rápida p50':>13}{'rápida p99':>13}{'health máx':>13}")
+    for mode in ("loop", "executor"):
+        r = asyncio.run(run_scenario(mode, args))
+        print(f"{r['mode']:<10}{r['elapsed']:>10.2f}{r['throughput']:>10.1f}"
+              f"{r['fast_p50']:>10.1f} ms{r['fast_p99']:>10.1f} ms{r['health_max']:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Benchmark: lote de eventos (/eventos:batch) vs un evento por llamada
+
+Mide cuántos eventos por segundo se registran enviando lotes mixtos de anotaciones,
+faltas y tiempos muertos (validación en una pasada + una transacción por lote) y lo
+compara con registrar los mismos eventos de a uno esperando cada commit, como hacía
+la tablet al reenviar lo acumulado sin conexión.
+
+Por defecto la base se simula (cada viaje tarda --rtt-ms y el costo por fila no se
+mide); con --sqlserver se escribe de verdad en el partido --partido (sus equipos deben
+ser --local y --visitante; conviene un partido de prueba: los eventos quedan guardados).
+
+Uso:
+    python bench_eventos_batch.py --events 1000 --calls 20
+    python bench_eventos_batch.py --sqlserver --partido 1 --local 1 --visitante 2 --calls 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from app.data.evento_ingest import EventoIngest, leer_evento
+from app.data.marcador_store import MarcadorStore
+from app.data.partido_data import PartidoDataAccess
+from app.data.pool import ConnectionPool
+
+COLUMNAS_INGESTA = [
+    "partido_id", "equipo_local_id", "equipo_visitante_id", "puntos_local", "puntos_visitante",
+    "faltas_local", "faltas_visitante", "tiempos_local", "tiempos_visitante", "ultimo_seq",
+]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+class SimCursor:
+    """Cursor simulado: cada sentencia es un viaje de ``rtt`` segundos"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+        self.rowcount = 0
+        self._row = None
+
+    def setinputsizes(self, sizes):
+        pass
+
+    def execute(self, sql, params=()):
+        time.sleep(self.conn.rtt)
+        self.conn.statements += 1
+        self._row = None
+        if "ultimo_seq" in sql:
+            self._row = self.conn.estado
+            self.description = [(c,) for c in COLUMNAS_INGESTA]
+        return self
+
+    def fetchone(self):
+        row, self._row = self._row, None
+        return row
+
+    def fetchall(self):
+        return []
+
+
+class SimConnection:
+    def __init__(self, args):
+        self.rtt = args.rtt_ms / 1000
+        self.statements = 0
+        self.estado = (args.partido, args.local, args.visitante, 0, 0, 0, 0, 0, 0, 0)
+
+    def cursor(self):
+        return SimCursor(self)
+
+    def commit(self):
+        time.sleep(self.rtt)
+
+    def rollback(self):
+        pass
+
+
+class DirectDataAccess:
+    """Interfaz async de la ingesta sobre PartidoDataAccess, en un hilo (como el executor)"""
+
+    def __init__(self, sync):
+        self.sync = sync
+
+    async def get_estado_ingesta(self, partido_id):
+        return await asyncio.to_thread(self.sync.get_estado_ingesta, partido_id)
+
+    async def buscar_eventos(self, partido_id, evento_ids):
+        return await asyncio.to_thread(self.sync.buscar_eventos, partido_id, evento_ids)
+
+    async def registrar_eventos(self, partido_id, **lotes):
+        return await asyncio.to_thread(self.sync.registrar_eventos, partido_id, **lotes)
+
+
+def make_data_access(args):
+    if args.sqlserver:
+        return PartidoDataAccess(marcador_store=MarcadorStore(ttl=0)), None
+    conn = SimConnection(args)
+    pool = ConnectionPool(factory=lambda: conn, max_size=1)
+    return PartidoDataAccess(pool=pool, marcador_store=MarcadorStore(ttl=0)), conn
+
+
+def make_payload(args, start_seq):
+    """Lote mixto (JSON del cliente): 60% anotaciones, 30% faltas, 10% tiempos muertos"""
+    equipos = (args.local, args.visitante)
+    payload = []
+    for i in range(args.events):
+        equipo = equipos[i % 2]
+        if i % 10 < 6:
+            item = {"tipo": "anotacion", "equipoId": equipo, "puntos": 1 + i % 3}
+        elif i % 10 < 9:
+            item = {"tipo": "falta", "equipoId": equipo}
+        else:
+            item = {"tipo": "tiempo_muerto", "equipoId": equipo, "tiempo": "corto"}
+        item.update(eventoId=str(uuid.uuid4()), seq=start_seq + i)
+        payload.append(item)
+    return payload
+
+
+async def run_batch(args):
+    sync, conn = make_data_access(args)
+    ingest = EventoIngest(DirectDataAccess(sync), interval=0.05)
+    seq = (await ingest.estado(args.partido))["ultimoSeq"] + 1
+    latencies = []
+    for _ in range(args.calls):
+        payload = make_payload(args, seq)
+        seq += args.events
+        start = time.perf_counter()
+        eventos = [leer_evento(item) for item in payload]
+        _, escrito = await ingest.submit_lote(args.partido, eventos)
+        await escrito
+        latencies.append(time.perf_counter() - start)
+    await ingest.close()
+    return "lote (/eventos:batch)", latencies, args.events, conn, ingest
+
+
+async def run_individual(args):
+    sync, conn = make_data_access(args)
+    ingest = EventoIngest(DirectDataAccess(sync), interval=0.05)
+    seq = (await ingest.estado(args.partido))["ultimoSeq"] + 1
+    latencies = []
+    for _ in range(args.individual_calls):
+        payload = make_payload(args, seq)
+        seq += args.events
+        start = time.perf_counter()
+        for item in payload:
+            _, escrito = await ingest.submit(args.partido, leer_evento(item))
+            await ingest.flush(args.partido)  # ?durable=true: espera cada commit
+            await escrito
+        latencies.append(time.perf_counter() - start)
+    await ingest.close()
+    return "de a uno (durable)", latencies, args.events, conn, ingest
+
+
+def report(name, latencies, events, conn, ingest):
+    ms = [x * 1000 for x in latencies]
+    total = sum(latencies)
+    print(f"\n▶ {name}: {len(latencies)} × {events} eventos en {total:.2f}s")
+    print(f"   {events * len(latencies) / total:10.0f} eventos/s   por llamada p50 {percentile(ms, 50):.1f} ms"
+          f"  p95 {percentile(ms, 95):.1f} ms  media {statistics.mean(ms):.1f} ms")
+    stats = ingest.stats()
+    print(f"   transacciones {stats['batches']}  eventos/transacción {stats['avgBatch']}", end="")
+    print(f"  sentencias {conn.statements}" if conn else "")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del registro de eventos en lote")
+    parser.add_argument("--events", type=int, default=1000, help="Eventos por llamada")
+    parser.add_argument("--calls", type=int, default=20, help="Llamadas con lote")
+    parser.add_argument("--individual-calls", type=int, default=1,
+                        help="Lotes reenviados de a uno (0 para omitir la comparación)")
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="Ida y vuelta simulado a SQL Server")
+    parser.add_argument("--sqlserver", action="store_true", help="Escribir en SQL Server (config de la app)")
+    parser.add_argument("--partido", type=int, default=1)
+    parser.add_argument("--local", type=int, default=1, help="equipo_local_id del partido")
+    parser.add_argument("--visitante", type=int, default=2, help="equipo_visitante_id del partido")
+    args = parser.parse_args()
+
+    destino = "SQL Server" if args.sqlserver else f"base simulada ({args.rtt_ms} ms por viaje)"
+    print(f"🚀 Eventos de partido en lote: {args.events} eventos por llamada, {destino}")
+    print("=" * 78)
+    report(*asyncio.run(run_batch(args)))
+    if args.individual_calls:
+        report(*asyncio.run(run_individual(args)))
+
+
+if __name__ == "__main__":
+    main()
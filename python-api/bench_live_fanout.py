@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga: fan-out en vivo por partido (ChannelManager)
+
+Mantiene miles de sockets simulados repartidos en decenas de partidos; cada partido
+publica mensajes a ritmo fijo y se mide la latencia de entrega (publicación → envío
+completado) por percentiles. Un porcentaje de clientes es lento para comprobar que
+no retrasa al resto (cola acotada + drop_oldest/disconnect).
+
+Con --legacy se repite la prueba con el ConnectionManager anterior (lista única,
+envíos secuenciales a todos los sockets); conviene reducir --sockets/--messages.
+
+Uso:
+    python bench_live_fanout.py --sockets 5000 --games 50 --messages 20
+    python bench_live_fanout.py --overflow disconnect --slow-pct 2
+    python bench_live_fanout.py --sockets 500 --games 10 --messages 3 --legacy
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from app.realtime.manager import ChannelManager
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+class FakeSocket:
+    """WebSocket simulado: cada envío tarda ``delay`` segundos"""
+
+    def __init__(self, game, delay, stats):
+        self.game = game
+        self.delay = delay
+        self.slow = delay > 0.01
+        self.stats = stats
+        self.closed = False
+
+    async def send_text(self, message):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        else:
+            await asyncio.sleep(0)
+        game, _, sent_at = message.split("|")
+        now = time.perf_counter()
+        if int(game) != self.game:
+            self.stats["irrelevant"] += 1
+            return
+        (self.stats["slow"] if self.slow else self.stats["fast"]).append(now - float(sent_at))
+
+    async def close(self, code=1000):
+        self.closed = True
+
+
+class LegacyConnectionManager:
+    """Copia del ConnectionManager original de app/routers/games.py"""
+
+    def __init__(self):
+        self.active_connections = []
+
+    async def broadcast(self, message: str):
+        for connection in self.active_connections:
+            try:
+                await connection.send_text(message)
+            except:
+                self.active_connections.remove(connection)
+
+
+def make_sockets(args, stats):
+    rng = random.Random(42)
+    sockets = []
+    for i in range(args.sockets):
+        slow = rng.random() < args.slow_pct / 100
+        delay = args.slow_ms / 1000 if slow else args.fast_ms / 1000
+        sockets.append(FakeSocket(i % args.games, delay, stats))
+    return sockets
+
+
+async def publish_all(args, publish):
+    """Cada partido publica ``messages`` mensajes a ``rate`` por segundo, en paralelo"""
+    async def game_publisher(game):
+        await asyncio.sleep(random.random() / args.rate)
+        for seq in range(args.messages):
+            await publish(game, f"{game}|{seq}|{time.perf_counter()}")
+            await asyncio.sleep(1 / args.rate)
+
+    await asyncio.gather(*(game_publisher(g) for g in range(args.games)))
+
+
+async def run_manager(args):
+    stats = {"fast": [], "slow": [], "irrelevant": 0}
+    manager = ChannelManager(max_queue=args.queue, overflow=args.overflow, send_timeout=args.send_timeout)
+    sockets = make_sockets(args, stats)
+    subscribers = [await manager.connect(ws, ws.game, accept=False) for ws in sockets]
+
+    start = time.perf_counter()
+    await publish_all(args, manager.broadcast)
+    publish_done = time.perf_counter()
+    # Esperar a que los clientes rápidos vacíen sus colas
+    deadline = time.perf_counter() + args.drain_timeout
+    fast = [s for s, ws in zip(subscribers, sockets) if not ws.slow]
+    while time.perf_counter() < deadline and any(s._queue for s in fast):
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    result = dict(stats, mode="canales", elapsed=elapsed, publish_time=publish_done - start,
+                  manager=manager.stats())
+    for s in subscribers:
+        manager.disconnect(s)
+    await asyncio.sleep(0)
+    return result
+
+
+async def run_legacy(args):
+    stats = {"fast": [], "slow": [], "irrelevant": 0}
+    manager = LegacyConnectionManager()
+    manager.active_connections = make_sockets(args, stats)
+
+    start = time.perf_counter()
+    await publish_all(args, lambda game, message: manager.broadcast(message))
+    elapsed = time.perf_counter() - start
+    return dict(stats, mode="legacy", elapsed=elapsed, publish_time=elapsed, manager=None)
+
+
+def report(args, r):
+    expected = args.messages * args.sockets
+    delivered = len(r["fast"]) + len(r["slow"])
+    print(f"\n▶ {r['mode']}: {r['elapsed']:.2f}s (publicación {r['publish_time']:.2f}s)")
+    print(f"   entregas relevantes {delivered}/{expected}   envíos a otros partidos {r['irrelevant']}")
+    for name in ("fast", "slow"):
+        lat = [x * 1000 for x in r[name]]
+        if lat:
+            print(f"   {name:<5} n={len(lat):<8} p50 {percentile(lat, 50):8.2f} ms  p95 {percentile(lat, 95):8.2f} ms"
+                  f"  p99 {percentile(lat, 99):8.2f} ms  máx {max(lat):8.2f} ms")
+    if r["manager"]:
+        m = r["manager"]
+        print(f"   descartados {m['dropped']}  desconectados por lentos {m['slowDisconnects']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del fan-out en vivo por partido")
+    parser.add_argument("--sockets", type=int, default=5000)
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=20, help="Mensajes por partido")
+    parser.add_argument("--rate", type=float, default=2, help="Mensajes por segundo por partido")
+    parser.add_argument("--fast-ms", type=float, default=0, help="Duración de envío de un cliente normal")
+    parser.add_argument("--slow-ms", type=float, default=500, help="Duración de envío de un cliente lento")
+    parser.add_argument("--slow-pct", type=float, default=1, help="Porcentaje de clientes lentos")
+    parser.add_argument("--queue", type=int, default=64, help="LIVE_QUEUE_SIZE")
+    parser.add_argument("--overflow", default="drop_oldest", choices=["drop_oldest", "disconnect"])
+    parser.add_argument("--send-timeout", type=float, default=5.0)
+    parser.add_argument("--drain-timeout", type=float, default=10.0)
+    parser.add_argument("--legacy", action="store_true", help="Comparar con el ConnectionManager anterior")
+    args = parser.parse_args()
+
+    print("🚀 Fan-out en vivo por partido")
+    print(f"   {args.sockets} sockets, {args.games} partidos, {args.messages} mensajes/partido a {args.rate}/s, "
+          f"{args.slow_pct}% lentos ({args.slow_ms:.0f} ms), cola {args.queue} ({args.overflow})")
+    print("=" * 78)
+    report(args, asyncio.run(run_manager(args)))
+    if args.legacy:
+        report(args, asyncio.run(run_legacy(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: página 1 vs página 1000 del listado de partidos (keyset vs OFFSET)
+
+Por defecto usa SQLite en memoria con la misma forma de consulta que
+partidos.listado (índice por fecha_creacion, partido_id; muchos empates de fecha).
+Con --sqlserver mide PartidoDataAccess.list_partidos contra la base real
+(la página N se pide con el cursor de la última fila de la página N-1).
+
+Uso:
+    python bench_partido_paginacion.py --rows 200000 --limit 100 --page 1000
+    python bench_partido_paginacion.py --sqlserver --limit 100 --page 1000
+"""
+import argparse
+import sqlite3
+import statistics
+import time
+from datetime import datetime, timedelta
+
+KEYSET = """
+    SELECT partido_id, fecha_creacion FROM Partido p
+    WHERE p.fecha_creacion <= IFNULL((SELECT fecha_creacion FROM Partido WHERE partido_id = ?), ?)
+      AND (p.fecha_creacion < IFNULL((SELECT fecha_creacion FROM Partido WHERE partido_id = ?), ?)
+           OR p.partido_id < ?)
+    ORDER BY p.fecha_creacion DESC, p.partido_id DESC
+    LIMIT ?
+"""
+PRIMERA = "SELECT partido_id, fecha_creacion FROM Partido ORDER BY fecha_creacion DESC, partido_id DESC LIMIT ?"
+OFFSET = PRIMERA + " OFFSET ?"
+
+
+def medir(func, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        start = time.perf_counter()
+        func()
+        tiempos.append((time.perf_counter() - start) * 1000)
+    return statistics.median(tiempos)
+
+
+def bench_sqlite(args):
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE Partido (partido_id INTEGER PRIMARY KEY, fecha_creacion TEXT NOT NULL, sede TEXT)")
+    inicio = datetime(2025, 1, 1)
+    db.executemany("INSERT INTO Partido VALUES (?, ?, 'Sede')", (
+        (i, (inicio + timedelta(minutes=i // 7)).isoformat(sep=" ")) for i in range(1, args.rows + 1)
+    ))
+    db.execute("CREATE INDEX IX_Partido_Listado ON Partido (fecha_creacion DESC, partido_id DESC)")
+
+    ultima = db.execute(OFFSET, (1, (args.page - 1) * args.limit - 1)).fetchone()
+    resultados = {
+        "keyset página 1": lambda: db.execute(PRIMERA, (args.limit + 1,)).fetchall(),
+        f"keyset página {args.page}": lambda: db.execute(
+            KEYSET, (ultima[0], ultima[1], ultima[0], ultima[1], ultima[0], args.limit + 1)).fetchall(),
+        f"OFFSET página {args.page}": lambda: db.execute(
+            OFFSET, (args.limit + 1, (args.page - 1) * args.limit)).fetchall(),
+    }
+    keyset, offset = (resultados[f"{modo} página {args.page}"]()[:args.limit] for modo in ("keyset", "OFFSET"))
+    assert keyset == offset, "keyset y OFFSET no devuelven la misma página"
+    return {nombre: medir(func, args.repeat) for nombre, func in resultados.items()}
+
+
+def bench_sqlserver(args):
+    from app.data.keyset import encode_cursor
+    from app.data.partido_data import PartidoDataAccess
+    from app.data.pool import close_pool, get_pool
+
+    data_access = PartidoDataAccess()
+    try:
+        with get_pool().connection() as conn:
+            ultima = conn.cursor().execute(
+                "SELECT partido_id, fecha_creacion FROM dbo.Partido "
+                "ORDER BY fecha_creacion DESC, partido_id DESC OFFSET ? ROWS FETCH NEXT 1 ROWS ONLY",
+                (args.page - 1) * args.limit - 1,
+            ).fetchone()
+        if ultima is None:
+            raise SystemExit(f"dbo.Partido no tiene {args.page} páginas de {args.limit}")
+        cursor = encode_cursor({"fc": ultima[1].isoformat(), "id": ultima[0]})
+        return {
+            "keyset página 1": medir(lambda: data_access.list_partidos(limit=args.limit), args.repeat),
+            f"keyset página {args.page}": medir(
+                lambda: data_access.list_partidos(limit=args.limit, cursor=cursor), args.repeat),
+        }
+    finally:
+        close_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la paginación de partidos")
+    parser.add_argument("--rows", type=int, default=200000, help="Partidos en la tabla (SQLite)")
+    parser.add_argument("--limit", type=int, default=100, help="Tamaño de página")
+    parser.add_argument("--page", type=int, default=1000, help="Página profunda a comparar con la 1")
+    parser.add_argument("--repeat", type=int, default=20, help="Repeticiones por medición (mediana)")
+    parser.add_argument("--sqlserver", action="store_true", help="Ejecutar contra SQL Server real")
+    args = parser.parse_args()
+
+    print("🚀 Benchmark: página 1 vs página profunda del listado de partidos")
+    print(f"   {'SQL Server' if args.sqlserver else f'SQLite, {args.rows} partidos'}, "
+          f"páginas de {args.limit}, página {args.page}")
+    print("=" * 50)
+    resultados = bench_sqlserver(args) if args.sqlserver else bench_sqlite(args)
+    for nombre, ms in resultados.items():
+        print(f"{nombre:<24}{ms:>12.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: costo por fila de la respuesta de listados de partidos
+
+Compara el camino anterior (print por fila + PartidoDto validado + revalidación de
+``response_model`` + jsonable_encoder + json.dumps) con el actual (dict de confianza
++ una sola serialización con FastJSONResponse). No necesita base de datos.
+
+Uso:
+    python bench_partido_serialization.py --rows 100 500 2000 --repeat 20
+"""
+import argparse
+import contextlib
+import io
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.controllers.partido_controller import partidos_response
+from app.models.partido_models import PartidoDto
+from app.serialization import FastJSONResponse, orjson
+from fastapi import Response
+
+
+def make_rows(n):
+    """Filas como las devuelve PartidoDataAccess.list_partidos (fechas ya en ISO)"""
+    base = datetime(2025, 10, 1, 18, 30)
+    return [
+        {
+            "id": i, "equipo_local_id": 1, "equipo_visitante_id": 2,
+            "fecha_hora_inicio": (base + timedelta(days=i)).isoformat(), "estado": "finalizado",
+            "minutos_por_cuarto": 10, "cuartos_totales": 4, "faltas_por_equipo_limite": 5,
+            "faltas_por_jugador_limite": 5, "sede": "Cancha Principal",
+            "fecha_creacion": (base + timedelta(minutes=i)).isoformat(),
+            "puntos_local": 70 + i % 30, "puntos_visitante": 60 + i % 25,
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+LIST_ADAPTER = TypeAdapter(List[PartidoDto])
+
+
+def antes(rows):
+    """Camino anterior de get_all_partidos"""
+    dtos = []
+    for i, partido in enumerate(rows):
+        print(f"DEBUG GET ALL: Processing partido {i}: {partido}")
+        dtos.append(PartidoDto(
+            id=partido["id"],
+            equipoLocalId=partido["equipo_local_id"],
+            equipoVisitanteId=partido["equipo_visitante_id"],
+            fechaHoraInicio=partido["fecha_hora_inicio"],
+            estado=partido["estado"],
+            minutosPorCuarto=partido["minutos_por_cuarto"],
+            cuartosTotales=partido["cuartos_totales"],
+            faltasPorEquipoLimite=partido["faltas_por_equipo_limite"],
+            faltasPorJugadorLimite=partido["faltas_por_jugador_limite"],
+            sede=partido["sede"],
+            fechaCreacion=partido["fecha_creacion"],
+            puntosLocal=partido["puntos_local"],
+            puntosVisitante=partido["puntos_visitante"],
+        ))
+        print(f"DEBUG GET ALL: Successfully processed partido {i}")
+    # Lo que hace FastAPI con response_model: volcar, revalidar, codificar y serializar
+    validated = LIST_ADAPTER.validate_python([dto.model_dump() for dto in dtos])
+    content = jsonable_encoder(LIST_ADAPTER.dump_python(validated, mode="json"))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def despues(rows):
+    """Camino actual: partidos_response"""
+    return partidos_response(rows, Response()).body
+
+
+def medir(func, rows, repeat):
+    mejor = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func(rows)
+        mejor = min(mejor, time.perf_counter() - start)
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Costo por fila de los listados de partidos")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print("🚀 Serialización de listados de partidos (mejor de %d)" % args.repeat)
+    print(f"   encoder: {'orjson ' + orjson.__version__ if orjson else 'json (stdlib)'}")
+    print("=" * 62)
+    print(f"{'filas':>8}{'antes µs/fila':>16}{'después µs/fila':>18}{'mejora':>10}")
+    for n in args.rows:
+        rows = make_rows(n)
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert json.loads(antes(rows)) == json.loads(despues(rows))
+        t_antes = medir(antes, rows, args.repeat) / n * 1e6
+        t_despues = medir(despues, rows, args.repeat) / n * 1e6
+        print(f"{n:>8}{t_antes:>16.2f}{t_despues:>18.2f}{t_antes / t_despues:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
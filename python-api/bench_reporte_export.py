@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memoria y velocidad de la exportación de reportes (/api/reportes/.../export)
+
+Exporta ``fact_anotacion`` (generada al vuelo en SQLite, mismas columnas que en
+mb_report) con el camino de streaming (cursor del servidor + bloques) y con el
+camino ingenuo (fetchall + una sola serialización), midiendo la memoria pico de
+Python con tracemalloc. No necesita MySQL; contra mb_report el streaming usa SSCursor.
+
+Uso:
+    python bench_reporte_export.py --rows 100000 1000000 --formato ndjson
+"""
+import argparse
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.data.reporte_vistas import VISTAS, exportar
+from app.serialization import dumps
+
+
+def make_engine(n):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            CREATE VIEW fact_anotacion AS
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {n})
+            SELECT i AS anotacion_id, 1 + i % 500 AS partido_id, i % 7 AS cuarto_id,
+                   1 + i % 2 AS equipo_id, 1 + i % 3 AS puntos
+            FROM n
+        """))
+    return engine
+
+
+def streaming(engine, formato, batch):
+    total = 0
+    for bloque in exportar(sessionmaker(bind=engine), VISTAS["anotaciones"], {}, formato, batch):
+        total += len(bloque)
+    return total
+
+
+def todo_en_memoria(engine, formato, batch):
+    with engine.connect() as conn:
+        result = conn.execute(text("SELECT * FROM fact_anotacion ORDER BY anotacion_id"))
+        columnas = list(result.keys())
+        filas = result.fetchall()
+    return len(b"".join(dumps(dict(zip(columnas, f))) + b"\n" for f in filas))
+
+
+def medir(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        total = fn(*args)
+        return total, time.perf_counter() - start, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria de la exportación de reportes")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--formato", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"🚀 Exportación de fact_anotacion ({args.formato}, bloques de {args.batch})")
+    print("=" * 72)
+    print(f"{'filas':>10}{'camino':>16}{'MB enviados':>14}{'pico MB':>10}{'filas/s':>14}")
+    for n in args.rows:
+        engine = make_engine(n)
+        caminos = [("streaming", streaming)]
+        if args.formato == "ndjson":
+            caminos.append(("fetchall", todo_en_memoria))
+        for nombre, fn in caminos:
+            total, segundos, pico = medir(fn, engine, args.formato, args.batch)
+            print(f"{n:>10}{nombre:>16}{total / 1e6:>14.1f}{pico / 1e6:>10.1f}{n / segundos:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,20 +8,49 @@ from dotenv import load_dotenv
 
 from app.database import engine, Base
 # from app.routers import auth, users, games, teams, integration, admin  # Temporarily disabled
-from app.controllers import partido_controller, inicio_controller
+from app.controllers import (
+    partido_controller, inicio_controller, diagnostico_controller, live_controller, reporte_controller,
+)
+from app.data.evento_ingest import close_evento_ingest
+from app.data.executor import shutdown_db_executor
+from app.data.live_state import close_live_state, start_live_state
+from app.data.partido_versions import start_partido_versiones
+from app.data.pool import close_pool
+from app.data.reporte_reconciliacion import close_reporte_reconciliacion, start_reporte_reconciliacion
+from app.data.reporte_sync import close_reporte_sync, start_reporte_sync
+from app.realtime.broker import close_broker, start_broker
+from app.realtime.reloj import get_reloj_hub
+from app.realtime.scoreboard import close_scoreboard_hub
 from app.config import settings
+from app.logging_config import configure_logging, get_logger
 
 load_dotenv()
+configure_logging()
+logger = get_logger("main")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    print("🚀 Starting Python API...")
+    logger.info("api.startup")
     # Create tables
     Base.metadata.create_all(bind=engine)
+    await start_broker()
+    get_reloj_hub()  # sigue las transiciones del reloj desde la primera sincronización
+    start_partido_versiones()
+    await start_live_state()
+    await start_reporte_sync()
+    await start_reporte_reconciliacion()
     yield
     # Shutdown
-    print("🛑 Shutting down Python API...")
+    logger.info("api.shutdown")
+    await close_evento_ingest()
+    await close_live_state()
+    await close_reporte_sync()
+    await close_reporte_reconciliacion()
+    close_scoreboard_hub()
+    await close_broker()
+    shutdown_db_executor()
+    close_pool()
 
 app = FastAPI(
     title="Marcador Basketball - Python API",
@@ -37,6 +66,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Security
@@ -51,6 +81,9 @@ security = HTTPBearer()
 # app.include_router(admin.router, prefix="/api/admin", tags=["Administration"])  # Temporarily disabled
 app.include_router(partido_controller.router, tags=["Partidos"])
 app.include_router(inicio_controller.router, prefix="/api/admin/inicio", tags=["Inicio"])
+app.include_router(diagnostico_controller.router, prefix="/api/admin/diagnostico", tags=["Diagnóstico"])
+app.include_router(live_controller.router, prefix="/api/live", tags=["En vivo"])
+app.include_router(reporte_controller.router, prefix="/api/reportes", tags=["Reportes"])
 
 @app.get("/")
 async def root():
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Pruebas del executor de base de datos (DbExecutor y AsyncPartidoDataAccess)
+
+Comprueba que ``max_pending`` limita las llamadas entregadas al pool de hilos (en
+ejecución + en su cola) y el resto aguarda en el event loop sin rechazarse, que el semáforo de cada loop se libera
+junto con el loop y que AsyncPartidoDataAccess ejecuta los métodos públicos en los
+hilos del executor y deja pasar los privados.
+No necesita SQL Server.
+
+Ejecutar con ``python test_executor.py`` o con pytest.
+"""
+import asyncio
+import gc
+import threading
+
+from app.data.executor import DbExecutor
+from app.data.partido_data import AsyncPartidoDataAccess
+
+
+def test_max_pending_limita_las_admitidas():
+    executor = DbExecutor(max_workers=1, max_pending=2)
+    liberar = threading.Event()
+
+    def consulta(i):
+        liberar.wait(5)
+        return i
+
+    async def escenario():
+        tareas = [asyncio.create_task(executor.run(consulta, i)) for i in range(5)]
+        await asyncio.sleep(0.1)
+        stats = executor.stats()
+        assert (stats["running"], stats["pending"]) == (1, 1)  # las otras 3 esperan en el semáforo
+        liberar.set()
+        return await asyncio.gather(*tareas)
+
+    try:
+        assert asyncio.run(escenario()) == [0, 1, 2, 3, 4]
+        assert executor.stats()["completed"] == 5
+    finally:
+        executor.shutdown()
+
+
+def test_semaforo_por_loop_se_libera():
+    executor = DbExecutor(max_workers=2, max_pending=4)
+    try:
+        for _ in range(3):
+            assert asyncio.run(executor.run(lambda: 1)) == 1
+        gc.collect()
+        assert len(executor._semaphores) == 0
+    finally:
+        executor.shutdown()
+
+
+class FakeDataAccess:
+    limite = 10
+
+    def get_partido(self, partido_id):
+        return partido_id, threading.current_thread().name
+
+    def _privado(self):
+        return threading.current_thread().name
+
+
+def test_async_partido_data_access():
+    executor = DbExecutor(max_workers=1, max_pending=1)
+    data = AsyncPartidoDataAccess(FakeDataAccess(), executor=executor)
+    try:
+        partido_id, hilo = asyncio.run(data.get_partido(7))
+        assert partido_id == 7 and hilo.startswith("db")
+        assert data._privado() == threading.current_thread().name  # sin pasar por el executor
+        assert data.limite == 10
+        assert data.get_partido.__name__ == "get_partido"
+    finally:
+        executor.shutdown()
+
+
+def main():
+    print("🚀 Pruebas del executor de base de datos")
+    print("=" * 50)
+    for test in (test_max_pending_limita_las_admitidas, test_semaforo_por_loop_se_libera,
+                 test_async_partido_data_access):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la foto de KPIs del dashboard (KpiSnapshot)
+
+Comprueba que una invalidación que llega mientras ``loader()`` cuenta descarta ese
+resultado (no se guarda como vigente), que varios hilos sin foto disparan una sola
+recarga y que la foto caduca a los ``max_staleness`` segundos.
+No necesita SQL Server.
+
+Ejecutar con ``python test_kpi_snapshot.py`` o con pytest.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.data.kpi_snapshot import KpiSnapshot
+
+
+def test_invalidacion_durante_la_lectura_no_se_guarda():
+    snapshot = KpiSnapshot(max_staleness=60)
+    cargas = []
+
+    def loader():
+        cargas.append(1)
+        if len(cargas) == 1:
+            snapshot.invalidate()  # una escritura llega mientras se cuenta
+        return {"total_equipos": len(cargas)}
+
+    kpis, edad = snapshot.get(loader)
+    assert kpis == {"total_equipos": 1} and edad == 0.0   # se responde, pero no queda vigente
+    assert snapshot.get_fresh() is None
+
+    kpis, _ = snapshot.get(loader)
+    assert kpis == {"total_equipos": 2} and len(cargas) == 2
+    assert snapshot.get_fresh()[0] == {"total_equipos": 2}
+    assert snapshot.get(loader)[0] == {"total_equipos": 2} and len(cargas) == 2
+
+
+def test_una_sola_recarga_a_la_vez():
+    snapshot = KpiSnapshot(max_staleness=60)
+    cargas = []
+    entrar = threading.Barrier(8)
+
+    def loader():
+        cargas.append(threading.current_thread().name)
+        time.sleep(0.1)
+        return {"total_equipos": 3}
+
+    def pedir():
+        entrar.wait()
+        return snapshot.get(loader)[0]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        resultados = list(pool.map(lambda _: pedir(), range(8)))
+    assert resultados == [{"total_equipos": 3}] * 8
+    assert len(cargas) == 1 and snapshot.stats()["refreshes"] == 1
+
+
+def test_caduca_por_antiguedad():
+    snapshot = KpiSnapshot(max_staleness=0.05)
+    snapshot.get(lambda: {"total_equipos": 1})
+    assert snapshot.get_fresh() is not None
+    time.sleep(0.08)
+    assert snapshot.get_fresh() is None
+    assert snapshot.get(lambda: {"total_equipos": 2})[0] == {"total_equipos": 2}
+
+
+def main():
+    print("🚀 Pruebas de la foto de KPIs")
+    print("=" * 50)
+    for test in (test_invalidacion_durante_la_lectura_no_se_guarda, test_una_sola_recarga_a_la_vez,
+                 test_caduca_por_antiguedad):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Pruebas de difusión en vivo entre workers (broker por socket Unix)
+
+Levanta varios procesos, cada uno con su ``UnixSocketBroker`` y sus espectadores
+suscritos a un ``ChannelManager``, y publica desde todos a la vez. Cada espectador
+debe recibir todos los eventos de su juego y en el mismo orden que los demás
+espectadores de ese juego, estén en el worker que estén. También prueba que, si
+cae el worker que atiende el socket, otro lo reemplaza, que lo publicado con la
+conexión al hub cerrándose va a la cola (y lo que se desborda cuenta en ``lost``) y
+que un ``BrokerAdapter`` incompleto falla al crearse. No necesita SQL Server.
+
+Ejecutar con ``python test_live_broker.py`` o con pytest.
+"""
+import asyncio
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+WORKERS = 4
+GAMES = 5
+VIEWERS_PER_GAME = 3
+EVENTS_PER_WORKER = 200
+
+
+async def _connect(path):
+    from app.realtime.broker import UnixSocketBroker
+
+    broker = UnixSocketBroker(path)
+    await broker.start()
+    while broker.role is None:
+        await asyncio.sleep(0.01)
+    return broker
+
+
+async def _viewers(broker):
+    """``ChannelManager`` difundido por ``broker`` con espectadores de todos los juegos"""
+    from app.realtime.manager import ChannelManager
+
+    manager = ChannelManager(max_queue=100_000, overflow="drop_oldest", send_timeout=5)
+    manager.attach(broker, "games")
+    viewers = {(game, v): manager.subscribe(game) for game in range(GAMES) for v in range(VIEWERS_PER_GAME)}
+    return manager, viewers
+
+
+async def _wait(primitive):
+    """Espera un Barrier/Event entre procesos sin bloquear el event loop (el hub debe seguir atendiendo)"""
+    await asyncio.get_running_loop().run_in_executor(None, primitive.wait)
+
+
+async def _collect(viewers, expected_per_game, timeout=20.0):
+    received = {key: [] for key in viewers}
+    deadline = time.monotonic() + timeout
+    for key, subscriber in viewers.items():
+        while len(received[key]) < expected_per_game:
+            message = await subscriber.receive(max(deadline - time.monotonic(), 0.01))
+            if message is None:
+                break
+            received[key].append(message)
+    return received
+
+
+def _worker(wid, path, barrier, results):
+    async def run():
+        broker = await _connect(path)
+        expected = WORKERS * EVENTS_PER_WORKER // GAMES
+        manager, viewers = await _viewers(broker)
+        await _wait(barrier)  # todos conectados antes de publicar
+        for n in range(EVENTS_PER_WORKER):
+            await manager.broadcast(n % GAMES, f"{wid}:{n}")
+            if n % 50 == 0:
+                await asyncio.sleep(0)
+        received = await _collect(viewers, expected)
+        results.put((wid, broker.role, {f"{g}/{v}": msgs for (g, v), msgs in received.items()}))
+        await _wait(barrier)  # nadie cierra (ni el hub) hasta que todos recibieron
+        await broker.close()
+
+    asyncio.run(run())
+
+
+def _failover_worker(wid, path, barrier, hub_killed, conn):
+    async def run():
+        broker = await _connect(path)
+        manager, viewers = await _viewers(broker)
+        await _wait(barrier)  # todos conectados
+        conn.send((wid, broker.role))
+        if broker.role == "hub":
+            await asyncio.sleep(60)  # el proceso principal lo mata
+            return
+        await _wait(hub_killed)
+        await asyncio.sleep(0.3)
+        while broker.role is None:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.3)  # los demás sobrevivientes terminan de reconectarse
+        await manager.broadcast(0, f"{wid}:despues")
+        received = await _collect({"0": viewers[(0, 0)]}, 2, timeout=10)
+        conn.send((wid, broker.role, sorted(received["0"])))
+        await asyncio.sleep(1)
+        await broker.close()
+
+    asyncio.run(run())
+
+
+def _socket_path():
+    return os.path.join(tempfile.mkdtemp(prefix="live-broker-"), "live.sock")
+
+
+def test_todos_los_espectadores_reciben_todo():
+    ctx = mp.get_context("spawn")
+    path = _socket_path()
+    barrier = ctx.Barrier(WORKERS)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(w, path, barrier, results)) for w in range(WORKERS)]
+    for p in procs:
+        p.start()
+    outcome = [results.get(timeout=60) for _ in procs]
+    for p in procs:
+        p.join(timeout=10)
+
+    roles = sorted(role for _, role, _ in outcome)
+    assert roles == ["client"] * (WORKERS - 1) + ["hub"], roles
+
+    expected = WORKERS * EVENTS_PER_WORKER // GAMES
+    orden_por_juego = {}
+    for wid, _, received in outcome:
+        for key, messages in received.items():
+            game = int(key.split("/")[0])
+            assert len(messages) == expected, f"worker {wid} espectador {key}: {len(messages)}/{expected}"
+            assert all(int(m.split(":")[1]) % GAMES == game for m in messages)
+            # Mismo orden para todos los espectadores del juego, en cualquier worker
+            assert orden_por_juego.setdefault(game, messages) == messages, f"orden distinto en {key}"
+            # Y el orden de cada publicador se respeta
+            for w in range(WORKERS):
+                propios = [int(m.split(":")[1]) for m in messages if m.startswith(f"{w}:")]
+                assert propios == sorted(propios)
+
+
+def test_otro_worker_reemplaza_al_hub():
+    ctx = mp.get_context("spawn")
+    path = _socket_path()
+    workers = 3
+    barrier = ctx.Barrier(workers)
+    hub_killed = ctx.Event()
+    # Un pipe por worker: una cola compartida puede quedar bloqueada al matar un proceso
+    pipes = [ctx.Pipe(duplex=False) for _ in range(workers)]
+    procs = [ctx.Process(target=_failover_worker, args=(w, path, barrier, hub_killed, pipes[w][1]))
+             for w in range(workers)]
+    for p in procs:
+        p.start()
+
+    def recv(w):
+        assert pipes[w][0].poll(30), f"worker {w} no respondió"
+        return pipes[w][0].recv()
+
+    roles = dict(recv(w) for w in range(workers))
+    hub = next(wid for wid, role in roles.items() if role == "hub")
+    procs[hub].kill()
+    procs[hub].join()
+    hub_killed.set()
+
+    outcome = [recv(w) for w in range(workers) if w != hub]
+    for p in procs:
+        p.join(timeout=10)
+    assert sorted(role for _, role, _ in outcome) == ["client", "hub"]
+    sobrevivientes = sorted(f"{wid}:despues" for wid, _, _ in outcome)
+    for wid, _, received in outcome:
+        assert received == sobrevivientes, f"worker {wid}: {received}"
+
+
+def test_conexion_cerrandose_va_a_la_cola():
+    """Lo publicado mientras se cae la conexión al hub no se pierde sin contarse"""
+    from app.realtime.broker import UnixSocketBroker
+
+    async def run():
+        path = _socket_path()
+        hub = await _connect(path)
+        recibidos = []
+        hub.subscribe("t", lambda key, payload: recibidos.append(payload))
+        cliente = UnixSocketBroker(path, backlog=2)
+        await cliente.start()
+        while cliente.role is None:
+            await asyncio.sleep(0.01)
+        assert cliente.role == "client"
+
+        cliente._writer.close()                  # la conexión con el hub se está cerrando
+        for i in range(3):
+            cliente.publish("t", 1, i)
+        stats = cliente.stats()
+        assert (stats["backlog"], stats["lost"]) == (2, 1)
+
+        deadline = time.monotonic() + 5
+        while len(recibidos) < 2 and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        assert recibidos == [1, 2]               # al reconectarse se envía la cola
+        assert cliente.stats()["reconnects"] == 1 and cliente.stats()["backlog"] == 0
+        await cliente.close()
+        await hub.close()
+
+    asyncio.run(run())
+
+
+def test_adaptador_incompleto_falla_al_crearse():
+    from app.realtime.broker import AdapterBroker, BrokerAdapter
+
+    class SinMensajes(BrokerAdapter):
+        async def connect(self):
+            pass
+
+        async def send(self, data):
+            pass
+
+    try:
+        SinMensajes()
+        raise AssertionError("un adaptador sin messages() debió fallar al crearse")
+    except TypeError:
+        pass
+
+    class EnMemoria(SinMensajes):
+        def __init__(self):
+            self.cola = asyncio.Queue()
+
+        async def send(self, data):
+            self.cola.put_nowait(data)
+
+        async def messages(self):
+            while True:
+                yield await self.cola.get()
+
+    async def run():
+        broker = AdapterBroker(EnMemoria())
+        recibidos = []
+        broker.subscribe("t", lambda key, payload: recibidos.append((key, payload)))
+        await broker.start()
+        broker.publish("t", 7, {"a": 1})
+        deadline = time.monotonic() + 5
+        while not recibidos and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        await broker.close()
+        assert recibidos == [(7, {"a": 1})]
+
+    asyncio.run(run())
+
+
+def main():
+    print("🚀 Pruebas de difusión entre workers (socket Unix)")
+    print("=" * 50)
+    for test in (test_todos_los_espectadores_reciben_todo, test_otro_worker_reemplaza_al_hub,
+                 test_conexion_cerrandose_va_a_la_cola, test_adaptador_incompleto_falla_al_crearse):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Pruebas del motor de estado en vivo (LiveStateEngine)
+
+Usa una base falsa en memoria con las filas de Partido, Cuarto, Anotacion, Falta,
+TiempoMuerto y CronometroEvento. Comprueba que al arrancar el estado se reconstruye
+reproduciendo las filas, que después se siguen las filas nuevas sin contar dos veces
+las ya aplicadas (también las que se confirman tarde con un IDENTITY menor), que las
+lecturas no consultan la base, que se informa la memoria por partido y que el reloj
+de juego se calcula en el servidor con la hora de la base (sin importar el desfase
+con el reloj local) y sólo se publica en las transiciones.
+No necesita SQL Server.
+
+Ejecutar con ``python test_live_state.py`` o con pytest.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+
+from app.data.live_state import LiveStateEngine
+from app.data.pool import ConnectionPool
+from app.realtime.reloj import RelojHub
+
+COLUMNAS = {
+    "Anotacion": ("anotacion_id", "partido_id", "cuarto_id", "equipo_id", "puntos"),
+    "Falta": ("falta_id", "partido_id", "cuarto_id", "equipo_id", "jugador_id"),
+    "TiempoMuerto": ("tiempo_muerto_id", "partido_id", "cuarto_id", "equipo_id"),
+    "CronometroEvento": ("evento_id", "partido_id", "cuarto_id", "tipo", "segundos_restantes", "creado_en"),
+}
+
+
+class FakeLiveDb:
+    """Tablas en memoria; responde a las sentencias live.* del catálogo"""
+
+    def __init__(self):
+        # partido_id -> (local, visitante, estado, limite_faltas_equipo, limite_faltas_jugador)
+        self.partidos = {}
+        self.cuartos = []  # (cuarto_id, partido_id, numero, duracion, segundos, estado)
+        self.filas = {tabla: [] for tabla in COLUMNAS}
+        self.executed = []
+        self.desfase = timedelta(0)  # reloj de SQL Server menos el de este proceso
+
+    def ahora(self):
+        """SYSUTCDATETIME() de la base falsa"""
+        return datetime.now(timezone.utc).replace(tzinfo=None) + self.desfase
+
+    def hace(self, segundos):
+        return self.ahora() - timedelta(seconds=segundos)
+
+    def insert(self, tabla, *valores, row_id=None):
+        filas = self.filas[tabla]
+        row_id = row_id or max((f[0] for f in filas), default=0) + 1
+        filas.append((row_id,) + valores)
+        filas.sort()
+        return row_id
+
+    def en_curso(self):
+        return {pid for pid, p in self.partidos.items() if p[2] == "en_curso"}
+
+    def query(self, sql, params):
+        self.executed.append(sql)
+        if "ISNULL(MAX(" in sql:
+            return [tuple(max((f[0] for f in self.filas[t]), default=0) for t in COLUMNAS)]
+        if "FROM dbo.Cuarto" in sql:
+            return [c for c in self.cuartos if c[1] in self.en_curso()]
+        tabla = re.search(r"FROM dbo\.(\w+) t", sql)
+        if tabla:
+            filas = self.filas[tabla.group(1)]
+            if "IN (" in sql:
+                return [f for f in filas if f[1] in params]
+            return [f for f in filas if f[0] > params[0] and f[1] in self.en_curso()]
+        if "FROM dbo.Partido" in sql:
+            return [(pid,) + p + (self.ahora(),) for pid, p in sorted(self.partidos.items()) if p[2] == "en_curso"]
+        raise AssertionError(f"sentencia inesperada: {sql}")
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.description = None
+        self.rowcount = 0
+        self._rows = []
+
+    def setinputsizes(self, sizes):
+        pass
+
+    def execute(self, sql, params=()):
+        self._rows = self.db.query(sql, params)
+        return self
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self):
+        return FakeCursor(self.db)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def _partido_en_curso(db, partido_id=7, local=1, visitante=2):
+    db.partidos[partido_id] = (local, visitante, "en_curso", 5, 5)
+    base = partido_id * 10
+    db.cuartos += [
+        (base + 1, partido_id, 1, 600, 0, "finalizado"),
+        (base + 2, partido_id, 2, 600, 312, "en_curso"),
+        (base + 3, partido_id, 3, 600, 600, "pendiente"),
+    ]
+    return base + 1, base + 2
+
+
+def _engine(db, lookback=16):
+    conn = FakeConnection(db)
+    return LiveStateEngine(pool=ConnectionPool(factory=lambda: conn, max_size=1), lookback=lookback)
+
+
+def test_reconstruye_reproduciendo_filas():
+    """Al arrancar, el estado sale de reproducir las filas de las cinco tablas"""
+    db = FakeLiveDb()
+    q1, q2 = _partido_en_curso(db)
+    db.partidos[8] = (3, 4, "finalizado", 5, 5)  # no está en curso: no se carga
+    for cuarto, equipo, puntos in [(q1, 1, 2), (q1, 2, 3), (q2, 1, 2), (q2, 1, 1), (q2, 2, -1)]:
+        db.insert("Anotacion", 7, cuarto, equipo, puntos)
+    db.insert("Anotacion", 8, None, 3, 3)
+    for cuarto, equipo, jugador in [(q1, 1, 10), (q2, 1, 10), (q2, 2, 20), (q2, 1, 11)]:
+        db.insert("Falta", 7, cuarto, equipo, jugador)
+    db.insert("TiempoMuerto", 7, q1, 2)
+    db.insert("CronometroEvento", 7, q2, "inicio", 600, datetime(2024, 1, 1, 20, 0))
+    db.insert("CronometroEvento", 7, q2, "pausa", 312, datetime(2024, 1, 1, 20, 5))
+
+    engine = _engine(db)
+    assert engine.sync() == {7}
+    assert engine.estado(8) is None
+    assert engine.estado(7) == {
+        "partido_id": 7, "estado": "en_curso", "puntos_local": 5, "puntos_visitante": 2,
+        "cuarto": 2, "segundos_restantes": 312, "faltas_local": 2, "faltas_visitante": 1,
+        "tiempos_local": 0, "tiempos_visitante": 1, "reloj_corriendo": False,
+    }
+    detalle = engine.detalle(7)
+    assert [c["puntosLocal"] for c in detalle["cuartos"]] == [2, 3, 0]
+    assert detalle["faltasJugador"][0] == {"jugadorId": 10, "faltas": 2, "eliminado": False}
+    assert detalle["memoriaBytes"] > 0
+    assert engine.stats()["memoriaPorPartido"][7] == detalle["memoriaBytes"]
+
+
+def test_sigue_filas_nuevas_sin_duplicar():
+    """Las filas nuevas se aplican una vez, también las que llegan tarde con un id menor"""
+    db = FakeLiveDb()
+    q1, q2 = _partido_en_curso(db)
+    db.insert("Anotacion", 7, q2, 1, 2)
+    engine = _engine(db)
+    engine.sync()
+
+    db.insert("Anotacion", 7, q2, 1, 3)                   # id 2
+    db.insert("Anotacion", 7, q2, 2, 2, row_id=5)         # id 5 (el 3 y el 4 aún no confirmaron)
+    db.insert("CronometroEvento", 7, q2, "reanudar", 312, datetime(2024, 1, 1, 20, 6))
+    assert engine.sync() == {7}
+    db.insert("Anotacion", 7, q2, 2, 1, row_id=3)         # commit tardío con id menor
+    engine.sync()
+    engine.sync()  # sin cambios: nada se aplica dos veces
+    estado = engine.estado(7)
+    assert (estado["puntos_local"], estado["puntos_visitante"], estado["reloj_corriendo"]) == (5, 3, True)
+    assert engine.stats()["rowsApplied"] == 5
+
+    # Un partido que entra en curso se reproduce entero; uno que termina se descarta
+    _partido_en_curso(db, partido_id=9, local=5, visitante=6)
+    db.insert("Anotacion", 9, None, 6, 2)
+    db.partidos[7] = (1, 2, "finalizado", 5, 5)
+    assert engine.sync() == {7, 9}  # el 7 terminó: se avisa con estado None
+    assert engine.estado(7) is None and engine.estado(9)["puntos_visitante"] == 2
+
+
+def test_lecturas_sin_base_de_datos():
+    db = FakeLiveDb()
+    _partido_en_curso(db)
+    engine = _engine(db)
+    engine.sync()
+    db.executed.clear()
+    for _ in range(1000):
+        engine.estado(7)
+        engine.detalle(7)
+    assert db.executed == []
+
+
+def test_reloj_solo_publica_transiciones():
+    """El reloj corre desde el último inicio/reanudar; sólo las transiciones llegan al stream"""
+    db = FakeLiveDb()
+    _, q2 = _partido_en_curso(db)
+    db.insert("CronometroEvento", 7, q2, "inicio", 600, db.hace(100))
+    db.insert("CronometroEvento", 7, q2, "pausa", 400, db.hace(30))
+    db.insert("CronometroEvento", 7, q2, "reanudar", 400, db.hace(10))
+    engine = _engine(db)
+    hub = RelojHub(engine, heartbeat=1)
+    subscriber = hub.manager.subscribe(7)
+
+    def sync():
+        for partido_id in engine.sync():
+            hub.observe(partido_id, engine.estado(partido_id))
+
+    sync()
+    reloj = hub.reloj(7)
+    assert reloj["corriendo"] and reloj["cuarto"] == 2 and reloj["evento"] == "reanudar"
+    assert 389 <= reloj["segundosRestantes"] <= 390
+    assert engine.estado(7)["reloj_corriendo"] is True
+    assert hub.transitions == 1
+
+    # Una anotación cambia el marcador pero no el reloj: no se publica nada
+    db.insert("Anotacion", 7, q2, 1, 2)
+    sync()
+    assert hub.transitions == 1
+
+    db.insert("CronometroEvento", 7, q2, "pausa", 385, db.hace(0), row_id=5)
+    sync()
+    reloj = hub.reloj(7)
+    assert (reloj["corriendo"], reloj["segundosRestantes"], reloj["evento"]) == (False, 385, "pausa")
+    assert hub.transitions == 2
+    assert len(subscriber._queue) == 2
+
+    # Un evento confirmado tarde con hora anterior no pisa al último
+    db.insert("CronometroEvento", 7, q2, "reanudar", 400, db.hace(5), row_id=4)
+    sync()
+    assert hub.reloj(7)["evento"] == "pausa"
+
+    db.partidos[7] = (1, 2, "finalizado", 5, 5)
+    sync()
+    assert hub.reloj(7) is None
+    assert len(subscriber._queue) == 3  # event: fin
+
+
+def test_reloj_con_la_hora_de_la_base():
+    """Con el reloj de SQL Server adelantado o atrasado respecto al local, lo transcurrido no cambia"""
+    for desfase in (timedelta(hours=1), timedelta(hours=-1), timedelta(seconds=-3)):
+        db = FakeLiveDb()
+        db.desfase = desfase
+        _, q2 = _partido_en_curso(db)
+        db.insert("CronometroEvento", 7, q2, "reanudar", 400, db.hace(10))
+        engine = _engine(db)
+        engine.sync()
+        reloj = engine.reloj(7)
+        assert reloj["corriendo"], desfase
+        assert 389 <= reloj["segundosRestantes"] <= 390, (desfase, reloj["segundosRestantes"])
+
+        # Un evento que la base fecha después de su propia hora de lectura no suma tiempo
+        db.insert("CronometroEvento", 7, q2, "inicio", 300, db.ahora() + timedelta(seconds=2))
+        engine.sync()
+        assert engine.reloj(7)["segundosRestantes"] == 300
+
+
+def main():
+    print("🚀 Pruebas del motor de estado en vivo")
+    print("=" * 50)
+    for test in (test_reconstruye_reproduciendo_filas, test_sigue_filas_nuevas_sin_duplicar,
+                 test_lecturas_sin_base_de_datos, test_reloj_solo_publica_transiciones,
+                 test_reloj_con_la_hora_de_la_base):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
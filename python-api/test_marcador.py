@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Pruebas del marcador mantenido (MarcadorStore y trg_Anotacion_Marcador)
+
+MarcadorStore se prueba con un cursor falso: armado del marcador por cuarto,
+caché con TTL, invalidación y reconstrucción con las sentencias del catálogo.
+
+La aritmética del trigger necesita SQL Server con sql/init.sql aplicado; se omite
+salvo con ``MARCADOR_TEST_SQLSERVER=1``. Corre dentro de una transacción que se
+deshace al final: inserta, mueve y borra anotaciones (en lote, negativas y sin
+cuarto) y compara los contadores con la suma de dbo.Anotacion.
+
+Ejecutar con ``python test_marcador.py`` o con pytest.
+"""
+import os
+import time
+
+import pytest
+
+from app.data.marcador_store import MarcadorStore
+from app.data.queries import MARCADOR_REBUILD
+
+
+class FakeCursor:
+    def __init__(self, filas):
+        self.filas = filas
+        self.executed = []
+        self.rowcount = 0
+        self._rows = []
+
+    def setinputsizes(self, sizes):
+        pass
+
+    def execute(self, sql, params=()):
+        self.executed.append((" ".join(sql.split()), params))
+        self._rows = list(self.filas) if "FROM dbo.Partido p" in sql else []
+        return self
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+
+def test_lee_y_arma_el_marcador():
+    cursor = FakeCursor([(7, 45, 40, 1, 20, 18), (7, 45, 40, 2, 25, 22)])
+    marcador = MarcadorStore(ttl=5).read(cursor, 7)
+    assert marcador == {
+        "partidoId": 7, "local": 45, "visitante": 40,
+        "cuartos": [{"cuartoId": 1, "local": 20, "visitante": 18}, {"cuartoId": 2, "local": 25, "visitante": 22}],
+    }
+    # Sin anotaciones: LEFT JOIN con NULL en los cuartos y totales en 0
+    assert MarcadorStore().read(FakeCursor([(8, 0, 0, None, None, None)]), 8)["cuartos"] == []
+    assert MarcadorStore().read(FakeCursor([]), 9) is None
+
+
+def test_cache_con_ttl_e_invalidacion():
+    store = MarcadorStore(ttl=0.05)
+    cursor = FakeCursor([(7, 3, 2, 1, 3, 2)])
+    assert store.get(cursor, 7)["local"] == 3
+    assert store.get(cursor, 7)["local"] == 3
+    assert len(cursor.executed) == 1 and (store.hits, store.misses) == (1, 1)
+
+    time.sleep(0.08)                       # caducó: vuelve a la base
+    store.get(cursor, 7)
+    assert len(cursor.executed) == 2
+
+    store.invalidate(7)
+    assert store.get_cached(7) is None
+    store.put({"partidoId": 8, "local": 1, "visitante": 0, "cuartos": []})
+    store.invalidate()
+    assert store.stats()["entries"] == 0
+
+
+def test_rebuild_por_partido_y_total():
+    store = MarcadorStore(ttl=60)
+    store.put({"partidoId": 7, "local": 1, "visitante": 0, "cuartos": []})
+    cursor = FakeCursor([])
+    store.rebuild(cursor, 7)
+    assert len(cursor.executed) == len(MARCADOR_REBUILD)
+    assert cursor.executed[0] == ("DELETE FROM dbo.MarcadorCuarto WHERE partido_id = ?", (7,))
+    assert all(params == (7,) for _, params in cursor.executed)
+    assert "WHERE a.partido_id = ?" in cursor.executed[2][0]
+    assert store.get_cached(7) is None
+
+    cursor = FakeCursor([])
+    store.rebuild(cursor)
+    assert cursor.executed[0] == ("DELETE FROM dbo.MarcadorCuarto", ())
+    assert all("?" not in sql for sql, _ in cursor.executed)
+
+
+# --- Trigger en SQL Server --------------------------------------------------------
+
+def _comparar(cursor, partido_id):
+    """Contadores por cuarto y total contra la suma directa de dbo.Anotacion"""
+    cursor.execute("""
+        SELECT ISNULL(a.cuarto_id, 0),
+               SUM(CASE WHEN a.equipo_id = p.equipo_local_id THEN a.puntos ELSE 0 END),
+               SUM(CASE WHEN a.equipo_id = p.equipo_visitante_id THEN a.puntos ELSE 0 END)
+        FROM dbo.Anotacion a JOIN dbo.Partido p ON p.partido_id = a.partido_id
+        WHERE a.partido_id = ? GROUP BY ISNULL(a.cuarto_id, 0)""", partido_id)
+    esperado = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    cursor.execute("SELECT cuarto_id, puntos_local, puntos_visitante FROM dbo.MarcadorCuarto "
+                   "WHERE partido_id = ?", partido_id)
+    cuartos = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    # Un cuarto que se quedó sin anotaciones puede quedar con contadores en 0
+    assert {k: v for k, v in cuartos.items() if v != (0, 0)} == {k: v for k, v in esperado.items() if v != (0, 0)}
+    cursor.execute("SELECT puntos_local, puntos_visitante FROM dbo.MarcadorTotal WHERE partido_id = ?", partido_id)
+    total = tuple(cursor.fetchone() or (0, 0))
+    assert total == (sum(v[0] for v in esperado.values()), sum(v[1] for v in esperado.values()))
+    return total, cuartos
+
+
+def test_trigger_mantiene_los_contadores():
+    if os.getenv("MARCADOR_TEST_SQLSERVER") != "1":
+        pytest.skip("requiere SQL Server (MARCADOR_TEST_SQLSERVER=1)")
+    import pyodbc
+
+    from app.config import get_settings
+
+    conn = pyodbc.connect(get_settings().sqlserver_odbc_connection_string, autocommit=False)
+    cursor = conn.cursor()
+    try:
+        equipos = []
+        for nombre in ("Prueba Marcador L", "Prueba Marcador V"):
+            cursor.execute("INSERT INTO dbo.Equipo (nombre) OUTPUT INSERTED.equipo_id VALUES (?)", nombre)
+            equipos.append(cursor.fetchone()[0])
+        local, visitante = equipos
+        cursor.execute("INSERT INTO dbo.Partido (equipo_local_id, equipo_visitante_id, estado) "
+                       "OUTPUT INSERTED.partido_id VALUES (?, ?, N'en_curso')", local, visitante)
+        partido_id = cursor.fetchone()[0]
+        cuartos = []
+        for numero in (1, 2):
+            cursor.execute("INSERT INTO dbo.Cuarto (partido_id, numero, duracion_segundos, segundos_restantes) "
+                           "OUTPUT INSERTED.cuarto_id VALUES (?, ?, 600, 600)", partido_id, numero)
+            cuartos.append(cursor.fetchone()[0])
+        c1, c2 = cuartos
+
+        # Varias filas en una sola sentencia: el trigger agrega inserted por cuarto
+        cursor.execute("""
+            INSERT INTO dbo.Anotacion (partido_id, cuarto_id, equipo_id, puntos) VALUES
+                (?, ?, ?, 3), (?, ?, ?, 2), (?, ?, ?, 1), (?, NULL, ?, 2), (?, ?, ?, -1)""",
+                       partido_id, c1, local, partido_id, c1, visitante, partido_id, c2, local,
+                       partido_id, visitante, partido_id, c2, local)
+        total, por_cuarto = _comparar(cursor, partido_id)
+        assert total == (3, 4) and por_cuarto[c1] == (3, 2) and por_cuarto[0] == (0, 2)
+
+        # UPDATE: resta la fila vieja y suma la nueva (cambio de equipo y de cuarto)
+        cursor.execute("UPDATE dbo.Anotacion SET equipo_id = ?, cuarto_id = ? "
+                       "WHERE partido_id = ? AND puntos = 3", visitante, c2, partido_id)
+        total, por_cuarto = _comparar(cursor, partido_id)
+        assert total == (0, 7) and por_cuarto[c1] == (0, 2) and por_cuarto[c2] == (0, 3)
+
+        cursor.execute("DELETE FROM dbo.Anotacion WHERE partido_id = ? AND cuarto_id IS NULL", partido_id)
+        total, _ = _comparar(cursor, partido_id)
+        assert total == (0, 5)
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def main():
+    print("🚀 Pruebas del marcador mantenido")
+    print("=" * 50)
+    for test in (test_lee_y_arma_el_marcador, test_cache_con_ttl_e_invalidacion, test_rebuild_por_partido_y_total,
+                 test_trigger_mantiene_los_contadores):
+        try:
+            test()
+        except pytest.skip.Exception as e:
+            print(f"⏭️  {test.__name__}: {e}")
+            continue
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la paginación por keyset de los listados de partidos
+
+Usa una base falsa que evalúa la sentencia partidos.listado como SQL Server
+(orden fecha_creacion DESC, partido_id DESC, ``TOP (?)`` y el predicado de keyset con
+la fecha vigente de la última fila). Comprueba que recorrer las páginas con el
+cursor devuelve todos los partidos una sola vez aunque muchos compartan
+fecha_creacion, que la página 1000 lee lo mismo que la 1, que un cursor inválido
+responde 400 y que sin ``limit`` ni ``cursor`` el listado sigue completo.
+No necesita SQL Server.
+
+Ejecutar con ``python test_partido_paginacion.py`` o con pytest.
+"""
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.controllers import partido_controller
+from app.data.keyset import encode_cursor
+from app.data.partido_data import AsyncPartidoDataAccess, PartidoDataAccess
+from app.data.pool import ConnectionPool
+from app.dependencies import get_async_partido_data_access
+
+COLUMNAS = [
+    "id", "equipo_local_id", "equipo_visitante_id", "fecha_hora_inicio", "estado",
+    "minutos_por_cuarto", "cuartos_totales", "faltas_por_equipo_limite",
+    "faltas_por_jugador_limite", "sede", "fecha_creacion", "puntos_local", "puntos_visitante",
+]
+INICIO = datetime(2025, 10, 1, 18, 30)
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.description = [(c,) for c in COLUMNAS]
+        self._rows = []
+
+    def setinputsizes(self, sizes):
+        pass
+
+    def execute(self, sql, params=()):
+        assert "FROM dbo.Partido p" in sql
+        params = list(params)
+        limit = params.pop(0) if "TOP (?)" in sql else None
+        filas = sorted(self.db.filas.values(), key=lambda f: (f[10], f[0]), reverse=True)
+        if "p.estado = ?" in sql:
+            estado = params.pop(0)
+            filas = [f for f in filas if f[4] == estado]
+        if "ISNULL((SELECT fecha_creacion" in sql:
+            ultimo_id, ultima_fecha = params[-5], params[-4]
+            if ultimo_id in self.db.filas:       # la fecha vigente de la fila, si sigue existiendo
+                ultima_fecha = self.db.filas[ultimo_id][10]
+            filas = [f for f in filas if (f[10], f[0]) < (ultima_fecha, ultimo_id)]
+        self._rows = filas[:limit] if limit is not None else filas
+        self.db.leidas.append(len(self._rows))
+        return self
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+
+class FakeDb:
+    def __init__(self, partidos, por_fecha=7):
+        # Grupos de ``por_fecha`` partidos con la misma fecha_creacion (empates)
+        self.filas = {
+            i: (i, 1, 2, INICIO, "finalizado" if i % 3 else "programado", 10, 4, 5, 5, "Sede",
+                INICIO + timedelta(minutes=i // por_fecha), 0, 0)
+            for i in range(1, partidos + 1)
+        }
+        self.leidas = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _data_access(db):
+    return PartidoDataAccess(pool=ConnectionPool(factory=lambda: db, max_size=1))
+
+
+def _recorrer(data_access, limit, **filtros):
+    ids, cursor, paginas = [], None, 0
+    while True:
+        partidos, cursor = data_access.list_partidos(limit=limit, cursor=cursor, **filtros)
+        ids += [p["id"] for p in partidos]
+        paginas += 1
+        if not cursor:
+            return ids, paginas
+
+
+def test_recorre_todo_una_vez_con_empates():
+    db = FakeDb(1000)
+    esperado = [f[0] for f in sorted(db.filas.values(), key=lambda f: (f[10], f[0]), reverse=True)]
+    ids, paginas = _recorrer(_data_access(db), 30)
+    assert ids == esperado and paginas == 34
+
+    ids, _ = _recorrer(_data_access(db), 25, estado="finalizado")
+    assert ids == [i for i in esperado if i % 3]
+
+
+def test_cursor_de_fila_borrada_usa_su_fecha():
+    db = FakeDb(100)
+    data_access = _data_access(db)
+    primera, cursor = data_access.list_partidos(limit=10)
+    del db.filas[primera[-1]["id"]]
+    segunda, _ = data_access.list_partidos(limit=10, cursor=cursor)
+    assert segunda[0]["id"] == primera[-1]["id"] - 1
+
+
+def test_pagina_1000_lee_lo_mismo_que_la_1():
+    """Keyset: la página 1000 pide ``limit + 1`` filas, igual que la primera"""
+    db = FakeDb(20000)
+    data_access = _data_access(db)
+    data_access.list_partidos(limit=10)
+    fila = sorted(db.filas.values(), key=lambda f: (f[10], f[0]), reverse=True)[999 * 10 - 1]
+    pagina, _ = data_access.list_partidos(limit=10, cursor=encode_cursor({"fc": fila[10], "id": fila[0]}))
+    assert pagina[0]["id"] == sorted(db.filas.values(), key=lambda f: (f[10], f[0]), reverse=True)[999 * 10][0]
+    assert db.leidas == [11, 11]
+
+
+def _client(db):
+    app = FastAPI()
+    app.include_router(partido_controller.router)
+    app.dependency_overrides[get_async_partido_data_access] = lambda: AsyncPartidoDataAccess(_data_access(db))
+    return TestClient(app)
+
+
+def test_endpoint_pagina_solo_si_se_pide():
+    client = _client(FakeDb(250))
+    r = client.get("/api/admin/partidos/")
+    assert r.status_code == 200 and len(r.json()) == 250 and "X-Next-Cursor" not in r.headers
+
+    r = client.get("/api/admin/partidos/", params={"limit": 100})
+    assert len(r.json()) == 100
+    siguiente = client.get("/api/admin/partidos/", params={"cursor": r.headers["X-Next-Cursor"]})
+    assert len(siguiente.json()) == 100                     # con cursor y sin limit: PARTIDOS_PAGE_SIZE
+    assert siguiente.json()[0]["id"] == r.json()[-1]["id"] - 1
+
+    r = client.get("/api/admin/partidos/historial", params={"limit": 50})
+    assert len(r.json()) == 50 and all(p["estado"] == "finalizado" for p in r.json())
+    assert len(client.get("/api/admin/partidos/historial").json()) == 167
+
+    assert client.get("/api/admin/partidos/", params={"cursor": "no-es-un-cursor"}).status_code == 400
+    assert client.get("/api/admin/partidos/", params={"cursor": encode_cursor({"id": 5})}).status_code == 400
+    assert client.get("/api/admin/partidos/historial",
+                      params={"cursor": encode_cursor({"fc": "ayer", "id": 5})}).status_code == 400
+
+
+def main():
+    print("🚀 Pruebas de la paginación de partidos")
+    print("=" * 50)
+    for test in (test_recorre_todo_una_vez_con_empates, test_cursor_de_fila_borrada_usa_su_fecha,
+                 test_pagina_1000_lee_lo_mismo_que_la_1, test_endpoint_pagina_solo_si_se_pide):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
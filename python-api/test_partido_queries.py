@@ -0,0 +1,586 @@
+#!/usr/bin/env python3
+"""
+Pruebas de número de consultas de la capa de datos de partidos
+
+Usa una conexión falsa que registra cada ``execute`` para asegurar que los
+listados calculan el marcador de todos los partidos en una sola consulta
+(sin N+1 contra dbo.Anotacion), que el roster se guarda por diferencias,
+en bloque, que una ráfaga de ajustes de puntos se escribe en un solo INSERT y
+que los eventos con eventoId/seq se aplican una sola vez y en orden (también en
+lotes de /eventos:batch, escritos en una transacción), que un lote que falla por un
+error pasajero se reintenta sin perder lo ya respondido, que si una clave única lo
+rechaza sólo se rechaza el evento en conflicto y que un GET condicional
+del partido responde 304 sin consultar mientras su versión no cambie, con el mismo
+ETag en todos los workers.
+No necesita SQL Server.
+
+Ejecutar con ``python test_partido_queries.py`` o con pytest.
+"""
+import asyncio
+import uuid
+from datetime import datetime
+
+import pyodbc
+
+from app.data.evento_ingest import (
+    ConflictoSecuencia, EventoIngest, LoteRechazado, PartidoNoEncontrado, leer_evento,
+)
+from app.data.marcador_store import MarcadorStore
+from app.data.partido_data import AsyncPartidoDataAccess, PartidoDataAccess
+from app.data.partido_versions import PartidoVersiones
+from app.data.pool import ConnectionPool
+
+COLUMNAS_PARTIDO = [
+    "id", "equipo_local_id", "equipo_visitante_id", "fecha_hora_inicio", "estado",
+    "minutos_por_cuarto", "cuartos_totales", "faltas_por_equipo_limite",
+    "faltas_por_jugador_limite", "sede", "fecha_creacion", "puntos_local", "puntos_visitante",
+]
+COLUMNAS_INGESTA = [
+    "partido_id", "equipo_local_id", "equipo_visitante_id", "puntos_local", "puntos_visitante",
+    "faltas_local", "faltas_visitante", "tiempos_local", "tiempos_visitante", "ultimo_seq",
+]
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+        self.rowcount = 0
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        self.conn.executed.append((sql, params))
+        if "ultimo_seq" in sql:
+            self._rows = [self.conn.estado]
+            self.description = [(c,) for c in COLUMNAS_INGESTA]
+            return self
+        if "FROM dbo.EventoPartido" in sql:
+            self._rows = []
+        elif "FROM dbo.Partido" in sql:
+            self._rows = list(self.conn.rows)
+        elif "FROM dbo.RosterPartido" in sql:
+            self._rows = list(self.conn.roster)
+        else:
+            self._rows = []
+        self.description = [(c,) for c in COLUMNAS_PARTIDO]
+        self.rowcount = len(self._rows)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self.conn.executed.append((sql, list(seq_of_params)))
+
+    def setinputsizes(self, sizes):
+        pass
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+
+class FakeConnection:
+    def __init__(self, rows, roster=(), estado=(7, 1, 2, 40, 20, 0, 0, 0, 0, 0)):
+        self.rows = rows
+        self.roster = list(roster)
+        self.estado = estado
+        self.executed = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def make_data_access(num_partidos):
+    fecha = datetime(2025, 10, 1, 18, 30)
+    rows = [
+        (i, 1, 2, fecha, "finalizado", 10, 4, 5, 5, "Cancha Principal", fecha, 70 + i, 60 + i)
+        for i in range(1, num_partidos + 1)
+    ]
+    conn = FakeConnection(rows)
+    pool = ConnectionPool(factory=lambda: conn, max_size=1)
+    return PartidoDataAccess(pool=pool), conn
+
+
+def test_historial_una_consulta():
+    """El historial no consulta dbo.Anotacion por cada partido"""
+    for num_partidos in (1, 10, 200):
+        data_access, conn = make_data_access(num_partidos)
+        partidos = data_access.get_partidos_by_estado("finalizado")
+        assert len(partidos) == num_partidos
+        assert len(conn.executed) == 1, f"{len(conn.executed)} consultas para {num_partidos} partidos"
+        assert partidos[0]["puntos_local"] == 71
+        assert partidos[0]["puntos_visitante"] == 61
+
+
+def test_listado_incluye_marcador():
+    """El listado general trae el marcador en la misma consulta"""
+    data_access, conn = make_data_access(50)
+    partidos = data_access.get_all_partidos()
+    assert len(conn.executed) == 1
+    assert all("puntos_local" in p and "puntos_visitante" in p for p in partidos)
+    assert partidos[-1]["puntos_local"] == 120
+
+
+def test_roster_por_diferencias():
+    """El roster sólo envía altas, bajas y cambios de titular, uno por tipo"""
+    # (roster_id, equipo_id, jugador_id, es_titular)
+    guardado = [(i, 1, i, i <= 5) for i in range(1, 13)] + [(12 + i, 2, 100 + i, i <= 5) for i in range(1, 13)]
+    conn = FakeConnection([], roster=guardado)
+    data_access = PartidoDataAccess(pool=ConnectionPool(factory=lambda: conn, max_size=1))
+
+    items = [{"partidoId": 7, "equipoId": e, "jugadorId": j, "esTitular": t} for _, e, j, t in guardado]
+    items = [item for item in items if item["jugadorId"] not in (11, 12)]        # 2 bajas
+    items[0]["esTitular"] = False                                                # 1 cambio
+    items += [{"partidoId": 7, "equipoId": 2, "jugadorId": 200, "esTitular": False}]  # 1 alta
+
+    cambios = data_access.save_roster_complete(7, items)
+    assert cambios == {"insertados": 1, "eliminados": 2, "actualizados": 1, "sinCambios": 21}, cambios
+    assert len(conn.executed) == 4, f"{len(conn.executed)} viajes a la base de datos"
+    assert [len(params) for _, params in conn.executed[1:]] == [2, 1, 1]
+
+    conn.executed.clear()
+    assert data_access.save_roster_complete(7, [
+        {"partidoId": 7, "equipoId": e, "jugadorId": j, "esTitular": t} for _, e, j, t in guardado
+    ])["sinCambios"] == 24
+    assert len(conn.executed) == 1  # sin cambios: sólo la lectura
+
+
+class IngestaDataAccess:
+    """Lo que usa EventoIngest de AsyncPartidoDataAccess, sin executor"""
+
+    def __init__(self, data_access):
+        self.sync = data_access
+
+    async def get_estado_ingesta(self, partido_id):
+        return {"partido_id": partido_id, "equipo_local_id": 1, "equipo_visitante_id": 2,
+                "puntos_local": 0, "puntos_visitante": 0, "faltas_local": 0, "faltas_visitante": 0,
+                "tiempos_local": 0, "tiempos_visitante": 0, "ultimo_seq": 0}
+
+    async def buscar_eventos(self, partido_id, evento_ids):
+        return self.sync.buscar_eventos(partido_id, evento_ids)
+
+    async def registrar_eventos(self, partido_id, **lotes):
+        return self.sync.registrar_eventos(partido_id, **lotes)
+
+
+class IngestaInestable(IngestaDataAccess):
+    """Falla las escrituras con los errores de ``fallas`` (uno por intento) antes de escribir"""
+
+    def __init__(self, data_access):
+        super().__init__(data_access)
+        self.fallas = []
+        self.intentos = 0
+
+    async def registrar_eventos(self, partido_id, **lotes):
+        self.intentos += 1
+        if self.fallas:
+            raise self.fallas.pop(0)
+        return await super().registrar_eventos(partido_id, **lotes)
+
+
+def _ingesta(conn, inestable=False, **kwargs):
+    data_access = PartidoDataAccess(pool=ConnectionPool(factory=lambda: conn, max_size=1),
+                                    marcador_store=MarcadorStore(ttl=0))
+    fuente = IngestaInestable(data_access) if inestable else IngestaDataAccess(data_access)
+    return EventoIngest(fuente, interval=0.01, **kwargs)
+
+
+def test_rafaga_de_ajustes_un_insert():
+    """Los ajustes de una ráfaga van juntos en un INSERT y en una transacción"""
+    conn = FakeConnection([])
+
+    async def rafaga(n, max_batch):
+        ingest = _ingesta(conn, max_batch=max_batch)
+        resultados = [await ingest.submit(7, leer_evento({"equipoId": 2 if i % 3 == 0 else 1, "puntos": 2},
+                                                         "anotacion")) for i in range(n)]
+        await ingest.close()
+        return ingest, resultados
+
+    ingest, resultados = asyncio.run(rafaga(30, 200))
+    # Se responde desde memoria, sin esperar a la base
+    assert resultados[-1][0]["local"] == 40 and resultados[-1][0]["visitante"] == 20
+    # Y con el commit, el marcador de la base
+    assert resultados[-1][1].result()["local"] == 40
+    inserts = [params for sql, params in conn.executed if "INSERT INTO dbo.Anotacion" in sql]
+    assert len(inserts) == 1, f"{len(inserts)} INSERT para 30 ajustes"
+    assert len(inserts[0]) == 2 + 2 * 30
+    assert not any("INSERT INTO dbo.EventoPartido" in sql for sql, _ in conn.executed)
+    assert ingest.stats()["batches"] == 1 and ingest.stats()["pending"] == 0
+
+    conn.executed.clear()
+    ingest, _ = asyncio.run(rafaga(450, 200))
+    inserts = [params for sql, params in conn.executed if "INSERT INTO dbo.Anotacion" in sql]
+    assert [len(p) for p in inserts] == [2 + 2 * 200, 2 + 2 * 200, 2 + 2 * 50]
+    assert ingest.stats()["written"] == 450
+
+
+def test_eventos_idempotentes_en_orden():
+    """Con eventoId/seq: los reintentos no suman dos veces y los adelantados esperan su turno"""
+    conn = FakeConnection([])
+    ids = [str(uuid.uuid4()) for _ in range(6)]
+
+    def evento(n, **extra):
+        data = {"tipo": "anotacion", "equipoId": 1, "puntos": 2, "eventoId": ids[n - 1], "seq": n}
+        data.update(extra)
+        return leer_evento(data)
+
+    async def escenario():
+        ingest = _ingesta(conn, gap_timeout=0.2)
+        # Pipelining: llegan 3, 2 y 1 sin esperar respuesta; se aplican 1, 2, 3
+        tareas = [asyncio.create_task(ingest.submit(7, evento(n))) for n in (3, 2)]
+        await asyncio.sleep(0)
+        assert ingest.stats()["outOfOrder"] == 2
+        primero, _ = await ingest.submit(7, evento(1, puntos=3))
+        (tercero, _), (segundo, _) = await asyncio.gather(*tareas)
+        assert (primero["local"], segundo["local"], tercero["local"]) == (3, 5, 7)
+        assert tercero["ultimoSeq"] == 3
+
+        # Reintento (p. ej. tras un timeout del cliente): mismo resultado, no vuelve a sumar
+        repetido, _ = await ingest.submit(7, evento(2))
+        assert repetido["duplicado"] and repetido["local"] == 5
+        falta, _ = await ingest.submit(7, evento(4, tipo="falta"))
+        assert falta["local"] == 7 and falta["faltasLocal"] == 1
+
+        # Mismo id con otra seq, seq ya usada por otro id, o un hueco que no se llena: conflicto
+        for malo in (evento(2, seq=5), evento(6, seq=4), evento(6)):
+            try:
+                await ingest.submit(7, malo)
+                raise AssertionError("se esperaba ConflictoSecuencia")
+            except ConflictoSecuencia:
+                pass
+        await ingest.close()
+        return ingest
+
+    ingest = asyncio.run(escenario())
+    assert ingest.stats()["written"] == 4 and ingest.stats()["duplicates"] == 1
+    registros = [params for sql, params in conn.executed if "INSERT INTO dbo.EventoPartido" in sql]
+    assert len(registros) == 1 and list(registros[0][1::3]) == ids[:4], registros
+    assert list(registros[0][2::3]) == [1, 2, 3, 4]
+    assert sum("INSERT INTO dbo.Falta" in sql for sql, _ in conn.executed) == 1
+
+
+def _lote(n, desde=1):
+    """Lote mixto como el que reenvía una tablet al recuperar la conexión"""
+    eventos = []
+    for i in range(n):
+        seq = desde + i
+        if i % 10 < 6:
+            data = {"tipo": "anotacion", "equipoId": 1 + i % 2, "puntos": 2}
+        elif i % 10 < 9:
+            data = {"tipo": "falta", "equipoId": 1 + i % 2, "jugadorId": 100 + i % 12}
+        else:
+            data = {"tipo": "tiempo_muerto", "equipoId": 1 + i % 2, "tiempo": "largo"}
+        data.update(eventoId=str(uuid.UUID(int=seq)), seq=seq)
+        eventos.append(leer_evento(data))
+    return eventos
+
+
+def test_lote_de_eventos_una_transaccion():
+    """1000 eventos mixtos: una transacción, INSERT multi-fila por tabla y reenvío sin duplicar"""
+    conn = FakeConnection([])
+    lote = _lote(1000)
+
+    async def escenario():
+        ingest = _ingesta(conn, max_batch=200)
+        resultados, escrito = await ingest.submit_lote(7, lote)
+        await escrito
+        assert [r["resultado"] for r in resultados] == ["aplicado"] * 1000
+        assert ingest.stats()["batches"] == 1, f"{ingest.stats()['batches']} transacciones"
+        por_tabla = {tabla: [len(p) for sql, p in conn.executed if f"INSERT INTO dbo.{tabla}" in sql]
+                     for tabla in ("Anotacion", "Falta", "TiempoMuerto", "EventoPartido")}
+        assert por_tabla == {"Anotacion": [2 + 2 * 600], "Falta": [2 + 4 * 300], "TiempoMuerto": [2 + 2 * 100],
+                             "EventoPartido": [1 + 3 * 699, 1 + 3 * 301]}, por_tabla
+
+        # El mismo lote otra vez (la respuesta se perdió): nada nuevo que escribir
+        conn.executed.clear()
+        resultados, escrito = await ingest.submit_lote(7, lote[500:] + _lote(2, desde=1001))
+        await escrito
+        assert [r["resultado"] for r in resultados] == ["duplicado"] * 500 + ["aplicado"] * 2
+        assert ingest.stats()["batches"] == 2
+        assert [len(p) for sql, p in conn.executed if "INSERT INTO dbo.EventoPartido" in sql] == [1 + 3 * 2]
+
+        # Un evento inválido o un hueco en la seq rechazan el lote entero
+        for malo in (_lote(3, desde=1003)[:2] + [leer_evento({"tipo": "falta", "equipoId": 9})],
+                     _lote(3, desde=1004)):
+            try:
+                await ingest.submit_lote(7, malo)
+                raise AssertionError("se esperaba LoteRechazado")
+            except LoteRechazado as e:
+                rechazo = e
+        assert rechazo.conflicto and rechazo.errores[0]["indice"] == 0
+        assert (await ingest.estado(7))["ultimoSeq"] == 1002
+        await ingest.close()
+
+    asyncio.run(escenario())
+
+
+def _caida():
+    return pyodbc.Error("08S01", "[08S01] Communication link failure")
+
+
+def test_lote_fallido_se_reintenta():
+    """Un error pasajero no pierde lo respondido: el lote vuelve al frente y se reintenta"""
+    conn = FakeConnection([])
+
+    def evento(n, equipo=1):
+        return leer_evento({"tipo": "anotacion", "equipoId": equipo, "puntos": 2,
+                            "eventoId": str(uuid.UUID(int=n)), "seq": n})
+
+    async def escenario():
+        ingest = _ingesta(conn, inestable=True, retries=3, retry_backoff=0.02, retry_max=0.05)
+        ingest.data_access.fallas = [_caida(), pyodbc.Error("40001", "[40001] deadlock victim")]
+        escritos = [(await ingest.submit(7, evento(n)))[1] for n in (1, 2, 3)]
+        await asyncio.sleep(0.03)                        # primer intento fallido, esperando el reintento
+        assert ingest.stats()["pending"] == 3 and ingest.stats()["retries"] == 1
+        escritos.append((await ingest.submit(7, evento(4, equipo=2)))[1])   # llega detrás del lote
+        assert (await ingest.submit(7, evento(2)))[0]["duplicado"]         # la ventana sigue intacta
+        await ingest.flush(7)
+        marcadores = await asyncio.gather(*escritos)
+        assert all(m == marcadores[-1] for m in marcadores)
+        assert ingest.stats()["retries"] == 2 and ingest.stats()["failed"] == 0
+        registros = [p for sql, p in conn.executed if "INSERT INTO dbo.EventoPartido" in sql]
+        assert len(registros) == 1 and list(registros[0][2::3]) == [1, 2, 3, 4]   # un lote, en orden de seq
+
+        # La base sigue caída después de los reintentos: lo pendiente espera y se escribe al volver
+        conn.executed.clear()
+        ingest.data_access.fallas = [_caida() for _ in range(4)]
+        _, escrito = await ingest.submit(7, evento(5))
+        await ingest.flush(7)
+        assert ingest.stats()["pending"] == 1 and not escrito.done()
+        assert (await ingest.estado(7))["ultimoSeq"] == 5
+        assert (await asyncio.wait_for(escrito, 1))["ultimoSeq"] == 5   # el timer de reintento lo escribió
+        assert ingest.stats()["pending"] == 0 and ingest.stats()["failed"] == 0
+
+        # Al apagar con la base caída: quien espera el commit recibe el error
+        ingest.data_access.fallas = [_caida() for _ in range(10)]
+        _, escrito = await ingest.submit(7, evento(6))
+        await ingest.close()
+        try:
+            await escrito
+            raise AssertionError("se esperaba el error del apagado")
+        except RuntimeError:
+            pass
+        assert ingest.stats()["failed"] == 1
+
+    asyncio.run(escenario())
+
+
+class IngestaConClaves:
+    """Base falsa con las claves únicas de dbo.EventoPartido y la FK de jugador de dbo.Falta"""
+
+    def __init__(self):
+        self.eventos = {}           # evento_id -> seq ya registrados
+        self.puntos = {1: 0, 2: 0}
+        self.faltas = {1: 0, 2: 0}
+        self.commits = []           # seqs de cada lote escrito
+        self.existe = True
+        self.sin_respuesta = 0      # commits cuya respuesta se pierde (conexión caída)
+
+    def estado(self):
+        return {"partido_id": 7, "equipo_local_id": 1, "equipo_visitante_id": 2,
+                "puntos_local": self.puntos[1], "puntos_visitante": self.puntos[2],
+                "faltas_local": self.faltas[1], "faltas_visitante": self.faltas[2],
+                "tiempos_local": 0, "tiempos_visitante": 0, "ultimo_seq": max(self.eventos.values(), default=0)}
+
+    async def get_estado_ingesta(self, partido_id):
+        return self.estado() if self.existe else None
+
+    async def buscar_eventos(self, partido_id, evento_ids):
+        return {i: self.eventos[i] for i in evento_ids if i in self.eventos}
+
+    async def registrar_eventos(self, partido_id, anotaciones=(), faltas=(), tiempos=(), registros=()):
+        if not self.existe:
+            raise pyodbc.IntegrityError("23000", "FK_Anotacion_Partido")
+        seqs = set(self.eventos.values())
+        for evento_id, seq, _ in registros:
+            if evento_id in self.eventos:
+                raise pyodbc.IntegrityError("23000", "Violation of UNIQUE KEY constraint 'UQ_EventoPartido_Evento'")
+            if seq in seqs:
+                raise pyodbc.IntegrityError("23000", "Violation of UNIQUE KEY constraint 'UQ_EventoPartido_Seq'")
+            seqs.add(seq)
+        if any(jugador == 999 for _, jugador, _, _ in faltas):
+            raise pyodbc.IntegrityError("23000", "FK_Falta_Jugador")
+        for equipo, puntos in anotaciones:
+            self.puntos[equipo] += puntos
+        for equipo, *_ in faltas:
+            self.faltas[equipo] += 1
+        self.eventos.update((evento_id, seq) for evento_id, seq, _ in registros)
+        self.commits.append([seq for _, seq, _ in registros])
+        if self.sin_respuesta:
+            self.sin_respuesta -= 1
+            raise _caida()
+        return self.estado()
+
+
+async def _rechazo(future, tipo):
+    try:
+        await future
+    except tipo as e:
+        return e
+    raise AssertionError(f"se esperaba {tipo.__name__}")
+
+
+def test_conflicto_rechaza_solo_el_evento():
+    """Otro worker usó la seq: se rechaza ese evento y el resto del lote se escribe"""
+    def evento(n, puntos=2, seq=None):
+        return leer_evento({"tipo": "anotacion", "equipoId": 1, "puntos": puntos,
+                            "eventoId": str(uuid.UUID(int=n)), "seq": seq or n})
+
+    async def escenario():
+        base = IngestaConClaves()
+        ingest = EventoIngest(base, interval=0.01, state_ttl=60, retry_backoff=0.01)
+        for n in (1, 2):
+            await ingest.submit(7, evento(n))
+        await ingest.flush(7)
+
+        # Sin afinidad: otro worker registra la seq 3 (un punto del visitante)
+        base.eventos[str(uuid.UUID(int=100))] = 3
+        base.puntos[2] += 1
+        _, tercero = await ingest.submit(7, evento(3, puntos=3))
+        _, suelto = await ingest.submit(7, leer_evento({"equipoId": 2, "puntos": 1}, "anotacion"))
+        _, cuarto = await ingest.submit(7, evento(4))
+        await ingest.flush(7)
+
+        assert "seq 3" in str(await _rechazo(tercero, ConflictoSecuencia))
+        marcador = await cuarto
+        assert (await suelto) == marcador
+        assert (marcador["local"], marcador["visitante"]) == (6, 2) == (base.puntos[1], base.puntos[2])
+        assert base.commits == [[1, 2], [4]]
+        assert (await ingest.submit(7, evento(4)))[0]["duplicado"]   # la ventana de ids sigue ahí
+        try:
+            await ingest.submit(7, evento(3, puntos=3))                # el reenvío del rechazado tampoco entra
+            raise AssertionError("se esperaba ConflictoSecuencia")
+        except ConflictoSecuencia:
+            pass
+        assert ingest.stats()["failed"] == 1
+
+        # Commit sin respuesta: el reintento choca consigo mismo y se da por escrito, sin sumar dos veces
+        base.sin_respuesta = 1
+        escritos = [(await ingest.submit(7, evento(n)))[1] for n in (5, 6)]
+        await ingest.flush(7)
+        marcadores = await asyncio.gather(*escritos)
+        assert base.commits[-1] == [5, 6] and len(base.commits) == 3
+        assert marcadores[-1]["local"] == base.puntos[1] == 10 and marcadores[-1]["ultimoSeq"] == 6
+        assert ingest.stats()["failed"] == 1
+
+        # Una falta que la base no acepta (FK) se aísla partiendo el lote; las demás se escriben
+        faltas = [(await ingest.submit(7, leer_evento({"equipoId": 1, "jugadorId": j}, "falta")))[1]
+                  for j in (10, 11, 999, 12)]
+        await ingest.flush(7)
+        await _rechazo(faltas[2], pyodbc.IntegrityError)
+        await asyncio.gather(*faltas[:2], faltas[3])
+        assert base.faltas[1] == 3 and (await ingest.estado(7))["faltasLocal"] == 3
+
+        # Un lote de /eventos:batch va entero o nada, también frente a la base
+        base.eventos[str(uuid.UUID(int=200))] = 8
+        _, escrito = await ingest.submit_lote(7, [evento(n) for n in (7, 8, 9)])
+        await ingest.flush(7)
+        await _rechazo(escrito, ConflictoSecuencia)
+        assert len(base.commits) == 5 and base.puntos[1] == 10
+
+        # El partido se eliminó: se descarta lo pendiente
+        base.existe = False
+        _, escrito = await ingest.submit(7, leer_evento({"equipoId": 1, "puntos": 1}, "anotacion"))
+        await ingest.flush(7)
+        await _rechazo(escrito, PartidoNoEncontrado)
+        assert ingest.stats()["partidos"] == 0
+        await ingest.close()
+
+    asyncio.run(escenario())
+
+
+def test_partido_304_sin_consultar():
+    """If-None-Match con la versión vigente responde 304 sin consultar; una escritura la cambia"""
+    from fastapi.testclient import TestClient
+
+    import main as api
+    from app.controllers import partido_controller
+    from app.dependencies import get_async_partido_data_access
+
+    data_access, conn = make_data_access(1)
+    versiones = PartidoVersiones(ttl=60)
+    data_access.versiones = versiones
+    api.app.dependency_overrides[get_async_partido_data_access] = lambda: AsyncPartidoDataAccess(data_access)
+    original = partido_controller.get_partido_versiones
+    partido_controller.get_partido_versiones = lambda: versiones
+    try:
+        client = TestClient(api.app)
+        respuesta = client.get("/api/admin/partidos/1")
+        etag = respuesta.headers["ETag"]
+        assert respuesta.status_code == 200 and respuesta.json()["id"] == 1
+
+        conn.executed.clear()
+        for _ in range(20):
+            respuesta = client.get("/api/admin/partidos/1", headers={"If-None-Match": etag})
+            assert respuesta.status_code == 304 and respuesta.headers["ETag"] == etag
+        assert conn.executed == [] and versiones.not_modified == 20
+
+        versiones.ttl = 0  # desde aquí cada GET revalida contra la base
+        data_access.clear_roster_partido(1)  # escritura en una tabla hija
+        conn.executed.clear()
+        respuesta = client.get("/api/admin/partidos/1", headers={"If-None-Match": etag})
+        # Se relee (la versión subió), pero el partido en sí no cambió: mismo ETag y 304
+        assert respuesta.status_code == 304 and respuesta.headers["ETag"] == etag
+        assert len(conn.executed) == 1
+        assert client.get("/api/admin/partidos/1/roster", headers={"If-None-Match": etag}).status_code == 200
+
+        # Escrito por otra vía (sin aviso): al vencer el ttl se relee y la versión sube
+        etag = respuesta.headers["ETag"]
+        conn.rows = [conn.rows[0][:9] + ("Cancha Auxiliar",) + conn.rows[0][10:]]
+        respuesta = client.get("/api/admin/partidos/1", headers={"If-None-Match": etag})
+        assert respuesta.status_code == 200 and respuesta.headers["ETag"] != etag
+    finally:
+        api.app.dependency_overrides.clear()
+        partido_controller.get_partido_versiones = original
+
+
+def test_etag_igual_en_todos_los_workers():
+    """El ETag sale del contenido: otro worker (o el mismo tras reiniciar) reconoce el del cliente"""
+    from app.realtime.broker import InProcessBroker
+
+    async def escenario():
+        broker = InProcessBroker()
+        a, b = PartidoVersiones(ttl=60), PartidoVersiones(ttl=60)
+        a.start(broker)
+        b.start(broker)
+        contenido = b'{"id":1,"sede":"Cancha Principal"}'
+        etag = a.validar(1, "partido", contenido, a.version(1))
+        assert b.no_modificado(1, "partido", etag) is None          # b todavía no leyó el partido
+        assert b.validar(1, "partido", contenido, b.version(1)) == etag
+        assert b.no_modificado(1, "partido", etag) == etag
+        assert b.no_modificado(1, "roster", etag) is None           # cada recurso tiene su ETag
+        assert PartidoVersiones(ttl=60).validar(1, "partido", contenido, 0) == etag
+
+        a.bump(1)                                                    # escritura en a: los dos releen
+        await asyncio.sleep(0.01)
+        assert a.no_modificado(1, "partido", etag) is None and b.no_modificado(1, "partido", etag) is None
+        assert (a.remote_bumps, b.remote_bumps) == (0, 1)
+        assert b.validar(1, "partido", b'{"id":1,"sede":"Cancha Auxiliar"}', b.version(1)) != etag
+
+    asyncio.run(escenario())
+
+
+def main():
+    print("🚀 Pruebas de número de consultas (partidos)")
+    print("=" * 50)
+    for test in (test_historial_una_consulta, test_listado_incluye_marcador, test_roster_por_diferencias,
+                 test_rafaga_de_ajustes_un_insert, test_eventos_idempotentes_en_orden,
+                 test_lote_de_eventos_una_transaccion, test_lote_fallido_se_reintenta,
+                 test_conflicto_rechaza_solo_el_evento,
+                 test_partido_304_sin_consultar, test_etag_igual_en_todos_los_workers):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Pruebas del pool de conexiones a SQL Server (ConnectionPool)
+
+Usa conexiones falsas que registran commit, rollback y close. Comprueba que el
+préstamo espera a lo sumo ``timeout`` y recibe la conexión que se libera mientras
+espera, que se reciclan las conexiones viejas y se descartan las ociosas que no
+responden al ping, y que al devolver una conexión se deshace lo pendiente.
+No necesita SQL Server.
+
+Ejecutar con ``python test_pool.py`` o con pytest.
+"""
+import threading
+import time
+
+import pyodbc
+
+from app.data.pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self, numero):
+        self.numero = numero
+        self.commits = 0
+        self.rollbacks = 0
+        self.pings = 0
+        self.closed = False
+        self.viva = True
+        self.rollback_falla = False
+
+    def execute(self, sql):
+        assert sql == "SELECT 1"
+        self.pings += 1
+        if not self.viva:
+            raise pyodbc.Error("08S01", "Communication link failure")
+        return self
+
+    def fetchone(self):
+        return (1,)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+        if self.rollback_falla:
+            raise pyodbc.Error("08S01", "Communication link failure")
+
+    def close(self):
+        self.closed = True
+
+
+def _pool(**kwargs):
+    creadas = []
+
+    def factory():
+        creadas.append(FakeConnection(len(creadas) + 1))
+        return creadas[-1]
+
+    opciones = {"max_size": 1, "timeout": 0.2, "recycle": 0, "ping_after": 60}
+    opciones.update(kwargs)
+    return ConnectionPool(factory=factory, **opciones), creadas
+
+
+def test_timeout_acotado():
+    pool, creadas = _pool(timeout=0.1)
+    prestada = pool.connection()
+    inicio = time.monotonic()
+    try:
+        pool.connection()
+        raise AssertionError("debió agotarse el tiempo de espera")
+    except PoolTimeoutError:
+        pass
+    assert 0.1 <= time.monotonic() - inicio < 0.5
+    assert pool.stats()["timeouts"] == 1
+
+    # Quien espera recibe la conexión en cuanto se libera, sin crear otra
+    threading.Timer(0.05, prestada.close).start()
+    pool.timeout = 2.0
+    with pool.connection() as conn:
+        assert conn is creadas[0]
+    stats = pool.stats()
+    assert (stats["created"], stats["waits"], stats["inUse"], stats["idle"]) == (1, 1, 0, 1)
+
+
+def test_recicla_y_valida_ociosas():
+    pool, creadas = _pool(recycle=0.05)
+    with pool.connection():
+        pass
+    time.sleep(0.08)
+    with pool.connection() as conn:
+        assert conn is creadas[1]            # la primera superó su vida máxima
+    assert creadas[0].closed and creadas[0].pings == 0
+
+    pool, creadas = _pool(ping_after=0.05)
+    with pool.connection():
+        pass
+    with pool.connection() as conn:          # usada hace poco: sin ping
+        assert conn is creadas[0] and conn.pings == 0
+    time.sleep(0.08)
+    creadas[0].viva = False
+    with pool.connection() as conn:          # ociosa y muerta: se descarta
+        assert conn is creadas[1]
+    assert creadas[0].closed
+    stats = pool.stats()
+    assert (stats["pingFailures"], stats["discarded"], stats["size"]) == (1, 1, 1)
+
+
+def test_rollback_al_devolver():
+    pool, creadas = _pool()
+    try:
+        with pool.connection() as conn:
+            raise ValueError("falla a mitad de la transacción")
+    except ValueError:
+        pass
+    assert (conn.commits, conn.rollbacks) == (0, 2)  # rollback por la excepción y al devolverla
+
+    with pool.connection() as conn:
+        pass
+    assert (conn.commits, conn.rollbacks) == (1, 3)
+
+    # close() devuelve la conexión sin confirmar lo pendiente
+    prestada = pool.connection()
+    prestada.close()
+    assert (conn.commits, conn.rollbacks) == (1, 4)
+
+    # Si el rollback falla la conexión no vuelve al pool
+    conn.rollback_falla = True
+    with pool.connection():
+        pass
+    assert conn.closed and pool.stats()["idle"] == 0
+    with pool.connection() as nueva:
+        assert nueva is creadas[1]
+
+
+def main():
+    print("🚀 Pruebas del pool de conexiones")
+    print("=" * 50)
+    for test in (test_timeout_acotado, test_recicla_y_valida_ociosas, test_rollback_al_devolver):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la caché de próximos partidos (ProximosCache)
+
+Usa un reloj monotónico falso. Comprueba que cada partido sale de
+``get_fresh(n)`` justo cuando pasa su ``fecha_hora_inicio`` según el reloj del
+servidor SQL (la hora de ``GETDATE()`` de la lectura más lo transcurrido, sin
+importar la hora local), que sin partidos suficientes se pide recargar y que una
+invalidación durante la lectura no guarda el resultado viejo.
+No necesita SQL Server.
+
+Ejecutar con ``python test_proximos_cache.py`` o con pytest.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.data import proximos_cache as modulo
+from app.data.proximos_cache import ProximosCache
+
+# Hora del servidor SQL muy lejos de la local: sólo cuenta el reloj de la base
+DB_NOW = datetime(2001, 3, 4, 18, 0, 0)
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def monotonic(self):
+        return self.ahora
+
+    def avanzar(self, segundos):
+        self.ahora += segundos
+
+
+@contextmanager
+def reloj_falso():
+    reloj = Reloj()
+    original = modulo.time
+    modulo.time = SimpleNamespace(monotonic=reloj.monotonic)
+    try:
+        yield reloj
+    finally:
+        modulo.time = original
+
+
+def _partidos(*segundos):
+    return [{"id": i, "fecha_hora_inicio": DB_NOW + timedelta(seconds=s)} for i, s in enumerate(segundos, 1)]
+
+
+def _ids(partidos):
+    return [p["id"] for p in partidos] if partidos is not None else None
+
+
+def test_cada_partido_caduca_al_empezar():
+    with reloj_falso() as reloj:
+        cache = ProximosCache(size=5, max_staleness=3600)
+        cargas = []
+
+        def loader(size):
+            cargas.append(size)
+            return _partidos(10, 20, 30), DB_NOW
+
+        assert _ids(cache.get(loader, 3)) == [1, 2, 3] and cargas == [5]
+
+        reloj.avanzar(10)                                   # hora de la base = inicio del 1
+        assert _ids(cache.get_fresh(3)) == [1, 2, 3]
+        reloj.avanzar(0.001)
+        assert _ids(cache.get_fresh(3)) == [2, 3]           # completa: no hay más programados
+        assert cache.stats()["nextExpiresInS"] == 9.999
+
+        reloj.avanzar(10)
+        assert _ids(cache.get_fresh(1)) == [3]
+        reloj.avanzar(10)
+        assert cache.get_fresh(1) == []
+        assert cargas == [5]                                # ninguna recarga por caducar
+
+
+def test_offset_del_reloj_de_la_base():
+    """La hora de la base a la lectura desplaza todas las caducidades"""
+    with reloj_falso() as reloj:
+        cache = ProximosCache(size=5, max_staleness=3600)
+        cache.get(lambda size: (_partidos(10, 20, 30), DB_NOW + timedelta(seconds=15)), 1)
+        assert _ids(cache.get_fresh(3)) == [2, 3]           # el 1 ya empezó en el reloj de la base
+        reloj.avanzar(5)
+        assert _ids(cache.get_fresh(3)) == [2, 3]
+        reloj.avanzar(0.001)
+        assert _ids(cache.get_fresh(3)) == [3]
+
+
+def test_sin_partidos_suficientes_recarga():
+    with reloj_falso() as reloj:
+        cache = ProximosCache(size=3, max_staleness=3600)
+        lecturas = [(_partidos(10, 20, 30), DB_NOW), (_partidos(20, 30, 40), DB_NOW + timedelta(seconds=11))]
+        cache.get(lambda size: lecturas.pop(0), 3)
+
+        reloj.avanzar(11)
+        assert _ids(cache.get_fresh(2)) == [2, 3]
+        assert cache.get_fresh(3) is None                   # puede haber un cuarto programado
+        assert _ids(cache.get(lambda size: lecturas.pop(0), 3)) == [1, 2, 3]
+        assert cache.stats()["refreshes"] == 2
+
+        reloj.avanzar(3601)
+        assert cache.get_fresh(1) is None                   # max_staleness: escrituras de la API .NET
+
+
+def test_invalidacion_durante_la_lectura():
+    with reloj_falso():
+        cache = ProximosCache(size=5, max_staleness=3600)
+
+        def loader(size):
+            cache.invalidate()
+            return _partidos(10), DB_NOW
+
+        assert _ids(cache.get(loader, 1)) == [1]
+        assert cache.get_fresh(1) is None
+
+
+def main():
+    print("🚀 Pruebas de la caché de próximos partidos")
+    print("=" * 50)
+    for test in (test_cada_partido_caduca_al_empezar, test_offset_del_reloj_de_la_base,
+                 test_sin_partidos_suficientes_recarga, test_invalidacion_durante_la_lectura):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la exportación de mb_report a Parquet (ReporteParquet)
+
+Usa un MySQL falso con el esquema estrella y sync_state. Comprueba qué meses se
+exportan (los cerrados una sola vez, los abiertos en cada corrida), que las tablas
+de partido quedan particionadas por mes con sus tipos, que la lectura va en lotes
+del cursor del servidor, que la marca de sync_state avanza sólo con meses cerrados y
+que la partición de un mes abierto que se quedó sin partidos se borra.
+Las pruebas que escriben archivos necesitan pyarrow; sin él se omiten.
+No necesita MySQL.
+
+Ejecutar con ``python test_reporte_parquet.py`` o con pytest.
+"""
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.data import reporte_parquet
+from app.data.reporte_parquet import MARCA, ReporteParquet, meses_a_exportar
+
+FECHAS = {1: datetime(2025, 9, 20, 18), 2: datetime(2025, 10, 4, 18), 3: datetime(2025, 10, 31, 23),
+          4: datetime(2025, 11, 8, 18), 5: None}
+
+
+class FakeMySql:
+    def __init__(self, anotaciones=1000):
+        self.fechas = dict(FECHAS)
+        self.tablas = {
+            "dim_equipo": [(e, f"Equipo {e}", "Guatemala", f"E{e}", None, e % 2, FECHAS[1]) for e in (1, 2)],
+            "dim_jugador": [(j, 1 + j % 2, f"Nombre {j}", f"Apellido {j}", j, "Base", 180, 20, "GT", 1, FECHAS[1])
+                            for j in range(1, 11)],
+            "dim_partido": [(p, 1, 2, f, "finalizado", 10, 4, 5, 5, f"Sede {p}", FECHAS[1]) for p, f in FECHAS.items()],
+            "bridge_roster_partido": [(r, 1 + (r - 1) % 5, 1 + r % 2, r, r % 3 == 0) for r in range(1, 51)],
+            "fact_anotacion": [(a, 1 + a % 4, None if a % 7 == 0 else a, 1 + a % 2, 1 + a % 3)
+                               for a in range(1, anotaciones + 1)],
+        }
+        self.sync_state = {}
+        self.lecturas = []   # (tabla, partición) de cada SELECT de exportación
+        self.max_lote = 0
+
+    def connect(self):
+        return self
+
+    def cursor(self, cursorclass=None):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        db = self.db
+        if "GET_LOCK" in sql or "RELEASE_LOCK" in sql:
+            self._rows = [(1,)]
+        elif sql.startswith("SELECT entity"):
+            self._rows = [(k, v, None) for k, v in db.sync_state.items()]
+        elif sql.startswith("SELECT DISTINCT"):
+            self._rows = list({(f.year * 100 + f.month if f else None,) for f in db.fechas.values()})
+        elif sql.startswith("INSERT INTO sync_state"):
+            entidad, last_id, _ = params
+            db.sync_state[entidad] = max(db.sync_state.get(entidad, 0), last_id)
+        elif "WHERE" not in sql:
+            tabla = sql.split(" FROM ")[1].split()[0]
+            db.lecturas.append((tabla, None))
+            self._rows = list(db.tablas[tabla])
+        else:
+            tabla = next(t for t in ("fact_anotacion", "bridge_roster_partido") if f"JOIN {t}" in sql) \
+                if "JOIN" in sql else "dim_partido"
+            if params:
+                desde, hasta = params
+                partidos = {p for p, f in db.fechas.items() if f and desde <= f < hasta}
+                particion = desde.strftime("%Y-%m")
+            else:
+                partidos = {p for p, f in db.fechas.items() if f is None}
+                particion = "sin-fecha"
+            db.lecturas.append((tabla, particion))
+            self._rows = [f for f in db.tablas[tabla] if (f[0] if tabla == "dim_partido" else f[1]) in partidos]
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        self.db.max_lote = max(self.db.max_lote, len(rows))
+        return rows
+
+    def close(self):
+        pass
+
+
+def _exportacion(db, directorio, batch=100):
+    return ReporteParquet(directorio=directorio, batch=batch, compresion="zstd", margen_horas=24,
+                          mysql_connect=db.connect)
+
+
+def _necesita_pyarrow():
+    if reporte_parquet.pq is None:
+        pytest.skip("pyarrow no está instalado")
+
+
+def test_meses_a_exportar():
+    claves = [202511, None, 202509, 202510]
+    ahora = datetime(2025, 11, 15)
+    margen = timedelta(hours=24)
+    assert meses_a_exportar(claves, 0, ahora, margen) == [
+        (date(2025, 9, 1), True), (date(2025, 10, 1), True), (date(2025, 11, 1), False), (None, False),
+    ]
+    # Con la marca en octubre sólo quedan los abiertos
+    assert meses_a_exportar(claves, 202510, ahora, margen) == [(date(2025, 11, 1), False), (None, False)]
+    # Octubre terminó hace menos del margen: sigue abierto aunque la marca lo pase
+    assert meses_a_exportar(claves, 202510, datetime(2025, 11, 1, 12), margen)[0] == (date(2025, 10, 1), False)
+    # Diciembre: noviembre ya cerró
+    assert meses_a_exportar(claves, 202510, datetime(2025, 12, 3), margen)[0] == (date(2025, 11, 1), True)
+
+
+def test_exporta_por_mes_y_salta_los_cerrados():
+    _necesita_pyarrow()
+    import pyarrow.parquet as pq
+
+    db = FakeMySql()
+    with tempfile.TemporaryDirectory() as directorio:
+        reporte = _exportacion(db, directorio).run(ahora=datetime(2025, 11, 15))
+        assert reporte["meses"] == ["2025-09", "2025-10", "2025-11", "sin-fecha"]
+        assert reporte["marca"] == db.sync_state[MARCA] == 202510
+        assert reporte["tablas"]["fact_anotacion"]["filas"] == 1000
+        assert reporte["tablas"]["dim_partido"]["archivos"] == 4
+        assert db.max_lote == 100
+
+        octubre = pq.read_table(os.path.join(directorio, "fact_anotacion", "mes=2025-10", "part-0.parquet"))
+        assert octubre.num_rows == 500 and set(octubre.column("partido_id").to_pylist()) == {2, 3}
+        assert str(octubre.schema.field("anotacion_id").type) == "int64"
+        roster = pq.read_table(os.path.join(directorio, "bridge_roster_partido", "mes=2025-09", "part-0.parquet"))
+        assert roster.column("es_titular").to_pylist() == [r % 3 == 0 for r in range(1, 51, 5)]
+        equipos = pq.read_table(os.path.join(directorio, "dim_equipo", "part-0.parquet"))
+        assert equipos.column("activo").to_pylist() == [True, False]
+        sin_fecha = pq.read_table(os.path.join(directorio, "dim_partido", "mes=sin-fecha", "part-0.parquet"))
+        assert sin_fecha.column("partido_id").to_pylist() == [5]
+        assert not any(nombre.endswith(".tmp") for _, _, nombres in os.walk(directorio) for nombre in nombres)
+
+        # Siguiente corrida: septiembre y octubre ya están; sólo los abiertos y las dimensiones
+        db.lecturas.clear()
+        reporte = _exportacion(db, directorio).run(ahora=datetime(2025, 11, 20))
+        assert reporte["meses"] == ["2025-11", "sin-fecha"]
+        assert {p for _, p in db.lecturas} == {None, "2025-11", "sin-fecha"}
+
+        # En diciembre noviembre cierra: se exporta una última vez y avanza la marca
+        reporte = _exportacion(db, directorio).run(ahora=datetime(2025, 12, 3))
+        assert reporte["meses"] == ["2025-11", "sin-fecha"] and db.sync_state[MARCA] == 202511
+        assert _exportacion(db, directorio).run(ahora=datetime(2025, 12, 4))["meses"] == ["sin-fecha"]
+
+        # --desde-cero reescribe todo
+        assert len(_exportacion(db, directorio).run(desde_cero=True, ahora=datetime(2025, 12, 4))["meses"]) == 4
+
+
+def test_borra_particiones_sin_partidos():
+    """Un partido reprogramado o que recibe fecha no deja su fila repetida en el mes viejo"""
+    _necesita_pyarrow()
+    import pyarrow.dataset as ds
+
+    db = FakeMySql()
+    with tempfile.TemporaryDirectory() as directorio:
+        _exportacion(db, directorio).run(ahora=datetime(2025, 11, 15))
+
+        db.fechas[4] = datetime(2025, 12, 6, 18)   # noviembre se queda sin partidos
+        db.fechas[5] = datetime(2025, 12, 13, 18)  # ya no hay partidos sin fecha
+        os.makedirs(os.path.join(directorio, "fact_anotacion", "mes=otra-cosa"))
+        reporte = _exportacion(db, directorio).run(ahora=datetime(2025, 11, 20))
+        assert reporte["meses"] == ["2025-12"]
+        assert sorted(reporte["borrados"]) == ["2025-11", "sin-fecha"]
+        for tabla in ("dim_partido", "bridge_roster_partido", "fact_anotacion"):
+            particiones = sorted(os.listdir(os.path.join(directorio, tabla)))
+            assert "mes=2025-11" not in particiones and "mes=sin-fecha" not in particiones
+            assert "mes=2025-09" in particiones and "mes=2025-12" in particiones   # cerrados: no se tocan
+
+        partidos = ds.dataset(os.path.join(directorio, "dim_partido"), partitioning="hive").to_table()
+        assert sorted(partidos.column("partido_id").to_pylist()) == [1, 2, 3, 4, 5]
+        assert os.path.isdir(os.path.join(directorio, "fact_anotacion", "mes=otra-cosa"))
+        assert _exportacion(db, directorio).run(ahora=datetime(2025, 11, 21))["borrados"] == []
+
+
+def test_sin_pyarrow_avisa():
+    if reporte_parquet.pq is not None:
+        pytest.skip("pyarrow está instalado")
+    with tempfile.TemporaryDirectory() as directorio:
+        with pytest.raises(RuntimeError, match="pyarrow"):
+            _exportacion(FakeMySql(), directorio).run()
+
+
+def main():
+    print("🚀 Pruebas de la exportación de mb_report a Parquet")
+    print("=" * 50)
+    for test in (test_meses_a_exportar, test_exporta_por_mes_y_salta_los_cerrados,
+                 test_borra_particiones_sin_partidos, test_sin_pyarrow_avisa):
+        try:
+            test()
+        except pytest.skip.Exception as e:
+            print(f"⏭️  {test.__name__}: {e}")
+            continue
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la reconciliación de mb_report por árbol de hashes (ReporteReconciliacion)
+
+Usa un SQL Server y un MySQL falsos que calculan la huella por rango de clave igual
+que las sentencias reales (filas y suma de dos trozos del MD5 de cada fila).
+Comprueba que sin diferencias sólo se compara la raíz, que un cambio o un borrado
+se encuentra bajando sólo por los rangos distintos y se repara leyendo a lo sumo un
+tramo por lado, que un partido borrado se lleva sus filas hijas y que lo posterior
+a la marca de agua de sync_state queda para el ETL.
+No necesita SQL Server ni MySQL.
+
+Ejecutar con ``python test_reporte_reconciliacion.py`` o con pytest.
+"""
+import hashlib
+import re
+from datetime import datetime, timedelta
+
+from app.data.pool import ConnectionPool
+from app.data.reporte_reconciliacion import ReporteReconciliacion
+
+FECHA = datetime(2025, 10, 1, 18, 30, 0, 700000)  # con fracción: MySQL la redondea
+
+TABLAS = {"Partido": "dim_partido", "RosterPartido": "bridge_roster_partido", "Anotacion": "fact_anotacion"}
+
+
+def _texto(valor):
+    if valor is None:
+        return "\x01"
+    if isinstance(valor, datetime):  # CAST(... AS DATETIME2(0)) redondea al segundo
+        return (valor + timedelta(microseconds=500000)).strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(valor, bool):
+        return str(int(valor))
+    return str(valor)
+
+
+def _huellas(filas, desde, ancho, hasta):
+    """Lo que devuelven las sentencias de hash: (bucket, filas, suma1, suma2) por sub-rango"""
+    buckets = {}
+    for fila in filas.values():
+        if desde <= fila[0] <= hasta:
+            h = hashlib.md5("|".join(_texto(v) for v in fila).encode("utf-16-le")).digest()
+            b = buckets.setdefault((fila[0] - desde) // ancho, [0, 0, 0])
+            b[0] += 1
+            b[1] += int.from_bytes(h[:4], "big")
+            b[2] += int.from_bytes(h[4:8], "big")
+    return [(k,) + tuple(v) for k, v in sorted(buckets.items())]
+
+
+class Tablas:
+    def __init__(self):
+        self.tablas = {nombre: {} for nombre in TABLAS.values()}
+        self.max_filas = 0  # mayor número de filas devuelto por una lectura fila a fila
+        self.hashes = 0
+
+    def rango(self, tabla, desde, hasta):
+        filas = [f for k, f in sorted(self.tablas[tabla].items()) if desde <= k <= hasta]
+        self.max_filas = max(self.max_filas, len(filas))
+        return filas
+
+
+class FakeSqlServer(Tablas):
+    def query(self, sql, params):
+        tabla = TABLAS[re.search(r"FROM dbo\.(\w+)", sql).group(1)]
+        if "bucket" in sql:
+            self.hashes += 1
+            desde, ancho, _, hasta = params
+            return _huellas(self.tablas[tabla], desde, ancho, hasta)
+        return self.rango(tabla, *params)
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.description = None
+        self.rowcount = 0
+        self._rows = []
+
+    def setinputsizes(self, sizes):
+        pass
+
+    def execute(self, sql, params=()):
+        self._rows = self.db.query(sql, params)
+        return self
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self):
+        return FakeCursor(self.db)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class FakeMySql(Tablas):
+    def __init__(self):
+        super().__init__()
+        self.sync_state = {}
+        self.commits = 0
+
+    def connect(self):
+        return self
+
+    def cursor(self):
+        return FakeMySqlCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def close(self):
+        pass
+
+
+class FakeMySqlCursor:
+    def __init__(self, db):
+        self.db = db
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        db = self.db
+        if "GET_LOCK" in sql or "RELEASE_LOCK" in sql:
+            self._rows = [(1,)]
+        elif sql.startswith("SELECT entity"):
+            self._rows = [(k, v, None) for k, v in db.sync_state.items()]
+        elif sql.startswith("SELECT bucket"):
+            db.hashes += 1
+            tabla = re.search(r"FROM (\w+) WHERE", sql).group(1)
+            assert "USING utf16le" in sql
+            desde, ancho, _, hasta = params
+            self._rows = _huellas(db.tablas[tabla], desde, ancho, hasta)
+        elif sql.startswith("SELECT"):
+            self._rows = db.rango(re.search(r"FROM (\w+)", sql).group(1), *params)
+        elif sql.startswith("DELETE FROM"):
+            tabla = sql.split()[2]
+            ids = set(params)
+            por_partido = "WHERE partido_id" in sql and tabla != "dim_partido"
+            for k, v in list(db.tablas[tabla].items()):
+                if (v[1] if por_partido else k) in ids:
+                    del db.tablas[tabla][k]
+        else:
+            raise AssertionError(f"sentencia inesperada: {sql}")
+
+    def executemany(self, sql, seq_of_params):
+        tabla = re.match(r"INSERT INTO (\w+)", sql).group(1)
+        for fila in seq_of_params:
+            self.db.tablas[tabla][fila[0]] = tuple(fila)
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+
+def _bases(partidos=20, anotaciones=2000):
+    """Origen y mb_report iguales (mb_report con las fechas redondeadas y los bits como 0/1)"""
+    origen = FakeSqlServer()
+    for p in range(1, partidos + 1):
+        origen.tablas["dim_partido"][p] = (p, 1, 2, FECHA, "finalizado", 10, 4, 5, 5, f"Sede {p}", FECHA)
+    for r in range(1, partidos * 2 + 1):
+        origen.tablas["bridge_roster_partido"][r] = (r, 1 + (r - 1) // 2, 1 + r % 2, r, r % 2 == 0)
+    for a in range(1, anotaciones + 1):
+        origen.tablas["fact_anotacion"][a] = (a, 1 + a % partidos, None if a % 7 == 0 else a, 1 + a % 2, 1 + a % 3)
+    destino = FakeMySql()
+    redondeada = FECHA.replace(microsecond=0).replace(second=1)
+    for tabla, filas in origen.tablas.items():
+        destino.tablas[tabla] = {
+            k: tuple(redondeada if isinstance(v, datetime) else int(v) if isinstance(v, bool) else v for v in f)
+            for k, f in filas.items()
+        }
+        destino.sync_state[tabla] = max(filas)
+    return origen, destino
+
+
+def _reconciliacion(origen, destino, chunk=50, fanout=8):
+    conn = FakeConnection(origen)
+    return ReporteReconciliacion(pool=ConnectionPool(factory=lambda: conn, max_size=1),
+                                 mysql_connect=destino.connect, chunk_size=chunk, fanout=fanout)
+
+
+def test_sin_diferencias_solo_la_raiz():
+    origen, destino = _bases()
+    reporte = _reconciliacion(origen, destino).run()
+    assert all(e["revisados"] == 1 and e["distintos"] == 0 for e in reporte["entidades"].values())
+    assert reporte["reparados"] == 0
+    assert origen.max_filas == destino.max_filas == 0  # ninguna lectura fila a fila
+
+
+def test_baja_solo_por_rangos_distintos():
+    """Un cambio y un borrado en 2000 anotaciones se reparan leyendo sólo sus tramos"""
+    origen, destino = _bases()
+    origen.tablas["fact_anotacion"][137] = (137, 18, 137, 2, 1)   # editada (antes 3 puntos)
+    del origen.tablas["fact_anotacion"][1500]                      # borrada
+    reconciliacion = _reconciliacion(origen, destino)
+    e = reconciliacion.run(["fact_anotacion"])["entidades"]["fact_anotacion"]
+
+    assert (e["distintos"] > 0, e["reparados"], e["upserts"], e["borrados"]) == (True, 2, 1, 1)
+    assert e["rangos"] == [[128, 159], [1479, 1505]]
+    assert e["revisados"] < 40 and e["niveles"] == 3
+    assert origen.max_filas <= 50 and destino.max_filas <= 50
+    assert destino.tablas["fact_anotacion"][137] == (137, 18, 137, 2, 1)
+    assert 1500 not in destino.tablas["fact_anotacion"]
+    assert destino.tablas["fact_anotacion"] == origen.tablas["fact_anotacion"]
+
+    # Ya iguales: la siguiente corrida sólo compara la raíz
+    e = reconciliacion.run(["fact_anotacion"])["entidades"]["fact_anotacion"]
+    assert (e["revisados"], e["reparados"]) == (1, 0)
+
+
+def test_partido_borrado_y_editado():
+    origen, destino = _bases()
+    del origen.tablas["dim_partido"][5]
+    origen.tablas["fact_anotacion"] = {k: v for k, v in origen.tablas["fact_anotacion"].items() if v[1] != 5}
+    origen.tablas["bridge_roster_partido"] = {
+        k: v for k, v in origen.tablas["bridge_roster_partido"].items() if v[1] != 5
+    }
+    fila = list(origen.tablas["dim_partido"][9])
+    fila[9] = None                                                # sede quitada
+    origen.tablas["dim_partido"][9] = tuple(fila)
+    origen.tablas["bridge_roster_partido"][3] = (3, 2, 2, 3, True)  # ahora titular
+
+    reporte = _reconciliacion(origen, destino).run()
+    partidos = reporte["entidades"]["dim_partido"]
+    assert (partidos["upserts"], partidos["borrados"]) == (1, 1)
+    assert 5 not in destino.tablas["dim_partido"] and destino.tablas["dim_partido"][9][9] is None
+    assert all(f[1] != 5 for f in destino.tablas["fact_anotacion"].values())
+    assert destino.tablas["bridge_roster_partido"][3][4] == 1
+    assert reporte["entidades"]["fact_anotacion"]["reparados"] == 0  # ya se quitaron con el partido
+    assert _reconciliacion(origen, destino).run()["reparados"] == 0
+
+
+def test_respeta_la_marca_de_agua():
+    """Las filas posteriores a sync_state son del ETL: no se comparan ni se cargan"""
+    origen, destino = _bases()
+    origen.tablas["fact_anotacion"][2001] = (2001, 1, None, 1, 2)
+    reporte = _reconciliacion(origen, destino).run(["fact_anotacion"])
+    assert reporte["reparados"] == 0 and 2001 not in destino.tablas["fact_anotacion"]
+
+
+def main():
+    print("🚀 Pruebas de la reconciliación de mb_report")
+    print("=" * 50)
+    for test in (test_sin_diferencias_solo_la_raiz, test_baja_solo_por_rangos_distintos,
+                 test_partido_borrado_y_editado, test_respeta_la_marca_de_agua):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
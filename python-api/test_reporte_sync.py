@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Pruebas del ETL incremental a mb_report (ReporteSync)
+
+Usa un SQL Server falso (tablas en memoria que responden a las sentencias etl.*) y
+un MySQL falso (tablas por clave primaria, upserts y sync_state). Comprueba que la
+primera sincronización carga todo en tramos acotados, que las siguientes sólo leen
+las filas nuevas según la marca de agua de sync_state, que los partidos abiertos se
+releen con su roster (estados, bajas y partidos borrados), que equipos y jugadores se
+releen completos sin que un dorsal reutilizado pise a otro jugador, que un corte a mitad de
+carga se reintenta desde el último tramo confirmado, y que las entidades extraen en
+paralelo y cargan en orden de dependencias (omitiendo las que dependen de una fallida),
+también con menos workers que entidades.
+No necesita SQL Server ni MySQL.
+
+Ejecutar con ``python test_reporte_sync.py`` o con pytest.
+"""
+import re
+import threading
+import time
+from datetime import datetime
+
+from app.data.pool import ConnectionPool
+from app.data.reporte_sync import ENTIDADES, ReporteSync
+
+FECHA = datetime(2025, 10, 1, 18, 30)
+
+ORIGEN = {
+    "Equipo": "dim_equipo",
+    "Jugador": "dim_jugador",
+    "Partido": "dim_partido",
+    "RosterPartido": "bridge_roster_partido",
+    "Anotacion": "fact_anotacion",
+}
+
+
+class FakeSqlServer:
+    """Filas de origen por tabla (ordenadas por clave)"""
+
+    def __init__(self, demora=0.0):
+        self.tablas = {tabla: {} for tabla in ORIGEN}
+        self.filas_leidas = 0
+        self.demora = demora
+        self.en_curso = self.max_en_curso = 0
+        self._lock = threading.Lock()
+
+    def query(self, sql, params):
+        with self._lock:
+            self.en_curso += 1
+            self.max_en_curso = max(self.max_en_curso, self.en_curso)
+        time.sleep(self.demora)
+        with self._lock:
+            self.en_curso -= 1
+        tabla = re.search(r"FROM dbo\.(\w+)", sql).group(1)
+        filas = [self.tablas[tabla][k] for k in sorted(self.tablas[tabla])]
+        if "IN (" in sql:
+            ids = set(params)
+            filas = [f for f in filas if (f[0] if tabla == "Partido" else f[1]) in ids]
+        else:
+            top, desde = params
+            filas = [f for f in filas if f[0] > desde][:top]
+        self.filas_leidas += len(filas)
+        return filas
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.description = None
+        self.rowcount = 0
+        self._rows = []
+
+    def setinputsizes(self, sizes):
+        pass
+
+    def execute(self, sql, params=()):
+        self._rows = self.db.query(sql, params)
+        return self
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self):
+        return FakeCursor(self.db)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class FakeMySql:
+    """Tablas de mb_report por clave primaria; los cambios de cada conexión se ven al hacer commit.
+
+    ``uq_equipo_dorsal`` se respeta como en MySQL: un upsert que choca con esa clave
+    actualiza la fila que la ocupa en vez de insertar.
+    """
+
+    def __init__(self, fallas=None):
+        self.tablas = {entidad.nombre: {} for entidad in ENTIDADES}
+        self.sync_state = {}
+        self.upserts = 0
+        # entidad -> [tramo que falla, veces]: simula cortes al confirmar ese tramo
+        self.fallas = fallas or {}
+        self.tramos = {}
+        self.commits = []  # entidad de cada tramo confirmado, en orden
+        self._lock = threading.Lock()
+
+    def connect(self):
+        return FakeMySqlConnection(self)
+
+
+class FakeMySqlConnection:
+    def __init__(self, db):
+        self.db = db
+        self.pendiente = []
+        self.entidad = None
+
+    def cursor(self):
+        return FakeMySqlCursor(self)
+
+    def commit(self):
+        db, entidad = self.db, self.entidad
+        pendiente, self.pendiente, self.entidad = self.pendiente, [], None
+        with db._lock:
+            if entidad is not None:
+                tramo = db.tramos.get(entidad, 0) + 1
+                falla = db.fallas.get(entidad)
+                if falla and falla[0] == tramo and falla[1] > 0:
+                    falla[1] -= 1
+                    raise ConnectionError("conexión perdida")
+                db.tramos[entidad] = tramo
+                db.commits.append(entidad)
+            for cambio in pendiente:
+                cambio()
+
+    def close(self):
+        self.pendiente.clear()
+
+
+class FakeMySqlCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.db = conn.db
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        db = self.db
+        if "GET_LOCK" in sql:
+            self._rows = [(1,)]
+        elif "RELEASE_LOCK" in sql:
+            self._rows = [(1,)]
+        elif sql.startswith("SELECT entity"):
+            self._rows = [(k,) + v for k, v in db.sync_state.items()]
+        elif sql.startswith("SELECT partido_id FROM dim_partido"):
+            self._rows = [(k,) for k, v in db.tablas["dim_partido"].items() if v[4] in params]
+        elif sql.startswith("INSERT INTO sync_state"):
+            entidad, last_id, last_ts = params
+
+            def marca():
+                anterior = db.sync_state.get(entidad, (0, None))[0]
+                db.sync_state[entidad] = (max(anterior, last_id), last_ts)
+            self.conn.entidad = entidad
+            self.conn.pendiente.append(marca)
+        elif sql.startswith("DELETE FROM"):
+            tabla = sql.split()[2]
+            ids = set(params)
+
+            def borrar():
+                for k, v in list(db.tablas[tabla].items()):
+                    if (k if tabla == "dim_partido" else v[1]) in ids:
+                        del db.tablas[tabla][k]
+            self.conn.pendiente.append(borrar)
+        else:
+            raise AssertionError(f"sentencia inesperada: {sql}")
+
+    def executemany(self, sql, seq_of_params):
+        db = self.db
+        filas = [tuple(p) for p in seq_of_params]
+        if sql.startswith("UPDATE dim_jugador SET dorsal = NULL"):
+            def liberar():
+                for equipo, dorsal, jugador in filas:
+                    for k, v in list(db.tablas["dim_jugador"].items()):
+                        if (v[1], v[4]) == (equipo, dorsal) and k != jugador:
+                            db.tablas["dim_jugador"][k] = v[:4] + (None,) + v[5:]
+            self.conn.pendiente.append(liberar)
+            return
+        tabla = re.match(r"INSERT INTO (\w+)", sql).group(1)
+        assert "ON DUPLICATE KEY UPDATE" in sql
+        db.upserts += 1
+
+        def upsert():
+            for f in filas:
+                clave = f[0]
+                if tabla == "dim_jugador" and clave not in db.tablas[tabla] and f[4] is not None:
+                    # Choca con uq_equipo_dorsal: MySQL actualiza la fila que ya la ocupa
+                    clave = next((k for k, v in db.tablas[tabla].items() if (v[1], v[4]) == (f[1], f[4])), clave)
+                db.tablas[tabla][clave] = (clave,) + f[1:]
+        self.conn.pendiente.append(upsert)
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+
+def _origen(partidos=3, anotaciones=25):
+    db = FakeSqlServer()
+    db.tablas["Equipo"] = {i: (i, f"Equipo {i}", "Guatemala", f"E{i}", True, FECHA) for i in (1, 2)}
+    db.tablas["Jugador"] = {
+        i: (i, 1 + i % 2, f"Nombre {i}", f"Apellido {i}", i, "Base", 180, 25, "Guatemalteca", True)
+        for i in range(1, 11)
+    }
+    for p in range(1, partidos + 1):
+        _partido(db, p, "finalizado")
+    db.tablas["RosterPartido"] = {i: (i, 1, 1 + i % 2, i, i <= 5) for i in range(1, 11)}
+    for i in range(1, anotaciones + 1):
+        db.tablas["Anotacion"][i] = (i, 1 + i % partidos, None, 1 + i % 2, 2)
+    return db
+
+
+def _partido(db, partido_id, estado):
+    db.tablas["Partido"][partido_id] = (partido_id, 1, 2, FECHA, estado, 10, 4, 5, 5, "Cancha", FECHA)
+
+
+def _sync(origen, destino, chunk=10, retries=2, workers=None):
+    return ReporteSync(pool=ConnectionPool(factory=lambda: FakeConnection(origen), max_size=10),
+                       mysql_connect=destino.connect, chunk_size=chunk, lookback=0, retries=retries,
+                       retry_backoff=0, workers=workers)
+
+
+def test_carga_inicial_y_solo_cambios():
+    """La primera corrida carga todo en tramos; las siguientes sólo leen lo nuevo"""
+    origen, destino = _origen(), FakeMySql()
+    sync = _sync(origen, destino)
+    reporte = sync.run()
+    assert {k: e["filas"] for k, e in reporte["entidades"].items()} == {
+        "dim_equipo": 2, "dim_jugador": 10, "dim_partido": 3, "bridge_roster_partido": 10, "fact_anotacion": 25,
+    }
+    assert reporte["entidades"]["fact_anotacion"]["tramos"] == 3  # 10 + 10 + 5
+    assert len(destino.tablas["fact_anotacion"]) == 25
+    assert destino.sync_state["fact_anotacion"][0] == 25
+    assert destino.tablas["dim_equipo"][1][4] == 1  # BIT -> TINYINT(1)
+
+    # Sin cambios: sólo se releen equipos y jugadores (completos)
+    origen.filas_leidas = 0
+    assert sync.run()["filas"] == 12
+    assert origen.filas_leidas == 12
+
+    # Tres anotaciones y un partido nuevos: sólo esas filas se leen y se escriben
+    for i in range(26, 29):
+        origen.tablas["Anotacion"][i] = (i, 1, None, 1, 3)
+    _partido(origen, 4, "finalizado")
+    origen.filas_leidas = 0
+    reporte = sync.run()
+    assert reporte["filas"] == 12 + 4 and origen.filas_leidas == 12 + 4
+    assert reporte["entidades"]["fact_anotacion"]["lastId"] == 28
+    assert len(destino.tablas["fact_anotacion"]) == 28
+
+
+def test_partidos_abiertos_se_releen():
+    """Los partidos abiertos en mb_report se actualizan con su roster; los borrados se quitan"""
+    origen, destino = _origen(partidos=2), FakeMySql()
+    _partido(origen, 1, "en_curso")
+    _partido(origen, 2, "programado")
+    sync = _sync(origen, destino)
+    sync.run()
+
+    _partido(origen, 1, "finalizado")                          # cambió el estado
+    del origen.tablas["RosterPartido"][3]                      # baja del roster
+    origen.tablas["RosterPartido"][4] = (4, 1, 1, 4, False)    # cambio de titular
+    del origen.tablas["Partido"][2]                            # partido borrado
+    origen.tablas["Anotacion"] = {k: v for k, v in origen.tablas["Anotacion"].items() if v[1] != 2}
+    reporte = sync.run()
+
+    assert reporte["abiertos"] == {"partidos": 1, "roster": 9, "borrados": 1, "ms": reporte["abiertos"]["ms"]}
+    assert destino.tablas["dim_partido"][1][4] == "finalizado"
+    assert 2 not in destino.tablas["dim_partido"]
+    assert 3 not in destino.tablas["bridge_roster_partido"]
+    assert destino.tablas["bridge_roster_partido"][4][4] == 0
+    assert all(f[1] != 2 for f in destino.tablas["fact_anotacion"].values())
+
+    # Ya no queda ninguno abierto: no se relee nada más que equipos y jugadores
+    origen.filas_leidas = 0
+    assert sync.run()["abiertos"]["partidos"] == 0 and origen.filas_leidas == 12
+
+
+def test_dorsal_reutilizado_y_cambios_en_dimensiones():
+    """Un jugador nuevo con el dorsal que dejó otro no pisa su fila; renombres y traspasos llegan"""
+    origen, destino = _origen(), FakeMySql()
+    sync = _sync(origen, destino, chunk=4)
+    sync.run()
+    assert destino.tablas["dim_jugador"][3][1] == 2 and destino.tablas["dim_jugador"][3][4] == 3
+
+    jugador = origen.tablas["Jugador"]
+    jugador[3] = jugador[3][:4] + (30,) + jugador[3][5:]                           # cambia de dorsal
+    jugador[11] = (11, 2, "Nuevo", "Jugador", 3, "Alero", 190, 22, "Guatemalteca", True)  # toma el 3
+    jugador[5] = jugador[5][:1] + (1,) + jugador[5][2:4] + (3,) + jugador[5][5:]   # traspaso al equipo 1
+    origen.tablas["Equipo"][1] = (1, "Equipo Uno", "Quetzaltenango", "E1", False, FECHA)
+    sync.run()
+
+    jugadores = destino.tablas["dim_jugador"]
+    assert len(jugadores) == 11
+    assert jugadores[3][2:5] == ("Nombre 3", "Apellido 3", 30)
+    assert jugadores[11][2:5] == ("Nuevo", "Jugador", 3)
+    assert jugadores[5][1] == 1 and jugadores[5][4] == 3
+    assert destino.tablas["dim_equipo"][1][1:3] == ("Equipo Uno", "Quetzaltenango")
+    assert destino.tablas["dim_equipo"][1][4] == 0
+
+
+def test_corte_se_reintenta_desde_ultimo_tramo():
+    """Un corte al confirmar un tramo se reintenta sólo en esa entidad, desde el último confirmado"""
+    origen = _origen(partidos=1, anotaciones=45)
+    destino = FakeMySql(fallas={"fact_anotacion": [3, 1]})
+    sync = _sync(origen, destino)
+    reporte = sync.run()
+    e = reporte["entidades"]["fact_anotacion"]
+    assert (e["intentos"], e["filas"], e["lastId"]) == (2, 45, 45)
+    assert reporte["entidades"]["dim_jugador"]["intentos"] == 1
+    assert len(destino.tablas["fact_anotacion"]) == 45 and sync.errors == 0
+    assert origen.filas_leidas == 2 + 10 + 1 + 10 + 45 + 25  # el reintento relee desde la anotación 20
+
+
+def test_falla_omite_dependientes():
+    """Si una dimensión agota sus reintentos, las demás cargan y puente y hechos se omiten"""
+    origen = _origen(partidos=1, anotaciones=45)
+    destino = FakeMySql(fallas={"dim_partido": [1, 9]})
+    sync = _sync(origen, destino, retries=1)
+    try:
+        sync.run()
+        raise AssertionError("la corrida debía fallar")
+    except ConnectionError:
+        pass
+    assert sync.errors == 1
+    assert len(destino.tablas["dim_jugador"]) == 10 and destino.tablas["fact_anotacion"] == {}
+    assert "fact_anotacion" not in destino.sync_state and "dim_partido" not in destino.sync_state
+
+    destino.fallas.clear()
+    reporte = sync.run()
+    assert reporte["entidades"]["fact_anotacion"]["filas"] == 45
+
+
+def test_extrae_en_paralelo_y_carga_en_orden():
+    """Las extracciones se solapan; puente y hechos cargan después de las dimensiones"""
+    origen = _origen(partidos=3, anotaciones=40)
+    origen.demora = 0.02
+    destino = FakeMySql()
+    reporte = _sync(origen, destino).run()
+    assert origen.max_en_curso >= 3
+    dims = [i for i, entidad in enumerate(destino.commits) if entidad.startswith("dim_")]
+    hechos = [i for i, entidad in enumerate(destino.commits) if not entidad.startswith("dim_")]
+    assert max(dims) < min(hechos)
+    e = reporte["entidades"]["fact_anotacion"]
+    assert e["esperaMs"] > 0 and e["extraerMs"] > 0 and e["cargarMs"] >= 0
+    # El tiempo total se acerca al de la entidad más lenta, no a la suma
+    assert reporte["ms"] < sum(x["extraerMs"] for x in reporte["entidades"].values())
+
+
+def test_pocos_workers_no_se_traban():
+    """Con menos workers que entidades, una extracción con la cola llena no bloquea a sus dependencias"""
+    for corrida in range(5):
+        origen = _origen(partidos=3, anotaciones=40)
+        origen.demora = 0.002
+        # El reintento de hechos vuelve a extraer mientras otras esperan con la cola llena
+        destino = FakeMySql(fallas={"fact_anotacion": [2, 1]} if corrida % 2 else {})
+        sync = _sync(origen, destino, chunk=2, workers=1 + corrida % 2)
+        sync.prefetch = 1
+        resultado = []
+        hilo = threading.Thread(target=lambda: resultado.append(sync.run()), daemon=True)
+        hilo.start()
+        hilo.join(timeout=20)
+        assert not hilo.is_alive(), f"la corrida {corrida} con workers={sync.workers} se trabó"
+        assert resultado[0]["entidades"]["fact_anotacion"]["filas"] == 40
+        assert len(destino.tablas["bridge_roster_partido"]) == 10
+        assert origen.max_en_curso <= sync.workers
+
+
+def main():
+    print("🚀 Pruebas del ETL incremental a mb_report")
+    print("=" * 50)
+    for test in (test_carga_inicial_y_solo_cambios, test_partidos_abiertos_se_releen,
+                 test_dorsal_reutilizado_y_cambios_en_dimensiones, test_corte_se_reintenta_desde_ultimo_tramo,
+                 test_falla_omite_dependientes,
+                 test_extrae_en_paralelo_y_carga_en_orden, test_pocos_workers_no_se_traban):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la API de reportes sobre las vistas de mb_report (/api/reportes)
+
+Usa SQLite en memoria con tablas y vistas del mismo nombre y columnas que las de
+mb_report. Comprueba la paginación por keyset (sin saltos ni repetidos, con filtros
+y cursores ajenos rechazados), la exportación NDJSON y CSV en streaming y que la
+memoria de la exportación no crece con el número de filas.
+No necesita MySQL.
+
+Ejecutar con ``python test_reportes_api.py`` o con pytest.
+"""
+import csv
+import io
+import json
+import tracemalloc
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.controllers import reporte_controller
+from app.data.reporte_vistas import VISTAS, exportar
+from app.database import get_mysql_db
+
+
+def _engine(anotaciones=1000):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE vw_report_equipos (equipo_id INTEGER, nombre TEXT, ciudad TEXT, "
+                          "abreviatura TEXT, logo TEXT, activo INTEGER, fecha_creacion TEXT)"))
+        conn.execute(text("CREATE TABLE vw_report_roster (partido_id INTEGER, equipo TEXT, jugador TEXT, "
+                          "dorsal INTEGER, posicion TEXT, tipo TEXT, roster_id INTEGER)"))
+        for i in range(1, 26):
+            conn.execute(text("INSERT INTO vw_report_equipos VALUES (:i, :n, 'Guatemala', :a, NULL, :act, "
+                              "'2025-10-01 18:30:00')"), {"i": i, "n": f"Equipo {i}", "a": f"E{i}", "act": i % 5 != 0})
+        for i in range(1, 41):
+            conn.execute(text("INSERT INTO vw_report_roster VALUES (:p, 'Equipo 1', :j, :i, 'Base', 'Local', :i)"),
+                         {"p": 1 + i % 2, "j": f"Jugador, {i}", "i": i})
+        # fact_anotacion generada al vuelo: no ocupa memoria de Python al crearla
+        conn.execute(text(f"""
+            CREATE VIEW fact_anotacion AS
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {anotaciones})
+            SELECT i AS anotacion_id, 1 + i % 50 AS partido_id, NULL AS cuarto_id,
+                   1 + i % 2 AS equipo_id, 1 + i % 3 AS puntos
+            FROM n
+        """))
+    return engine
+
+
+def _client(engine):
+    Session = sessionmaker(bind=engine)
+
+    def db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(reporte_controller.router, prefix="/api/reportes")
+    app.dependency_overrides[get_mysql_db] = db
+    reporte_controller.MySQLSessionLocal = Session
+    return TestClient(app)
+
+
+def test_paginacion_keyset():
+    client = _client(_engine())
+    ids, cursor, paginas = [], None, 0
+    while True:
+        params = {"limit": 10}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get("/api/reportes/equipos", params=params)
+        assert r.status_code == 200
+        ids += [fila["equipo_id"] for fila in r.json()]
+        paginas += 1
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert ids == list(range(1, 26)) and paginas == 3
+
+    r = client.get("/api/reportes/roster", params={"partido_id": 2, "limit": 100})
+    assert [f["roster_id"] for f in r.json()] == list(range(1, 41, 2))
+    assert r.json()[0]["jugador"] == "Jugador, 1"
+
+    assert client.get("/api/reportes/roster", params={"sede": "x"}).status_code == 400
+    assert client.get("/api/reportes/equipos", params={"cursor": "no-es-un-cursor"}).status_code == 400
+    otro = "eyJ2IjoiZXF1aXBvcyIsImsiOjV9"  # {"v":"equipos","k":5}: cursor de otro reporte
+    assert client.get("/api/reportes/roster", params={"cursor": otro}).status_code == 400
+    assert client.get("/api/reportes/roster", params={"partido_id": "uno"}).status_code == 400
+    assert client.get("/api/reportes/no-existe").status_code == 404
+
+
+def test_exportacion_ndjson_y_csv():
+    client = _client(_engine(anotaciones=2500))
+    r = client.get("/api/reportes/anotaciones/export", params={"partido_id": 7})
+    assert r.headers["content-type"] == "application/x-ndjson"
+    filas = [json.loads(linea) for linea in r.text.splitlines()]
+    assert len(filas) == 50 and filas[0] == {
+        "anotacion_id": 6, "partido_id": 7, "cuarto_id": None, "equipo_id": 1, "puntos": 1,
+    }
+
+    r = client.get("/api/reportes/roster/export", params={"formato": "csv"})
+    assert r.headers["content-type"].startswith("text/csv")
+    assert 'filename="roster.csv"' in r.headers["content-disposition"]
+    filas = list(csv.reader(io.StringIO(r.text)))
+    assert filas[0] == ["partido_id", "equipo", "jugador", "dorsal", "posicion", "tipo", "roster_id"]
+    assert len(filas) == 41 and filas[1][2] == "Jugador, 1"
+
+    assert client.get("/api/reportes/roster/export", params={"formato": "xml"}).status_code == 422
+
+
+def _pico_exportando(engine):
+    tracemalloc.start()
+    try:
+        total = 0
+        for bloque in exportar(sessionmaker(bind=engine), VISTAS["anotaciones"], {}, "ndjson", 1000):
+            total += bloque.count(b"\n")
+        return total, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_memoria_plana_al_exportar():
+    """La memoria pico no crece con las filas exportadas (cursor del servidor y bloques)"""
+    filas_chico, pico_chico = _pico_exportando(_engine(anotaciones=20000))
+    filas_grande, pico_grande = _pico_exportando(_engine(anotaciones=200000))
+    assert (filas_chico, filas_grande) == (20000, 200000)
+    assert pico_grande < 2 * pico_chico + 256 * 1024
+
+
+def main():
+    print("🚀 Pruebas de la API de reportes")
+    print("=" * 50)
+    for test in (test_paginacion_keyset, test_exportacion_ndjson_y_csv, test_memoria_plana_al_exportar):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Pruebas del protocolo de marcador en vivo (Scoreboard / ScoreboardHub, WebSocket y SSE)
+
+Usa un WebSocket falso y el broker en proceso. Comprueba que el cliente recibe
+primero la foto y después parches con ``s`` consecutivo, que varios ``update()``
+dentro de la misma ventana de tick salen en un solo parche con ``s + 1``, que un
+cliente que pierde parches ve el hueco en ``s`` y con ``{"t": "r"}`` recibe una foto
+nueva, y que ``since()`` sólo reanuda mientras el historial alcanza. Del stream SSE
+comprueba el preámbulo ``retry:``, el comentario ``: ping`` sin cambios, la
+reanudación con ``Last-Event-ID`` (misma instancia: parches perdidos; otra: foto) y
+que ``min_interval`` funde los parches en uno con la base ``b``.
+No necesita SQL Server.
+
+Ejecutar con ``python test_scoreboard.py`` o con pytest.
+"""
+import asyncio
+import json
+import time
+
+from fastapi import WebSocketDisconnect
+
+from app.realtime.broker import InProcessBroker
+from app.realtime.manager import ChannelManager
+from app.realtime.scoreboard import Frame, Scoreboard, ScoreboardHub, merge_patches
+
+ESTADO = {"estado": "en_curso", "puntos_local": 10, "puntos_visitante": 8, "cuarto": 2}
+
+
+class FakeWebSocket:
+    """Guarda lo enviado; con ``libre`` sin marcar el envío queda colgado como en un cliente lento"""
+
+    def __init__(self):
+        self.enviados = []
+        self.entrantes = asyncio.Queue()
+        self.libre = asyncio.Event()
+        self.libre.set()
+        self.cerrado = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await self.libre.wait()
+        self.enviados.append(json.loads(text))
+
+    async def receive_text(self):
+        text = await self.entrantes.get()
+        if text is None:
+            raise WebSocketDisconnect()
+        return text
+
+    async def close(self, code=1000):
+        self.cerrado = code
+
+
+async def _esperar(condicion, timeout=2.0):
+    limite = time.monotonic() + timeout
+    while not condicion():
+        assert time.monotonic() < limite, "no se cumplió a tiempo"
+        await asyncio.sleep(0.005)
+
+
+def _hub(tick=0.02, manager=None):
+    async def loader(partido_id):
+        return dict(ESTADO) if partido_id == 1 else None
+
+    return ScoreboardHub(loader, manager=manager, tick=tick, refresh_interval=30, broker=InProcessBroker())
+
+
+def test_flush_solo_lo_que_cambio():
+    board = Scoreboard(1, ESTADO, history=4)
+    assert board.snapshot().body == {"t": "s", "p": 1, "s": 0, "d": {"e": "en_curso", "sl": 10, "sv": 8, "q": 2}}
+    board.stage({"puntos_local": 12, "cuarto": 2})
+    board.stage({"puntos_local": 13})                     # el último valor de cada campo gana
+    assert board.flush().body == {"t": "p", "s": 1, "d": {"sl": 13}}
+    board.stage({"puntos_local": 13})
+    assert board.flush() is None and board.seq == 1     # sin cambios reales no hay frame
+
+
+def test_since_en_el_borde_del_historial():
+    board = Scoreboard(1, ESTADO, history=3)
+    for puntos in range(11, 16):                         # seq 1..5; el historial guarda 3, 4 y 5
+        board.stage({"puntos_local": puntos})
+        board.flush()
+    eid = board.event_id
+
+    assert [f.seq for f in board.since(eid(2))] == [3, 4, 5]   # el primero del historial es seq + 1
+    assert board.since(eid(1)) is None                          # falta el 2: hace falta una foto
+    assert [f.seq for f in board.since(eid(4))] == [5]
+    assert board.since(eid(5)) == []
+    assert board.since(eid(6)) is None                          # secuencia del futuro
+    assert board.since(f"otraepoc-{board.seq}") is None         # otra instancia / otro worker
+    assert board.since(f"{board.epoch}-x") is None and board.since(None) is None and board.since("") is None
+
+    sin_historial = Scoreboard(1, ESTADO)
+    sin_historial.stage({"puntos_local": 11})
+    sin_historial.flush()
+    assert sin_historial.since(sin_historial.event_id(0)) is None
+
+
+def test_merge_patches():
+    frames = [Frame({"t": "p", "s": 4, "d": {"sl": 12, "q": 3}}), Frame({"t": "p", "s": 5, "d": {"sl": 14}})]
+    assert merge_patches(3, frames).body == {"t": "p", "s": 5, "b": 3, "d": {"sl": 14, "q": 3}}
+
+
+def test_foto_y_parches_agrupados_por_tick():
+    async def run():
+        hub = _hub(tick=0.05)
+        ws = FakeWebSocket()
+        servir = asyncio.create_task(hub.serve(ws, 1))
+        await _esperar(lambda: len(ws.enviados) == 1)
+        foto = ws.enviados[0]
+        assert foto["t"] == "s" and foto["s"] == 0 and foto["d"]["sl"] == 10
+
+        hub.update(1, {"puntos_local": 12})
+        hub.update(1, {"puntos_local": 14, "faltas_local": 1})
+        hub.update(1, {"puntos_visitante": 8})          # no cambia: no viaja
+        await _esperar(lambda: len(ws.enviados) == 2)
+        await asyncio.sleep(0.1)
+        assert ws.enviados[1] == {"t": "p", "s": foto["s"] + 1, "d": {"sl": 14, "fl": 1}}
+        assert len(ws.enviados) == 2
+        assert (hub.updates, hub.patches, hub.stats()["coalesced"]) == (3, 1, 2)
+
+        hub.update(1, {"cuarto": 3})
+        await _esperar(lambda: len(ws.enviados) == 3)
+        assert ws.enviados[2] == {"t": "p", "s": 2, "d": {"q": 3}}
+
+        ws.entrantes.put_nowait(None)
+        await servir
+        assert hub.manager.subscribers(1) == 0
+        hub.close()
+
+    asyncio.run(run())
+
+
+def test_hueco_en_la_secuencia_y_resync():
+    """Un cliente lento pierde parches (drop_oldest), ve el salto en ``s`` y pide una foto"""
+    async def run():
+        hub = _hub(tick=0.001, manager=ChannelManager(max_queue=1, overflow="drop_oldest", send_timeout=5))
+        ws = FakeWebSocket()
+        ws.libre.clear()                                  # la foto queda colgada en el envío
+        servir = asyncio.create_task(hub.serve(ws, 1))
+        await _esperar(lambda: hub.manager.subscribers(1) == 1)
+        await asyncio.sleep(0.01)
+        for puntos in (12, 14, 16):
+            hub.update(1, {"puntos_local": puntos})
+            await asyncio.sleep(0.01)                     # un tick por cambio: tres parches
+        ws.libre.set()
+        await _esperar(lambda: len(ws.enviados) == 2)
+
+        foto, parche = ws.enviados
+        assert foto["t"] == "s" and foto["s"] == 0
+        assert parche["t"] == "p" and parche["s"] == 3   # se perdieron el 1 y el 2
+        assert parche["s"] != foto["s"] + 1              # el cliente detecta el hueco...
+        ws.entrantes.put_nowait(json.dumps({"t": "r"}))  # ...y pide una foto
+        await _esperar(lambda: len(ws.enviados) == 3)
+        assert ws.enviados[2] == {"t": "s", "p": 1, "s": 3,
+                                  "d": {"e": "en_curso", "sl": 16, "sv": 8, "q": 2}}
+        assert hub.resyncs == 1 and hub.snapshots == 2
+
+        ws.entrantes.put_nowait("no es json")             # se ignora
+        ws.entrantes.put_nowait(None)
+        await servir
+        hub.close()
+
+    asyncio.run(run())
+
+
+def test_partido_inexistente_cierra():
+    async def run():
+        hub = _hub()
+        ws = FakeWebSocket()
+        await hub.serve(ws, 99)
+        assert ws.cerrado == 4404 and ws.enviados == []
+
+    asyncio.run(run())
+
+
+def _evento(texto):
+    """Campos de un evento SSE (``id``, ``event``, ``data`` ya decodificado)"""
+    campos = dict(linea.split(": ", 1) for linea in texto.strip().split("\n"))
+    if "data" in campos:
+        campos["data"] = json.loads(campos["data"])
+    return campos
+
+
+def _parche(hub, board, **cambios):
+    """Un parche por llamada, publicado en el canal como lo haría el tick"""
+    board.stage(cambios)
+    hub.manager.publish(board.partido_id, board.flush())
+
+
+def test_sse_retry_foto_y_ping():
+    async def run():
+        hub = _hub()
+        hub.sse_heartbeat = 0.05
+        board = await hub.board(1)
+        stream = hub.stream(board, min_interval=0)
+        assert await stream.__anext__() == "retry: 3000\n\n"
+        foto = _evento(await stream.__anext__())
+        assert foto["id"] == f"{board.epoch}-0" and foto["event"] == "snapshot"
+        assert foto["data"]["t"] == "s" and foto["data"]["d"]["sl"] == 10
+
+        inicio = time.monotonic()
+        assert await stream.__anext__() == ": ping\n\n"   # sin cambios: comentario de keep-alive
+        assert time.monotonic() - inicio >= 0.04
+
+        _parche(hub, board, puntos_local=12)
+        parche = _evento(await stream.__anext__())
+        assert parche["id"] == f"{board.epoch}-1" and parche["event"] == "patch"
+        assert parche["data"] == {"t": "p", "s": 1, "d": {"sl": 12}}
+        assert hub.sse_streams == 1
+
+        await stream.aclose()
+        assert hub.sse_streams == 0 and hub.manager.subscribers(1) == 0
+        hub.close()
+
+    asyncio.run(run())
+
+
+def test_sse_reanuda_con_last_event_id():
+    async def run():
+        hub = _hub()
+        board = await hub.board(1)
+        for puntos in (12, 14, 16):
+            _parche(hub, board, puntos_local=puntos)
+
+        stream = hub.stream(board, board.event_id(1), min_interval=0)
+        assert await stream.__anext__() == "retry: 3000\n\n"
+        perdidos = [_evento(await stream.__anext__()) for _ in range(2)]
+        assert [e["id"] for e in perdidos] == [board.event_id(2), board.event_id(3)]
+        assert [e["data"]["d"] for e in perdidos] == [{"sl": 14}, {"sl": 16}]
+        assert hub.sse_resumes == 1 and hub.snapshots == 0
+        _parche(hub, board, cuarto=3)
+        assert _evento(await stream.__anext__())["data"] == {"t": "p", "s": 4, "d": {"q": 3}}
+        await stream.aclose()
+
+        # Id de otra instancia (otro worker o carga anterior): foto, no parches
+        stream = hub.stream(board, "0badf00d-2", min_interval=0)
+        await stream.__anext__()
+        foto = _evento(await stream.__anext__())
+        assert foto["event"] == "snapshot" and foto["id"] == board.event_id(4)
+        assert foto["data"]["d"]["sl"] == 16 and foto["data"]["d"]["q"] == 3
+        assert hub.sse_resumes == 1 and hub.snapshots == 1
+        await stream.aclose()
+        hub.close()
+
+    asyncio.run(run())
+
+
+def test_sse_min_interval_funde_con_base():
+    async def run():
+        hub = _hub()
+        board = await hub.board(1)
+        stream = hub.stream(board, min_interval=0.2)
+        await stream.__anext__()
+        await stream.__anext__()                          # foto con s = 0
+
+        inicio = time.monotonic()
+        _parche(hub, board, puntos_local=12)
+        _parche(hub, board, puntos_local=14, faltas_local=1)
+        _parche(hub, board, cuarto=3)
+        fundido = _evento(await stream.__anext__())
+        assert time.monotonic() - inicio >= 0.15           # esperó al intervalo mínimo
+        assert fundido["id"] == board.event_id(3)
+        assert fundido["data"] == {"t": "p", "s": 3, "b": 0, "d": {"sl": 14, "fl": 1, "q": 3}}
+
+        _parche(hub, board, puntos_local=16)              # uno solo: sale tal cual, sin ``b``
+        assert _evento(await stream.__anext__())["data"] == {"t": "p", "s": 4, "d": {"sl": 16}}
+        await stream.aclose()
+        hub.close()
+
+    asyncio.run(run())
+
+
+def main():
+    print("🚀 Pruebas del protocolo de marcador en vivo")
+    print("=" * 50)
+    for test in (test_flush_solo_lo_que_cambio, test_since_en_el_borde_del_historial, test_merge_patches,
+                 test_foto_y_parches_agrupados_por_tick, test_hueco_en_la_secuencia_y_resync,
+                 test_partido_inexistente_cierra, test_sse_retry_foto_y_ping, test_sse_reanuda_con_last_event_id,
+                 test_sse_min_interval_funde_con_base):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Pruebas del catálogo de sentencias SQL (StatementCatalog)
+
+Usa un cursor falso que registra ``setinputsizes`` y ``execute``. Comprueba que
+los parámetros se enlazan con los tipos declarados (o los indicados en la llamada),
+que ``parts`` completa las plantillas, que se cuentan llamadas, errores, filas y
+latencia por sentencia, y que /start envía a partido.crear una fecha y no un texto
+ISO (el driver rechaza la ``T`` al convertir a SQL_TYPE_TIMESTAMP).
+No necesita SQL Server.
+
+Ejecutar con ``python test_statements.py`` o con pytest.
+"""
+from datetime import datetime
+
+import pyodbc
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.controllers import partido_controller
+from app.data.queries import catalog
+from app.data.statements import DATETIME2, INT, LATENCY_BUCKETS_MS, NVARCHAR, StatementCatalog
+from app.dependencies import get_async_partido_data_access
+
+
+class FakeCursor:
+    def __init__(self, filas=(), falla=False):
+        self.filas = list(filas)
+        self.falla = falla
+        self.log = []
+        self.rowcount = -1
+        self._rows = []
+
+    def setinputsizes(self, sizes):
+        self.log.append(("sizes", sizes))
+
+    def execute(self, sql, params=()):
+        self.log.append(("execute", sql, params))
+        if self.falla:
+            raise pyodbc.Error("42000", "error de prueba")
+        self._rows = list(self.filas)
+        self.rowcount = len(self._rows)
+        return self
+
+    def executemany(self, sql, seq):
+        self.log.append(("executemany", sql, len(seq)))
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+
+def test_enlaza_tipos_declarados():
+    cat = StatementCatalog()
+    cat.register("uno", "SELECT ? , ?", (INT, NVARCHAR(20)))
+    cat.register("libre", "SELECT ?")
+    cat.register("fijo", "SELECT 1")
+
+    cursor = FakeCursor([(1,)])
+    assert cat.fetchone(cursor, "uno", (5, "x")) == (1,)
+    assert cursor.log[0] == ("sizes", [INT, NVARCHAR(20)])
+    assert cursor.log[1] == ("execute", "SELECT ? , ?", (5, "x"))
+
+    cursor = FakeCursor()
+    cat.execute(cursor, "libre", (7,))                 # sin tipos: se limpian los de la llamada anterior
+    cat.execute(cursor, "libre", (7,), types=(INT,))   # tipos de la llamada (p. ej. WHERE armado)
+    cat.execute(cursor, "fijo")                        # sin parámetros: no se toca setinputsizes
+    assert [e for e in cursor.log if e[0] == "sizes"] == [("sizes", None), ("sizes", [INT])]
+
+    cursor = FakeCursor()
+    cat.executemany(cursor, "uno", [(1, "a"), (2, "b")])
+    assert cursor.log == [("sizes", [INT, NVARCHAR(20)]), ("executemany", "SELECT ? , ?", 2)]
+
+    try:
+        cat.register("uno", "SELECT 2")
+        raise AssertionError("debió rechazar el nombre duplicado")
+    except ValueError:
+        pass
+
+
+def test_parts_completa_la_plantilla():
+    cat = StatementCatalog()
+    cat.register("lista", "SELECT {top} id FROM t {where} ORDER BY id")
+    cursor = FakeCursor()
+    cat.fetchall(cursor, "lista", (10, 3), types=(INT, INT), parts={"top": "TOP (?)", "where": "WHERE id > ?"})
+    assert cursor.log[-1] == ("execute", "SELECT TOP (?) id FROM t WHERE id > ? ORDER BY id", (10, 3))
+    assert cat.get("lista").render() == "SELECT {top} id FROM t {where} ORDER BY id"
+
+    # Las plantillas del catálogo real se completan con todas sus partes
+    sql = catalog.get("partidos.listado").render({"top": "TOP (?)", "where": "WHERE p.estado = ?"})
+    assert "{" not in sql and "TOP (?)" in sql and "WHERE p.estado = ?" in sql
+
+
+def test_metricas_por_sentencia():
+    cat = StatementCatalog()
+    cat.register("filas", "SELECT id FROM t")
+    cat.register("rota", "SELECT x")
+
+    for _ in range(3):
+        cat.fetchall(FakeCursor([(1,), (2,)]), "filas")
+    try:
+        cat.fetchall(FakeCursor(falla=True), "rota")
+    except pyodbc.Error:
+        pass
+
+    stats = {s["name"]: s for s in cat.stats()}
+    assert (stats["filas"]["calls"], stats["filas"]["rows"], stats["filas"]["errors"]) == (3, 6, 0)
+    assert (stats["rota"]["calls"], stats["rota"]["errors"], stats["rota"]["rows"]) == (1, 1, 0)
+    assert sum(stats["filas"]["histogram"].values()) == 3
+    assert stats["filas"]["histogram"][f"<={LATENCY_BUCKETS_MS[0]}ms"] == 3   # sin base: menos de 1 ms
+    assert stats["filas"]["p50Ms"] == LATENCY_BUCKETS_MS[0]
+
+    cat.reset()
+    assert all(s["calls"] == 0 and s["p50Ms"] is None for s in cat.stats())
+
+
+def test_start_partido_envia_fecha():
+    """partido.crear declara DATETIME2: /start debe pasar un datetime, no isoformat()"""
+    assert catalog.get("partido.crear").types[2] == DATETIME2
+    creados = []
+
+    class FakeAsyncDataAccess:
+        async def create_partido(self, partido):
+            creados.append(partido)
+            return 42
+
+        async def get_equipos_basicos(self, ids):
+            return {}
+
+    app = FastAPI()
+    app.include_router(partido_controller.router)
+    app.dependency_overrides[get_async_partido_data_access] = FakeAsyncDataAccess
+    r = TestClient(app).post("/api/admin/partidos/start", json={"equipoLocalId": 1, "equipoVisitanteId": 2})
+    assert r.status_code == 200 and r.json()["partidoId"] == 42
+    assert isinstance(creados[0].fecha_hora_inicio, datetime)
+
+
+def main():
+    print("🚀 Pruebas del catálogo de sentencias SQL")
+    print("=" * 50)
+    for test in (test_enlaza_tipos_declarados, test_parts_completa_la_plantilla, test_metricas_por_sentencia,
+                 test_start_partido_envia_fecha):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -89,6 +89,44 @@ IF NOT EXISTS (
 )
 CREATE INDEX IX_Partido_Equipos ON dbo.Partido(equipo_local_id, equipo_visitante_id);
 GO
+-- listados paginados por keyset (fecha_creacion DESC, partido_id DESC)
+IF NOT EXISTS (
+  SELECT 1 FROM sys.indexes
+  WHERE name = 'IX_Partido_Creacion'
+    AND object_id = OBJECT_ID('dbo.Partido')
+)
+CREATE INDEX IX_Partido_Creacion ON dbo.Partido(fecha_creacion DESC, partido_id DESC);
+GO
+IF NOT EXISTS (
+  SELECT 1 FROM sys.indexes
+  WHERE name = 'IX_Partido_Estado_Creacion'
+    AND object_id = OBJECT_ID('dbo.Partido')
+)
+CREATE INDEX IX_Partido_Estado_Creacion ON dbo.Partido(estado, fecha_creacion DESC, partido_id DESC);
+GO
+-- filtro por equipo: OR entre local y visitante (unión de ambos índices)
+IF NOT EXISTS (
+  SELECT 1 FROM sys.indexes
+  WHERE name = 'IX_Partido_Local_Creacion'
+    AND object_id = OBJECT_ID('dbo.Partido')
+)
+CREATE INDEX IX_Partido_Local_Creacion ON dbo.Partido(equipo_local_id, fecha_creacion DESC, partido_id DESC);
+GO
+IF NOT EXISTS (
+  SELECT 1 FROM sys.indexes
+  WHERE name = 'IX_Partido_Visitante_Creacion'
+    AND object_id = OBJECT_ID('dbo.Partido')
+)
+CREATE INDEX IX_Partido_Visitante_Creacion ON dbo.Partido(equipo_visitante_id, fecha_creacion DESC, partido_id DESC);
+GO
+-- filtro por rango de fecha de juego y sede
+IF NOT EXISTS (
+  SELECT 1 FROM sys.indexes
+  WHERE name = 'IX_Partido_Inicio'
+    AND object_id = OBJECT_ID('dbo.Partido')
+)
+CREATE INDEX IX_Partido_Inicio ON dbo.Partido(fecha_hora_inicio) INCLUDE (sede, estado, fecha_creacion);
+GO
 
 /* =========================================================
    CUARTO
@@ -159,6 +197,14 @@ IF NOT EXISTS (
 )
 CREATE INDEX IX_Anotacion_Partido_Cuarto ON dbo.Anotacion(partido_id, cuarto_id);
 GO
+-- marcador por partido/equipo (vw_MarcadorPartido) sin lookups
+IF NOT EXISTS (
+  SELECT 1 FROM sys.indexes
+  WHERE name = 'IX_Anotacion_Partido_Equipo'
+    AND object_id = OBJECT_ID('dbo.Anotacion')
+)
+CREATE INDEX IX_Anotacion_Partido_Equipo ON dbo.Anotacion(partido_id, equipo_id) INCLUDE (puntos);
+GO
 
 /* =========================================================
    FALTA (sin libre_convertido ni comentarios)
@@ -241,6 +287,28 @@ ALTER TABLE dbo.CronometroEvento ADD CONSTRAINT CK_Crono_Tipo
   CHECK (tipo IN (N'inicio',N'pausa',N'reanudar',N'fin',N'prorroga',N'descanso',N'medio',N'reiniciar'));
 GO
 
+/* =========================================================
+   EVENTO PARTIDO (eventos de la mesa de control: idempotencia y orden)
+   Cada anotación/falta/tiempo muerto enviado con evento_id y seq deja
+   aquí su fila en la misma transacción; las claves únicas impiden
+   aplicar dos veces un reintento o reutilizar una secuencia.
+   --------------------------------------------------------- */
+IF OBJECT_ID('dbo.EventoPartido','U') IS NULL
+CREATE TABLE dbo.EventoPartido(
+  evento_partido_id BIGINT IDENTITY(1,1) PRIMARY KEY,
+  partido_id        INT NOT NULL,
+  evento_id         UNIQUEIDENTIFIER NOT NULL,
+  seq               INT NOT NULL CONSTRAINT CK_EventoPartido_Seq CHECK (seq >= 1),
+  tipo              NVARCHAR(20) NOT NULL
+    CONSTRAINT CK_EventoPartido_Tipo CHECK (tipo IN (N'anotacion',N'falta',N'tiempo_muerto')),
+  creado_en         DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+  CONSTRAINT FK_EventoPartido_Partido FOREIGN KEY (partido_id)
+    REFERENCES dbo.Partido(partido_id) ON DELETE CASCADE,
+  CONSTRAINT UQ_EventoPartido_Evento UNIQUE (partido_id, evento_id),
+  CONSTRAINT UQ_EventoPartido_Seq UNIQUE (partido_id, seq)
+);
+GO
+
 /* =========================================================
    ROSTER POR PARTIDO (convocados)
    --------------------------------------------------------- */
@@ -333,6 +401,118 @@ LEFT JOIN dbo.Anotacion a ON a.partido_id = p.partido_id
 GROUP BY p.partido_id, p.equipo_local_id, p.equipo_visitante_id;
 GO
 
+/* =========================================================
+   MARCADOR MANTENIDO (contadores por partido y por cuarto)
+   Se actualiza en la misma transacción de cada INSERT/DELETE
+   en dbo.Anotacion; cuarto_id = 0 agrupa anotaciones sin cuarto.
+   Reparación: python -m app.commands.rebuild_marcador
+   --------------------------------------------------------- */
+-- Al crearlas se cargan desde dbo.Anotacion (bases existentes): el trigger sólo
+-- suma deltas, así que unos contadores vacíos quedarían mal para siempre.
+IF OBJECT_ID('dbo.MarcadorCuarto','U') IS NULL
+BEGIN
+  CREATE TABLE dbo.MarcadorCuarto(
+    partido_id       INT NOT NULL,
+    cuarto_id        INT NOT NULL,
+    puntos_local     INT NOT NULL DEFAULT 0,
+    puntos_visitante INT NOT NULL DEFAULT 0,
+    CONSTRAINT PK_MarcadorCuarto PRIMARY KEY (partido_id, cuarto_id),
+    CONSTRAINT FK_MarcadorCuarto_Partido FOREIGN KEY (partido_id)
+      REFERENCES dbo.Partido(partido_id) ON DELETE CASCADE
+  );
+
+  INSERT INTO dbo.MarcadorCuarto (partido_id, cuarto_id, puntos_local, puntos_visitante)
+  SELECT
+    a.partido_id,
+    ISNULL(a.cuarto_id, 0),
+    SUM(CASE WHEN a.equipo_id = p.equipo_local_id     THEN a.puntos ELSE 0 END),
+    SUM(CASE WHEN a.equipo_id = p.equipo_visitante_id THEN a.puntos ELSE 0 END)
+  FROM dbo.Anotacion a WITH (TABLOCK, HOLDLOCK)
+  JOIN dbo.Partido p ON p.partido_id = a.partido_id
+  GROUP BY a.partido_id, ISNULL(a.cuarto_id, 0);
+END;
+GO
+IF OBJECT_ID('dbo.MarcadorTotal','U') IS NULL
+BEGIN
+  CREATE TABLE dbo.MarcadorTotal(
+    partido_id       INT NOT NULL PRIMARY KEY,
+    puntos_local     INT NOT NULL DEFAULT 0,
+    puntos_visitante INT NOT NULL DEFAULT 0,
+    CONSTRAINT FK_MarcadorTotal_Partido FOREIGN KEY (partido_id)
+      REFERENCES dbo.Partido(partido_id) ON DELETE CASCADE
+  );
+
+  INSERT INTO dbo.MarcadorTotal (partido_id, puntos_local, puntos_visitante)
+  SELECT
+    a.partido_id,
+    SUM(CASE WHEN a.equipo_id = p.equipo_local_id     THEN a.puntos ELSE 0 END),
+    SUM(CASE WHEN a.equipo_id = p.equipo_visitante_id THEN a.puntos ELSE 0 END)
+  FROM dbo.Anotacion a WITH (TABLOCK, HOLDLOCK)
+  JOIN dbo.Partido p ON p.partido_id = a.partido_id
+  GROUP BY a.partido_id;
+END;
+GO
+
+IF OBJECT_ID('dbo.trg_Anotacion_Marcador','TR') IS NOT NULL
+  DROP TRIGGER dbo.trg_Anotacion_Marcador;
+GO
+CREATE TRIGGER dbo.trg_Anotacion_Marcador
+ON dbo.Anotacion
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+  SET NOCOUNT ON;
+
+  DECLARE @delta TABLE(
+    partido_id INT NOT NULL,
+    cuarto_id  INT NOT NULL,
+    local      INT NOT NULL,
+    visitante  INT NOT NULL,
+    PRIMARY KEY (partido_id, cuarto_id)
+  );
+
+  INSERT INTO @delta(partido_id, cuarto_id, local, visitante)
+  SELECT
+    d.partido_id,
+    d.cuarto_id,
+    SUM(CASE WHEN d.equipo_id = p.equipo_local_id     THEN d.puntos ELSE 0 END),
+    SUM(CASE WHEN d.equipo_id = p.equipo_visitante_id THEN d.puntos ELSE 0 END)
+  FROM (
+    SELECT partido_id, ISNULL(cuarto_id, 0) AS cuarto_id, equipo_id, CAST(puntos AS INT) AS puntos FROM inserted
+    UNION ALL
+    SELECT partido_id, ISNULL(cuarto_id, 0), equipo_id, -CAST(puntos AS INT) FROM deleted
+  ) AS d
+  JOIN dbo.Partido p ON p.partido_id = d.partido_id
+  GROUP BY d.partido_id, d.cuarto_id;
+
+  IF NOT EXISTS (SELECT 1 FROM @delta) RETURN;
+
+  MERGE dbo.MarcadorCuarto WITH (HOLDLOCK) AS t
+  USING @delta AS s
+    ON t.partido_id = s.partido_id AND t.cuarto_id = s.cuarto_id
+  WHEN MATCHED THEN
+    UPDATE SET puntos_local     = t.puntos_local + s.local,
+               puntos_visitante = t.puntos_visitante + s.visitante
+  WHEN NOT MATCHED THEN
+    INSERT (partido_id, cuarto_id, puntos_local, puntos_visitante)
+    VALUES (s.partido_id, s.cuarto_id, s.local, s.visitante);
+
+  MERGE dbo.MarcadorTotal WITH (HOLDLOCK) AS t
+  USING (
+    SELECT partido_id, SUM(local) AS local, SUM(visitante) AS visitante
+    FROM @delta
+    GROUP BY partido_id
+  ) AS s
+    ON t.partido_id = s.partido_id
+  WHEN MATCHED THEN
+    UPDATE SET puntos_local     = t.puntos_local + s.local,
+               puntos_visitante = t.puntos_visitante + s.visitante
+  WHEN NOT MATCHED THEN
+    INSERT (partido_id, puntos_local, puntos_visitante)
+    VALUES (s.partido_id, s.local, s.visitante);
+END;
+GO
+
 
 
 --ESTO ES LO QUE ESTOY AGREGANDO ADICIONALMENTE